@@ -1,4 +1,5 @@
 from .client import A2AClient
 from .card_resolver import A2ACardResolver
+from .transport import A2ATransportPool, get_transport_pool, shutdown_transport_pool
 
-__all__ = ["A2AClient", "A2ACardResolver"]
+__all__ = ["A2AClient", "A2ACardResolver", "A2ATransportPool", "get_transport_pool", "shutdown_transport_pool"]
\ No newline at end of file
@@ -22,6 +22,7 @@ from agent.a2a.common.types import (
     SendTaskStreamingResponse,
 )
 import json
+from agent.a2a.common.client.transport import A2ATransportPool, get_transport_pool
 from utils.logger_helper import logger_helper as logger
 
 
@@ -31,6 +32,7 @@ class A2AClient:
         agent_card: AgentCard = None,
         url: str = None,
         timeout: httpx.Timeout | float | None = None,
+        transport: A2ATransportPool | None = None,
     ):
         if agent_card:
             self.url = agent_card.url
@@ -41,6 +43,8 @@ class A2AClient:
 
         self._timeout = self._normalize_timeout(timeout)
         self._trust_env = not self._should_bypass_proxy(self.url)
+        # Keep-alive connections shared per recipient across all A2AClient instances
+        self._transport = transport or get_transport_pool()
 
     def set_recipient(self, agent_card: AgentCard = None, url: str = None):
         if agent_card:
@@ -52,93 +56,105 @@ class A2AClient:
 
         self._trust_env = not self._should_bypass_proxy(self.url)
 
-    async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
+    async def send_task(self, payload: dict[str, Any], url: str = None) -> SendTaskResponse:
+        """Send a task to `url` (default: the current recipient).
+
+        Passing `url` instead of calling set_recipient() first is safe when one
+        client fans out to several agents concurrently.
+        """
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return SendTaskResponse(**await self._send_request(request, url))
 
-    def sync_send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
+    def sync_send_task(self, payload: dict[str, Any], url: str = None) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**self._sync_send_request(request))
+        return SendTaskResponse(**self._sync_send_request(request, url))
 
     async def send_task_streaming(
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None, trust_env=self._trust_env) as client:
-            with connect_sse(
-                client, "POST", self.url, json=request.model_dump()
-            ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(503, str(e)) from e
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=self._timeout, trust_env=self._trust_env) as client:
+        client = self._transport.get_sync_client(self.url, self._trust_env)
+        with connect_sse(
+            client, "POST", self.url, json=request.model_dump(), timeout=None
+        ) as event_source:
             try:
-                # Image generation could take time, adding timeout
-                logger.debug("A2A URL:", self.url, request.model_dump())
-                response = await client.post(
-                    self.url, json=request.model_dump()
-                )
-                logger.debug("response recevied from server:", type(response), response)
-                response.raise_for_status()
-                logger.debug("etc response", response)
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except httpx.ReadTimeout as e:
-                timeout_value = getattr(self._timeout, "read", None) or getattr(
-                    self._timeout, "timeout", None
-                )
-                logger.error(
-                    f"[ASYNC] Request Timeout after {timeout_value if timeout_value is not None else 'configured'} seconds: {e}"
-                )
-                raise A2AClientHTTPError(504, "Request timed out") from e
-            except httpx.RequestError as e:
-                logger.error(f"[ASYNC] Request Error: {e}")
-                raise A2AClientHTTPError(503, str(e)) from e
+                for sse in event_source.iter_sse():
+                    yield SendTaskStreamingResponse(**json.loads(sse.data))
             except json.JSONDecodeError as e:
                 raise A2AClientJSONError(str(e)) from e
-
-    def _sync_send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        with httpx.Client(timeout=self._timeout, trust_env=self._trust_env) as client:
-            try:
-                # Image generation could take time, adding timeout
-                logger.debug("[SYNC] A2A URL:", self.url, request.model_dump())
-                response = client.post(
-                    self.url, json=request.model_dump()
-                )
-                logger.debug("[SYNC] response received from server:", type(response), response)
-                
-                # 检查响应状态码
-                if response.status_code != 200:
-                    logger.error(f"[SYNC] HTTP {response.status_code}: {response.text}")
-                    raise A2AClientHTTPError(response.status_code, f"HTTP {response.status_code}: {response.text}")
-                
-                response.raise_for_status()
-                logger.debug("[SYNC] response", response)
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"[SYNC] HTTP Status Error: {e.response.status_code} - {e.response.text}")
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except httpx.ReadTimeout as e:
-                timeout_value = getattr(self._timeout, "read", None) or getattr(
-                    self._timeout, "timeout", None
-                )
-                logger.error(
-                    f"[SYNC] Request Timeout after {timeout_value if timeout_value is not None else 'configured'} seconds: {e}"
-                )
-                raise A2AClientHTTPError(504, "Request timed out") from e
             except httpx.RequestError as e:
-                logger.error(f"[SYNC] Request Error: {e}")
                 raise A2AClientHTTPError(503, str(e)) from e
-            except json.JSONDecodeError as e:
-                logger.error(f"[SYNC] JSON Decode Error: {e}")
-                raise A2AClientJSONError(str(e)) from e
+
+    def _resolve_recipient(self, url: str | None) -> tuple[str, bool]:
+        if url is None or url == self.url:
+            return self.url, self._trust_env
+        return url, not self._should_bypass_proxy(url)
+
+    async def _send_request(self, request: JSONRPCRequest, url: str = None) -> dict[str, Any]:
+        url, trust_env = self._resolve_recipient(url)
+        client = self._transport.get_async_client(url, trust_env)
+        try:
+            # Image generation could take time, adding timeout
+            logger.debug("A2A URL:", url, request.model_dump())
+            response = await client.post(
+                url, json=request.model_dump(), timeout=self._timeout
+            )
+            logger.debug("response recevied from server:", type(response), response)
+            response.raise_for_status()
+            logger.debug("etc response", response)
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.ReadTimeout as e:
+            timeout_value = getattr(self._timeout, "read", None) or getattr(
+                self._timeout, "timeout", None
+            )
+            logger.error(
+                f"[ASYNC] Request Timeout after {timeout_value if timeout_value is not None else 'configured'} seconds: {e}"
+            )
+            raise A2AClientHTTPError(504, "Request timed out") from e
+        except httpx.RequestError as e:
+            logger.error(f"[ASYNC] Request Error: {e}")
+            raise A2AClientHTTPError(503, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+    def _sync_send_request(self, request: JSONRPCRequest, url: str = None) -> dict[str, Any]:
+        url, trust_env = self._resolve_recipient(url)
+        client = self._transport.get_sync_client(url, trust_env)
+        try:
+            # Image generation could take time, adding timeout
+            logger.debug("[SYNC] A2A URL:", url, request.model_dump())
+            response = client.post(
+                url, json=request.model_dump(), timeout=self._timeout
+            )
+            logger.debug("[SYNC] response received from server:", type(response), response)
+            
+            # 检查响应状态码
+            if response.status_code != 200:
+                logger.error(f"[SYNC] HTTP {response.status_code}: {response.text}")
+                raise A2AClientHTTPError(response.status_code, f"HTTP {response.status_code}: {response.text}")
+            
+            response.raise_for_status()
+            logger.debug("[SYNC] response", response)
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"[SYNC] HTTP Status Error: {e.response.status_code} - {e.response.text}")
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.ReadTimeout as e:
+            timeout_value = getattr(self._timeout, "read", None) or getattr(
+                self._timeout, "timeout", None
+            )
+            logger.error(
+                f"[SYNC] Request Timeout after {timeout_value if timeout_value is not None else 'configured'} seconds: {e}"
+            )
+            raise A2AClientHTTPError(504, "Request timed out") from e
+        except httpx.RequestError as e:
+            logger.error(f"[SYNC] Request Error: {e}")
+            raise A2AClientHTTPError(503, str(e)) from e
+        except json.JSONDecodeError as e:
+            logger.error(f"[SYNC] JSON Decode Error: {e}")
+            raise A2AClientJSONError(str(e)) from e
 
     @staticmethod
     def _normalize_timeout(timeout: httpx.Timeout | float | None) -> httpx.Timeout:
@@ -0,0 +1,129 @@
+"""
+Shared, connection-pooled HTTP transport for A2A clients.
+
+Every A2AClient used to open a fresh httpx client per request, paying TCP (and
+TLS) setup for each agent-to-agent message. The pool keeps one long-lived
+httpx client per recipient (scheme://host:port) with HTTP keep-alive, and
+HTTP/2 when the optional `h2` package is installed, so repeated sends to the
+same agent reuse warm connections.
+
+httpx.AsyncClient connections are bound to the event loop that opened them and
+the app runs several loops (Qt main loop, worker threads), so async clients are
+kept per event loop; sync clients are shared across threads. Timeouts are
+passed per request, so clients with different timeouts share connections.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from utils.logger_helper import logger_helper as logger
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Per recipient: a group fan-out sends one request to each agent, but a busy
+# agent may receive many concurrent tasks from the same sender
+DEFAULT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=8, keepalive_expiry=60.0)
+
+_ClientKey = Tuple[str, bool]
+
+
+def recipient_key(url: str) -> str:
+    """Connection pool key for a recipient URL: normalized scheme://host:port"""
+    parts = urlsplit(url)
+    scheme = (parts.scheme or "http").lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return f"{scheme}://{(parts.hostname or '').lower()}:{port}"
+
+
+class A2ATransportPool:
+    """Long-lived httpx clients keyed by recipient, shared by all A2AClient instances."""
+
+    def __init__(self, limits: Optional[httpx.Limits] = None, http2: bool = True):
+        self._limits = limits or DEFAULT_LIMITS
+        self._http2 = http2 and HTTP2_AVAILABLE
+        self._lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ClientKey, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+        self._sync_clients: Dict[_ClientKey, httpx.Client] = {}
+
+    def get_async_client(self, url: str, trust_env: bool = True) -> httpx.AsyncClient:
+        """Pooled AsyncClient for `url`'s recipient on the running event loop"""
+        loop = asyncio.get_running_loop()
+        key = (recipient_key(url), trust_env)
+        with self._lock:
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                clients = self._async_clients[loop] = {}
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=self._limits, http2=self._http2, trust_env=trust_env)
+                clients[key] = client
+                logger.debug(f"[A2ATransport] New async connection pool for {key[0]} (http2={self._http2})")
+            return client
+
+    def get_sync_client(self, url: str, trust_env: bool = True) -> httpx.Client:
+        """Pooled (thread-safe) Client for `url`'s recipient"""
+        key = (recipient_key(url), trust_env)
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(limits=self._limits, http2=self._http2, trust_env=trust_env)
+                self._sync_clients[key] = client
+                logger.debug(f"[A2ATransport] New sync connection pool for {key[0]} (http2={self._http2})")
+            return client
+
+    async def aclose(self):
+        """Close the async clients of the running event loop (call before the loop stops)"""
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def close(self):
+        """Close all sync clients"""
+        with self._lock:
+            clients, self._sync_clients = self._sync_clients, {}
+        for client in clients.values():
+            client.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "async_loops": len(self._async_clients),
+                "async_recipients": sum(len(c) for c in self._async_clients.values()),
+                "sync_recipients": len(self._sync_clients),
+                "http2": self._http2,
+            }
+
+
+_transport_pool: Optional[A2ATransportPool] = None
+_transport_pool_lock = threading.Lock()
+
+
+def get_transport_pool() -> A2ATransportPool:
+    """Process-wide transport pool used by A2AClient by default"""
+    global _transport_pool
+    if _transport_pool is None:
+        with _transport_pool_lock:
+            if _transport_pool is None:
+                _transport_pool = A2ATransportPool()
+    return _transport_pool
+
+
+def shutdown_transport_pool():
+    """Close the process-wide pool's sync clients; the next get_transport_pool() starts a new one"""
+    global _transport_pool
+    with _transport_pool_lock:
+        pool, _transport_pool = _transport_pool, None
+    if pool is not None:
+        pool.close()
@@ -1,4 +1,5 @@
 from .server import A2AServer
 from .task_manager import TaskManager, InMemoryTaskManager
+from .gateway import A2AGateway, a2a_gateway_enabled, get_a2a_gateway
 
-__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager"]
+__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager", "A2AGateway", "a2a_gateway_enabled", "get_a2a_gateway"]
@@ -0,0 +1,201 @@
+"""
+Shared A2A gateway: one ASGI server / port hosting every local agent's A2A endpoints.
+
+Each EC_Agent used to run its own A2AServer (uvicorn server, thread, event loop
+and port). With the gateway enabled (ECAN_A2A_GATEWAY=1) agents register their
+A2AServer here instead and are reached by path:
+
+    POST /agents/<agent_id>/a2a/                      -> A2AServer._process_request
+    GET  /agents/<agent_id>/.well-known/agent.json    -> agent card
+    GET  /agents/<agent_id>/ping                      -> health check
+
+or by header, for callers that only know the gateway address:
+
+    POST /a2a/ and GET /.well-known/agent.json with "X-A2A-Agent: <agent_id>"
+
+Requests are handed to the registered A2AServer's own handlers, so agent cards
+and task manager semantics are unchanged. Agents can be registered and
+unregistered at any time; the routing table is looked up per request.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import quote, urlsplit
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from agent.a2a.common.server.server import A2AServer
+from utils.logger_helper import logger_helper as logger
+
+AGENT_HEADER = "X-A2A-Agent"
+AGENT_PREFIX = "/agents"
+DEFAULT_GATEWAY_PORT = 3600
+
+
+def a2a_gateway_enabled() -> bool:
+    """Whether local agents share the A2A gateway instead of one server per agent"""
+    return os.environ.get("ECAN_A2A_GATEWAY", "0").lower() in ("1", "true", "yes", "on")
+
+
+def agent_url(base_url: str, agent_id: str) -> str:
+    """Card URL of `agent_id` on the gateway reachable at `base_url` (scheme://host:port[/...])"""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}{AGENT_PREFIX}/{quote(agent_id, safe='')}"
+
+
+class A2AGateway:
+    def __init__(self, host="0.0.0.0", port=DEFAULT_GATEWAY_PORT, endpoint="/a2a/"):
+        self.host = host
+        self.port = port
+        self.endpoint = endpoint
+        self._servers: Dict[str, A2AServer] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+        agent_path = AGENT_PREFIX + "/{agent_id}"
+        self.app = Starlette(routes=[
+            Route(agent_path + endpoint, self._process_request, methods=["POST"]),
+            Route(agent_path + "/.well-known/agent.json", self._get_agent_card, methods=["GET"]),
+            Route(agent_path + "/ping", self._agent_health_check, methods=["GET"]),
+            Route(endpoint, self._process_request, methods=["POST"]),
+            Route("/.well-known/agent.json", self._get_agent_card, methods=["GET"]),
+            Route("/ping", self._health_check, methods=["GET"]),
+        ])
+
+    # ------------------------------------------------------------------ registry
+
+    def register(self, agent_id: str, server: A2AServer):
+        """Serve `server`'s endpoints for `agent_id`, replacing any previous registration"""
+        if server.agent_card is None:
+            raise ValueError("agent_card is not defined")
+        if server.task_manager is None:
+            raise ValueError("request_handler is not defined")
+        with self._lock:
+            self._servers[agent_id] = server
+        logger.info(f"[A2AGateway] ➕ Registered agent {agent_id} ({len(self._servers)} hosted)")
+
+    def unregister(self, agent_id: str) -> bool:
+        with self._lock:
+            removed = self._servers.pop(agent_id, None) is not None
+        if removed:
+            logger.info(f"[A2AGateway] ➖ Unregistered agent {agent_id} ({len(self._servers)} hosted)")
+        return removed
+
+    def agent_ids(self):
+        with self._lock:
+            return list(self._servers)
+
+    def _resolve(self, request: Request) -> Optional[A2AServer]:
+        agent_id = request.path_params.get("agent_id") or request.headers.get(AGENT_HEADER)
+        if not agent_id:
+            return None
+        with self._lock:
+            return self._servers.get(agent_id)
+
+    # ------------------------------------------------------------------ handlers
+    # The card / ping handlers are trivial, so they are async to stay off Starlette's threadpool
+
+    def _unknown_agent(self, request: Request) -> JSONResponse:
+        agent_id = request.path_params.get("agent_id") or request.headers.get(AGENT_HEADER)
+        message = f"Unknown agent: {agent_id}" if agent_id else f"Missing agent id (path or {AGENT_HEADER} header)"
+        return JSONResponse({"error": message}, status_code=404)
+
+    async def _process_request(self, request: Request):
+        server = self._resolve(request)
+        if server is None:
+            return self._unknown_agent(request)
+        return await server._process_request(request)
+
+    async def _get_agent_card(self, request: Request) -> JSONResponse:
+        server = self._resolve(request)
+        if server is None:
+            return self._unknown_agent(request)
+        return server._get_agent_card(request)
+
+    async def _agent_health_check(self, request: Request) -> JSONResponse:
+        server = self._resolve(request)
+        if server is None:
+            return self._unknown_agent(request)
+        return server._health_check(request)
+
+    async def _health_check(self, request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", "agents": len(self._servers)})
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float = 10.0) -> bool:
+        """Start the gateway in a daemon thread (no-op if running); returns once it accepts connections"""
+        import uvicorn
+
+        with self._lock:
+            if self.running:
+                return True
+            config = uvicorn.Config(self.app, host=self.host or "127.0.0.1", port=self.port,
+                                    log_level="warning", log_config=None)
+            self._server = uvicorn.Server(config)
+            # Disable signal handlers for daemon threads
+            if hasattr(self._server, "install_signal_handlers"):
+                self._server.install_signal_handlers = False
+            self._thread = threading.Thread(target=self._run, name="A2A-Gateway", daemon=True)
+            self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                logger.error(f"[A2AGateway] ❌ Gateway failed to start on port {self.port}")
+                return False
+            time.sleep(0.01)
+        logger.info(f"[A2AGateway] ✅ Gateway listening on {self.host}:{self.port}")
+        return True
+
+    def _run(self):
+        import asyncio
+
+        # Run server with dedicated event loop
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._server.serve())
+        except Exception as e:
+            logger.error(f"[A2AGateway] A2A gateway failed on port {self.port}: {e}")
+        finally:
+            loop.close()
+
+    def stop(self, timeout: float = 5.0):
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+_gateway: Optional[A2AGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_a2a_gateway(port_factory=None) -> A2AGateway:
+    """
+    Process-wide gateway. The port comes from ECAN_A2A_GATEWAY_PORT, else from
+    `port_factory()` (e.g. the main window's agent port allocator) on first use,
+    else DEFAULT_GATEWAY_PORT.
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            port = os.environ.get("ECAN_A2A_GATEWAY_PORT")
+            if port:
+                port = int(port)
+            elif port_factory is not None:
+                port = port_factory()
+            _gateway = A2AGateway(port=port or DEFAULT_GATEWAY_PORT)
+        return _gateway
@@ -3,6 +3,7 @@ import traceback
 import socket
 
 from utils.logger_helper import logger_helper as logger
+from agent.a2a.common.server.gateway import a2a_gateway_enabled, get_a2a_gateway
 
 def get_lan_ip():
     try:
@@ -27,6 +28,11 @@ def get_a2a_server_url(mainwin):
     """
     try:
         host = get_lan_ip()
+        if a2a_gateway_enabled():
+            # All local agents share the gateway's port; EC_Agent appends the per-agent path
+            gateway = get_a2a_gateway(port_factory=lambda: mainwin.get_free_agent_ports(1)[0])
+            return f"http://{host}:{gateway.port}"
+
         # Use thread-safe port allocator - it has its own lock
         free_ports = mainwin.get_free_agent_ports(1)
         logger.debug(f"Getting a2a server ports: {host}, {free_ports}")
@@ -506,9 +506,9 @@ class UnifiedMessenger:
                 metadata=metadata
             )
             
-            # Send via A2A client
-            self._a2a_client.set_recipient(url=url)
-            response = await self._a2a_client.send_task(payload.model_dump())
+            # Send via A2A client; the URL is per call (not set_recipient) so
+            # concurrent group sends don't race on the shared client
+            response = await self._a2a_client.send_task(payload.model_dump(), url=url)
             
             logger.debug(f"[UnifiedMessenger] LAN send success to {recipient_id}")
             return {"transport": "lan", "response": response}
@@ -539,8 +539,7 @@ class UnifiedMessenger:
                 metadata=metadata
             )
             
-            self._a2a_client.set_recipient(url=url)
-            response = self._a2a_client.sync_send_task(payload.model_dump())
+            response = self._a2a_client.sync_send_task(payload.model_dump(), url=url)
             
             logger.debug(f"[UnifiedMessenger] LAN send (sync) success to {recipient_id}")
             return {"transport": "lan", "response": response}
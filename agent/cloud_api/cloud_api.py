@@ -2063,6 +2063,10 @@ def send_completion_status_to_cloud(session, taskStats, token, endpoint, full=Tr
 
 
 # =================================================================================================
+class CloudRequestError(Exception):
+    """The AppSync request itself failed (no answer from the cloud: network, timeout)"""
+
+
 # Helper function for safe JSON parsing
 def safe_parse_response(jresp, operation_name, data_key):
     """
@@ -2100,6 +2104,8 @@ def safe_parse_response(jresp, operation_name, data_key):
             # No data and errors - this is a failure
             logger.error(f"❌ GraphQL Error: {error_message}")
             logger.error(f"📋 Full error response: {json.dumps(jresp, ensure_ascii=False)}")
+            if errors and errors[0].get("errorType") == "RequestError":
+                raise CloudRequestError(f"{operation_name} failed: {error_message}")
             raise Exception(f"{operation_name} failed: {error_message}")
     else:
         if response_data is not None:
@@ -99,7 +99,8 @@ class CloudAPIService:
             timeout: Request timeout in seconds, None uses default
             
         Returns:
-            Sync result {'success': bool, 'synced': int, 'failed': int, 'errors': []}
+            Sync result {'success': bool, 'synced': int, 'failed': int, 'errors': []};
+            'rejected': True when the cloud answered but refused the items
         """
         token = self._get_auth_token()
         if not token:
@@ -167,7 +168,8 @@ class CloudAPIService:
                     'synced': 0,
                     'failed': len(local_items),
                     'errors': [error_msg],
-                    'response': result
+                    'response': result,
+                    'rejected': True
                 }
             
             # Check if response is successful (may not have explicit success flag)
@@ -179,7 +181,8 @@ class CloudAPIService:
                     'success': False,
                     'synced': 0,
                     'failed': len(local_items),
-                    'errors': [error_msg]
+                    'errors': [error_msg],
+                    'rejected': True
                 }
             
             if not isinstance(result, dict):
@@ -204,11 +207,14 @@ class CloudAPIService:
             logger.error(f"[CloudAPIService] ❌ Exception during sync {self.data_type}(s): {error_msg}")
             logger.error(f"[CloudAPIService] Traceback: {traceback.format_exc()}")
             
+            from agent.cloud_api.cloud_api import CloudRequestError
             return {
                 'success': False,
                 'synced': 0,
                 'failed': len(local_items),
-                'errors': [error_msg]
+                'errors': [error_msg],
+                # GraphQL errors mean the cloud refused these items; request errors mean it wasn't reached
+                'rejected': not isinstance(e, (CloudRequestError, requests.RequestException))
             }
     
     def _prepare_delete_items(self, cloud_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -14,7 +14,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Union
 from utils.logger_helper import logger_helper as logger
 from agent.cloud_api.cloud_api_service import get_cloud_service
-from agent.cloud_api.offline_sync_queue import get_offline_sync_queue
+from agent.cloud_api.offline_sync_queue import OfflineSyncQueue, get_offline_sync_queue
 from agent.cloud_api.constants import DataType, Operation
 
 
@@ -24,9 +24,9 @@ class OfflineSyncManager:
     # Configuration variable for offline sync control
     OFFLINE_SYNC_ENABLED = False  # 启用/禁用离线同步功能
     
-    def __init__(self):
-        """Initialize offline sync manager"""
-        self.sync_queue = get_offline_sync_queue()
+    def __init__(self, sync_queue: Optional[OfflineSyncQueue] = None):
+        """Initialize offline sync manager (on the global queue unless one is given)"""
+        self.sync_queue = sync_queue or get_offline_sync_queue()
         self._retry_thread = None
         self._stop_retry = False
         
@@ -171,32 +171,35 @@ class OfflineSyncManager:
         # Submit to thread pool for execution
         self._executor.submit(_sync_task)
     
-    def sync_pending_queue(self, max_tasks: int = None, timeout_per_task: float = 10.0, include_failed: bool = True) -> Dict[str, Any]:
+    def sync_pending_queue(self, max_tasks: int = None, timeout_per_task: float = 10.0, include_failed: bool = True,
+                           batch_size: int = 25, max_parallel: int = 4) -> Dict[str, Any]:
         """
         Sync pending tasks in queue
-        
+
+        Tasks are uploaded as multi-item mutations, one per (data type, operation)
+        and up to batch_size items, with at most max_parallel batches in flight.
+        Tasks for the same resource are replayed in queue order. A batch the
+        cloud rejects is retried item by item, so one bad item doesn't fail the rest.
+
         Args:
             max_tasks: Maximum number of tasks to sync (None = all)
-            timeout_per_task: Timeout per task (seconds)
+            timeout_per_task: Timeout per request (seconds)
             include_failed: Whether to include failed tasks (default True)
-        
+            batch_size: Maximum items per mutation
+            max_parallel: Maximum concurrent mutations
+
         Returns:
             Dict: Sync result statistics
         """
-        # Get pending tasks
-        pending_tasks = self.sync_queue.get_pending_tasks()
-        
-        # If needed, also get failed tasks and retry
+        # If needed, move failed tasks back to pending queue and retry them
         if include_failed:
-            failed_tasks = self.sync_queue.get_failed_tasks()
-            if failed_tasks:
-                logger.info(f"[OfflineSyncManager] Found {len(failed_tasks)} failed tasks, will retry them")
-                # Move failed tasks back to pending queue
-                for task in failed_tasks:
-                    self.sync_queue.retry_failed_task(task['id'])
-                # Re-get pending tasks (now includes failed tasks)
-                pending_tasks = self.sync_queue.get_pending_tasks()
-        
+            retried = self.sync_queue.retry_all_failed()
+            if retried:
+                logger.info(f"[OfflineSyncManager] Found {retried} failed tasks, will retry them")
+
+        # Get pending tasks (limited, to avoid processing too many tasks at startup)
+        pending_tasks = self.sync_queue.get_pending_tasks(limit=max_tasks)
+
         if not pending_tasks:
             logger.info("[OfflineSyncManager] No pending tasks to sync")
             return {
@@ -205,56 +208,103 @@ class OfflineSyncManager:
                 'synced': 0,
                 'failed': 0
             }
-        
-        # Limit number of tasks (avoid processing too many tasks at startup)
-        if max_tasks and len(pending_tasks) > max_tasks:
-            logger.info(f"[OfflineSyncManager] Limiting sync to {max_tasks} tasks (total: {len(pending_tasks)})")
-            pending_tasks = pending_tasks[:max_tasks]
-        
-        logger.info(f"[OfflineSyncManager] Syncing {len(pending_tasks)} pending tasks (timeout: {timeout_per_task}s per task)...")
-        
+
+        rounds = self._plan_batches(pending_tasks, batch_size)
+        logger.info(f"[OfflineSyncManager] Syncing {len(pending_tasks)} pending tasks in "
+                    f"{sum(len(batches) for batches in rounds)} batches (timeout: {timeout_per_task}s per request)...")
+
         synced_count = 0
         failed_count = 0
-        import time
-        
-        for task in pending_tasks:
-            try:
-                data_type = task['data_type']
-                operation = task['operation']
-                data = task['data']
-                task_id = task['id']
-                
-                # Try sync (with specified timeout)
-                service = get_cloud_service(data_type)
-                result = service.sync_to_cloud([data], operation=operation, timeout=timeout_per_task)
-                
-                if result['success']:
-                    # Sync succeeded, remove from queue
-                    self.sync_queue.mark_success(task_id)
-                    synced_count += 1
-                    logger.info(f"[OfflineSyncManager] ✅ Queue task synced: {task_id}")
-                else:
-                    # Sync failed, mark as failed
-                    error = ', '.join(result.get('errors', ['Unknown error']))
-                    self.sync_queue.mark_failed(task_id, error)
-                    failed_count += 1
-                    logger.warning(f"[OfflineSyncManager] ⚠️ Queue task failed: {task_id}")
-                    
-            except Exception as e:
-                # Exception, mark as failed
-                self.sync_queue.mark_failed(task['id'], str(e))
-                failed_count += 1
-                logger.error(f"[OfflineSyncManager] ❌ Queue task error: {task['id']} - {e}")
-        
+        offline = threading.Event()
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix='CloudSyncReplay') as executor:
+            for batches in rounds:
+                results = executor.map(lambda batch: self._sync_batch(batch, timeout_per_task, offline), batches)
+                for synced, failed in results:
+                    synced_count += synced
+                    failed_count += failed
+                if offline.is_set():
+                    break
+
+        skipped_count = len(pending_tasks) - synced_count - failed_count
+        if skipped_count:
+            logger.warning(f"[OfflineSyncManager] Cloud unreachable, {skipped_count} tasks left queued for the next retry")
         logger.info(f"[OfflineSyncManager] Queue sync completed: {synced_count} synced, {failed_count} failed")
-        
+
         return {
             'success': True,
             'total': len(pending_tasks),
             'synced': synced_count,
-            'failed': failed_count
+            'failed': failed_count,
+            'skipped': skipped_count
         }
-    
+
+    @staticmethod
+    def _plan_batches(tasks: List[Dict[str, Any]], batch_size: int) -> List[List[List[Dict[str, Any]]]]:
+        """
+        Split tasks into rounds of batches
+
+        A resource's n-th task goes in round n, so e.g. a delete and a later
+        re-add of the same item are never sent in the same or reversed order.
+        Within a round, tasks are grouped by (data type, operation) and chunked.
+        """
+        round_of: Dict[tuple, int] = {}
+        rounds: List[Dict[tuple, List[Dict[str, Any]]]] = []
+        for task in tasks:
+            resource = (task['data_type'], task['data'].get('id') if isinstance(task['data'], dict) else None)
+            if resource[1] is None:
+                index = 0
+            else:
+                index = round_of.get(resource, -1) + 1
+                round_of[resource] = index
+            while len(rounds) <= index:
+                rounds.append({})
+            rounds[index].setdefault((task['data_type'], task['operation']), []).append(task)
+
+        size = max(1, batch_size)
+        return [
+            [group[i:i + size] for group in groups.values() for i in range(0, len(group), size)]
+            for groups in rounds
+        ]
+
+    def _sync_batch(self, batch: List[Dict[str, Any]], timeout: float, offline: threading.Event) -> tuple:
+        """Upload one batch; returns (synced, failed) counts, (0, 0) if skipped while offline"""
+        if offline.is_set():
+            return 0, 0
+        data_type = batch[0]['data_type']
+        operation = batch[0]['operation']
+        try:
+            service = get_cloud_service(data_type)
+            result = service.sync_to_cloud([task['data'] for task in batch], operation=operation, timeout=timeout)
+        except Exception as e:
+            result = {'success': False, 'errors': [str(e)]}
+
+        if result['success']:
+            # Sync succeeded, remove from queue (unless changed since it was read)
+            self.sync_queue.mark_success_many((task['id'], task.get('revision')) for task in batch)
+            logger.info(f"[OfflineSyncManager] ✅ Queue batch synced: {len(batch)} {data_type}.{operation}")
+            return len(batch), 0
+
+        if len(batch) > 1 and result.get('rejected'):
+            # The cloud refused the batch: find the bad item(s) without failing the rest
+            logger.warning(f"[OfflineSyncManager] ⚠️ Queue batch of {len(batch)} {data_type}.{operation} rejected, "
+                           f"retrying items individually")
+            synced = failed = 0
+            for task in batch:
+                s, f = self._sync_batch([task], timeout, offline)
+                synced += s
+                failed += f
+            return synced, failed
+
+        # Sync failed, mark as failed
+        error = ', '.join(result.get('errors') or ['Unknown error'])
+        for task in batch:
+            self.sync_queue.mark_failed(task['id'], error)
+        if not result.get('rejected'):
+            # No answer from the cloud (network, auth): don't send the remaining batches now
+            offline.set()
+        logger.warning(f"[OfflineSyncManager] ⚠️ Queue batch failed: {len(batch)} {data_type}.{operation} - {error}")
+        return 0, len(batch)
+
     # def load_from_cloud(self, username: str, data_types: Optional[List[str]] = None) -> Dict[str, Any]:
     #     """
     #     从云端加载数据
@@ -5,25 +5,55 @@ Provides offline caching and auto-sync functionality:
 1. When network is poor, cache sync requests locally
 2. When network recovers, auto-sync cached requests
 3. On startup, sync local cache first, then load from cloud
+
+Tasks are kept in a SQLite database (WAL journal), so queueing or resolving a
+task writes one row instead of rewriting the whole queue. Repeated changes to
+the same resource coalesce into one pending task carrying the latest state:
+an update folds into a pending add/update, and a delete replaces them.
+Queues saved by older versions as pending_sync.json / failed_sync.json are
+imported the first time the queue is opened.
 """
 
 import json
 import os
+import sqlite3
 import time
 import threading
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable
 from datetime import datetime
 from pathlib import Path
 from utils.logger_helper import logger_helper as logger
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_tasks (
+    seq           INTEGER PRIMARY KEY AUTOINCREMENT,
+    id            TEXT NOT NULL UNIQUE,
+    data_type     TEXT NOT NULL,
+    operation     TEXT NOT NULL,
+    resource_id   TEXT,
+    data          TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    retry_count   INTEGER NOT NULL DEFAULT 0,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    revision      INTEGER NOT NULL DEFAULT 0,
+    last_error    TEXT,
+    last_retry_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sync_tasks_status ON sync_tasks (status, seq);
+CREATE INDEX IF NOT EXISTS idx_sync_tasks_resource ON sync_tasks (data_type, resource_id, status);
+"""
+
+_COLUMNS = "id, data_type, operation, data, created_at, retry_count, status, revision, last_error, last_retry_at"
+
+
 class OfflineSyncQueue:
     """Offline Sync Queue - Manages offline caching and auto-sync"""
-    
+
     def __init__(self, cache_dir: Optional[str] = None):
         """
         Initialize offline sync queue
-        
+
         Args:
             cache_dir: Cache directory path, defaults to app_info.appdata_path/offline_sync_queue
         """
@@ -31,279 +61,338 @@ class OfflineSyncQueue:
             # Use appdata directory from app_info
             from config.app_info import app_info
             cache_dir = Path(app_info.appdata_path) / 'offline_sync_queue'
-        
+
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Queue file paths
+
+        # Queue database, and the JSON files used by older versions
+        self.db_file = self.cache_dir / 'sync_queue.db'
         self.queue_file = self.cache_dir / 'pending_sync.json'
         self.failed_file = self.cache_dir / 'failed_sync.json'
-        
-        # Sync lock
+
+        # Sync lock (also serializes use of the shared connection)
         self._lock = threading.Lock()
-        
-        # Initialize queue
-        self._load_queue()
-        
-        logger.info(f"[OfflineSyncQueue] Initialized with cache dir: {self.cache_dir}")
-    
-    def _load_queue(self):
-        """Load queue from file"""
-        try:
-            if self.queue_file.exists():
-                with open(self.queue_file, 'r', encoding='utf-8') as f:
-                    self.pending_queue = json.load(f)
-            else:
-                self.pending_queue = []
-            
-            if self.failed_file.exists():
-                with open(self.failed_file, 'r', encoding='utf-8') as f:
-                    self.failed_queue = json.load(f)
-            else:
-                self.failed_queue = []
-                
-            logger.info(f"[OfflineSyncQueue] Loaded {len(self.pending_queue)} pending, {len(self.failed_queue)} failed")
-        except Exception as e:
-            logger.error(f"[OfflineSyncQueue] Failed to load queue: {e}")
-            self.pending_queue = []
-            self.failed_queue = []
-    
-    def _save_queue(self):
-        """Save queue to file"""
-        try:
-            with open(self.queue_file, 'w', encoding='utf-8') as f:
-                json.dump(self.pending_queue, f, indent=2, ensure_ascii=False)
-            
-            with open(self.failed_file, 'w', encoding='utf-8') as f:
-                json.dump(self.failed_queue, f, indent=2, ensure_ascii=False)
-                
-            logger.debug(f"[OfflineSyncQueue] Saved {len(self.pending_queue)} pending, {len(self.failed_queue)} failed")
-        except Exception as e:
-            logger.error(f"[OfflineSyncQueue] Failed to save queue: {e}")
-    
+        self._counter = 0
+
+        self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._import_legacy_queue()
+
+        stats = self.get_stats()
+        logger.info(f"[OfflineSyncQueue] Initialized with cache dir: {self.cache_dir} "
+                    f"({stats['pending_count']} pending, {stats['failed_count']} failed)")
+
+    def _import_legacy_queue(self):
+        """Import pending_sync.json / failed_sync.json written by older versions"""
+        for path in (self.queue_file, self.failed_file):
+            if not path.exists():
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    tasks = json.load(f)
+                with self._lock, self._conn:
+                    for task in tasks:
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO sync_tasks "
+                            "(id, data_type, operation, resource_id, data, created_at, retry_count, status, last_error, last_retry_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (task['id'], task['data_type'], task['operation'], _resource_id(task.get('data')),
+                             json.dumps(task.get('data', {}), ensure_ascii=False),
+                             task.get('created_at') or datetime.now().isoformat(), task.get('retry_count', 0),
+                             task.get('status', 'pending'), task.get('last_error'), task.get('last_retry_at')),
+                        )
+                os.replace(path, path.with_name(path.name + '.migrated'))
+                logger.info(f"[OfflineSyncQueue] Imported {len(tasks)} tasks from {path.name}")
+            except Exception as e:
+                logger.error(f"[OfflineSyncQueue] Failed to import {path.name}: {e}")
+
+    def _new_task_id(self, data_type: str, operation: str) -> str:
+        self._counter += 1
+        return f"{data_type}_{operation}_{int(time.time() * 1000)}_{self._counter}"
+
+    def _select(self, where: str = "", params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(f"SELECT {_COLUMNS} FROM sync_tasks {where} ORDER BY seq", tuple(params)).fetchall()
+        return [_row_to_task(row) for row in rows]
+
     def add(self, data_type: str, data: Dict[str, Any], operation: str = 'add') -> str:
         """
         Add sync task to queue
-        
+
+        Changes to a resource (data['id']) that already has a pending task are
+        coalesced: an 'update' is merged into the data of a pending 'add'/'update'
+        (its fields win, the operation is kept), a 'delete' drops them and is
+        queued instead.
+
         Args:
             data_type: Data type ('skill', 'task', 'agent', 'tool')
             data: Data content
             operation: Operation type ('add', 'update', 'delete')
-        
+
         Returns:
-            str: Task ID
+            str: Task ID (of the pending task the change was folded into, if coalesced)
         """
-        with self._lock:
-            task_id = f"{data_type}_{operation}_{int(time.time() * 1000)}"
-            
-            task = {
-                'id': task_id,
-                'data_type': data_type,
-                'operation': operation,
-                'data': data,
-                'created_at': datetime.now().isoformat(),
-                'retry_count': 0,
-                'status': 'pending'
-            }
-            
-            self.pending_queue.append(task)
-            self._save_queue()
-            
+        data_type, operation = str(data_type), str(operation)
+        resource_id = _resource_id(data)
+        payload = json.dumps(data, ensure_ascii=False)
+
+        with self._lock, self._conn:
+            if resource_id is not None and operation in ('update', 'delete'):
+                latest = self._conn.execute(
+                    "SELECT id, operation, data FROM sync_tasks WHERE data_type = ? AND resource_id = ? AND status = 'pending' "
+                    "ORDER BY seq DESC LIMIT 1",
+                    (data_type, resource_id),
+                ).fetchone()
+                if latest is not None and operation == 'update' and latest['operation'] in ('add', 'update'):
+                    # Updates may be partial: keep the fields only the pending task carries
+                    merged = {**json.loads(latest['data']), **data}
+                    self._conn.execute(
+                        "UPDATE sync_tasks SET data = ?, revision = revision + 1 WHERE id = ?",
+                        (json.dumps(merged, ensure_ascii=False), latest['id']),
+                    )
+                    logger.debug(f"[OfflineSyncQueue] Coalesced {data_type}.update of {resource_id} into {latest['id']}")
+                    return latest['id']
+                if operation == 'delete':
+                    superseded = self._conn.execute(
+                        "DELETE FROM sync_tasks WHERE data_type = ? AND resource_id = ? AND status = 'pending' "
+                        "AND operation IN ('add', 'update')",
+                        (data_type, resource_id),
+                    ).rowcount
+                    if superseded:
+                        logger.debug(f"[OfflineSyncQueue] Delete of {data_type}:{resource_id} superseded {superseded} task(s)")
+
+            task_id = self._new_task_id(data_type, operation)
+            self._conn.execute(
+                "INSERT INTO sync_tasks (id, data_type, operation, resource_id, data, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (task_id, data_type, operation, resource_id, payload, datetime.now().isoformat()),
+            )
+
             logger.info(f"[OfflineSyncQueue] Added task: {task_id}")
             return task_id
-    
-    def get_pending_tasks(self, data_type: Optional[str] = None) -> List[Dict[str, Any]]:
+
+    def get_pending_tasks(self, data_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get pending sync tasks
-        
+
         Args:
             data_type: Optional, only get tasks of specified type
-        
+            limit: Optional, maximum number of (oldest) tasks to return
+
         Returns:
             List[Dict]: Pending task list
         """
+        where, params = "WHERE status = 'pending'", []
+        if data_type:
+            where += " AND data_type = ?"
+            params.append(str(data_type))
         with self._lock:
-            if data_type:
-                return [task for task in self.pending_queue if task['data_type'] == data_type]
-            return self.pending_queue.copy()
-    
+            tasks = self._select(where, params)
+        return tasks[:limit] if limit else tasks
+
     def get_failed_tasks(self, data_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get failed tasks
-        
+
         Args:
             data_type: Optional, only get tasks of specified type
-        
+
         Returns:
             List[Dict]: Failed task list
         """
+        where, params = "WHERE status = 'failed'", []
+        if data_type:
+            where += " AND data_type = ?"
+            params.append(str(data_type))
         with self._lock:
-            if data_type:
-                return [task for task in self.failed_queue if task['data_type'] == data_type]
-            return self.failed_queue.copy()
-    
+            return self._select(where, params)
+
     def retry_failed_task(self, task_id: str):
         """
         Move failed task back to pending queue
-        
+
         Args:
             task_id: Task ID
         """
-        with self._lock:
-            for task in self.failed_queue:
-                if task['id'] == task_id:
-                    # Reset status
-                    task['status'] = 'pending'
-                    task['retry_count'] = 0
-                    task['last_error'] = None
-                    # Move back to pending queue
-                    self.pending_queue.append(task)
-                    self.failed_queue.remove(task)
-                    self._save_queue()
-                    logger.info(f"[OfflineSyncQueue] Retry failed task: {task_id}")
-                    break
-    
+        with self._lock, self._conn:
+            moved = self._conn.execute(
+                "UPDATE sync_tasks SET status = 'pending', retry_count = 0, last_error = NULL "
+                "WHERE id = ? AND status = 'failed'",
+                (task_id,),
+            ).rowcount
+        if moved:
+            logger.info(f"[OfflineSyncQueue] Retry failed task: {task_id}")
+
+    def retry_all_failed(self) -> int:
+        """
+        Move all failed tasks back to pending queue
+
+        Returns:
+            int: Number of tasks moved
+        """
+        with self._lock, self._conn:
+            moved = self._conn.execute(
+                "UPDATE sync_tasks SET status = 'pending', retry_count = 0, last_error = NULL WHERE status = 'failed'"
+            ).rowcount
+        if moved:
+            logger.info(f"[OfflineSyncQueue] Retry {moved} failed tasks")
+        return moved
+
     def get_pending(self) -> List[Dict[str, Any]]:
         """
         Get all pending tasks (alias for get_pending_tasks)
-        
+
         Returns:
             List[Dict]: Pending task list
         """
         return self.get_pending_tasks()
-    
+
     def mark_completed(self, task_id: str):
         """
         Mark task as completed (alias for mark_success)
-        
+
         Args:
             task_id: Task ID
         """
         self.mark_success(task_id)
-    
-    def mark_success(self, task_id: str):
+
+    def mark_success(self, task_id: str, revision: Optional[int] = None):
         """
         Mark task as successful (remove from queue)
-        
+
         Args:
             task_id: Task ID
+            revision: Optional, the task revision that was synced; if newer data
+                was coalesced into the task since, it stays queued
         """
-        with self._lock:
-            self.pending_queue = [task for task in self.pending_queue if task['id'] != task_id]
-            self._save_queue()
-            logger.info(f"[OfflineSyncQueue] Task succeeded: {task_id}")
-    
+        self.mark_success_many([(task_id, revision)])
+
+    def mark_success_many(self, tasks: Iterable[tuple]) -> int:
+        """
+        Mark several tasks as successful in one transaction
+
+        Args:
+            tasks: (task_id, revision) pairs; revision None matches any revision
+
+        Returns:
+            int: Number of tasks removed
+        """
+        tasks = list(tasks)
+        with self._lock, self._conn:
+            removed = 0
+            for task_id, revision in tasks:
+                if revision is None:
+                    removed += self._conn.execute("DELETE FROM sync_tasks WHERE id = ?", (task_id,)).rowcount
+                else:
+                    removed += self._conn.execute(
+                        "DELETE FROM sync_tasks WHERE id = ? AND revision = ?", (task_id, revision)
+                    ).rowcount
+        logger.info(f"[OfflineSyncQueue] {removed} task(s) succeeded")
+        if removed < len(tasks):
+            logger.debug(f"[OfflineSyncQueue] {len(tasks) - removed} synced task(s) changed meanwhile, kept queued")
+        return removed
+
     def mark_failed(self, task_id: str, error: str, max_retries: int = 3):
         """
         Mark task as failed
-        
+
         Args:
             task_id: Task ID
             error: Error message
             max_retries: Maximum retry count
         """
-        with self._lock:
-            for task in self.pending_queue:
-                if task['id'] == task_id:
-                    task['retry_count'] += 1
-                    task['last_error'] = error
-                    task['last_retry_at'] = datetime.now().isoformat()
-                    
-                    if task['retry_count'] >= max_retries:
-                        # Exceeded max retries, move to failed queue
-                        task['status'] = 'failed'
-                        self.failed_queue.append(task)
-                        self.pending_queue.remove(task)
-                        logger.warning(f"[OfflineSyncQueue] Task failed after {max_retries} retries: {task_id}")
-                    else:
-                        logger.warning(f"[OfflineSyncQueue] Task retry {task['retry_count']}/{max_retries}: {task_id}")
-                    
-                    self._save_queue()
-                    break
-    
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT retry_count FROM sync_tasks WHERE id = ? AND status = 'pending'", (task_id,)
+            ).fetchone()
+            if row is None:
+                return
+            retry_count = row['retry_count'] + 1
+            status = 'failed' if retry_count >= max_retries else 'pending'
+            self._conn.execute(
+                "UPDATE sync_tasks SET retry_count = ?, status = ?, last_error = ?, last_retry_at = ? WHERE id = ?",
+                (retry_count, status, error, datetime.now().isoformat(), task_id),
+            )
+        if status == 'failed':
+            # Exceeded max retries, moved to failed queue
+            logger.warning(f"[OfflineSyncQueue] Task failed after {max_retries} retries: {task_id}")
+        else:
+            logger.warning(f"[OfflineSyncQueue] Task retry {retry_count}/{max_retries}: {task_id}")
+
     def clear_pending(self):
         """Clear pending queue"""
-        with self._lock:
-            self.pending_queue = []
-            self._save_queue()
-            logger.info("[OfflineSyncQueue] Cleared pending queue")
-    
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sync_tasks WHERE status = 'pending'")
+        logger.info("[OfflineSyncQueue] Cleared pending queue")
+
     def clear_failed(self):
         """Clear failed queue"""
-        with self._lock:
-            self.failed_queue = []
-            self._save_queue()
-            logger.info("[OfflineSyncQueue] Cleared failed queue")
-    
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sync_tasks WHERE status = 'failed'")
+        logger.info("[OfflineSyncQueue] Cleared failed queue")
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get queue statistics
-        
+
         Returns:
             Dict: Statistics
         """
         with self._lock:
-            return {
-                'pending_count': len(self.pending_queue),
-                'failed_count': len(self.failed_queue),
-                'pending_by_type': self._count_by_type(self.pending_queue),
-                'failed_by_type': self._count_by_type(self.failed_queue)
-            }
-    
-    def _count_by_type(self, queue: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Count tasks by type"""
-        counts = {}
-        for task in queue:
-            data_type = task['data_type']
-            counts[data_type] = counts.get(data_type, 0) + 1
-        return counts
-    
+            rows = self._conn.execute(
+                "SELECT status, data_type, COUNT(*) AS n FROM sync_tasks GROUP BY status, data_type"
+            ).fetchall()
+        by_status = {'pending': {}, 'failed': {}}
+        for row in rows:
+            by_status.setdefault(row['status'], {})[row['data_type']] = row['n']
+        return {
+            'pending_count': sum(by_status['pending'].values()),
+            'failed_count': sum(by_status['failed'].values()),
+            'pending_by_type': by_status['pending'],
+            'failed_by_type': by_status['failed']
+        }
+
     def remove_tasks_by_resource(self, data_type: str, resource_id: str, operation: Optional[str] = None) -> int:
         """
         Remove tasks related to a specific resource from both pending and failed queues
-        
+
         Args:
             data_type: Data type ('skill', 'task', 'agent', 'tool', etc.)
             resource_id: Resource ID to match
             operation: Optional, only remove tasks with specific operation ('add', 'update', 'delete')
-        
+
         Returns:
             int: Number of tasks removed
         """
+        sql = "DELETE FROM sync_tasks WHERE data_type = ? AND resource_id = ?"
+        params = [str(data_type), str(resource_id)]
+        if operation is not None:
+            sql += " AND operation = ?"
+            params.append(str(operation))
+        with self._lock, self._conn:
+            removed_count = self._conn.execute(sql, params).rowcount
+
+        if removed_count > 0:
+            logger.info(f"[OfflineSyncQueue] Removed {removed_count} tasks for {data_type}:{resource_id} (operation={operation})")
+
+        return removed_count
+
+    def close(self):
+        """Close the queue database"""
         with self._lock:
-            removed_count = 0
-            
-            # Remove from pending queue
-            original_pending = len(self.pending_queue)
-            self.pending_queue = [
-                task for task in self.pending_queue
-                if not (
-                    task['data_type'] == data_type and
-                    task.get('data', {}).get('id') == resource_id and
-                    (operation is None or task.get('operation') == operation)
-                )
-            ]
-            removed_from_pending = original_pending - len(self.pending_queue)
-            
-            # Remove from failed queue
-            original_failed = len(self.failed_queue)
-            self.failed_queue = [
-                task for task in self.failed_queue
-                if not (
-                    task['data_type'] == data_type and
-                    task.get('data', {}).get('id') == resource_id and
-                    (operation is None or task.get('operation') == operation)
-                )
-            ]
-            removed_from_failed = original_failed - len(self.failed_queue)
-            
-            removed_count = removed_from_pending + removed_from_failed
-            
-            if removed_count > 0:
-                self._save_queue()
-                logger.info(f"[OfflineSyncQueue] Removed {removed_count} tasks for {data_type}:{resource_id} (operation={operation})")
-            
-            return removed_count
+            self._conn.close()
+
+
+def _resource_id(data: Optional[Dict[str, Any]]) -> Optional[str]:
+    resource_id = data.get('id') if isinstance(data, dict) else None
+    return None if resource_id in (None, '') else str(resource_id)
+
+
+def _row_to_task(row: sqlite3.Row) -> Dict[str, Any]:
+    task = dict(row)
+    task['data'] = json.loads(task['data'])
+    return task
 
 
 # Global singleton
@@ -0,0 +1,80 @@
+"""
+Migration from version 3.0.7 to 3.0.8
+Add the messages_fts full-text index and backfill it from existing messages
+"""
+
+from sqlalchemy import text
+from ..base_migration import BaseMigration
+from ...utils.message_search import MESSAGE_FTS_TABLE, MessageSearchIndex
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Migration_307_to_308(BaseMigration):
+    """Migration to create and backfill the chat message full-text index"""
+    
+    @property
+    def version(self) -> str:
+        """Target version"""
+        return "3.0.8"
+    
+    @property
+    def previous_version(self) -> str:
+        """Previous version"""
+        return "3.0.7"
+    
+    @property
+    def description(self) -> str:
+        """Migration description"""
+        return "Add messages_fts FTS5 index for chat message search and backfill it"
+    
+    def upgrade(self, session):
+        """Create messages_fts and index all existing messages"""
+        logger.info("[Migration 3.0.7→3.0.8] Starting upgrade...")
+        
+        try:
+            search_index = MessageSearchIndex(self.engine)
+            if not search_index.ensure():
+                # Search keeps working through the message scan fallback
+                logger.warning("[Migration 3.0.7→3.0.8] FTS5 not available, skipping message index")
+                return True
+            
+            with self.engine.connect() as conn:
+                indexed = search_index.rebuild(conn)
+                conn.commit()
+            
+            logger.info(f"[Migration 3.0.7→3.0.8] ✅ Upgrade completed successfully, indexed {indexed} messages")
+            return True
+            
+        except Exception as e:
+            logger.error(f"[Migration 3.0.7→3.0.8] ❌ Upgrade failed: {e}", exc_info=True)
+            raise
+    
+    def downgrade(self, session):
+        """Drop the full-text index"""
+        logger.info("[Migration 3.0.8→3.0.7] Starting downgrade...")
+        with self.engine.connect() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {MESSAGE_FTS_TABLE}"))
+            conn.commit()
+        return True
+    
+    def validate_postconditions(self, session):
+        """Validate the migration was successful"""
+        logger.info("[Migration 3.0.7→3.0.8] Validating migration...")
+        
+        try:
+            search_index = MessageSearchIndex(self.engine)
+            if not search_index.ensure():
+                logger.warning("[Migration 3.0.7→3.0.8] FTS5 not available, nothing to validate")
+                return True
+            
+            with self.engine.connect() as conn:
+                indexed = search_index.count(conn)
+            
+            logger.info(f"[Migration 3.0.7→3.0.8] ✅ Validation successful ({indexed} messages indexed)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"[Migration 3.0.7→3.0.8] ❌ Validation failed: {e}", exc_info=True)
+            return False
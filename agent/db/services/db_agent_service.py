@@ -4,7 +4,7 @@ Agent database service.
 This module provides database service for agent management operations.
 """
 
-from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.orm import sessionmaker, joinedload, selectinload
 from ..models.skill_model import DBAgentSkill
 from ..models.agent_model import DBAgent, DBAgentTool, DBAgentTask, DBAgentKnowledge
 from ..models.org_model import DBAgentOrg
@@ -512,65 +512,37 @@ class DBAgentService(BaseService):
         """
         try:
             with self.session_scope() as session:
-                from agent.db.models.association_models import DBAgentOrgRel
-                
-                # Query agents by owner
-                db_agent_records = session.query(DBAgent).filter(
+                # Load agents and all their relationships with a fixed number of
+                # statements (one per relationship) regardless of agent count
+                db_agent_records = session.query(DBAgent).options(
+                    selectinload(DBAgent.org_rels),
+                    selectinload(DBAgent.skill_rels).joinedload(DBAgentSkillRel.skill),
+                    selectinload(DBAgent.task_rels).joinedload(DBAgentTaskRel.task),
+                ).filter(
                     DBAgent.owner == owner
                 ).all()
                 
-                # Query all agent-org relationships for these agents
-                agent_ids = [agent.id for agent in db_agent_records]
-                org_rels = session.query(DBAgentOrgRel).filter(
-                    DBAgentOrgRel.agent_id.in_(agent_ids)
-                ).all()
-                org_rel_map = {rel.agent_id: rel.org_id for rel in org_rels}
-                
-                # Query all agent-skill relationships
-                skill_rels = session.query(DBAgentSkillRel).filter(
-                    DBAgentSkillRel.agent_id.in_(agent_ids)
-                ).all()
-                
-                # Build skill map: agent_id -> [skill_objects]
-                skill_map = {}
-                for rel in skill_rels:
-                    if rel.agent_id not in skill_map:
-                        skill_map[rel.agent_id] = []
-                    # Get full skill object (not just name)
-                    if rel.skill:
-                        skill_map[rel.agent_id].append(rel.skill.to_dict())
-                
-                # Query all agent-task relationships
-                task_rels = session.query(DBAgentTaskRel).filter(
-                    DBAgentTaskRel.agent_id.in_(agent_ids)
-                ).all()
-                
-                # Build task map: agent_id -> [task_objects]
-                task_map = {}
-                for rel in task_rels:
-                    if rel.agent_id not in task_map:
-                        task_map[rel.agent_id] = []
-                    # Get full task object (not just name)
-                    if rel.task:
-                        task_map[rel.agent_id].append(rel.task.to_dict())
+                # Resolve avatars for all agents in one batch
+                avatar_map = {}
+                avatar_service = self._get_avatar_service()
+                if avatar_service and db_agent_records:
+                    avatar_map = avatar_service.get_agents_avatar_info(db_agent_records, owner)
                 
                 # Convert to dict list and add relationships
                 agents_data = []
                 for agent in db_agent_records:
                     agent_dict = agent.to_dict()
                     # Add org_id from relationship table
-                    agent_dict['org_id'] = org_rel_map.get(agent.id)
+                    agent_dict['org_id'] = agent.org_rels[0].org_id if agent.org_rels else None
                     # Add skills from relationship table (override JSON field)
-                    agent_dict['skills'] = skill_map.get(agent.id, [])
+                    agent_dict['skills'] = [rel.skill.to_dict() for rel in agent.skill_rels if rel.skill]
                     # Add tasks from relationship table (override JSON field)
-                    agent_dict['tasks'] = task_map.get(agent.id, [])
+                    agent_dict['tasks'] = [rel.task.to_dict() for rel in agent.task_rels if rel.task]
                     
                     # Add avatar information
-                    avatar_service = self._get_avatar_service()
-                    if avatar_service:
-                        avatar_info = avatar_service.get_agent_avatar_info(agent, owner)
-                        if avatar_info:
-                            agent_dict['avatar'] = avatar_info
+                    avatar_info = avatar_map.get(agent.id)
+                    if avatar_info:
+                        agent_dict['avatar'] = avatar_info
                     
                     agents_data.append(agent_dict)
                 
@@ -656,19 +628,17 @@ class DBAgentService(BaseService):
                 # Build base query
                 query = s.query(DBAgent)
 
-                # Add eager loading for relationships (using correct backref names)
-                if include_org:
-                    query = query.options(joinedload(DBAgent.org_rels))
-                if include_skills:
-                    # Use nested joinedload to load skill_rels AND the actual skill objects
-                    from ..models.association_models import DBAgentSkillRel
-                    query = query.options(joinedload(DBAgent.skill_rels).joinedload(DBAgentSkillRel.skill))
-                if include_tasks:
-                    # Use nested joinedload to load task_rels AND the actual task objects
-                    from ..models.association_models import DBAgentTaskRel
-                    query = query.options(joinedload(DBAgent.task_rels).joinedload(DBAgentTaskRel.task))
-                # Always eager load avatar_resource to avoid N+1 queries
-                query = query.options(joinedload(DBAgent.avatar_resource))
+                # Eager load collections with selectinload (one extra statement each,
+                # no cartesian row explosion) and many-to-one links with joins.
+                # DBAgent.to_dict(deep=True) reads every one of these, so they are
+                # loaded regardless of the include_* flags to avoid per-agent lazy loads.
+                query = query.options(
+                    selectinload(DBAgent.org_rels),
+                    selectinload(DBAgent.skill_rels).joinedload(DBAgentSkillRel.skill),
+                    selectinload(DBAgent.task_rels).joinedload(DBAgentTaskRel.task),
+                    joinedload(DBAgent.supervisor).selectinload(DBAgent.org_rels),
+                    joinedload(DBAgent.avatar_resource),
+                )
 
                 # Apply filters
                 if id:
@@ -676,80 +646,70 @@ class DBAgentService(BaseService):
                 if name:
                     query = query.filter(DBAgent.name.ilike(f"%{name}%"))
                 if org_id:
-                    query = query.filter(DBAgent.org_id == org_id)
+                    query = query.filter(DBAgent.org_rels.any(DBAgentOrgRel.org_id == org_id))
 
                 # Execute query
                 agents = query.all()
 
+                # Code-generated skills/tasks live in memory only; index them once
+                memory_skills_by_id = {}
+                memory_tasks_by_id = {}
+                if include_skills or include_tasks:
+                    try:
+                        from app_context import AppContext
+                        mainwin = AppContext.get_main_window()
+                        if mainwin:
+                            if include_skills:
+                                # Reversed so the first entry wins for duplicate IDs
+                                memory_skills_by_id = {getattr(sk, 'id', None): sk for sk in reversed(getattr(mainwin, 'agent_skills', None) or [])}
+                            if include_tasks:
+                                memory_tasks_by_id = {getattr(t, 'id', None): t for t in reversed(getattr(mainwin, 'agent_tasks', None) or [])}
+                    except Exception as e:
+                        logger.debug(f"[DBAgentService] Could not read memory skills/tasks: {e}")
+
+                # Resolve avatars for all agents in one batch (needed for agent_converter)
+                avatar_map = {}
+                avatar_service = self._get_avatar_service()
+                if avatar_service and agents:
+                    avatar_map = avatar_service.get_agents_avatar_info(agents, owner=None)
+
                 # Convert to dict with deep relationships
                 result_data = []
                 for agent in agents:
                     agent_dict = agent.to_dict(deep=True)
 
                     # Add code-generated skills/tasks from memory (not in database)
-                    if include_skills and hasattr(agent, 'skill_rels') and agent.skill_rels:
-                        try:
-                            from app_context import AppContext
-                            mainwin = AppContext.get_main_window()
-                            if mainwin and hasattr(mainwin, 'agent_skills'):
-                                # Get skill IDs from relationships
-                                skill_ids = [rel.skill_id for rel in agent.skill_rels]
-                                # Find skills in memory (including code-generated ones)
-                                memory_skills = []
-                                for skill_id in skill_ids:
-                                    # First check if already in agent_dict['skills'] (from DB)
-                                    if 'skills' in agent_dict and any(s.get('id') == skill_id for s in agent_dict['skills']):
-                                        continue
-                                    # Check memory for code-generated skills
-                                    memory_skill = next((s for s in mainwin.agent_skills if getattr(s, 'id', None) == skill_id), None)
-                                    if memory_skill:
-                                        # Serialize the skill using helper function
-                                        skill_dict = self._serialize_pydantic_model(memory_skill)
-                                        memory_skills.append(skill_dict)
-                                # Add memory skills to agent_dict
-                                if memory_skills:
-                                    agent_dict.setdefault('skills', []).extend(memory_skills)
-                                    logger.debug(f"[DBAgentService] Added {len(memory_skills)} code-generated skills for agent {agent.id}")
-                        except Exception as e:
-                            logger.debug(f"[DBAgentService] Could not add memory skills: {e}")
-                    
-                    if include_tasks and hasattr(agent, 'task_rels') and agent.task_rels:
-                        try:
-                            from app_context import AppContext
-                            mainwin = AppContext.get_main_window()
-                            if mainwin and hasattr(mainwin, 'agent_tasks'):
-                                # Get task IDs from relationships
-                                task_ids = [rel.task_id for rel in agent.task_rels]
-                                # Find tasks in memory (including code-generated ones)
-                                memory_tasks = []
-                                for task_id in task_ids:
-                                    # First check if already in agent_dict['tasks'] (from DB)
-                                    if 'tasks' in agent_dict and any(t.get('id') == task_id for t in agent_dict['tasks']):
-                                        continue
-                                    # Check memory for code-generated tasks
-                                    memory_task = next((t for t in mainwin.agent_tasks if getattr(t, 'id', None) == task_id), None)
-                                    if memory_task:
-                                        # Serialize the task using helper function
-                                        task_dict = self._serialize_pydantic_model(memory_task)
-                                        memory_tasks.append(task_dict)
-                                # Add memory tasks to agent_dict
-                                if memory_tasks:
-                                    agent_dict.setdefault('tasks', []).extend(memory_tasks)
-                                    logger.debug(f"[DBAgentService] Added {len(memory_tasks)} code-generated tasks for agent {agent.id}")
-                        except Exception as e:
-                            logger.debug(f"[DBAgentService] Could not add memory tasks: {e}")
+                    if include_skills and agent.skill_rels and memory_skills_by_id:
+                        db_skill_ids = {sk.get('id') for sk in agent_dict.get('skills', [])}
+                        memory_skills = [
+                            self._serialize_pydantic_model(memory_skills_by_id[rel.skill_id])
+                            for rel in agent.skill_rels
+                            if rel.skill_id not in db_skill_ids and rel.skill_id in memory_skills_by_id
+                        ]
+                        if memory_skills:
+                            agent_dict.setdefault('skills', []).extend(memory_skills)
+                            logger.debug(f"[DBAgentService] Added {len(memory_skills)} code-generated skills for agent {agent.id}")
+
+                    if include_tasks and agent.task_rels and memory_tasks_by_id:
+                        db_task_ids = {t.get('id') for t in agent_dict.get('tasks', [])}
+                        memory_tasks = [
+                            self._serialize_pydantic_model(memory_tasks_by_id[rel.task_id])
+                            for rel in agent.task_rels
+                            if rel.task_id not in db_task_ids and rel.task_id in memory_tasks_by_id
+                        ]
+                        if memory_tasks:
+                            agent_dict.setdefault('tasks', []).extend(memory_tasks)
+                            logger.debug(f"[DBAgentService] Added {len(memory_tasks)} code-generated tasks for agent {agent.id}")
 
                     # Add additional computed fields for frontend (using correct backref names)
-                    agent_dict['skills_count'] = len(agent.skill_rels) if hasattr(agent, 'skill_rels') and agent.skill_rels else 0
-                    agent_dict['tasks_count'] = len(agent.task_rels) if hasattr(agent, 'task_rels') and agent.task_rels else 0
-                    agent_dict['active_tasks_count'] = len([t for t in (agent.task_rels or []) if t.status in ['pending', 'running']])
+                    agent_dict['skills_count'] = len(agent.skill_rels)
+                    agent_dict['tasks_count'] = len(agent.task_rels)
+                    agent_dict['active_tasks_count'] = len([t for t in agent.task_rels if t.status in ['pending', 'running']])
                     
                     # Add avatar information (needed for agent_converter)
-                    avatar_service = self._get_avatar_service()
-                    if avatar_service:
-                        avatar_info = avatar_service.get_agent_avatar_info(agent, owner=None)
-                        if avatar_info:
-                            agent_dict['avatar'] = avatar_info
+                    avatar_info = avatar_map.get(agent.id)
+                    if avatar_info:
+                        agent_dict['avatar'] = avatar_info
 
                     result_data.append(agent_dict)
 
@@ -851,9 +811,14 @@ class DBAgentService(BaseService):
                 # Build base query
                 query = s.query(DBAgentTask)
 
-                # Add eager loading for relationships
+                # Add eager loading for relationships; agents are linked through
+                # DBAgentTaskRel, so load the rels and their agents in bulk
                 if include_agent:
-                    query = query.options(joinedload(DBAgentTask.agent))
+                    query = query.options(
+                        selectinload(DBAgentTask.agent_rels)
+                        .joinedload(DBAgentTaskRel.agent)
+                        .selectinload(DBAgent.org_rels)
+                    )
                 if include_org:
                     query = query.options(joinedload(DBAgentTask.organization))
 
@@ -863,7 +828,7 @@ class DBAgentService(BaseService):
                 if name:
                     query = query.filter(DBAgentTask.name.ilike(f"%{name}%"))
                 if agent_id:
-                    query = query.filter(DBAgentTask.agent_id == agent_id)
+                    query = query.filter(DBAgentTask.agent_rels.any(DBAgentTaskRel.agent_id == agent_id))
                 if org_id:
                     query = query.filter(DBAgentTask.org_id == org_id)
                 if status:
@@ -876,6 +841,10 @@ class DBAgentService(BaseService):
                 result_data = []
                 for task in tasks:
                     task_dict = task.to_dict(deep=True)
+                    if include_agent:
+                        agents = [rel.agent for rel in task.agent_rels if rel.agent]
+                        task_dict['agent_id'] = agents[0].id if agents else None
+                        task_dict['agents'] = [agent.to_dict(deep=False) for agent in agents]
                     result_data.append(task_dict)
 
                 return {
@@ -91,22 +91,50 @@ class DBAvatarService(BaseService):
                     logger.debug(f"[DBAvatarService] Avatar resource not found: {avatar_id}")
                     return None
                 
-                return {
-                    'id': avatar_resource.id,
-                    'resource_type': avatar_resource.resource_type,
-                    'name': avatar_resource.name,
-                    'image_path': avatar_resource.image_path,
-                    'image_hash': avatar_resource.image_hash,
-                    'video_path': avatar_resource.video_path,
-                    'avatar_metadata': avatar_resource.avatar_metadata,
-                    'owner': avatar_resource.owner,
-                    'created_at': avatar_resource.created_at,
-                    'updated_at': avatar_resource.updated_at
-                }
+                return self._resource_to_dict(avatar_resource)
         except Exception as e:
             logger.error(f"[DBAvatarService] Error getting avatar resource {avatar_id}: {e}")
             return None
     
+    def get_avatar_resources_by_ids(self, avatar_ids) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many avatar resources with a single query.
+        
+        Args:
+            avatar_ids: Iterable of avatar resource IDs
+            
+        Returns:
+            dict: avatar_id -> avatar resource dict (missing IDs are omitted)
+        """
+        avatar_ids = list(set(avatar_ids))
+        if not avatar_ids:
+            return {}
+        try:
+            with self.session_scope() as session:
+                resources = session.query(DBAvatarResource).filter(
+                    DBAvatarResource.id.in_(avatar_ids)
+                ).all()
+                return {r.id: self._resource_to_dict(r) for r in resources}
+        except Exception as e:
+            logger.error(f"[DBAvatarService] Error getting avatar resources {avatar_ids}: {e}")
+            return {}
+    
+    @staticmethod
+    def _resource_to_dict(avatar_resource: DBAvatarResource) -> Dict[str, Any]:
+        """Convert an avatar resource row to the dict returned by this service."""
+        return {
+            'id': avatar_resource.id,
+            'resource_type': avatar_resource.resource_type,
+            'name': avatar_resource.name,
+            'image_path': avatar_resource.image_path,
+            'image_hash': avatar_resource.image_hash,
+            'video_path': avatar_resource.video_path,
+            'avatar_metadata': avatar_resource.avatar_metadata,
+            'owner': avatar_resource.owner,
+            'created_at': avatar_resource.created_at,
+            'updated_at': avatar_resource.updated_at
+        }
+    
     def get_avatar_resources_by_owner(self, owner: str, resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get all avatar resources for a specific owner.
@@ -442,29 +470,75 @@ class DBAvatarService(BaseService):
                 return None
             
             server_url = main_window.get_server_base_url()
-            
-            # Build URLs using the same format as upload response
-            image_url = f"{server_url}/api/avatar?path={avatar_resource['image_path']}"
-            video_url = None
-            if avatar_resource.get('video_path'):
-                video_url = f"{server_url}/api/avatar?path={avatar_resource['video_path']}"
-            
-            # Get thumbnail URL from metadata if available
-            thumbnail_url = image_url  # Default to image
-            if avatar_resource.get('avatar_metadata'):
-                metadata = avatar_resource['avatar_metadata']
-                if isinstance(metadata, dict) and metadata.get('thumbnail_path'):
-                    thumbnail_url = f"{server_url}/api/avatar?path={metadata['thumbnail_path']}"
-            
-            return {
-                'id': avatar_resource['id'],
-                'type': avatar_type,
-                'imageUrl': image_url,
-                'thumbnailUrl': thumbnail_url,
-                'videoPath': video_url,
-                'videoExists': bool(avatar_resource.get('video_path'))
-            }
+            return self._build_uploaded_avatar_info(avatar_resource, server_url)
 
         except Exception as e:
             logger.error(f"[DBAvatarService] Failed to get avatar info for agent {agent.id}: {e}")
             return None
+    
+    def get_agents_avatar_info(self, agents: List[DBAgent], owner: str = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get avatar information for many agents.
+        
+        Uploaded avatar resources of all agents are fetched with one query
+        instead of one query per agent. Default and system avatars need no
+        query; agents referencing a missing resource go through
+        get_agent_avatar_info so the reference is auto-fixed as before.
+
+        Args:
+            agents: DBAgent instances
+            owner: Owner username (kept for backward compatibility)
+
+        Returns:
+            dict: agent_id -> avatar information (None if unavailable)
+        """
+        uploaded_ids = {
+            agent.avatar_resource_id for agent in agents
+            if agent.avatar_resource_id and not agent.avatar_resource_id.startswith('A00')
+        }
+        resources = self.get_avatar_resources_by_ids(uploaded_ids)
+        
+        server_url = None
+        if resources:
+            from app_context import AppContext
+            main_window = AppContext.get_main_window()
+            if main_window:
+                server_url = main_window.get_server_base_url()
+            else:
+                logger.error(f"[DBAvatarService] MainWindow not available, cannot build avatar URLs")
+        
+        result = {}
+        for agent in agents:
+            avatar_resource = resources.get(agent.avatar_resource_id) if agent.avatar_resource_id else None
+            if avatar_resource is None:
+                result[agent.id] = self.get_agent_avatar_info(agent, owner)
+            elif server_url is None:
+                result[agent.id] = None
+            else:
+                result[agent.id] = self._build_uploaded_avatar_info(avatar_resource, server_url)
+        return result
+    
+    @staticmethod
+    def _build_uploaded_avatar_info(avatar_resource: Dict[str, Any], server_url: str) -> Dict[str, Any]:
+        """Build frontend avatar info (HTTP URLs) for an uploaded avatar resource."""
+        # Build URLs using the same format as upload response
+        image_url = f"{server_url}/api/avatar?path={avatar_resource['image_path']}"
+        video_url = None
+        if avatar_resource.get('video_path'):
+            video_url = f"{server_url}/api/avatar?path={avatar_resource['video_path']}"
+        
+        # Get thumbnail URL from metadata if available
+        thumbnail_url = image_url  # Default to image
+        if avatar_resource.get('avatar_metadata'):
+            metadata = avatar_resource['avatar_metadata']
+            if isinstance(metadata, dict) and metadata.get('thumbnail_path'):
+                thumbnail_url = f"{server_url}/api/avatar?path={metadata['thumbnail_path']}"
+        
+        return {
+            'id': avatar_resource['id'],
+            'type': 'uploaded',
+            'imageUrl': image_url,
+            'thumbnailUrl': thumbnail_url,
+            'videoPath': video_url,
+            'videoExists': bool(avatar_resource.get('video_path'))
+        }
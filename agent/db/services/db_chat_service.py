@@ -17,7 +17,7 @@ import copy
 
 from app_context import AppContext
 from ..core import Chat, Member, Message, Attachment, ChatNotification, Base
-from ..utils import ContentSchema
+from ..utils import ContentSchema, MessageSearchIndex, extract_searchable_text
 from .base_service import BaseService
 from utils.logger_helper import logger_helper as logger
 
@@ -39,6 +39,11 @@ class DBChatService(BaseService):
             session: SQLAlchemy session instance (optional)
         """
         super().__init__(engine, session)
+        if engine is None and session is not None:
+            engine = session.get_bind()
+        # Full-text index over message text; search falls back to a scan if unavailable
+        self.search_index = MessageSearchIndex(engine)
+        self.search_index.ensure()
 
     def session_scope(self):
         """
@@ -243,6 +248,7 @@ class DBChatService(BaseService):
             session.add(message)
             t_flush = time_module.time()
             session.flush()
+            self._index_message(session, message_id, chatId, content)
             logger.debug(f"[PERF] add_message - session.flush: {time_module.time()-t_flush:.3f}s")
             logger.debug(f"[PERF] add_message - DB operations: {time_module.time()-t_db_start:.3f}s")
             logger.debug(f"[PERF] add_message - TOTAL: {time_module.time()-t_add_msg_start:.3f}s")
@@ -487,7 +493,9 @@ class DBChatService(BaseService):
         self, 
         userId: Optional[str] = None, 
         searchText: Optional[str] = None,
-        deep: bool = False
+        deep: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> Dict[str, Any]:
         """
         Search chats by message content for a specific user.
@@ -496,13 +504,19 @@ class DBChatService(BaseService):
         1. The user is a member (via userId)
         2. Any message in the chat contains the search text
         
+        Chats are ranked by their best-matching message using the full-text
+        index. Each chat dict additionally carries ``matchMessageId``,
+        ``matchSnippet`` (match wrapped in <mark>) and ``matchCount``.
+        
         Args:
             userId (str, optional): User ID to filter chats
             searchText (str, optional): Text to search in message content
             deep (bool): Whether to include messages in response
+            limit (int, optional): Maximum number of chats to return
+            offset (int): Number of ranked chats to skip
             
         Returns:
-            dict: Standard response with filtered chat list
+            dict: Standard response with filtered chat list and ``total`` match count
         """
         if not userId:
             return {
@@ -518,94 +532,39 @@ class DBChatService(BaseService):
         
         with self.session_scope() as session:
             try:
-                # Find all chats where user is a member
-                user_chats_stmt = select(Chat).join(Member).where(Member.userId == userId)
-                user_chats = session.execute(user_chats_stmt).scalars().all()
-                
-                # Filter chats that have messages containing the search text
-                matching_chats = []
-                search_lower = searchText.lower().strip()
-                
-                logger.debug(f"[search_chats] Total user chats: {len(user_chats)}, searching for: '{search_lower}'")
-                
-                for chat in user_chats:
-                    # Query messages for this chat
-                    messages_stmt = select(Message).where(Message.chatId == chat.id)
-                    messages = session.execute(messages_stmt).scalars().all()
-                    
-                    logger.trace(f"[search_chats] Chat {chat.id}: {len(messages)} messages")
-                    
-                    # Check if any message contains the search text
-                    has_match = False
-                    for msg in messages:
-                        if msg.content:
-                            # Handle different content types
-                            searchable_text = ""
-                            
-                            if isinstance(msg.content, str):
-                                searchable_text = msg.content
-                            elif isinstance(msg.content, dict):
-                                # 提取所有可能包含文本的字段
-                                text_fields = []
-                                
-                                # 主要文本字段
-                                if msg.content.get('text'):
-                                    text_fields.append(str(msg.content.get('text')))
-                                if msg.content.get('content'):
-                                    text_fields.append(str(msg.content.get('content')))
-                                
-                                # form 字段（递归提取所有文本）
-                                if msg.content.get('form'):
-                                    form_data = msg.content.get('form')
-                                    if isinstance(form_data, dict):
-                                        # 递归提取 form 中的所有字符串值
-                                        def extract_strings(obj):
-                                            if isinstance(obj, str):
-                                                return [obj]
-                                            elif isinstance(obj, dict):
-                                                result = []
-                                                for v in obj.values():
-                                                    result.extend(extract_strings(v))
-                                                return result
-                                            elif isinstance(obj, list):
-                                                result = []
-                                                for item in obj:
-                                                    result.extend(extract_strings(item))
-                                                return result
-                                            else:
-                                                return [str(obj)] if obj is not None else []
-                                        
-                                        text_fields.extend(extract_strings(form_data))
-                                    elif isinstance(form_data, str):
-                                        text_fields.append(form_data)
-                                
-                                # 其他可能的文本字段
-                                for field in ['title', 'description', 'label', 'value', 'message']:
-                                    if msg.content.get(field):
-                                        text_fields.append(str(msg.content.get(field)))
-                                
-                                # 合并所有文本字段
-                                searchable_text = ' '.join(filter(None, text_fields))
-                            
-                            # 模糊匹配
-                            if searchable_text and search_lower in searchable_text.lower():
-                                logger.debug(f"[search_chats] Match found in chat {chat.id}, searchable_text: {searchable_text[:100]}...")
-                                has_match = True
-                                break
-                    
-                    if has_match:
-                        matching_chats.append(chat)
-                    else:
-                        logger.info(f"[search_chats] No match in chat {chat.id}")
-                
-                logger.info(f"[search_chats_by_message_content] Found {len(matching_chats)} chats matching '{searchText}' for user {userId}")
+                if self.search_index.available:
+                    try:
+                        result = self.search_index.search_chats(session, userId, searchText, limit=limit, offset=offset)
+                    except Exception as e:
+                        logger.error(f"[search_chats_by_message_content] Full-text search failed, scanning instead: {e}")
+                        result = None
+                    if result is not None:
+                        hits = result["hits"]
+                        chats = {}
+                        if hits:
+                            chats_stmt = select(Chat).where(Chat.id.in_([hit["chatId"] for hit in hits]))
+                            chats = {chat.id: chat for chat in session.execute(chats_stmt).scalars().all()}
+                        data = []
+                        for hit in hits:
+                            chat = chats.get(hit["chatId"])
+                            if chat is None:
+                                continue
+                            chat_dict = chat.to_dict(deep=deep)
+                            chat_dict["matchMessageId"] = hit["messageId"]
+                            chat_dict["matchSnippet"] = hit["snippet"]
+                            chat_dict["matchCount"] = hit["hits"]
+                            data.append(chat_dict)
+                        
+                        logger.info(f"[search_chats_by_message_content] Found {result['total']} chats matching '{searchText}' for user {userId}")
+                        return {
+                            "success": True,
+                            "id": None,
+                            "data": data,
+                            "total": result["total"],
+                            "error": None
+                        }
                 
-                return {
-                    "success": True,
-                    "id": None,
-                    "data": [chat.to_dict(deep=deep) for chat in matching_chats],
-                    "error": None
-                }
+                return self._search_chats_by_scan(session, userId, searchText, deep, limit, offset)
             except Exception as e:
                 logger.error(f"[search_chats_by_message_content] Error: {e}")
                 return {
@@ -615,6 +574,59 @@ class DBChatService(BaseService):
                     "error": str(e)
                 }
 
+    def _search_chats_by_scan(
+        self,
+        session,
+        userId: str,
+        searchText: str,
+        deep: bool,
+        limit: Optional[int],
+        offset: int
+    ) -> Dict[str, Any]:
+        """
+        Search chats by scanning every message (used when FTS5 is unavailable).
+        
+        Args:
+            session: SQLAlchemy session
+            userId (str): User ID to filter chats
+            searchText (str): Text to search in message content
+            deep (bool): Whether to include messages in response
+            limit (int, optional): Maximum number of chats to return
+            offset (int): Number of matching chats to skip
+            
+        Returns:
+            dict: Standard response with filtered chat list
+        """
+        # Find all chats where user is a member
+        user_chats_stmt = select(Chat).join(Member).where(Member.userId == userId)
+        user_chats = session.execute(user_chats_stmt).scalars().all()
+        
+        # Filter chats that have messages containing the search text
+        matching_chats = []
+        search_lower = searchText.lower().strip()
+        
+        logger.debug(f"[search_chats] Total user chats: {len(user_chats)}, searching for: '{search_lower}'")
+        
+        for chat in user_chats:
+            # Query messages for this chat
+            messages_stmt = select(Message).where(Message.chatId == chat.id)
+            messages = session.execute(messages_stmt).scalars().all()
+            
+            # 模糊匹配
+            if any(search_lower in extract_searchable_text(msg.content).lower() for msg in messages):
+                matching_chats.append(chat)
+        
+        logger.info(f"[search_chats_by_message_content] Found {len(matching_chats)} chats matching '{searchText}' for user {userId}")
+        
+        page = matching_chats[offset:] if limit is None else matching_chats[offset:offset + limit]
+        return {
+            "success": True,
+            "id": None,
+            "data": [chat.to_dict(deep=deep) for chat in page],
+            "total": len(matching_chats),
+            "error": None
+        }
+
     def delete_chat(self, chatId: str) -> Dict[str, Any]:
         """
         Delete a chat and all related data.
@@ -641,6 +653,7 @@ class DBChatService(BaseService):
                     "data": None,
                     "error": f"Chat {chatId} not found"
                 }
+            self._unindex_chat(session, chatId)
             session.delete(chat)
             session.flush()
             return {
@@ -792,6 +805,7 @@ class DBChatService(BaseService):
             content['form'] = formData
             message.content = copy.deepcopy(content)  # Ensure SQLAlchemy detects the change
             session.flush()
+            self._index_message(session, messageId, chatId, message.content, replace=True)
             return {
                 "success": True,
                 "data": message.to_dict(deep=True),
@@ -838,6 +852,7 @@ class DBChatService(BaseService):
                 session.query(Attachment).filter(Attachment.messageId == messageId).delete()
                 
                 # Delete the message
+                self._unindex_message(session, messageId)
                 session.delete(message)
                 session.commit()
                 
@@ -857,6 +872,27 @@ class DBChatService(BaseService):
                 "data": None
             }
 
+    def _index_message(self, session, message_id: str, chat_id: str, content: Any, replace: bool = False):
+        """Update the full-text index for a message; index errors never fail the write."""
+        try:
+            self.search_index.index_message(session, message_id, chat_id, content, replace=replace)
+        except Exception as e:
+            logger.error(f"[db_chat_service] Failed to index message {message_id}: {e}")
+
+    def _unindex_message(self, session, message_id: str):
+        """Remove a message from the full-text index."""
+        try:
+            self.search_index.remove_message(session, message_id)
+        except Exception as e:
+            logger.error(f"[db_chat_service] Failed to unindex message {message_id}: {e}")
+
+    def _unindex_chat(self, session, chat_id: str):
+        """Remove all messages of a chat from the full-text index."""
+        try:
+            self.search_index.remove_chat(session, chat_id)
+        except Exception as e:
+            logger.error(f"[db_chat_service] Failed to unindex chat {chat_id}: {e}")
+
     def add_chat_notification(self, chatId: str, content: dict, timestamp: int, isRead: bool = False, uid: str = None) -> dict:
         """
         Add a chat notification.
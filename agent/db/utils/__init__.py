@@ -2,12 +2,16 @@
 Database utilities module.
 
 This module contains utility classes and functions for database operations
-including content schema definitions and validation tools.
+including content schema definitions, validation tools and the
+chat message full-text search index.
 """
 
 from .content_schema import ContentSchema, ContentType
+from .message_search import MessageSearchIndex, extract_searchable_text
 
 __all__ = [
     'ContentSchema',
-    'ContentType'
+    'ContentType',
+    'MessageSearchIndex',
+    'extract_searchable_text'
 ]
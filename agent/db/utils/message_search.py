@@ -0,0 +1,410 @@
+"""
+Full-text search index for chat messages.
+
+This module maintains an SQLite FTS5 table (``messages_fts``) next to the
+``messages`` table, holding one row per message with the searchable text
+extracted from its JSON content. DBChatService keeps the index in sync on
+message writes and routes chat search through it; migration 3.0.7 -> 3.0.8
+backfills the index for existing databases.
+
+The trigram tokenizer is preferred since it gives the same case-insensitive
+substring semantics as the old Python scan (for queries of three or more
+characters). Older SQLite builds without trigram fall back to unicode61
+prefix matching.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from utils.logger_helper import logger_helper as logger
+
+
+MESSAGE_FTS_TABLE = "messages_fts"
+
+# Top-level content fields that carry searchable text (besides 'form')
+SEARCHABLE_CONTENT_FIELDS = ('text', 'content', 'title', 'description', 'label', 'value', 'message')
+
+# Tokenizers tried in order when creating the index
+FTS_TOKENIZERS = ("trigram", "unicode61 remove_diacritics 2")
+
+# Trigram MATCH needs at least three characters; shorter queries use LIKE
+TRIGRAM_MIN_QUERY_CHARS = 3
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_ELLIPSIS = "..."
+SNIPPET_TOKENS = 16
+# Context kept on each side of a LIKE match when building snippets in Python
+SNIPPET_CONTEXT_CHARS = 32
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _extract_strings(obj: Any) -> List[str]:
+    """Recursively collect string values from nested dicts/lists."""
+    if isinstance(obj, str):
+        return [obj]
+    if isinstance(obj, dict):
+        result = []
+        for value in obj.values():
+            result.extend(_extract_strings(value))
+        return result
+    if isinstance(obj, list):
+        result = []
+        for item in obj:
+            result.extend(_extract_strings(item))
+        return result
+    return [str(obj)] if obj is not None else []
+
+
+def extract_searchable_text(content: Any) -> str:
+    """
+    Extract the searchable text of a message content.
+
+    Plain string content is used as-is. For dict content the text/content
+    fields, every string inside 'form' and the title/description/label/
+    value/message fields are joined with spaces.
+
+    Args:
+        content (Any): Message content (str or content schema dict)
+
+    Returns:
+        str: Searchable text, empty if the content carries none
+    """
+    if not content:
+        return ""
+    if isinstance(content, str):
+        return content
+    if not isinstance(content, dict):
+        return ""
+
+    text_fields = []
+    for field in SEARCHABLE_CONTENT_FIELDS[:2]:
+        if content.get(field):
+            text_fields.append(str(content.get(field)))
+
+    form_data = content.get('form')
+    if form_data:
+        if isinstance(form_data, dict):
+            text_fields.extend(_extract_strings(form_data))
+        elif isinstance(form_data, str):
+            text_fields.append(form_data)
+
+    for field in SEARCHABLE_CONTENT_FIELDS[2:]:
+        if content.get(field):
+            text_fields.append(str(content.get(field)))
+
+    return ' '.join(filter(None, text_fields))
+
+
+def _like_snippet(body: str, needle: str) -> str:
+    """Build a snippet around the first case-insensitive occurrence of needle."""
+    pos = body.lower().find(needle.lower())
+    if pos < 0:
+        return body[:SNIPPET_CONTEXT_CHARS * 2]
+    start = max(0, pos - SNIPPET_CONTEXT_CHARS)
+    end = min(len(body), pos + len(needle) + SNIPPET_CONTEXT_CHARS)
+    return (
+        (SNIPPET_ELLIPSIS if start > 0 else "")
+        + body[start:pos]
+        + SNIPPET_OPEN + body[pos:pos + len(needle)] + SNIPPET_CLOSE
+        + body[pos + len(needle):end]
+        + (SNIPPET_ELLIPSIS if end < len(body) else "")
+    )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class MessageSearchIndex:
+    """
+    FTS5 index over chat message text.
+
+    All write methods take the caller's session so index updates commit
+    together with the message change. When the database is not SQLite or
+    FTS5 is unavailable, ``available`` is False and every method is a no-op
+    (search callers should fall back to scanning).
+    """
+
+    def __init__(self, engine):
+        """
+        Initialize the index wrapper.
+
+        Args:
+            engine: SQLAlchemy engine instance
+        """
+        self.engine = engine
+        self.available = False
+        self.tokenizer: Optional[str] = None
+
+    def ensure(self) -> bool:
+        """
+        Create the FTS table if it does not exist.
+
+        Returns:
+            bool: True if the index is usable
+        """
+        if self.engine is None or self.engine.dialect.name != 'sqlite':
+            self.available = False
+            return False
+
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": MESSAGE_FTS_TABLE}
+                ).first()
+                table_sql = row[0] if row else None
+
+                if table_sql is None:
+                    for tokenizer in FTS_TOKENIZERS:
+                        try:
+                            conn.execute(text(
+                                f"CREATE VIRTUAL TABLE IF NOT EXISTS {MESSAGE_FTS_TABLE} USING fts5("
+                                f"body, message_id UNINDEXED, chat_id UNINDEXED, tokenize='{tokenizer}')"
+                            ))
+                            conn.commit()
+                            table_sql = tokenizer
+                            break
+                        except OperationalError as e:
+                            logger.debug(f"[message_search] Tokenizer '{tokenizer}' unavailable: {e}")
+                    if table_sql is None:
+                        logger.warning("[message_search] FTS5 is not available, chat search will scan messages")
+                        self.available = False
+                        return False
+        except Exception as e:
+            logger.error(f"[message_search] Failed to create {MESSAGE_FTS_TABLE}: {e}")
+            self.available = False
+            return False
+
+        self.tokenizer = "trigram" if "trigram" in table_sql else "unicode61"
+        self.available = True
+        return True
+
+    # ==================== Writes ====================
+
+    def index_message(self, session, message_id: str, chat_id: str, content: Any, replace: bool = False):
+        """
+        Add (or replace) the index row of a message.
+
+        Args:
+            session: SQLAlchemy session of the write
+            message_id (str): Message ID
+            chat_id (str): Chat ID
+            content (Any): Message content
+            replace (bool): Remove an existing row first (content edits)
+        """
+        if not self.available:
+            return
+        if replace:
+            self.remove_message(session, message_id)
+        body = extract_searchable_text(content)
+        if not body:
+            return
+        session.execute(
+            text(f"INSERT INTO {MESSAGE_FTS_TABLE} (body, message_id, chat_id) VALUES (:body, :message_id, :chat_id)"),
+            {"body": body, "message_id": message_id, "chat_id": chat_id}
+        )
+
+    def remove_message(self, session, message_id: str):
+        """
+        Remove the index row of a message.
+
+        Args:
+            session: SQLAlchemy session of the write
+            message_id (str): Message ID
+        """
+        if not self.available:
+            return
+        session.execute(
+            text(f"DELETE FROM {MESSAGE_FTS_TABLE} WHERE message_id = :message_id"),
+            {"message_id": message_id}
+        )
+
+    def remove_chat(self, session, chat_id: str):
+        """
+        Remove the index rows of every message in a chat.
+
+        Args:
+            session: SQLAlchemy session of the write
+            chat_id (str): Chat ID
+        """
+        if not self.available:
+            return
+        session.execute(
+            text(f"DELETE FROM {MESSAGE_FTS_TABLE} WHERE chat_id = :chat_id"),
+            {"chat_id": chat_id}
+        )
+
+    def rebuild(self, conn, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """
+        Clear the index and backfill it from the messages table.
+
+        Args:
+            conn: SQLAlchemy connection or session
+            batch_size (int): Messages read and inserted per batch
+
+        Returns:
+            int: Number of indexed messages
+        """
+        if not self.available:
+            return 0
+        conn.execute(text(f"DELETE FROM {MESSAGE_FTS_TABLE}"))
+
+        insert_stmt = text(
+            f"INSERT INTO {MESSAGE_FTS_TABLE} (body, message_id, chat_id) VALUES (:body, :message_id, :chat_id)"
+        )
+        select_stmt = text(
+            "SELECT rowid, id, chatId, content FROM messages WHERE rowid > :last ORDER BY rowid LIMIT :limit"
+        )
+        indexed = 0
+        last_rowid = 0
+        while True:
+            # Page by rowid so large histories are never loaded at once
+            rows = conn.execute(select_stmt, {"last": last_rowid, "limit": batch_size}).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+
+            batch = []
+            for _, message_id, chat_id, raw_content in rows:
+                content = raw_content
+                if isinstance(raw_content, (str, bytes)):
+                    try:
+                        content = json.loads(raw_content)
+                    except (TypeError, ValueError):
+                        content = raw_content
+                body = extract_searchable_text(content)
+                if body:
+                    batch.append({"body": body, "message_id": message_id, "chat_id": chat_id})
+            if batch:
+                conn.execute(insert_stmt, batch)
+                indexed += len(batch)
+        return indexed
+
+    def count(self, conn) -> int:
+        """Number of indexed messages."""
+        if not self.available:
+            return 0
+        return conn.execute(text(f"SELECT COUNT(*) FROM {MESSAGE_FTS_TABLE}")).scalar() or 0
+
+    # ==================== Search ====================
+
+    def _match_query(self, search_text: str) -> Optional[str]:
+        """Build the FTS5 MATCH expression, or None when LIKE must be used."""
+        if self.tokenizer == "trigram":
+            if len(search_text) < TRIGRAM_MIN_QUERY_CHARS:
+                return None
+            # A quoted phrase is a plain substring match for trigram
+            return '"' + search_text.replace('"', '""') + '"'
+        tokens = [t for t in search_text.split() if t]
+        if not tokens:
+            return None
+        return ' '.join('"' + t.replace('"', '""') + '"*' for t in tokens)
+
+    def search_chats(
+        self,
+        session,
+        user_id: str,
+        search_text: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Find the user's chats with messages matching the search text.
+
+        Chats are ranked by their best-matching message (bm25, then most
+        recent); each hit carries that message's ID, a highlighted snippet
+        and the number of matching messages in the chat.
+
+        Args:
+            session: SQLAlchemy session
+            user_id (str): Member user ID
+            search_text (str): Text to search for
+            limit (int, optional): Maximum number of chats to return
+            offset (int): Number of ranked chats to skip
+
+        Returns:
+            dict: {"total": int, "hits": [{"chatId", "messageId", "snippet", "hits", "score"}]}
+        """
+        search_text = search_text.strip()
+        match_query = self._match_query(search_text)
+        params = {
+            "user_id": user_id,
+            "limit": -1 if limit is None else max(0, int(limit)),
+            "offset": max(0, int(offset or 0)),
+        }
+        if match_query is not None:
+            where_clause = f"{MESSAGE_FTS_TABLE} MATCH :query"
+            score_expr = f"bm25({MESSAGE_FTS_TABLE})"
+            params["query"] = match_query
+        else:
+            where_clause = "body LIKE :pattern ESCAPE '\\'"
+            score_expr = "0.0"
+            params["pattern"] = f"%{_escape_like(search_text)}%"
+
+        rows = session.execute(text(f"""
+            WITH matches AS (
+                SELECT rowid AS fts_rowid, chat_id, message_id, {score_expr} AS score
+                FROM {MESSAGE_FTS_TABLE}
+                WHERE {where_clause}
+                  AND chat_id IN (SELECT chatId FROM members WHERE userId = :user_id)
+            ),
+            ranked AS (
+                SELECT fts_rowid, chat_id, message_id, score,
+                       ROW_NUMBER() OVER (PARTITION BY chat_id ORDER BY score, fts_rowid DESC) AS rn,
+                       COUNT(*) OVER (PARTITION BY chat_id) AS hits
+                FROM matches
+            )
+            SELECT fts_rowid, chat_id, message_id, score, hits, COUNT(*) OVER () AS total
+            FROM ranked
+            WHERE rn = 1
+            ORDER BY score, fts_rowid DESC
+            LIMIT :limit OFFSET :offset
+        """), params).fetchall()
+
+        if not rows:
+            total = 0
+            if params["offset"]:
+                # Page past the end: still report the total
+                total = self.search_chats(session, user_id, search_text, limit=1)["total"]
+            return {"total": total, "hits": []}
+
+        snippets = self._snippets(session, [row[0] for row in rows], match_query, search_text)
+        hits = [
+            {
+                "chatId": row[1],
+                "messageId": row[2],
+                "snippet": snippets.get(row[0], ""),
+                "hits": row[4],
+                "score": row[3],
+            }
+            for row in rows
+        ]
+        return {"total": rows[0][5], "hits": hits}
+
+    def _snippets(self, session, fts_rowids: List[int], match_query: Optional[str], search_text: str) -> Dict[int, str]:
+        """Highlighted snippets for the page's best-matching messages only."""
+        placeholders = ', '.join(f":r{i}" for i in range(len(fts_rowids)))
+        params = {f"r{i}": rowid for i, rowid in enumerate(fts_rowids)}
+        if match_query is not None:
+            params.update({
+                "query": match_query,
+                "open": SNIPPET_OPEN,
+                "close": SNIPPET_CLOSE,
+                "ellipsis": SNIPPET_ELLIPSIS,
+                "tokens": SNIPPET_TOKENS,
+            })
+            rows = session.execute(text(
+                f"SELECT rowid, snippet({MESSAGE_FTS_TABLE}, 0, :open, :close, :ellipsis, :tokens) "
+                f"FROM {MESSAGE_FTS_TABLE} WHERE {MESSAGE_FTS_TABLE} MATCH :query AND rowid IN ({placeholders})"
+            ), params).fetchall()
+            return {row[0]: row[1] for row in rows}
+
+        rows = session.execute(text(
+            f"SELECT rowid, body FROM {MESSAGE_FTS_TABLE} WHERE rowid IN ({placeholders})"
+        ), params).fetchall()
+        return {row[0]: _like_snippet(row[1] or "", search_text) for row in rows}
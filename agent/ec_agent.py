@@ -7,7 +7,8 @@ from queue import Queue
 from concurrent.futures import ThreadPoolExecutor
 
 from agent.a2a.common.client import A2AClient
-from agent.a2a.common.server import A2AServer
+from agent.a2a.common.server import A2AServer, a2a_gateway_enabled, get_a2a_gateway
+from agent.a2a.common.server.gateway import agent_url
 from agent.a2a.common.types import AgentCard
 from agent.a2a.common.utils.push_notification_auth import PushNotificationSenderAuth
 from agent.a2a.langgraph_agent.task_manager import AgentTaskManager
@@ -18,10 +19,12 @@ from browser_use.agent.service import Agent
 from agent.ec_skill import EC_Skill
 from agent.run_utils import time_execution_sync
 from agent.ec_tasks import TaskRunner, ManagedTask
+from agent.ec_tasks.skill_scheduler import get_skill_scheduler
 from agent.human_chatter import *
 import threading
 import concurrent.futures
 import base64
+from urllib.parse import urlsplit
 from utils.logger_helper import logger_helper as logger
 from utils.logger_helper import get_traceback
 from agent.db.services.db_avatar_service import DBAvatarService
@@ -121,6 +124,9 @@ class EC_Agent(Agent):
 			return None
 
 		self.mainwin = mainwin
+		if a2a_gateway_enabled():
+			# Served from the shared gateway under /agents/<id>; peers append "/a2a/" to the card URL as before
+			card.url = agent_url(card.url, card.id)
 		self.card = card
 		server_host = "0.0.0.0"  # Bind to all interfaces for both local and remote access
 
@@ -235,14 +241,23 @@ class EC_Agent(Agent):
 
 	def add_tasks(self, tasks):
 		self.tasks += tasks  # or: self.tasks.extend(tasks)
+		self._notify_schedule_changed()
 
 	def remove_tasks(self, tasks):
 		self.tasks = [t for t in self.tasks if t not in tasks]
+		self._notify_schedule_changed()
 
 	def update_tasks(self, tasks):
 		# Replace existing tasks with same ID or append if new
 		task_ids = {t.id for t in tasks}
 		self.tasks = [t for t in self.tasks if t.id not in task_ids] + tasks
+		self._notify_schedule_changed()
+
+	def _notify_schedule_changed(self):
+		# Schedule workers sleep until the next due task; wake them to re-index
+		runner = getattr(self, "runner", None)
+		if runner is not None and hasattr(runner, "notify_schedule_changed"):
+			runner.notify_schedule_changed()
 
 	def get_work_msg_queue(self):
 		chat_task = next((task for task in self.tasks if task and "work" in task.name.lower()), None)
@@ -279,7 +294,7 @@ class EC_Agent(Agent):
 
 	def get_a2a_server_port(self):
 		"""Get the A2A server port number"""
-		return int(self.a2a_server.agent_card.url.split(":")[-1])
+		return urlsplit(self.a2a_server.agent_card.url).port
 
 	def get_vehicle(self):
 		return self.vehicle
@@ -289,7 +304,14 @@ class EC_Agent(Agent):
 		return busy
 
 	def start_a2a_server_in_thread(self, a2a_server):
-		"""Start A2A server in a daemon thread"""
+		"""Start A2A server in a daemon thread, or register it with the shared gateway"""
+		if a2a_gateway_enabled():
+			gateway = get_a2a_gateway()
+			gateway.register(self.card.id, a2a_server)
+			gateway.start()
+			self.a2a_server_thread = None
+			return
+
 		def run_server():
 			try:
 				a2a_server.start()
@@ -303,8 +325,11 @@ class EC_Agent(Agent):
 		self.a2a_server_thread.start()
 
 	def exit_a2a_server_in_thread(self):
-		if self.a2a_server_thread and self.a2a_server_thread.is_alive():
-			self.a2a_server_thread.join(timeout=5)
+		if a2a_gateway_enabled():
+			get_a2a_gateway().unregister(self.card.id)
+		a2a_server_thread = getattr(self, "a2a_server_thread", None)
+		if a2a_server_thread and a2a_server_thread.is_alive():
+			a2a_server_thread.join(timeout=5)
 
 	def new_thread(self,tid):
 		task_thread = threading.Thread()
@@ -320,7 +345,8 @@ class EC_Agent(Agent):
 		logger.info("A2A server started....", self.card.name)
 		# loop = asyncio.get_running_loop()
 		# kick off TaskExecutor
-		thread_pool_executor = self.mainwin.threadPoolExecutor
+		# Trigger loops block for their whole life, so each gets its own thread rather than a pool slot
+		scheduler = get_skill_scheduler()
 		logger.info(f"[AGENT_START] Agent {self.card.name} has {len(self.tasks)} tasks to start")
 		for task in self.tasks:
 			# new_thread = self.new_thread(task.id)
@@ -344,7 +370,7 @@ class EC_Agent(Agent):
 
 			# Submit the task and register it using its run_id
 			if hasattr(task, 'run_id') and task.run_id:
-				future = thread_pool_executor.submit(target_func, task)
+				future = scheduler.start_loop(f"{self.card.name}-{task.run_id}", target_func, task)
 				with self.task_lock:
 					self.active_tasks[task.run_id] = future
 				future.add_done_callback(lambda f, run_id=task.run_id: self._task_done_callback(run_id, f))
@@ -425,7 +451,6 @@ class EC_Agent(Agent):
 		try:
 			a2a_end_point = recipient_agent.get_card().url + "/a2a/"
 			logger.info("[ec_agent] a2a end point: ", a2a_end_point)
-			self.a2a_client.set_recipient(url=a2a_end_point)
 			if isinstance(message["attributes"]['params']['content'], str):
 				msg_text = message["attributes"]['params']['content']
 			elif isinstance(message["attributes"]['params']['content'], dict):
@@ -480,7 +505,7 @@ class EC_Agent(Agent):
 
 			logger.info("[ec_agent] client payload:", payload)
 			# response = await self.a2a_client.send_task(payload)
-			response = self.a2a_client.sync_send_task(payload.model_dump())
+			response = self.a2a_client.sync_send_task(payload.model_dump(), url=a2a_end_point)
 			logger.info("[ec_agent] A2A RESPONSE:", response)
 			return response
 		except Exception as e:
@@ -907,8 +932,9 @@ class EC_Agent(Agent):
 			dev_task_template.cancellation_event.clear() # Ensure the event is not set from a previous run
 
 			# Launch the new dev run task
-			thread_pool_executor = self.mainwin.threadPoolExecutor
-			future = thread_pool_executor.submit(self.runner.launch_dev_run, init_state, dev_task_template)
+			future = get_skill_scheduler().start_loop(
+				f"{self.card.name}-{DEV_RUN_ID}", self.runner.launch_dev_run, init_state, dev_task_template
+			)
 			with self.task_lock:
 				self.active_tasks[DEV_RUN_ID] = future
 			future.add_done_callback(lambda f: self._task_done_callback(DEV_RUN_ID, f))
@@ -540,7 +540,59 @@ async def _update_database_with_cloud_agent_tasks(cloud_agent_tasks, main_win):
         logger.error(f"[create_agent_tasks] Error: {e}")
 
 
-async def build_agent_tasks(main_win):
+async def load_agent_task_sources(main_win) -> list:
+    """Load DB agent tasks, preferring cloud data (independent of skills)
+
+    1. Parallel loading: local database + cloud data
+    2. Wait for both to complete, cloud data takes priority and overwrites local database
+
+    Returns:
+        List of agent task objects from DB/cloud
+    """
+    # Step 1: Parallel loading from local database and cloud
+    logger.info("[build_agent_tasks] Step 1: Parallel loading DB and Cloud...")
+    db_task = asyncio.create_task(_load_agent_tasks_from_database_async(main_win))
+    cloud_task = asyncio.create_task(_load_agent_tasks_from_cloud_async(main_win))
+
+    # Step 2: Wait for both database and cloud to complete
+    logger.info("[build_agent_tasks] Step 2: Waiting for DB and Cloud...")
+    db_agent_tasks = []
+    cloud_agent_tasks = []
+
+    try:
+        db_agent_tasks = await asyncio.wait_for(db_task, timeout=5.0)
+        logger.info(f"[build_agent_tasks] ✅ Loaded {len(db_agent_tasks)} agent tasks from database")
+    except asyncio.TimeoutError:
+        logger.warning("[build_agent_tasks] ⏰ Database timeout")
+    except Exception as e:
+        logger.error(f"[build_agent_tasks] ❌ Database failed: {e}")
+
+    try:
+        cloud_agent_tasks = await asyncio.wait_for(cloud_task, timeout=10.0)
+        logger.info(f"[build_agent_tasks] ✅ Loaded {len(cloud_agent_tasks or [])} agent tasks from cloud")
+    except asyncio.TimeoutError:
+        logger.warning("[build_agent_tasks] ⏰ Cloud timeout")
+    except Exception as e:
+        logger.error(f"[build_agent_tasks] ❌ Cloud failed: {e}")
+
+    # Step 3: Check cloud data, if available overwrite local database
+    if cloud_agent_tasks and len(cloud_agent_tasks) > 0:
+        logger.info(f"[build_agent_tasks] Step 3: Cloud data available, using cloud agent tasks...")
+
+        # Cloud data overwrites local database (background async execution, non-blocking)
+        asyncio.create_task(_update_database_with_cloud_agent_tasks(cloud_agent_tasks, main_win))
+        logger.info(f"[build_agent_tasks] 🔄 Database update started in background (non-blocking)")
+
+        # Use cloud data as final database agent tasks
+        logger.info(f"[build_agent_tasks] ✅ Using {len(cloud_agent_tasks)} cloud agent tasks")
+        return cloud_agent_tasks
+
+    # No cloud data, use local database data
+    logger.info(f"[build_agent_tasks] Step 3: No cloud data, using database agent tasks...")
+    return db_agent_tasks
+
+
+async def build_agent_tasks(main_win, task_sources=None):
     """Build Agent Tasks - supports local database + cloud data + local code triple data sources
 
     Data flow (similar to build_agent_skills):
@@ -550,52 +602,18 @@ async def build_agent_tasks(main_win):
     4. Update mainwindow.agent_tasks memory
     5. TODO: After agents are built, merge agent.tasks into mainwin.agent_tasks
        (This step will be deprecated in the future)
+
+    Local code tasks look their skills up in main_win.agent_skills, so skills must
+    be built first; DB/cloud loading does not need them and can be done ahead of
+    time with load_agent_task_sources() and passed in as task_sources.
     """
     try:
         logger.info("[build_agent_tasks] Starting agent task building with DB+Cloud+Local integration...")
 
-        # Step 1: Parallel loading from local database and cloud
-        logger.info("[build_agent_tasks] Step 1: Parallel loading DB and Cloud...")
-        db_task = asyncio.create_task(_load_agent_tasks_from_database_async(main_win))
-        cloud_task = asyncio.create_task(_load_agent_tasks_from_cloud_async(main_win))
-
-        # Step 2: Wait for both database and cloud to complete
-        logger.info("[build_agent_tasks] Step 2: Waiting for DB and Cloud...")
-        db_agent_tasks = []
-        cloud_agent_tasks = []
-
-        try:
-            db_agent_tasks = await asyncio.wait_for(db_task, timeout=5.0)
-            logger.info(f"[build_agent_tasks] ✅ Loaded {len(db_agent_tasks)} agent tasks from database")
-        except asyncio.TimeoutError:
-            logger.warning("[build_agent_tasks] ⏰ Database timeout")
-        except Exception as e:
-            logger.error(f"[build_agent_tasks] ❌ Database failed: {e}")
-
-        try:
-            cloud_agent_tasks = await asyncio.wait_for(cloud_task, timeout=10.0)
-            logger.info(f"[build_agent_tasks] ✅ Loaded {len(cloud_agent_tasks or [])} agent tasks from cloud")
-        except asyncio.TimeoutError:
-            logger.warning("[build_agent_tasks] ⏰ Cloud timeout")
-        except Exception as e:
-            logger.error(f"[build_agent_tasks] ❌ Cloud failed: {e}")
-
-        # Step 3: Check cloud data, if available overwrite local database
-        final_db_agent_tasks = []
-        if cloud_agent_tasks and len(cloud_agent_tasks) > 0:
-            logger.info(f"[build_agent_tasks] Step 3: Cloud data available, using cloud agent tasks...")
-
-            # Cloud data overwrites local database (background async execution, non-blocking)
-            asyncio.create_task(_update_database_with_cloud_agent_tasks(cloud_agent_tasks, main_win))
-            logger.info(f"[build_agent_tasks] 🔄 Database update started in background (non-blocking)")
-
-            # Use cloud data as final database agent tasks
-            final_db_agent_tasks = cloud_agent_tasks
-            logger.info(f"[build_agent_tasks] ✅ Using {len(cloud_agent_tasks)} cloud agent tasks")
+        if task_sources is None:
+            final_db_agent_tasks = await load_agent_task_sources(main_win)
         else:
-            # No cloud data, use local database data
-            logger.info(f"[build_agent_tasks] Step 3: No cloud data, using database agent tasks...")
-            final_db_agent_tasks = db_agent_tasks
+            final_db_agent_tasks = task_sources
 
         # Step 4: Build local code agent tasks
         local_agent_tasks = []
@@ -1,7 +1,10 @@
 import traceback
 import asyncio
+import os
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple, Any
 import inspect
@@ -32,6 +35,13 @@ from agent.ec_skills.flowgram2langgraph_v2 import flowgram2langgraph_v2
 from agent.db.models.skill_model import DBAgentSkill
 
 
+# Workflow compilation is pure Python (the compiled graphs hold closures and can't be
+# pickled back from a process pool), so it runs on a small dedicated thread pool to
+# keep the event loop responsive while other startup phases make progress.
+_SKILL_COMPILE_WORKERS_ENV = "EC_SKILL_COMPILE_WORKERS"
+_skill_compile_executor: Optional[ThreadPoolExecutor] = None
+_skill_compile_executor_lock = threading.Lock()
+
 
 def _get_resource_skills_root() -> Path:
     """Get the root path for resource/my_skills directory.
@@ -80,31 +90,21 @@ async def build_agent_skills_parallel(mainwin):
     total_skills = len(core_skills) + len(rpa_skills) + len(advanced_skills)
     logger.info(f"[build_agent_skills] Starting optimized creation of {total_skills} skills in 3 batches...")
 
-    all_skills = []
-
-    # Batch 1: Core skills (concurrency=4)
-    logger.info(f"[build_agent_skills] Batch 1: Creating {len(core_skills)} core skills...")
-    batch1_start = time.time()
-    batch1_results = await _create_skills_batch(mainwin, core_skills, max_concurrent=4)
-    all_skills.extend(batch1_results)
-    batch1_time = time.time() - batch1_start
-    logger.info(f"[build_agent_skills] Batch 1 completed in {batch1_time:.3f}s")
-
-    # Batch 2: RPA skills (concurrency=3, avoid resource contention)
-    logger.info(f"[build_agent_skills] Batch 2: Creating {len(rpa_skills)} RPA skills...")
-    batch2_start = time.time()
-    batch2_results = await _create_skills_batch(mainwin, rpa_skills, max_concurrent=3)
-    all_skills.extend(batch2_results)
-    batch2_time = time.time() - batch2_start
-    logger.info(f"[build_agent_skills] Batch 2 completed in {batch2_time:.3f}s")
-
-    # Batch 3: Advanced skills (concurrency=2, avoid overload)
-    logger.info(f"[build_agent_skills] Batch 3: Creating {len(advanced_skills)} advanced skills...")
-    batch3_start = time.time()
-    batch3_results = await _create_skills_batch(mainwin, advanced_skills, max_concurrent=2)
-    all_skills.extend(batch3_results)
-    batch3_time = time.time() - batch3_start
-    logger.info(f"[build_agent_skills] Batch 3 completed in {batch3_time:.3f}s")
+    async def run_batch(label, skill_creators, max_concurrent):
+        logger.info(f"[build_agent_skills] {label}: Creating {len(skill_creators)} skills...")
+        batch_start = time.time()
+        results = await _create_skills_batch(mainwin, skill_creators, max_concurrent=max_concurrent)
+        logger.info(f"[build_agent_skills] {label} completed in {time.time() - batch_start:.3f}s")
+        return results
+
+    # The batches are independent; each keeps its own concurrency limit
+    # (core=4, RPA=3, advanced=2) and heavy compilation is bounded by the compile pool
+    batch_results = await asyncio.gather(
+        run_batch("Batch 1", core_skills, 4),
+        run_batch("Batch 2", rpa_skills, 3),
+        run_batch("Batch 3", advanced_skills, 2),
+    )
+    all_skills = [skill for results in batch_results for skill in results]
 
     total_time = time.time() - start_time
     logger.info(f"[build_agent_skills] Optimized parallel creation completed in {total_time:.3f}s")
@@ -260,12 +260,12 @@ def create_skill_from_resource(
 
 async def create_demo0_skill(mainwin) -> Optional[EC_Skill]:
     """Create demo0 skill from resource/my_skills example"""
-    return create_skill_from_resource("demo0")
+    return await _run_in_compile_pool(create_skill_from_resource, "demo0")
 
 
 async def create_ebay_fullfill_messages_skill(mainwin) -> Optional[EC_Skill]:
     """Create ebay_fullfill_messages skill from resource/my_skills example"""
-    return create_skill_from_resource("ebay_fullfill_messages")
+    return await _run_in_compile_pool(create_skill_from_resource, "ebay_fullfill_messages")
 
 
 async def create_search_digikey_chatter_skill(mainwin) -> Optional[EC_Skill]:
@@ -326,96 +326,160 @@ async def _create_skills_batch(mainwin, skill_creators, max_concurrent=4):
         skills = []
     return skills
 
-async def build_agent_skills(mainwin, skill_path=""):
-    """Build Agent Skills - supports local database + cloud data + local code triple data sources
+def get_skill_compile_workers() -> int:
+    """Number of worker threads used to compile skill workflows at startup"""
+    raw = os.environ.get(_SKILL_COMPILE_WORKERS_ENV, "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            logger.warning(f"[build_agent_skills] Invalid {_SKILL_COMPILE_WORKERS_ENV}={raw!r}, using default")
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _get_skill_compile_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for CPU-heavy skill compilation (keeps the event loop free)"""
+    global _skill_compile_executor
+    with _skill_compile_executor_lock:
+        if _skill_compile_executor is None:
+            _skill_compile_executor = ThreadPoolExecutor(
+                max_workers=get_skill_compile_workers(), thread_name_prefix="skill-compile"
+            )
+        return _skill_compile_executor
+
+
+async def _run_in_compile_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_skill_compile_executor(), func, *args)
+
+
+async def load_skill_sources(mainwin) -> list:
+    """Load DB skill records, preferring cloud data (the startup cloud skill sync)
 
-    Data flow:
     1. Parallel loading: local database + cloud data
     2. Wait for both to complete, cloud data takes priority and overwrites local database
-    3. Add locally built skills from code
-    4. Merge all data and update mainwindow.agent_skills memory
+
+    Returns:
+        List of skill records to convert into EC_Skill objects
     """
+    # Step 1: Start parallel loading from local database and cloud
+    logger.info("[build_agent_skills] Step 1: Parallel loading DB and Cloud...")
+    db_task = asyncio.create_task(_load_skills_from_database_async(mainwin))
+    cloud_task = asyncio.create_task(_load_skills_from_cloud_async(mainwin))
+
+    # Step 2: Wait for both database and cloud to complete (with timeout)
+    logger.info("[build_agent_skills] Step 2: Waiting for DB and Cloud...")
+    db_skills = []
+    cloud_skills = []
+
     try:
-        logger.info("[build_agent_skills] Starting skill building with DB+Cloud+Local integration...")
-        start_time = time.time()
+        # Wait for database task
+        db_skills = await asyncio.wait_for(db_task, timeout=3.0)
+        logger.info(f"[build_agent_skills] ✅ Loaded {len(db_skills)} skills from database")
+    except asyncio.TimeoutError:
+        logger.warning("[build_agent_skills] ⏰ Database timeout")
+    except Exception as e:
+        logger.error(f"[build_agent_skills] ❌ Database failed: {e}")
+
+    try:
+        # Wait for cloud task
+        cloud_skills = await asyncio.wait_for(cloud_task, timeout=5.0)
+        logger.info(f"[build_agent_skills] ✅ Loaded {len(cloud_skills or [])} skills from cloud")
+    except asyncio.TimeoutError:
+        logger.warning("[build_agent_skills] ⏰ Cloud timeout")
+    except Exception as e:
+        logger.error(f"[build_agent_skills] ❌ Cloud failed: {e}")
 
-        # Step 1: Start parallel loading from local database and cloud
-        logger.info("[build_agent_skills] Step 1: Parallel loading DB and Cloud...")
-        db_task = asyncio.create_task(_load_skills_from_database_async(mainwin))
-        cloud_task = asyncio.create_task(_load_skills_from_cloud_async(mainwin))
+    # Step 3: Check cloud data, if available overwrite local database (async non-blocking)
+    if cloud_skills and len(cloud_skills) > 0:
+        logger.info(f"[build_agent_skills] Step 3: Cloud data available, using cloud skills...")
 
-        # Step 2: Wait for both database and cloud to complete (with timeout)
-        logger.info("[build_agent_skills] Step 2: Waiting for DB and Cloud...")
-        db_skills = []
-        cloud_skills = []
+        # Cloud data overwrites local database (background async execution, non-blocking)
+        asyncio.create_task(_update_database_with_cloud_skills(cloud_skills, mainwin))
+        logger.info(f"[build_agent_skills] 🔄 Database update started in background (non-blocking)")
 
-        try:
-            # Wait for database task
-            db_skills = await asyncio.wait_for(db_task, timeout=3.0)
-            logger.info(f"[build_agent_skills] ✅ Loaded {len(db_skills)} skills from database")
-        except asyncio.TimeoutError:
-            logger.warning("[build_agent_skills] ⏰ Database timeout")
-        except Exception as e:
-            logger.error(f"[build_agent_skills] ❌ Database failed: {e}")
+        # Use cloud data as final database skills
+        logger.info(f"[build_agent_skills] ✅ Using {len(cloud_skills)} cloud skills")
+        return cloud_skills
+
+    # No cloud data, use local database data
+    logger.info(f"[build_agent_skills] Step 3: No cloud data, using database skills...")
+    return db_skills
 
+
+async def _convert_db_skills_async(final_db_skills) -> list:
+    """Convert DB skill records to EC_Skill objects on the compile pool, preserving order"""
+
+    async def convert_single(i, db_skill):
         try:
-            # Wait for cloud task
-            cloud_skills = await asyncio.wait_for(cloud_task, timeout=5.0)
-            logger.info(f"[build_agent_skills] ✅ Loaded {len(cloud_skills or [])} skills from cloud")
-        except asyncio.TimeoutError:
-            logger.warning("[build_agent_skills] ⏰ Cloud timeout")
+            db_skill_name = db_skill.get('name', 'unknown')
+            db_skill_source = db_skill.get('source', 'ui')
+
+            # Validate: code skills should not be in database
+            if db_skill_source == 'code':
+                logger.error(f"[build_agent_skills] ❌ Invalid: code skill '{db_skill_name}' found in database")
+                return None
+
+            logger.debug(f"[build_agent_skills] Converting DB skill {i+1}/{len(final_db_skills)}: {db_skill_name}")
+            skill_obj = await _run_in_compile_pool(_convert_db_skill_to_object, db_skill)
+            if skill_obj:
+                logger.debug(f"[build_agent_skills] ✅ Successfully converted: {skill_obj.name}")
+            else:
+                logger.warning(f"[build_agent_skills] ⚠️ Conversion returned None for: {db_skill_name}")
+            return skill_obj
         except Exception as e:
-            logger.error(f"[build_agent_skills] ❌ Cloud failed: {e}")
+            logger.error(f"[build_agent_skills] ❌ Failed to convert skill {db_skill.get('name', 'unknown')}: {e}")
+            logger.error(f"[build_agent_skills] Traceback: {traceback.format_exc()}")
+            return None
+
+    results = await asyncio.gather(*(convert_single(i, db_skill) for i, db_skill in enumerate(final_db_skills)))
+    return [skill_obj for skill_obj in results if skill_obj]
 
-        # Step 3: Check cloud data, if available overwrite local database (async non-blocking)
-        final_db_skills = []
-        if cloud_skills and len(cloud_skills) > 0:
-            logger.info(f"[build_agent_skills] Step 3: Cloud data available, using cloud skills...")
 
-            # Cloud data overwrites local database (background async execution, non-blocking)
-            asyncio.create_task(_update_database_with_cloud_skills(cloud_skills, mainwin))
-            logger.info(f"[build_agent_skills] 🔄 Database update started in background (non-blocking)")
+async def build_agent_skills(mainwin, skill_path="", skill_sources=None):
+    """Build Agent Skills - supports local database + cloud data + local code triple data sources
+
+    Data flow:
+    1. Parallel loading: local database + cloud data, and local code skills alongside
+    2. Wait for both to complete, cloud data takes priority and overwrites local database
+    3. Convert database skills on the compile worker pool
+    4. Merge all data and update mainwindow.agent_skills memory
 
-            # Use cloud data as final database skills
-            final_db_skills = cloud_skills
-            logger.info(f"[build_agent_skills] ✅ Using {len(cloud_skills)} cloud skills")
+    Args:
+        skill_sources: Optional list (or awaitable resolving to a list) of already
+            loaded DB/cloud skill records, e.g. from a separate load_skill_sources()
+            startup phase. Loaded here when not given.
+    """
+    try:
+        logger.info("[build_agent_skills] Starting skill building with DB+Cloud+Local integration...")
+        start_time = time.time()
+
+        # Local code skills don't depend on DB/cloud data, build them while those load
+        code_task = asyncio.create_task(_build_local_skills_async(mainwin, skill_path))
+
+        if skill_sources is None:
+            final_db_skills = await load_skill_sources(mainwin)
+        elif inspect.isawaitable(skill_sources):
+            try:
+                final_db_skills = await skill_sources
+            except Exception as e:
+                logger.error(f"[build_agent_skills] ❌ Loading DB/Cloud skills failed: {e}")
+                final_db_skills = []
         else:
-            # No cloud data, use local database data
-            logger.info(f"[build_agent_skills] Step 3: No cloud data, using database skills...")
-            final_db_skills = db_skills
+            final_db_skills = skill_sources
+        final_db_skills = final_db_skills or []
 
         # Step 4: Convert database skills to skill objects
         logger.info("[build_agent_skills] Step 4: Converting DB skills to objects...")
         logger.info(f"[build_agent_skills] DB skills to convert: {len(final_db_skills)}")
-        
-        memory_skills = []
-        for i, db_skill in enumerate(final_db_skills):
-            try:
-                db_skill_name = db_skill.get('name', 'unknown')
-                db_skill_source = db_skill.get('source', 'ui')
-                
-                # Validate: code skills should not be in database
-                if db_skill_source == 'code':
-                    logger.error(f"[build_agent_skills] ❌ Invalid: code skill '{db_skill_name}' found in database")
-                    continue
-                
-                logger.debug(f"[build_agent_skills] Converting DB skill {i+1}/{len(final_db_skills)}: {db_skill_name}")
-                skill_obj = _convert_db_skill_to_object(db_skill)
-                if skill_obj:
-                    memory_skills.append(skill_obj)
-                    logger.debug(f"[build_agent_skills] ✅ Successfully converted: {skill_obj.name}")
-                else:
-                    logger.warning(f"[build_agent_skills] ⚠️ Conversion returned None for: {db_skill_name}")
-            except Exception as e:
-                logger.error(f"[build_agent_skills] ❌ Failed to convert skill {db_skill.get('name', 'unknown')}: {e}")
-                logger.error(f"[build_agent_skills] Traceback: {traceback.format_exc()}")
+
+        memory_skills = await _convert_db_skills_async(final_db_skills)
 
         logger.info(f"[build_agent_skills] ✅ Converted {len(memory_skills)} DB skills to objects")
 
-        # Step 5: Build local code-based skills (built-in + resource/my_skills examples)
-        logger.info("[build_agent_skills] Step 5: Building local code skills...")
+        # Step 5: Collect local code-based skills (built-in + resource/my_skills examples)
+        logger.info("[build_agent_skills] Step 5: Waiting for local code skills...")
         try:
-            code_skills = await _build_local_skills_async(mainwin, skill_path)
+            code_skills = await code_task
             logger.info(f"[build_agent_skills] ✅ Built {len(code_skills or [])} code skills")
         except Exception as e:
             logger.error(f"[build_agent_skills] ❌ Local build failed: {e}")
@@ -423,18 +487,18 @@ async def build_agent_skills(mainwin, skill_path=""):
 
         # Step 6: Merge all skill data (simplified)
         logger.info("[build_agent_skills] Step 6: Merging all skills...")
-        
+
         # Design: Only 2 types of skills
         # 1. Database skills (UI-created): saved in DB, use DB ID
         # 2. Code skills: Built-in + resource/my_skills examples, use stable ID, source="code"
-        
+
         skills_dict = {}
-        
+
         # First add database/cloud skills (UI-created)
         for skill in memory_skills:
             if skill is not None and hasattr(skill, 'name'):
                 skills_dict[skill.name] = skill
-        
+
         # Then add code skills (built-in + examples)
         # Code skills override DB skills with same name
         if code_skills:
@@ -445,7 +509,7 @@ async def build_agent_skills(mainwin, skill_path=""):
                         logger.info(f"[build_agent_skills] 💡 Consider deleting '{skill.name}' from database to avoid conflicts")
                     skill.source = "code"  # Ensure source is set
                     skills_dict[skill.name] = skill
-        
+
         # Convert back to list
         all_skills = list(skills_dict.values())
 
@@ -1,6 +1,11 @@
+import copy
+import hashlib
 import json
 import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from agent.ec_skills.dev_defs import BreakpointManager
 
@@ -8,6 +13,51 @@ from utils.logger_helper import logger_helper as logger
 from utils.user_path_helper import ensure_user_data_dir
 
 
+# Per-stage workflow dumps (JSON + mermaid) are opt-in: EC_SKILL_GRAPH_DEBUG=1
+_V2_DEBUG_ENV = "EC_SKILL_GRAPH_DEBUG"
+
+# Bump when preprocessing output changes in a way the source hash cannot see
+_V2_CACHE_VERSION = 1
+_V2_CACHE_SUBDIR = "cache/skill_graphs"
+_V2_MEMORY_CACHE_SIZE = 256
+_V2_DISK_CACHE_MAX_FILES = 512
+# The disk cache is pruned on the first write and then every this many writes,
+# so it may briefly hold up to this many files over the limit
+_V2_DISK_CACHE_PRUNE_EVERY = 32
+
+_v2_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+_v2_cache_lock = threading.Lock()
+_v2_code_fingerprint: Optional[str] = None
+_v2_writer_executor: Optional[ThreadPoolExecutor] = None
+_v2_disk_puts = 0
+
+
+def _v2_debug_enabled() -> bool:
+    return os.environ.get(_V2_DEBUG_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _v2_submit_write(fn, *args):
+    """Run file output (cache entries, debug dumps) on the background writer thread."""
+    global _v2_writer_executor
+    with _v2_cache_lock:
+        if _v2_writer_executor is None:
+            _v2_writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="v2_wf_writer")
+    return _v2_writer_executor.submit(fn, *args)
+
+
+def _v2_submit_debug(fn, *args):
+    """Run a debug dump on the background writer thread."""
+    _v2_submit_write(fn, *args)
+
+
+def _v2_flush_writes():
+    """Wait for the writes submitted so far (the writer runs them in order)."""
+    with _v2_cache_lock:
+        executor = _v2_writer_executor
+    if executor is not None:
+        executor.submit(lambda: None).result()
+
+
 def _get_debug_workflow_dir() -> str:
     """Get the directory for workflow debug files.
     Returns: {log_user}/debug/workflows/
@@ -93,6 +143,16 @@ def _v2_remove_dummy_nodes(wf: dict) -> dict:
 
 
 def _v2_debug_workflow(tag: str, wf: dict, base_name: Optional[str] = None):
+    if not _v2_debug_enabled():
+        return
+    try:
+        # Snapshot now; summarizing and writing happen on the writer thread
+        _v2_submit_debug(_v2_write_debug_workflow, tag, copy.deepcopy(wf), base_name)
+    except Exception:
+        pass
+
+
+def _v2_write_debug_workflow(tag: str, wf: dict, base_name: Optional[str] = None):
     try:
         nodes = wf.get('nodes', []) or []
         edges = wf.get('edges', []) or []
@@ -602,6 +662,15 @@ def _v2_safe_base_name(flow: dict) -> str:
 
 
 def _v2_save_mermaid(tag: str, wf: dict, base_name: str):
+    if not _v2_debug_enabled():
+        return
+    try:
+        _v2_submit_debug(_v2_write_mermaid, tag, copy.deepcopy(wf), base_name)
+    except Exception:
+        pass
+
+
+def _v2_write_mermaid(tag: str, wf: dict, base_name: str):
     try:
         mer = _v2_build_mermaid(wf)
         debug_dir = _get_debug_workflow_dir()
@@ -613,11 +682,146 @@ def _v2_save_mermaid(tag: str, wf: dict, base_name: str):
         logger.debug(f"[v2][mmd] save failed: {e}")
 
 
-def flowgram2langgraph_v2(flow: dict, bundle_json: Optional[dict] = None, enable_subgraph: bool = False, bp_mgr: Optional[BreakpointManager] = None):
-    """
-    v2 layered converter (flat mode for now). Same input/output signature as v1.
-    We preprocess schema (flatten sheets, remove groups), then delegate to v1.
-    """
+# ---------------------------------------------------------------------------
+# Preprocessed graph cache
+# ---------------------------------------------------------------------------
+
+def _v2_get_code_fingerprint() -> str:
+    """Hash of this module's source, so converter changes invalidate cached graphs."""
+    global _v2_code_fingerprint
+    if _v2_code_fingerprint is None:
+        h = hashlib.sha256(str(_V2_CACHE_VERSION).encode())
+        try:
+            with open(__file__, 'rb') as f:
+                h.update(f.read())
+        except Exception:
+            pass  # Frozen builds without sources rely on _V2_CACHE_VERSION
+        _v2_code_fingerprint = h.hexdigest()
+    return _v2_code_fingerprint
+
+
+def _v2_cache_key(flow: dict, bundle_json: Optional[dict]) -> Optional[str]:
+    """Content hash of everything preprocessing reads from the flow and bundle."""
+    try:
+        payload = json.dumps(
+            {
+                'workFlow': flow.get('workFlow'),
+                'sheetName': flow.get('sheetName'),
+                'bundle': bundle_json or flow.get('bundle'),
+                'code': _v2_get_code_fingerprint(),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _v2_cache_path(key: str) -> Optional[str]:
+    try:
+        return os.path.join(ensure_user_data_dir(subdir=_V2_CACHE_SUBDIR), f"{key}.json")
+    except Exception as e:
+        logger.debug(f"[v2][cache] cache directory unavailable: {e}")
+        return None
+
+
+def _v2_cache_remember(key: str, text: str):
+    with _v2_cache_lock:
+        _v2_memory_cache[key] = text
+        _v2_memory_cache.move_to_end(key)
+        while len(_v2_memory_cache) > _V2_MEMORY_CACHE_SIZE:
+            _v2_memory_cache.popitem(last=False)
+
+
+def _v2_cache_get(key: str) -> Optional[dict]:
+    with _v2_cache_lock:
+        text = _v2_memory_cache.get(key)
+        if text is not None:
+            _v2_memory_cache.move_to_end(key)
+    if text is None:
+        path = _v2_cache_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            logger.debug(f"[v2][cache] read failed for {path}: {e}")
+            return None
+    try:
+        # Every hit gets its own copy; the converter may mutate the workflow
+        wf = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(wf, dict):
+        return None
+    _v2_cache_remember(key, text)
+    return wf
+
+
+def _v2_cache_put(key: str, wf: dict):
+    try:
+        text = json.dumps(wf, ensure_ascii=False, separators=(',', ':'))
+    except (TypeError, ValueError) as e:
+        logger.debug(f"[v2][cache] workflow not serializable, not cached: {e}")
+        return
+    _v2_cache_remember(key, text)
+    path = _v2_cache_path(key)
+    if not path:
+        return
+    global _v2_disk_puts
+    with _v2_cache_lock:
+        prune = _v2_disk_puts % _V2_DISK_CACHE_PRUNE_EVERY == 0
+        _v2_disk_puts += 1
+    _v2_submit_write(_v2_write_cache_file, path, text, prune)
+
+
+def _v2_write_cache_file(path: str, text: str, prune: bool):
+    try:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.debug(f"[v2][cache] write failed for {path}: {e}")
+        return
+    if prune:
+        _v2_prune_disk_cache(os.path.dirname(path))
+
+
+def _v2_prune_disk_cache(cache_dir: str):
+    """Drop the least recently written entries beyond _V2_DISK_CACHE_MAX_FILES."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.name.endswith('.json')]
+        if len(entries) <= _V2_DISK_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - _V2_DISK_CACHE_MAX_FILES]:
+            os.remove(e.path)
+    except Exception as e:
+        logger.debug(f"[v2][cache] prune failed: {e}")
+
+
+def clear_v2_compile_cache(disk: bool = False):
+    """Forget cached preprocessed graphs (and their files when disk=True)."""
+    _v2_flush_writes()
+    with _v2_cache_lock:
+        _v2_memory_cache.clear()
+    if not disk:
+        return
+    try:
+        cache_dir = ensure_user_data_dir(subdir=_V2_CACHE_SUBDIR)
+        for e in os.scandir(cache_dir):
+            if e.name.endswith('.json'):
+                os.remove(e.path)
+    except Exception as e:
+        logger.debug(f"[v2][cache] clear failed: {e}")
+
+
+def _v2_preprocess(flow: dict, bundle_json: Optional[dict], base_name: str) -> dict:
+    """Flatten sheets, remove groups, convert loops and remove dummy nodes."""
     # Prepare sheets list like v1
     sheets: List[dict] = []
     base = flow
@@ -632,8 +836,6 @@ def flowgram2langgraph_v2(flow: dict, bundle_json: Optional[dict] = None, enable
         # Single sheet fallback
         sheets.append({'name': base.get('sheetName', 'main'), 'workFlow': base.get('workFlow', {})})
 
-    base_name = _v2_safe_base_name(flow)
-
     # Preprocess each sheet individually: remove groups, convert loops
     processed_sheets: List[dict] = []
     for s in sheets:
@@ -728,6 +930,25 @@ def flowgram2langgraph_v2(flow: dict, bundle_json: Optional[dict] = None, enable
     stitched = _v2_remove_dummy_nodes(stitched)
     _v2_debug_workflow('after_remove_dummy', stitched, base_name)
     _v2_save_mermaid('after_remove_dummy', stitched, base_name)
+    return stitched
+
+
+def flowgram2langgraph_v2(flow: dict, bundle_json: Optional[dict] = None, enable_subgraph: bool = False, bp_mgr: Optional[BreakpointManager] = None):
+    """
+    v2 layered converter (flat mode for now). Same input/output signature as v1.
+    We preprocess schema (flatten sheets, remove groups), then delegate to v1.
+    Preprocessed graphs are cached by a content hash of the flow, bundle and
+    converter source, in memory and under {user_data}/cache/skill_graphs/.
+    """
+    # With per-stage dumps enabled, always rerun preprocessing so the stages get written
+    key = None if _v2_debug_enabled() else _v2_cache_key(flow, bundle_json)
+    stitched = _v2_cache_get(key) if key else None
+    if stitched is not None:
+        logger.debug(f"[v2][cache] hit for {_v2_safe_base_name(flow)}")
+    else:
+        stitched = _v2_preprocess(flow, bundle_json, _v2_safe_base_name(flow))
+        if key:
+            _v2_cache_put(key, stitched)
 
     # Delegate to v1 by re-wrapping as a single-sheet flow
     new_flow = {
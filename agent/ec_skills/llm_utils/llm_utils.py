@@ -6,7 +6,6 @@ import re
 import sys
 import time
 import uuid
-from threading import Thread
 from typing import Any, Dict, Tuple, TYPE_CHECKING
 
 # Third-party library imports
@@ -36,6 +35,7 @@ from agent.agent_service import get_agent_by_id
 from agent.ec_skills.dev_defs import BreakpointManager
 from agent.memory.models import MemoryItem
 from utils.env.secure_store import secure_store, get_current_username
+from utils.async_loop_pool import get_async_loop_pool
 from utils.logger_helper import get_traceback
 from utils.logger_helper import logger_helper as logger
 from app_context import AppContext
@@ -2279,102 +2279,30 @@ def send_response_back(state: "NodeState", force_send: bool = False) -> "NodeSta
         return err_trace
 
 
-def run_async_in_sync(awaitable):
-    """Run an async awaitable from sync code with safe event loop lifecycle and cleanup."""
-    # Event loop policy is handled at the application level (main.py)
-    # Trust that the correct policy is already set for the main process
+def run_async_in_sync(awaitable, timeout: float | None = None):
+    """Run an async awaitable from sync code and return its result.
 
-    loop = asyncio.new_event_loop()
-    try:
-        # Ensure the newly created loop is current in this thread
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(awaitable)
-    finally:
-        try:
-            pending_tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
-            for t in pending_tasks:
-                t.cancel()
-            if pending_tasks:
-                loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
-            if hasattr(loop, "shutdown_asyncgens"):
-                loop.run_until_complete(loop.shutdown_asyncgens())
-            if hasattr(loop, "shutdown_default_executor"):
-                loop.run_until_complete(loop.shutdown_default_executor())
-        except Exception:
-            pass
-        loop.close()
+    Runs on one of the process-wide long-lived event loops
+    (utils.async_loop_pool), so HTTP clients and MCP sessions cached per loop
+    survive between calls. `timeout` cancels the awaitable after that many
+    seconds (raises asyncio.TimeoutError).
+    """
+    return get_async_loop_pool().run(awaitable, timeout=timeout)
 
 
 def run_async_in_worker_thread(awaitable_or_factory):
-    """Run an async awaitable in a dedicated worker thread with its own Selector event loop.
+    """Run an async awaitable on a pooled worker event loop (Proactor on Windows) and return its result.
 
     Accepts either:
     - a zero-arg callable that returns a coroutine (preferred), or
     - a coroutine object (will still work, but may be created on the caller thread).
 
-    Use a factory when possible so the coroutine is created inside the worker thread,
-    ensuring no binding to a GUI/qasync loop on Windows.
+    Use a factory when possible so the coroutine is created on the worker loop,
+    ensuring no binding to a GUI/qasync loop on Windows. Tasks the call leaves
+    running (e.g. Playwright/Browser Use helpers) are cancelled when it returns,
+    as they were when each call had its own loop.
     """
-    result_holder = {}
-    error_holder = {}
-
-    def _worker():
-        # On Windows, check current policy and set ProactorEventLoop for subprocess support in worker thread
-        if sys.platform.startswith("win"):
-            try:
-                current_policy = asyncio.get_event_loop_policy()
-                # In worker thread, we may need ProactorEventLoop for subprocess support
-                if hasattr(asyncio, "WindowsProactorEventLoopPolicy") and \
-                   not isinstance(current_policy, asyncio.WindowsProactorEventLoopPolicy):
-                    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-            except Exception:
-                pass
-
-        # Create loop using current policy (Proactor on Windows)
-        try:
-            loop = asyncio.get_event_loop_policy().new_event_loop()
-        except Exception:
-            try:
-                if sys.platform.startswith("win") and hasattr(asyncio, "ProactorEventLoop"):
-                    loop = asyncio.ProactorEventLoop()
-                else:
-                    loop = asyncio.new_event_loop()
-            except Exception:
-                loop = asyncio.new_event_loop()
-        try:
-            asyncio.set_event_loop(loop)
-            logger.debug(f"[run_async_in_worker_thread] thread={__import__('threading').current_thread().name}, policy={type(asyncio.get_event_loop_policy()).__name__}, loop={type(loop).__name__}")
-            # Create the coroutine inside the worker thread if a factory is provided
-            if callable(awaitable_or_factory):
-                coro = awaitable_or_factory()
-            else:
-                coro = awaitable_or_factory
-            res = loop.run_until_complete(coro)
-            result_holder["result"] = res
-        except Exception as e:
-            error_holder["error"] = e
-        finally:
-            try:
-                pending_tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
-                for t in pending_tasks:
-                    t.cancel()
-                if pending_tasks:
-                    loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
-                if hasattr(loop, "shutdown_asyncgens"):
-                    loop.run_until_complete(loop.shutdown_asyncgens())
-                if hasattr(loop, "shutdown_default_executor"):
-                    loop.run_until_complete(loop.shutdown_default_executor())
-            except Exception:
-                pass
-            loop.close()
-
-    t = Thread(target=_worker, name="playwright-worker", daemon=True)
-    t.start()
-    t.join()
-
-    if "error" in error_holder:
-        raise error_holder["error"]
-    return result_holder.get("result")
+    return get_async_loop_pool().run(awaitable_or_factory, cancel_leftovers=True)
 
 
 def try_parse_json(s: str):
@@ -12,6 +12,8 @@ Modular architecture for task management:
 - resume: Event normalization, checkpoint, resume payload
 - timer_service: Timeout timer management
 - pending_events: Async operation registration and routing
+- dispatch: Event-driven worker wakeups for queue triggers
+- skill_scheduler: Process-wide fair-share scheduler for skill runs and trigger loops
 
 Usage:
     from agent.ec_tasks import ManagedTask, TaskRunner, TaskExecutor
@@ -33,6 +35,9 @@ from .scheduler import (
     find_tasks_ready_to_run,
     add_months,
     add_years,
+    parse_schedule,
+    ParsedSchedule,
+    ScheduleIndex,
 )
 
 from .serializer import TaskSerializer
@@ -50,6 +55,13 @@ from .dev_runner import DevRunner
 
 from .runner import TaskRunner, TaskRunnerRegistry
 
+from .skill_scheduler import (
+    SkillScheduler,
+    get_skill_scheduler,
+    shutdown_skill_scheduler,
+    priority_for_trigger,
+)
+
 from .resume import (
     normalize_event,
     select_checkpoint,
@@ -99,6 +111,9 @@ __all__ = [
     "find_tasks_ready_to_run",
     "add_months",
     "add_years",
+    "parse_schedule",
+    "ParsedSchedule",
+    "ScheduleIndex",
     # Serializer
     "TaskSerializer",
     # Executor
@@ -114,6 +129,11 @@ __all__ = [
     # Runner
     "TaskRunner",
     "TaskRunnerRegistry",
+    # Skill Scheduler
+    "SkillScheduler",
+    "get_skill_scheduler",
+    "shutdown_skill_scheduler",
+    "priority_for_trigger",
     # Resume
     "normalize_event",
     "select_checkpoint",
@@ -0,0 +1,101 @@
+"""
+Event-driven dispatch helpers for TaskRunner worker loops.
+
+Each ManagedTask owns a ``queue.Queue``; ``Queue.get`` already parks the
+worker on the queue's internal condition variable, so a message put on the
+queue wakes its worker immediately. The worker loop therefore blocks on the
+queue instead of polling, and anything else that needs the worker's
+attention (shutdown, cancellation, a skill completing and arming a pending
+timeout) pushes a wakeup signal onto the same queue.
+
+Wakeup signals are control messages: they never reach a skill and consumers
+of the task queue must drop them.
+"""
+
+import os
+import time
+from queue import Full, Queue
+from typing import Any, Optional
+
+# Safety-net wait for an idle queue worker. Every real event wakes the worker
+# immediately; this only bounds how long a worker can miss a state change
+# made by code that does not signal the queue.
+QUEUE_IDLE_WAIT_SEC = float(os.getenv("QUEUE_IDLE_WAIT_SEC", "30"))
+
+# Floor for a queue wait, so a due-but-not-yet-expired timeout cannot spin.
+MIN_QUEUE_WAIT_SEC = 0.01
+
+WAKEUP_KEY = "__wakeup__"
+SHUTDOWN_KEY = "__shutdown__"
+
+
+def is_wakeup_signal(msg: Any) -> bool:
+    """Return True if msg is a wakeup control message."""
+    return isinstance(msg, dict) and bool(msg.get(WAKEUP_KEY))
+
+
+def is_shutdown_signal(msg: Any) -> bool:
+    """Return True if msg is a shutdown control message."""
+    return isinstance(msg, dict) and bool(msg.get(SHUTDOWN_KEY))
+
+
+def wake_queue(q: Optional[Queue], reason: str = "") -> bool:
+    """
+    Wake the worker blocked on a task queue.
+
+    Args:
+        q: The task queue (may be None).
+        reason: Optional reason, carried for logging/debugging.
+
+    Returns:
+        True if the signal was queued.
+    """
+    if q is None:
+        return False
+    try:
+        q.put_nowait({WAKEUP_KEY: True, "reason": reason})
+        return True
+    except Full:
+        # A full queue already has work for the worker to pick up.
+        return False
+    except Exception:
+        return False
+
+
+def shutdown_queue(q: Optional[Queue]) -> bool:
+    """Push a shutdown signal onto a task queue."""
+    if q is None:
+        return False
+    try:
+        q.put_nowait({SHUTDOWN_KEY: True})
+        return True
+    except Exception:
+        return False
+
+
+def compute_queue_wait_timeout(
+    pending_since: Optional[float],
+    pending_timeout_sec: float,
+    idle_wait_sec: float = QUEUE_IDLE_WAIT_SEC,
+    now: Optional[float] = None,
+) -> float:
+    """
+    Compute how long a worker may block on its queue.
+
+    Idle workers block for ``idle_wait_sec``; workers waiting on an
+    interrupted task block only until that task's pending timeout is due.
+
+    Args:
+        pending_since: Timestamp the task started waiting for input, or None.
+        pending_timeout_sec: Seconds a pending task may wait.
+        idle_wait_sec: Upper bound on the wait.
+        now: Current time (defaults to time.time()).
+
+    Returns:
+        Seconds to block, at least MIN_QUEUE_WAIT_SEC.
+    """
+    if not pending_since:
+        return max(MIN_QUEUE_WAIT_SEC, idle_wait_sec)
+    now = time.time() if now is None else now
+    remaining = pending_since + pending_timeout_sec - now
+    return max(MIN_QUEUE_WAIT_SEC, min(idle_wait_sec, remaining))
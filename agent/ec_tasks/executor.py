@@ -18,6 +18,7 @@ from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
 from langgraph.types import Command
 
 from utils.logger_helper import logger_helper as logger
+from utils.logger_helper import lazy
 
 if TYPE_CHECKING:
     from .models import ManagedTask
@@ -171,6 +172,14 @@ class TaskExecutor:
         except Exception:
             pass
     
+    def reset_run_state(self):
+        """Start a new run-state history for this run ID on the GUI side (run start/end)."""
+        try:
+            from gui.ipc.api import IPCAPI
+            IPCAPI.get_instance().reset_run_state(self.task.run_id)
+        except Exception:
+            pass
+    
     # ==================== State Helpers ====================
     
     def get_node_name_from_step(self, step: dict, effective_config: dict) -> str:
@@ -297,6 +306,7 @@ class TaskExecutor:
         if success:
             st_js = current_checkpoint.values if hasattr(current_checkpoint, "values") else {}
             self.emit_run_status("completed", "", st_js)
+            self.reset_run_state()
         
         return run_result
     
@@ -311,6 +321,7 @@ class TaskExecutor:
             timeout: Maximum seconds to wait for all events
         """
         from .pending_events import resolve_async_operation
+        from .dispatch import is_wakeup_signal
         
         start = time.time()
         poll_interval = 0.5
@@ -333,6 +344,10 @@ class TaskExecutor:
             try:
                 event = self.task.queue.get(timeout=poll_interval)
                 
+                if is_wakeup_signal(event):
+                    # Control signal for the runner's worker loop; nothing to resolve
+                    continue
+                
                 if event.get("type") == "async_callback":
                     corr_id = event.get("correlation_id")
                     result = event.get("result")
@@ -400,8 +415,8 @@ class TaskExecutor:
         """
         from agent.a2a.common.types import TaskState, Message, TextPart
         
-        logger.debug(f"in_msg: {in_msg}, config: {config}, kwargs: {kwargs}")
-        logger.debug(f"self.task.metadata: {self.task.metadata}")
+        logger.debug("in_msg:", in_msg, "config:", config, "kwargs:", kwargs)
+        logger.debug("self.task.metadata:", self.task.metadata)
         
         # Step 1: Prepare config and context
         effective_config, context = self.prepare_config(config, context)
@@ -422,26 +437,28 @@ class TaskExecutor:
         self.validate_skill()
         
         logger.debug(f"[SKILL_CHECK] Task {self.task.id} using skill: {self.task.skill.name}, runnable type: {type(self.task.skill.runnable)}")
-        logger.debug(f"current langgraph run time state0: {self.task.skill.runnable.get_state(config=effective_config)}")
+        logger.debug("current langgraph run time state0:", lazy(self.task.skill.runnable.get_state, config=effective_config))
         
         # Step 5: Create stream generator
         if isinstance(in_msg, Command):
-            logger.debug(f"effective config before resume: {effective_config}")
+            logger.debug("effective config before resume:", effective_config)
             agen = self.task.skill.runnable.stream(in_msg, config=effective_config, context=context, **kwargs)
         else:
             in_args = self.task.metadata.get("state", {})
-            logger.debug(f"in_args: {in_args}")
+            logger.debug("in_args:", in_args)
             agen = self.task.skill.runnable.stream(in_args, config=effective_config, context=context, **kwargs)
         
         try:
-            logger.debug(f"stream running skill: {self.task.skill.name}, {in_msg}")
-            logger.debug(f"stream_run config: {effective_config}")
-            logger.debug(f"current langgraph run time state2: {self.task.skill.runnable.get_state(config=effective_config)}")
+            logger.debug("stream running skill:", self.task.skill.name, in_msg)
+            logger.debug("stream_run config:", effective_config)
+            logger.debug("current langgraph run time state2:", lazy(self.task.skill.runnable.get_state, config=effective_config))
             
             step = {}
             current_checkpoint = None
             
-            # Step 6: Emit initial running status
+            # Step 6: Emit initial running status (a fresh run starts a new state history)
+            if not isinstance(in_msg, Command):
+                self.reset_run_state()
             st0_js = self.get_state_values(effective_config)
             node0 = ""
             try:
@@ -511,7 +528,7 @@ class TaskExecutor:
                 logger.info("task completed...")
             
             run_result = self.finalize_run(success, step, current_checkpoint, effective_config)
-            logger.debug(f"synced stream_run result: {run_result}")
+            logger.debug("synced stream_run result:", run_result)
             return run_result
         
         except Exception as e:
@@ -557,17 +574,19 @@ class TaskExecutor:
             agen = self.task.skill.runnable.astream(in_msg, config=effective_config, **kwargs)
         else:
             in_args = self.task.metadata.get("state", {})
-            logger.debug(f"in_args: {in_args}")
+            logger.debug("in_args:", in_args)
             agen = self.task.skill.runnable.astream(in_args, config=effective_config, **kwargs)
         
         try:
-            logger.debug(f"astream running skill: {self.task.skill.name}, {in_msg}")
-            logger.debug(f"astream_run config: {effective_config}")
+            logger.debug("astream running skill:", self.task.skill.name, in_msg)
+            logger.debug("astream_run config:", effective_config)
             
             step = {}
             current_checkpoint = None
             
-            # Step 5: Emit initial running status
+            # Step 5: Emit initial running status (a fresh run starts a new state history)
+            if not isinstance(in_msg, Command):
+                self.reset_run_state()
             st0_js = self.get_state_values(effective_config)
             node0 = ""
             try:
@@ -639,7 +658,7 @@ class TaskExecutor:
                 logger.info("task completed...")
             
             run_result = self.finalize_run(success, step, current_checkpoint, effective_config)
-            logger.debug(f"astream_run result: {run_result}")
+            logger.debug("astream_run result:", run_result)
             return run_result
         
         except Exception as e:
@@ -34,11 +34,19 @@ from utils.logger_helper import logger_helper as logger
 from utils.logger_helper import get_traceback
 
 from .models import ManagedTask, PriorityType
-from .scheduler import find_tasks_ready_to_run
+from .scheduler import ScheduleIndex, find_tasks_ready_to_run
 from .message_sender import ChatMessageSender, MessageType
 from .dev_runner import DevRunner
 from .executor import TaskExecutor
 from .timer_service import get_timer_service, TimerService
+from .skill_scheduler import get_skill_scheduler, priority_for_trigger
+from .dispatch import (
+    compute_queue_wait_timeout,
+    is_shutdown_signal,
+    is_wakeup_signal,
+    shutdown_queue,
+    wake_queue,
+)
 
 if TYPE_CHECKING:
     from agent.ec_agent import EC_Agent
@@ -51,6 +59,8 @@ Context = TypeVar('Context')
 DEV_EVENT_TIMEOUT_SEC = int(os.getenv("DEV_EVENT_TIMEOUT_SEC", "300"))
 DEV_EVENT_POLL_INTERVAL_SEC = float(os.getenv("DEV_EVENT_POLL_INTERVAL_SEC", "0.5"))
 RUN_EVENT_TIMEOUT_SEC = int(os.getenv("RUN_EVENT_TIMEOUT_SEC", "600"))
+# Upper bound on how long a schedule worker sleeps before re-checking the task list
+SCHEDULE_MAX_SLEEP_SEC = float(os.getenv("SCHEDULE_MAX_SLEEP_SEC", "30"))
 
 
 class TaskRunnerRegistry:
@@ -103,11 +113,8 @@ class TaskRunner(Generic[Context]):
         self.agent = agent
         self.tasks: Dict[str, ManagedTask] = {}
         
-        # Skill execution thread pool
-        self._skill_executor = concurrent.futures.ThreadPoolExecutor(
-            max_workers=20,
-            thread_name_prefix="SkillExec"
-        )
+        # Skill runs share the process-wide fair-share scheduler
+        self._scheduler = get_skill_scheduler()
         
         # Per-task state for concurrent execution
         self._task_states: Dict[str, dict] = {}
@@ -125,6 +132,15 @@ class TaskRunner(Generic[Context]):
         # Stop event for shutdown
         self._stop_event = threading.Event()
         
+        # Queues that worker loops are currently blocked on (thread id -> queue),
+        # so stop() can wake them without polling
+        self._worker_queues: Dict[int, Queue] = {}
+        self._worker_queues_lock = threading.Lock()
+        
+        # Due-time index shared by this agent's schedule workers
+        self._schedule_index = ScheduleIndex()
+        self._schedule_cond = threading.Condition()
+        
         # Message sender
         self._message_sender: Optional[ChatMessageSender] = None
         
@@ -161,7 +177,7 @@ class TaskRunner(Generic[Context]):
     
     def sendChatMessageToGUI(self, sender_agent, chatId, msg):
         """Send a text message to GUI. Backward compatible."""
-        logger.debug(f"sendChatMessageToGUI: {msg}")
+        logger.debug("sendChatMessageToGUI:", msg)
         sender = ChatMessageSender(sender_agent)
         sender.send_text(chatId, msg)
     
@@ -190,7 +206,7 @@ class TaskRunner(Generic[Context]):
     def launch_dev_run(self, init_state: dict, dev_task: ManagedTask) -> dict:
         """Launch a dev run via the unified execution loop."""
         try:
-            logger.debug(f"[TaskRunner][launch_dev_run] init_state: {init_state}")
+            logger.debug("[TaskRunner][launch_dev_run] init_state:", init_state)
             dev_init_state = init_state or {}
             try:
                 if isinstance(dev_init_state.get("messages"), list) and not dev_init_state["messages"]:
@@ -251,6 +267,7 @@ class TaskRunner(Generic[Context]):
         """Signal all loops to exit and notify running tasks to shut down."""
         try:
             self._stop_event.set()
+            self.notify_schedule_changed()
             
             # Get agent name safely
             agent_name = self._get_agent_name()
@@ -262,6 +279,9 @@ class TaskRunner(Generic[Context]):
             # Notify agent tasks' queues
             self._notify_task_queues_shutdown()
             
+            # Wake every worker blocked on a queue
+            self._notify_worker_queues_shutdown()
+            
         except Exception as e:
             logger.debug(f"[TaskRunner] Error in stop method: {e}")
     
@@ -275,6 +295,11 @@ class TaskRunner(Generic[Context]):
                 return agent_card.get('name', 'unknown')
         return 'unknown'
     
+    def _get_agent_key(self) -> str:
+        """Key the scheduler shares workers by: the agent's id, else its name."""
+        agent_card = getattr(self.agent, 'card', None)
+        return getattr(agent_card, 'id', None) or self._get_agent_name()
+    
     def _stop_managed_tasks(self):
         """Stop all managed tasks."""
         from .pending_events import cancel_task_async_operations
@@ -316,6 +341,46 @@ class TaskRunner(Generic[Context]):
         except Exception:
             pass
     
+    def _notify_worker_queues_shutdown(self):
+        """Push a shutdown signal to every queue a worker loop is blocked on."""
+        with self._worker_queues_lock:
+            queues = list(self._worker_queues.values())
+        for q in queues:
+            shutdown_queue(q)
+    
+    def _register_worker_queue(self, task: Optional[ManagedTask]):
+        """Record the queue the calling worker thread blocks on."""
+        q = getattr(task, "queue", None) if task else None
+        if q is None:
+            return
+        with self._worker_queues_lock:
+            self._worker_queues[threading.get_ident()] = q
+    
+    def _unregister_worker_queue(self):
+        """Forget the queue of the calling worker thread."""
+        with self._worker_queues_lock:
+            self._worker_queues.pop(threading.get_ident(), None)
+    
+    def notify_schedule_changed(self):
+        """Wake schedule workers after tasks or schedules were added or edited."""
+        with self._schedule_cond:
+            self._schedule_cond.notify_all()
+    
+    def _wait_for_next_schedule(self) -> bool:
+        """
+        Sleep until the next scheduled task is due.
+        
+        Returns:
+            True if the runner is stopping.
+        """
+        delay = self._schedule_index.seconds_until_next_due()
+        if delay is None or delay > SCHEDULE_MAX_SLEEP_SEC:
+            delay = SCHEDULE_MAX_SLEEP_SEC
+        with self._schedule_cond:
+            if not self._stop_event.is_set():
+                self._schedule_cond.wait(timeout=delay)
+        return self._stop_event.is_set()
+    
     def close(self):
         """Close the runner and unregister."""
         self.stop()
@@ -473,6 +538,8 @@ class TaskRunner(Generic[Context]):
                         task.queue.get_nowait()
                     except Empty:
                         break
+                # Wake the worker so it observes the cancellation
+                wake_queue(task.queue, "cancelled")
             
             logger.info(f"Task {task_id} cancelled successfully")
             
@@ -973,6 +1040,10 @@ class TaskRunner(Generic[Context]):
         """
         Unified task execution loop supporting all trigger types.
         
+        Queue-driven triggers block on the task queue and are woken as soon
+        as a message (or a wakeup/shutdown signal) arrives, so back-to-back
+        messages are dispatched without delay and idle workers do not poll.
+        
         Args:
             task2run: ManagedTask to execute.
             trigger_type: "schedule" | "a2a_queue" | "chat_queue" | "dev"
@@ -998,6 +1069,11 @@ class TaskRunner(Generic[Context]):
                 logger.info(f"[WORKER] Task {current_task.name} cancelled")
                 break
             
+            # Dev single-run exit check
+            if trigger_type == "dev" and dev_single_run:
+                if getattr(self, "_dev_exit_requested", False):
+                    break
+            
             loop_count += 1
             msg = None
             message_taken = False
@@ -1009,17 +1085,20 @@ class TaskRunner(Generic[Context]):
                 )
                 
                 if current_task is None:
-                    if self._stop_event.wait(timeout=0.5):
+                    if trigger_type == "schedule":
+                        if self._wait_for_next_schedule():
+                            break
+                    elif self._stop_event.wait(timeout=0.5):
                         break
                     continue
                 
+                # Queue wait timed out or was woken without work; the wait
+                # itself already blocked, so loop straight back
                 if msg is None and trigger_type != "schedule":
-                    if self._stop_event.wait(timeout=0.5):
-                        break
                     continue
                 
                 # Handle shutdown signal
-                if isinstance(msg, dict) and msg.get("__shutdown__"):
+                if is_shutdown_signal(msg):
                     logger.info("[WORKER] Shutdown signal received")
                     break
                 
@@ -1050,16 +1129,8 @@ class TaskRunner(Generic[Context]):
                         current_task.queue.task_done()
                     except Exception:
                         pass
-            
-            # Dev single-run exit check
-            if trigger_type == "dev" and dev_single_run:
-                if getattr(self, "_dev_exit_requested", False):
-                    break
-            
-            # Loop delay
-            if self._stop_event.wait(timeout=1.0):
-                break
         
+        self._unregister_worker_queue()
         logger.info(f"[WORKER] Exiting: trigger={trigger_type}")
     
     def _get_next_work_item(
@@ -1078,7 +1149,7 @@ class TaskRunner(Generic[Context]):
             Tuple of (task, message, message_taken_from_queue)
         """
         if trigger_type == "schedule":
-            task = find_tasks_ready_to_run(self.agent.tasks)
+            task = find_tasks_ready_to_run(self.agent.tasks, index=self._schedule_index)
             return task, None, False
         
         if trigger_type in ("a2a_queue", "chat_queue", "message", "dev"):
@@ -1095,11 +1166,20 @@ class TaskRunner(Generic[Context]):
                     state['dev_auto_started'] = True
                     return current_task, {"__dev_kickoff__": True}, False
             
-            # Try to get from queue
+            # Block on the queue until a message or signal arrives
+            self._register_worker_queue(current_task)
             try:
-                timeout = 0.5 if trigger_type != "dev" else DEV_EVENT_POLL_INTERVAL_SEC
+                if trigger_type == "dev":
+                    timeout = DEV_EVENT_POLL_INTERVAL_SEC
+                else:
+                    state = self._task_states.get(current_task.id, {})
+                    timeout = compute_queue_wait_timeout(state.get('pending_since'), RUN_EVENT_TIMEOUT_SEC)
                 msg = current_task.queue.get(timeout=timeout)
                 
+                if is_wakeup_signal(msg):
+                    self._check_pending_timeout(current_task, trigger_type)
+                    return current_task, None, True
+                
                 # Handle chat_queue task finding
                 if trigger_type == "chat_queue":
                     chatter = self.find_chatter_tasks()
@@ -1188,7 +1268,10 @@ class TaskRunner(Generic[Context]):
         # Submit
         task_state = self._task_states.setdefault(task.id, {})
         task_state['pending_since'] = None
-        future = self._skill_executor.submit(_execute)
+        future = self._scheduler.submit(
+            self._get_agent_key(), _execute,
+            priority=priority_for_trigger(trigger_type, getattr(task, "priority", None)),
+        )
         future.add_done_callback(_on_complete)
         
         logger.info(f"[SUBMIT] Skill execution submitted for task={task.name}")
@@ -1382,6 +1465,8 @@ class TaskRunner(Generic[Context]):
             state['justStarted'] = not task_interrupted
             if task_interrupted:
                 state['pending_since'] = time.time()
+                # Let the worker re-arm its queue wait for the pending timeout
+                wake_queue(task.queue, "pending")
             else:
                 state['pending_since'] = None
                 if trigger_type == "dev":
@@ -5,11 +5,17 @@ This module handles all scheduling logic including:
 - Next runtime calculation
 - Repeat interval computation
 - Time-to-run checks
+- ScheduleIndex: min-heap of next due times, so schedule loops only look
+  at tasks that are due and can sleep until the next one
 """
 
+import heapq
+import itertools
+import threading
 from datetime import datetime, timedelta
 from calendar import monthrange
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 from utils.logger_helper import logger_helper as logger
 
@@ -39,6 +45,112 @@ def add_years(dt: datetime, years: int) -> datetime:
         return dt.replace(month=2, day=28, year=dt.year + years)
 
 
+def _months_between(start: datetime, now: datetime) -> int:
+    """Whole calendar months from start's month to now's month."""
+    return (now.year - start.year) * 12 + (now.month - start.month)
+
+
+def _month_step_bounds(start_time: datetime, now: datetime, step_months: int) -> Tuple[datetime, datetime]:
+    """
+    Last/next occurrence of a month-stepped schedule around now.
+    
+    Occurrences are start_time + k * step_months (k >= 0), computed directly
+    from start_time, so month-end days do not drift (Jan 31 -> Feb 28 -> Mar 31).
+    """
+    k = max(0, _months_between(start_time, now) // step_months)
+    last_runtime = add_months(start_time, k * step_months)
+    if last_runtime > now and k > 0:
+        k -= 1
+        last_runtime = add_months(start_time, k * step_months)
+    return last_runtime, add_months(start_time, (k + 1) * step_months)
+
+
+# ==================== Schedule Parsing ====================
+
+SCHEDULE_DATETIME_FMT = "%Y-%m-%d %H:%M:%S:%f"
+
+# Time-delta based repeat units
+_UNIT_SECONDS = {
+    RepeatType.BY_SECONDS: 1,
+    RepeatType.BY_MINUTES: 60,
+    RepeatType.BY_HOURS: 3600,
+    RepeatType.BY_DAYS: 86400,
+    RepeatType.BY_WEEKS: 7 * 86400,
+}
+
+# Calendar based repeat units, in months per repeat_number
+_UNIT_MONTHS = {
+    RepeatType.BY_MONTHS: 1,
+    RepeatType.BY_YEARS: 12,
+}
+
+
+class ParsedSchedule:
+    """
+    A TaskSchedule with its datetimes parsed once.
+    
+    Use parse_schedule() to get a cached instance.
+    """
+    
+    __slots__ = ("repeat_type", "repeat_number", "start_time", "end_time")
+    
+    def __init__(self, repeat_type: RepeatType, repeat_number: int, start_time: datetime, end_time: datetime):
+        self.repeat_type = repeat_type
+        self.repeat_number = repeat_number
+        self.start_time = start_time
+        self.end_time = end_time
+    
+    def runtime_bounds(self, now: datetime) -> Tuple[datetime, datetime]:
+        """Last and next runtime around now, clamped to end_time."""
+        if self.repeat_type == RepeatType.NONE:
+            return self.start_time, self.start_time
+        
+        last_runtime, next_runtime = _calculate_runtime_bounds(
+            self.repeat_type,
+            self.repeat_number,
+            self.start_time,
+            now
+        )
+        
+        # Clamp to end time
+        if next_runtime > self.end_time:
+            next_runtime = self.end_time
+        if last_runtime > self.end_time:
+            last_runtime = self.end_time
+        
+        return last_runtime, next_runtime
+
+
+@lru_cache(maxsize=8192)
+def _parse_schedule_cached(
+    repeat_type: RepeatType,
+    repeat_number: int,
+    start_date_time: str,
+    end_date_time: str
+) -> ParsedSchedule:
+    return ParsedSchedule(
+        repeat_type,
+        int(repeat_number),
+        datetime.strptime(start_date_time, SCHEDULE_DATETIME_FMT),
+        datetime.strptime(end_date_time, SCHEDULE_DATETIME_FMT),
+    )
+
+
+def parse_schedule(schedule: TaskSchedule) -> ParsedSchedule:
+    """
+    Parse a TaskSchedule, reusing the result for identical schedules.
+    
+    Raises:
+        ValueError: If a date/time string does not match SCHEDULE_DATETIME_FMT.
+    """
+    return _parse_schedule_cached(
+        schedule.repeat_type,
+        schedule.repeat_number,
+        schedule.start_date_time,
+        schedule.end_date_time,
+    )
+
+
 # ==================== Schedule Calculations ====================
 
 def get_next_runtime(schedule: TaskSchedule) -> Tuple[datetime, bool]:
@@ -51,28 +163,25 @@ def get_next_runtime(schedule: TaskSchedule) -> Tuple[datetime, bool]:
     Returns:
         Tuple of (next_runtime, should_run_now)
     """
-    fmt = "%Y-%m-%d %H:%M:%S:%f"
     now = datetime.now()
     
     logger.debug(f"Checking start time: {schedule.start_date_time}")
-    start_time = datetime.strptime(schedule.start_date_time, fmt)
-    end_time = datetime.strptime(schedule.end_date_time, fmt)
-    repeat_number = int(schedule.repeat_number)
+    parsed = parse_schedule(schedule)
     
-    if schedule.repeat_type == RepeatType.NONE:
-        return start_time, False  # Never auto-run
+    if parsed.repeat_type == RepeatType.NONE:
+        return parsed.start_time, False  # Never auto-run
     
     # Calculate next runtime based on repeat type
     next_runtime = _calculate_next_runtime(
-        schedule.repeat_type, 
-        repeat_number, 
-        start_time, 
+        parsed.repeat_type, 
+        parsed.repeat_number, 
+        parsed.start_time, 
         now
     )
     
     # Clamp to end_time
-    if next_runtime > end_time:
-        next_runtime = end_time
+    if next_runtime > parsed.end_time:
+        next_runtime = parsed.end_time
     
     should_run_now = now >= next_runtime
     return next_runtime, should_run_now
@@ -97,16 +206,10 @@ def _calculate_next_runtime(
         delta = timedelta(days=repeat_number)
     elif repeat_type == RepeatType.BY_WEEKS:
         delta = timedelta(weeks=repeat_number)
-    elif repeat_type == RepeatType.BY_MONTHS:
-        next_runtime = start_time
-        while next_runtime <= now:
-            next_runtime = add_months(next_runtime, repeat_number)
-        return next_runtime
-    elif repeat_type == RepeatType.BY_YEARS:
-        next_runtime = start_time
-        while next_runtime <= now:
-            next_runtime = add_years(next_runtime, repeat_number)
-        return next_runtime
+    elif repeat_type in _UNIT_MONTHS:
+        if start_time > now:
+            return start_time
+        return _month_step_bounds(start_time, now, repeat_number * _UNIT_MONTHS[repeat_type])[1]
     else:
         raise ValueError(f"Unsupported repeat type: {repeat_type}")
     
@@ -126,29 +229,8 @@ def get_runtime_bounds(schedule: TaskSchedule) -> Tuple[datetime, datetime]:
     Returns:
         Tuple of (last_runtime, next_runtime)
     """
-    fmt = "%Y-%m-%d %H:%M:%S:%f"
-    now = datetime.now()
-    start_time = datetime.strptime(schedule.start_date_time, fmt)
-    end_time = datetime.strptime(schedule.end_date_time, fmt)
-    repeat_number = int(schedule.repeat_number)
-    
-    if schedule.repeat_type == RepeatType.NONE:
-        return start_time, start_time  # One-time tasks
-    
-    last_runtime, next_runtime = _calculate_runtime_bounds(
-        schedule.repeat_type,
-        repeat_number,
-        start_time,
-        now
-    )
-    
-    # Clamp to end time
-    if next_runtime > end_time:
-        next_runtime = end_time
-    if last_runtime > end_time:
-        last_runtime = end_time
-    
-    return last_runtime, next_runtime
+    # One-time tasks return (start, start)
+    return parse_schedule(schedule).runtime_bounds(datetime.now())
 
 
 def _calculate_runtime_bounds(
@@ -160,41 +242,17 @@ def _calculate_runtime_bounds(
     """Calculate last and next runtime bounds."""
     
     # Time-delta based schedules
-    unit_seconds = {
-        RepeatType.BY_SECONDS: 1,
-        RepeatType.BY_MINUTES: 60,
-        RepeatType.BY_HOURS: 3600,
-        RepeatType.BY_DAYS: 86400,
-        RepeatType.BY_WEEKS: 7 * 86400,
-    }
-    
-    if repeat_type in unit_seconds:
-        delta_seconds = unit_seconds[repeat_type] * repeat_number
+    if repeat_type in _UNIT_SECONDS:
+        delta_seconds = _UNIT_SECONDS[repeat_type] * repeat_number
         elapsed = (now - start_time).total_seconds()
         intervals = max(0, int(elapsed // delta_seconds))
         last_runtime = start_time + timedelta(seconds=delta_seconds * intervals)
         next_runtime = last_runtime + timedelta(seconds=delta_seconds)
         return last_runtime, next_runtime
     
-    # Month-based schedule
-    if repeat_type == RepeatType.BY_MONTHS:
-        last_runtime = start_time
-        while last_runtime <= now:
-            future = add_months(last_runtime, repeat_number)
-            if future > now:
-                return last_runtime, future
-            last_runtime = future
-        return last_runtime, add_months(last_runtime, repeat_number)
-    
-    # Year-based schedule
-    if repeat_type == RepeatType.BY_YEARS:
-        last_runtime = start_time
-        while last_runtime <= now:
-            future = add_years(last_runtime, repeat_number)
-            if future > now:
-                return last_runtime, future
-            last_runtime = future
-        return last_runtime, add_years(last_runtime, repeat_number)
+    # Month/year based schedules, computed arithmetically from start_time
+    if repeat_type in _UNIT_MONTHS:
+        return _month_step_bounds(start_time, now, repeat_number * _UNIT_MONTHS[repeat_type])
     
     raise ValueError(f"Unsupported repeat type: {repeat_type}")
 
@@ -229,7 +287,67 @@ def get_repeat_interval_seconds(schedule: TaskSchedule) -> int:
 
 # ==================== Task Selection ====================
 
-def find_tasks_ready_to_run(tasks: List["ManagedTask"]) -> Optional["ManagedTask"]:
+# already_run_flag is re-armed once the next scheduled run is this close
+ALREADY_RUN_RESET_WINDOW = timedelta(minutes=30)
+
+
+def _is_schedulable(task: "ManagedTask") -> bool:
+    """Check if a task is driven by a time-based schedule."""
+    if not task.schedule:
+        return False
+    if task.schedule.repeat_type == RepeatType.NONE:
+        return False
+    return task.trigger == "schedule"
+
+
+def _evaluate_scheduled_task(
+    task: "ManagedTask",
+    parsed: ParsedSchedule,
+    now: datetime
+) -> Tuple[bool, float, datetime]:
+    """
+    Check whether a scheduled task should run now.
+    
+    Re-arms task.already_run_flag when the next run is near.
+    
+    Returns:
+        Tuple of (should_run, overdue_seconds, next_runtime)
+    """
+    last_runtime, next_runtime = parsed.runtime_bounds(now)
+    
+    # Calculate elapsed time since last task run
+    if task.last_run_datetime:
+        elapsed_since_last_run = (now - task.last_run_datetime).total_seconds()
+    else:
+        elapsed_since_last_run = float('inf')  # Never ran before
+    
+    repeat_seconds = get_repeat_interval_seconds(task.schedule)
+    overdue_time = (now - last_runtime).total_seconds()
+    
+    logger.debug(f"overdue: {overdue_time}, repeat: {repeat_seconds}, elapsed: {elapsed_since_last_run}")
+    
+    # Should we run now?
+    should_run = (now >= last_runtime and
+                  elapsed_since_last_run > repeat_seconds / 2 and
+                  not task.already_run_flag)
+    
+    # Reset already_run_flag if now is close to the next scheduled run time
+    if abs(next_runtime - now) <= ALREADY_RUN_RESET_WINDOW:
+        task.already_run_flag = False
+    
+    return should_run, overdue_time, next_runtime
+
+
+def _mark_task_run(task: "ManagedTask", now: datetime) -> None:
+    task.last_run_datetime = now
+    task.already_run_flag = True
+
+
+def find_tasks_ready_to_run(
+    tasks: List["ManagedTask"],
+    index: Optional["ScheduleIndex"] = None,
+    now: Optional[datetime] = None
+) -> Optional["ManagedTask"]:
     """
     Find the next scheduled task that should run now.
     
@@ -237,47 +355,30 @@ def find_tasks_ready_to_run(tasks: List["ManagedTask"]) -> Optional["ManagedTask
     
     Args:
         tasks: List of managed tasks to check.
+        index: Optional ScheduleIndex; when given, only tasks that are due
+            are evaluated instead of scanning every task.
+        now: Evaluation time (defaults to datetime.now()).
         
     Returns:
         The task to run, or None if no task is ready.
     """
+    if index is not None:
+        return index.pop_ready(tasks, now)
+    
     candidates = []
-    now = datetime.now()
+    now = now or datetime.now()
     
     for task in tasks:
         # Skip tasks without schedule or non-time-based tasks
-        if not task.schedule:
-            continue
-        if task.schedule.repeat_type == RepeatType.NONE:
+        if not _is_schedulable(task):
             continue
-        if task.trigger != "schedule":
-            continue
-        
-        last_runtime, next_runtime = get_runtime_bounds(task.schedule)
-        
-        # Calculate elapsed time since last task run
-        if task.last_run_datetime:
-            elapsed_since_last_run = (now - task.last_run_datetime).total_seconds()
-        else:
-            elapsed_since_last_run = float('inf')  # Never ran before
-        
-        repeat_seconds = get_repeat_interval_seconds(task.schedule)
-        overdue_time = (now - last_runtime).total_seconds()
         
-        logger.debug(f"overdue: {overdue_time}, repeat: {repeat_seconds}, elapsed: {elapsed_since_last_run}")
-        
-        # Should we run now?
-        if (now >= last_runtime and
-            elapsed_since_last_run > repeat_seconds / 2 and
-            not task.already_run_flag):
+        should_run, overdue_time, _ = _evaluate_scheduled_task(task, parse_schedule(task.schedule), now)
+        if should_run:
             candidates.append({
                 "overdue": overdue_time,
                 "task": task
             })
-        
-        # Reset already_run_flag if now is close to the next scheduled run time
-        if abs((next_runtime - now).total_seconds()) <= 30 * 60:
-            task.already_run_flag = False
     
     if not candidates:
         return None
@@ -286,7 +387,205 @@ def find_tasks_ready_to_run(tasks: List["ManagedTask"]) -> Optional["ManagedTask
     candidates.sort(key=lambda x: x["overdue"], reverse=True)
     
     selected_task = candidates[0]["task"]
-    selected_task.last_run_datetime = now
-    selected_task.already_run_flag = True
+    _mark_task_run(selected_task, now)
     
     return selected_task
+
+
+# ==================== Schedule Index ====================
+
+class _IndexEntry:
+    """Index bookkeeping for one scheduled task."""
+    
+    __slots__ = ("task", "fingerprint", "parsed", "due_at", "version")
+    
+    def __init__(self, task: "ManagedTask"):
+        self.task = task
+        self.fingerprint: Optional[tuple] = None
+        self.parsed: Optional[ParsedSchedule] = None
+        self.due_at: datetime = datetime.max
+        self.version = 0
+
+
+def _task_fingerprint(task: "ManagedTask") -> tuple:
+    """Everything the due time of a task depends on."""
+    schedule = task.schedule
+    return (
+        task.trigger,
+        schedule.repeat_type,
+        schedule.repeat_number,
+        schedule.start_date_time,
+        schedule.end_date_time,
+        task.last_run_datetime,
+        task.already_run_flag,
+    )
+
+
+class ScheduleIndex:
+    """
+    Min-heap of scheduled tasks keyed by the earliest time each could run.
+    
+    Each task's schedule is parsed once; a task is only re-evaluated when its
+    due time passes or its schedule/run state changes. The due time is a
+    lower bound, and the exact find_tasks_ready_to_run rules are applied when
+    it is reached, so selection matches a full scan.
+    
+    Thread-safe: the schedule workers of one agent share an index.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[int, _IndexEntry] = {}
+        self._heap: List[Tuple[datetime, int, int, int]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def pop_ready(self, tasks: List["ManagedTask"], now: Optional[datetime] = None) -> Optional["ManagedTask"]:
+        """
+        Select the most overdue task that should run now and mark it as run.
+        
+        Args:
+            tasks: Current task list (used to pick up added/removed/edited tasks).
+            now: Evaluation time (defaults to datetime.now()).
+            
+        Returns:
+            The task to run, or None if no task is ready.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._sync(tasks, now)
+            
+            evaluated: List[_IndexEntry] = []
+            selected: Optional[_IndexEntry] = None
+            selected_overdue = 0.0
+            while self._heap and self._heap[0][0] <= now:
+                _, _, key, version = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is None or entry.version != version:
+                    continue  # Stale heap item
+                evaluated.append(entry)
+                try:
+                    should_run, overdue, _ = _evaluate_scheduled_task(entry.task, entry.parsed, now)
+                except Exception as e:
+                    logger.error(f"[SCHEDULE] Failed to evaluate task {getattr(entry.task, 'name', '')}: {e}")
+                    continue
+                if should_run and (selected is None or overdue > selected_overdue):
+                    selected, selected_overdue = entry, overdue
+            
+            if selected is not None:
+                _mark_task_run(selected.task, now)
+            
+            for entry in evaluated:
+                self._reindex(entry, now, retry_due=entry is not selected)
+            
+            return selected.task if selected is not None else None
+    
+    def next_due(self) -> Optional[datetime]:
+        """Earliest time any indexed task could become ready, or None."""
+        with self._lock:
+            while self._heap:
+                due_at, _, key, version = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    return due_at
+                heapq.heappop(self._heap)
+            return None
+    
+    def seconds_until_next_due(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds until next_due(), 0 if already due, or None if nothing is scheduled."""
+        due_at = self.next_due()
+        if due_at is None:
+            return None
+        now = now or datetime.now()
+        return max(0.0, (due_at - now).total_seconds())
+    
+    def invalidate(self) -> None:
+        """Drop all entries; the next pop_ready() re-indexes every task."""
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+    
+    # ---------- internals (caller holds the lock) ----------
+    
+    def _sync(self, tasks: List["ManagedTask"], now: datetime) -> None:
+        """Index new or changed tasks and drop removed ones."""
+        seen = set()
+        for task in tasks:
+            if not _is_schedulable(task):
+                continue
+            key = id(task)
+            seen.add(key)
+            entry = self._entries.get(key)
+            if entry is None or entry.task is not task:
+                entry = _IndexEntry(task)
+                self._entries[key] = entry
+            if entry.fingerprint != _task_fingerprint(task):
+                self._reindex(entry, now)
+        
+        if len(seen) != len(self._entries):
+            for key in [k for k in self._entries if k not in seen]:
+                del self._entries[key]
+    
+    def _reindex(self, entry: _IndexEntry, now: datetime, retry_due: bool = False) -> None:
+        """Recompute an entry's due time and push it onto the heap."""
+        task = entry.task
+        entry.version += 1
+        entry.fingerprint = _task_fingerprint(task)
+        try:
+            entry.parsed = parse_schedule(task.schedule)
+            due_at = self._compute_due(task, entry.parsed, now)
+        except Exception as e:
+            logger.error(f"[SCHEDULE] Invalid schedule for task {getattr(task, 'name', '')}: {e}")
+            entry.parsed = None
+            entry.due_at = datetime.max
+            return
+        
+        # A ready task that was not selected stays due; anything else that is
+        # still not ready must not be re-evaluated in a tight loop.
+        if retry_due and due_at <= now and not self._is_ready(task, entry.parsed, now):
+            due_at = now + timedelta(seconds=1)
+        
+        entry.due_at = due_at
+        if due_at != datetime.max:
+            heapq.heappush(self._heap, (due_at, next(self._seq), id(task), entry.version))
+    
+    @staticmethod
+    def _is_ready(task: "ManagedTask", parsed: ParsedSchedule, now: datetime) -> bool:
+        if task.already_run_flag:
+            return False
+        last_runtime, _ = parsed.runtime_bounds(now)
+        if now < last_runtime:
+            return False
+        if task.last_run_datetime:
+            elapsed = (now - task.last_run_datetime).total_seconds()
+            return elapsed > get_repeat_interval_seconds(task.schedule) / 2
+        return True
+    
+    @staticmethod
+    def _compute_due(task: "ManagedTask", parsed: ParsedSchedule, now: datetime) -> datetime:
+        """
+        Earliest time the task needs to be evaluated again.
+        
+        While already_run_flag is set the task is due when the flag can be
+        re-armed (the next run is within ALREADY_RUN_RESET_WINDOW); the
+        evaluation at that point clears it. Otherwise it is due once
+        - now >= last_runtime, i.e. the schedule has started
+        - more than half an interval has passed since the last run
+        """
+        if task.already_run_flag:
+            _, next_runtime = parsed.runtime_bounds(now)
+            if next_runtime < now - ALREADY_RUN_RESET_WINDOW:
+                return datetime.max  # Schedule ended; the flag can never re-arm
+            due_at = next_runtime - ALREADY_RUN_RESET_WINDOW
+            if task.last_run_datetime:
+                # Not in the same pass that marked the task as run
+                due_at = max(due_at, task.last_run_datetime + timedelta(microseconds=1))
+            return due_at
+        
+        due_at = min(parsed.start_time, parsed.end_time)
+        if task.last_run_datetime:
+            half_interval = timedelta(seconds=get_repeat_interval_seconds(task.schedule) / 2)
+            due_at = max(due_at, task.last_run_datetime + half_interval + timedelta(microseconds=1))
+        return due_at
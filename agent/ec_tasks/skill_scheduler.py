@@ -0,0 +1,279 @@
+"""
+Process-wide fair-share scheduler for skill runs and task trigger loops.
+
+Skill runs from every agent's TaskRunner share one bounded pool of workers
+(ECAN_SKILL_WORKERS, default 20) instead of a 20-thread pool per runner.
+Queued runs are picked by:
+
+1. priority - chat/dev runs ahead of A2A messages ahead of scheduled runs.
+   A run gains one priority level per ECAN_SKILL_AGING_SEC it has waited,
+   so a steady stream of chat cannot starve background work;
+2. fair share - among agents with a run at that level, the agent with the
+   fewest runs in flight (ties: the one served least recently), subject to
+   an optional hard per-agent cap (ECAN_SKILL_AGENT_QUOTA, 0 = none);
+3. FIFO within an agent and priority.
+
+Trigger loops (TaskRunner.launch_unified_run) block on a task queue or a
+schedule condition for their whole life. Occupying a slot of a bounded pool
+with one meant that loops beyond the pool size never started, so each loop
+gets its own daemon thread from start_loop() instead.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from utils.logger_helper import logger_helper as logger
+
+from .models import PriorityType
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_MESSAGE = 1
+PRIORITY_SCHEDULED = 2
+
+TRIGGER_PRIORITIES = {
+    "dev": PRIORITY_INTERACTIVE,
+    "chat_queue": PRIORITY_INTERACTIVE,
+    "interaction": PRIORITY_INTERACTIVE,
+    "a2a_queue": PRIORITY_MESSAGE,
+    "message": PRIORITY_MESSAGE,
+    "schedule": PRIORITY_SCHEDULED,
+}
+
+SKILL_WORKERS = int(os.getenv("ECAN_SKILL_WORKERS", "20"))
+SKILL_AGENT_QUOTA = int(os.getenv("ECAN_SKILL_AGENT_QUOTA", "0"))
+SKILL_AGING_SEC = float(os.getenv("ECAN_SKILL_AGING_SEC", "10"))
+
+
+def priority_for_trigger(trigger_type: str, task_priority: Optional[PriorityType] = None) -> int:
+    """Scheduling priority (lower runs first) of a skill run started by `trigger_type`."""
+    priority = TRIGGER_PRIORITIES.get(trigger_type, PRIORITY_MESSAGE)
+    if task_priority in (PriorityType.URGENT, PriorityType.ASAP):
+        priority = max(PRIORITY_INTERACTIVE, priority - 1)
+    return priority
+
+
+@dataclass
+class _Job:
+    agent_id: str
+    priority: int
+    seq: int
+    enqueued: float
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class _AgentState:
+    queues: Dict[int, Deque[_Job]] = field(default_factory=lambda: defaultdict(deque))
+    running: int = 0
+    last_served: int = 0
+    completed: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+
+class SkillScheduler:
+    def __init__(self, max_workers: int = SKILL_WORKERS, agent_quota: int = SKILL_AGENT_QUOTA,
+                 aging_sec: float = SKILL_AGING_SEC, clock: Callable[[], float] = time.monotonic):
+        self.max_workers = max(1, max_workers)
+        self.agent_quota = agent_quota
+        self.aging_sec = aging_sec
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._agents: Dict[str, _AgentState] = defaultdict(_AgentState)
+        self._seq = itertools.count(1)
+        self._served = itertools.count(1)
+        self._workers = 0
+        self._idle = 0
+        self._wakeups = 0
+        self._queued = 0
+        self._running = 0
+        self._shutdown = False
+        self._wait_max_by_priority: Dict[int, float] = defaultdict(float)
+        self._loops: Dict[str, threading.Thread] = {}
+
+    # ==================== Skill runs ====================
+
+    def submit(self, agent_id: str, fn: Callable, *args: Any, priority: int = PRIORITY_MESSAGE,
+               **kwargs: Any) -> Future:
+        """Queue fn(*args, **kwargs) as a skill run of `agent_id`."""
+        job = _Job(agent_id, priority, next(self._seq), self._clock(), fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new skill runs after shutdown")
+            self._agents[agent_id].queues[priority].append(job)
+            self._queued += 1
+            # Wake an idle worker that is not already being woken, else add one
+            if self._idle > self._wakeups:
+                self._wakeups += 1
+                self._cond.notify()
+            elif self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._worker, name=f"SkillExec_{self._workers}", daemon=True).start()
+        return job.future
+
+    def _pick(self) -> Optional[_Job]:
+        """Pop the next job to run; caller holds the lock."""
+        now = self._clock()
+        best_key, best_queue = None, None
+        for state in self._agents.values():
+            if self.agent_quota and state.running >= self.agent_quota:
+                continue
+            for queue in state.queues.values():
+                if not queue:
+                    continue
+                head = queue[0]
+                effective = head.priority
+                if self.aging_sec > 0:
+                    effective -= int((now - head.enqueued) // self.aging_sec)
+                key = (effective, state.running, state.last_served, head.seq)
+                if best_key is None or key < best_key:
+                    best_key, best_queue = key, queue
+        if best_queue is None:
+            return None
+        job = best_queue.popleft()
+        state = self._agents[job.agent_id]
+        state.running += 1
+        state.last_served = next(self._served)
+        self._queued -= 1
+        self._running += 1
+        wait = now - job.enqueued
+        state.wait_total += wait
+        state.wait_max = max(state.wait_max, wait)
+        self._wait_max_by_priority[job.priority] = max(self._wait_max_by_priority[job.priority], wait)
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._pick()
+                while job is None and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                    self._wakeups = max(0, self._wakeups - 1)
+                    job = self._pick()
+                if job is None:
+                    self._workers -= 1
+                    return
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.fn(*job.args, **job.kwargs))
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    state = self._agents[job.agent_id]
+                    state.running -= 1
+                    state.completed += 1
+                    self._running -= 1
+                    # A job held back by the per-agent cap may be runnable now
+                    if self.agent_quota and self._queued and self._idle > self._wakeups:
+                        self._wakeups += 1
+                        self._cond.notify()
+
+    # ==================== Trigger loops ====================
+
+    def start_loop(self, name: str, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Run a long-lived trigger loop on its own daemon thread; the future completes when it returns."""
+        future: Future = Future()
+
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    if self._loops.get(name) is threading.current_thread():
+                        del self._loops[name]
+
+        thread = threading.Thread(target=run, name=f"TaskLoop-{name}", daemon=True)
+        with self._cond:
+            self._loops[name] = thread
+        thread.start()
+        return future
+
+    # ==================== Metrics / lifecycle ====================
+
+    def stats(self) -> dict:
+        """Queue depth, concurrency and wait-time metrics, overall and per agent."""
+        now = self._clock()
+        with self._cond:
+            queued_by_priority: Dict[int, int] = defaultdict(int)
+            oldest = 0.0
+            agents = {}
+            for agent_id, state in self._agents.items():
+                for priority, queue in state.queues.items():
+                    queued_by_priority[priority] += len(queue)
+                    if queue:
+                        oldest = max(oldest, now - queue[0].enqueued)
+                started = state.completed + state.running
+                agents[agent_id] = {
+                    "queued": state.queued(),
+                    "running": state.running,
+                    "completed": state.completed,
+                    "wait_avg": state.wait_total / started if started else 0.0,
+                    "wait_max": state.wait_max,
+                }
+            return {
+                "max_workers": self.max_workers,
+                "workers": self._workers,
+                "running": self._running,
+                "queued": self._queued,
+                "queued_by_priority": {p: n for p, n in sorted(queued_by_priority.items()) if n},
+                "oldest_wait": oldest,
+                "wait_max_by_priority": dict(sorted(self._wait_max_by_priority.items())),
+                "loops": len(self._loops),
+                "agents": agents,
+            }
+
+    def shutdown(self, cancel_futures: bool = True):
+        """Stop accepting runs, cancel queued ones and let idle workers exit; running skills finish."""
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for state in self._agents.values():
+                    for queue in state.queues.values():
+                        while queue:
+                            queue.popleft().future.cancel()
+                            self._queued -= 1
+            self._cond.notify_all()
+        logger.info("[SkillScheduler] Shut down")
+
+
+_scheduler: Optional[SkillScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_skill_scheduler() -> SkillScheduler:
+    """Process-wide scheduler shared by all TaskRunners."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SkillScheduler()
+            logger.info(f"[SkillScheduler] Started with {_scheduler.max_workers} workers, "
+                        f"agent quota={_scheduler.agent_quota or 'fair share'}, aging={_scheduler.aging_sec}s")
+        return _scheduler
+
+
+def shutdown_skill_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.shutdown()
@@ -5,12 +5,20 @@ This module provides a thread-safe timer service for:
 - Starting timers that fire timeout events into task queues
 - Cancelling timers when callbacks arrive
 - Bulk cancellation for task cleanup
+
+All timers of a service are multiplexed on one daemon thread driven by a
+min-heap of deadlines: start/cancel are O(log n)/O(1), bulk cancellation
+uses a per-task index, and no thread is kept alive while no timer is
+pending. Callbacks run on the timer thread, so they must be quick (the
+built-in ones just put an event on a task queue).
 """
 
+import heapq
+import itertools
 import threading
 import time
 import uuid
-from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 from utils.logger_helper import logger_helper as logger
 
@@ -30,28 +38,39 @@ class TimerHandle:
         timer_id: str,
         correlation_id: str,
         task_id: str,
-        timer: threading.Timer,
-        timeout_seconds: float,
-        created_at: float
+        timer: Optional[Any] = None,
+        timeout_seconds: float = 0.0,
+        created_at: Optional[float] = None,
+        deadline: Optional[float] = None
     ):
         self.timer_id = timer_id
         self.correlation_id = correlation_id
         self.task_id = task_id
+        # Legacy per-timer thread (threading.Timer); None for service-managed timers
         self.timer = timer
         self.timeout_seconds = timeout_seconds
-        self.created_at = created_at
+        self.created_at = created_at if created_at is not None else time.time()
+        # Monotonic deadline used by TimerService
+        self.deadline = deadline if deadline is not None else time.monotonic() + timeout_seconds
         self.cancelled = False
         self.fired = False
     
     def cancel(self):
         """Cancel this timer."""
         if not self.cancelled and not self.fired:
-            self.timer.cancel()
+            if self.timer is not None:
+                self.timer.cancel()
             self.cancelled = True
     
     def is_active(self) -> bool:
         """Check if timer is still active (not cancelled or fired)."""
         return not self.cancelled and not self.fired
+    
+    def remaining(self) -> float:
+        """Seconds until this timer fires (0 if due or inactive)."""
+        if not self.is_active():
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
 
 
 class TimerService:
@@ -62,9 +81,20 @@ class TimerService:
     allowing bulk cancellation when tasks complete or are cancelled.
     """
     
-    def __init__(self):
+    # Rebuild the heap once cancelled entries outnumber live ones by this factor
+    _COMPACT_RATIO = 2
+    _COMPACT_MIN = 1024
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
         self._timers: Dict[str, TimerHandle] = {}
+        self._by_task: Dict[str, Set[str]] = {}
+        self._heap: List[Tuple[float, int, TimerHandle]] = []
+        self._seq = itertools.count()
         self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._callbacks: Dict[str, Tuple[Callable[[], None], Optional[Callable[[str], None]]]] = {}
+        self._thread: Optional[threading.Thread] = None
     
     def start_timer(
         self,
@@ -83,38 +113,18 @@ class TimerService:
             delay_seconds: Seconds until timer fires
             callback: Function to call when timer fires
             on_fire: Optional callback with correlation_id when timer fires
-            
+        
         Returns:
             TimerHandle for managing this timer
         """
         timer_id = f"{correlation_id}:{uuid.uuid4().hex[:8]}"
-        
-        def _on_timeout():
-            with self._lock:
-                handle = self._timers.get(correlation_id)
-                if handle and not handle.cancelled:
-                    handle.fired = True
-                    # Remove from active timers
-                    self._timers.pop(correlation_id, None)
-            
-            # Call the callback outside the lock
-            try:
-                callback()
-                if on_fire:
-                    on_fire(correlation_id)
-            except Exception as e:
-                logger.error(f"[TIMER] Callback error for {correlation_id}: {e}")
-        
-        timer = threading.Timer(delay_seconds, _on_timeout)
-        timer.daemon = True  # Don't block process exit
-        
         handle = TimerHandle(
             timer_id=timer_id,
             correlation_id=correlation_id,
             task_id=task_id,
-            timer=timer,
             timeout_seconds=delay_seconds,
-            created_at=time.time()
+            created_at=time.time(),
+            deadline=self._clock() + max(0.0, delay_seconds),
         )
         
         with self._lock:
@@ -122,10 +132,21 @@ class TimerService:
             existing = self._timers.get(correlation_id)
             if existing:
                 existing.cancel()
+                self._forget(existing)
             
             self._timers[correlation_id] = handle
+            self._by_task.setdefault(task_id, set()).add(correlation_id)
+            self._callbacks[timer_id] = (callback, on_fire)
+            
+            is_earliest = not self._heap or handle.deadline < self._heap[0][0]
+            heapq.heappush(self._heap, (handle.deadline, next(self._seq), handle))
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TimerService", daemon=True)
+                self._thread.start()
+            elif is_earliest:
+                self._wakeup.notify()
         
-        timer.start()
         logger.debug(f"[TIMER] Started timer {correlation_id} ({delay_seconds}s)")
         
         return handle
@@ -136,14 +157,16 @@ class TimerService:
         
         Args:
             correlation_id: The timer's correlation ID
-            
+        
         Returns:
             True if timer was found and cancelled, False otherwise
         """
         with self._lock:
-            handle = self._timers.pop(correlation_id, None)
+            handle = self._timers.get(correlation_id)
             if handle:
                 handle.cancel()
+                self._forget(handle)
+                self._maybe_compact()
                 logger.debug(f"[TIMER] Cancelled timer {correlation_id}")
                 return True
         return False
@@ -154,21 +177,20 @@ class TimerService:
         
         Args:
             task_id: The task ID to cancel timers for
-            
+        
         Returns:
             Number of timers cancelled
         """
         cancelled_count = 0
         with self._lock:
-            to_remove = []
-            for corr_id, handle in self._timers.items():
-                if handle.task_id == task_id:
+            for corr_id in list(self._by_task.get(task_id, ())):
+                handle = self._timers.get(corr_id)
+                if handle:
                     handle.cancel()
-                    to_remove.append(corr_id)
+                    self._forget(handle)
                     cancelled_count += 1
-            
-            for corr_id in to_remove:
-                self._timers.pop(corr_id, None)
+            self._by_task.pop(task_id, None)
+            self._maybe_compact()
         
         if cancelled_count > 0:
             logger.debug(f"[TIMER] Cancelled {cancelled_count} timers for task {task_id}")
@@ -195,7 +217,7 @@ class TimerService:
         
         Args:
             correlation_id: The timer's correlation ID
-            
+        
         Returns:
             TimerHandle if found, None otherwise
         """
@@ -209,9 +231,96 @@ class TimerService:
                 handle.cancel()
             count = len(self._timers)
             self._timers.clear()
+            self._by_task.clear()
+            self._callbacks.clear()
+            self._heap.clear()
+            self._wakeup.notify()
         
         if count > 0:
             logger.debug(f"[TIMER] Cleared all {count} timers")
+    
+    def pending_count(self) -> int:
+        """Number of timers that have not fired or been cancelled."""
+        with self._lock:
+            return len(self._timers)
+    
+    # ==================== Internals ====================
+    
+    def _forget(self, handle: TimerHandle):
+        """Drop a handle from the indexes (caller holds the lock). Its heap entry is skipped lazily."""
+        self._callbacks.pop(handle.timer_id, None)
+        # A replaced handle's correlation_id now belongs to its replacement
+        if self._timers.get(handle.correlation_id) is not handle:
+            return
+        del self._timers[handle.correlation_id]
+        task_timers = self._by_task.get(handle.task_id)
+        if task_timers is not None:
+            task_timers.discard(handle.correlation_id)
+            if not task_timers:
+                del self._by_task[handle.task_id]
+    
+    def _maybe_compact(self):
+        """Rebuild the heap when it is mostly cancelled entries (caller holds the lock)."""
+        heap_size = len(self._heap)
+        if heap_size < self._COMPACT_MIN:
+            return
+        if heap_size > self._COMPACT_RATIO * max(1, len(self._timers)):
+            kept = []
+            for entry in self._heap:
+                if entry[2].is_active():
+                    kept.append(entry)
+                else:
+                    # As in _pop_due: a handle cancelled directly is still indexed
+                    self._forget(entry[2])
+            self._heap = kept
+            heapq.heapify(self._heap)
+    
+    def _pop_due(self) -> Optional[Tuple[TimerHandle, Callable[[], None], Optional[Callable[[str], None]]]]:
+        """
+        Wait for the next due timer (caller holds the lock).
+        
+        Returns:
+            (handle, callback, on_fire), or None when no timers remain.
+        """
+        while True:
+            # Skip cancelled/replaced entries (including handles cancelled directly)
+            while self._heap and not self._heap[0][2].is_active():
+                self._forget(heapq.heappop(self._heap)[2])
+            
+            if not self._heap:
+                return None
+            
+            deadline, _, handle = self._heap[0]
+            delay = deadline - self._clock()
+            if delay > 0:
+                self._wakeup.wait(timeout=delay)
+                continue
+            
+            heapq.heappop(self._heap)
+            callbacks = self._callbacks.get(handle.timer_id)
+            handle.fired = True
+            self._forget(handle)
+            if callbacks is None:
+                continue
+            return handle, callbacks[0], callbacks[1]
+    
+    def _run(self):
+        """Timer thread: fire due timers, exit when none remain."""
+        while True:
+            with self._lock:
+                due = self._pop_due()
+                if due is None:
+                    self._thread = None
+                    return
+            
+            handle, callback, on_fire = due
+            # Call the callback outside the lock
+            try:
+                callback()
+                if on_fire:
+                    on_fire(handle.correlation_id)
+            except Exception as e:
+                logger.error(f"[TIMER] Callback error for {handle.correlation_id}: {e}")
 
 
 # Global timer service instance (can be overridden for testing)
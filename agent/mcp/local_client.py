@@ -2,6 +2,7 @@ from agent.mcp.config import mcp_http_base
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.session import ClientSession
 from agent.mcp.streamablehttp_manager import Streamable_HTTP_Manager
+from agent.mcp.local_dispatch import LocalDispatchUnavailable, call_tool_in_process, can_dispatch_locally
 
 import asyncio
 import traceback
@@ -57,6 +58,17 @@ class MCPClientManager:
                      timeout for slow operations like API queries.
         """
         result = None
+
+        # Local MCP server in this process: call its tool handler directly
+        if can_dispatch_locally(url):
+            try:
+                return await call_tool_in_process(tool_name, arguments, timeout=timeout)
+            except LocalDispatchUnavailable as e:
+                logger.debug(f"[MCP] In-process dispatch unavailable for '{tool_name}', using HTTP: {e}")
+            except asyncio.TimeoutError:
+                logger.error(f"Tool call timed out for '{tool_name}' after {timeout}s")
+                raise
+
         # Use shorter timeout only for getting persistent session (not for the actual call)
         persistent_session_timeout = min(5.0, timeout)
         
@@ -147,35 +159,33 @@ class MCPClientManager:
 # Create a singleton instance for managing MCP client operations
 mcp_client_manager = MCPClientManager()
 
-# Flag to track if persistent session needs warmup
+# Flag to track if persistent sessions need warmup
 _needs_warmup = False
-_session_warmed_up = False
 
 def mark_needs_warmup():
-    """Mark that MCP session needs warmup on first call."""
+    """Mark that MCP sessions need warmup on each event loop's first call."""
     global _needs_warmup
     _needs_warmup = True
 
 async def warmup_mcp_session():
-    """Pre-initialize the persistent MCP session.
+    """Pre-initialize the persistent MCP session of the running event loop.
     
-    This should be called from the same event loop where MCP calls will be made.
+    Sessions are kept per event loop (see Streamable_HTTP_Manager.get), so each
+    loop warms up its own; this must run on the loop where MCP calls will be made.
     """
-    global _session_warmed_up, _needs_warmup
-    if _session_warmed_up:
+    url = mcp_http_base()
+    mgr = Streamable_HTTP_Manager.get(url)
+    if mgr.is_open:
         logger.debug("MCP session already warmed up, skipping")
         return True
     
-    _needs_warmup = False  # Clear the flag
+    mgr.warmup_attempted = True  # once per loop's manager, even if it fails
     
     try:
-        url = mcp_http_base()
         logger.info(f"Warming up MCP persistent session to {url}...")
-        mgr = Streamable_HTTP_Manager.get(url)
         # Try to establish session with a reasonable timeout
         session = await asyncio.wait_for(mgr.session(), timeout=15.0)
         if session is not None:
-            _session_warmed_up = True
             logger.info("✅ MCP persistent session warmed up successfully")
             return True
         else:
@@ -197,10 +207,10 @@ async def mcp_call_tool(tool_name, args, timeout: float = 60.0):
         timeout: Timeout in seconds (default 60s). Caller should specify longer
                  timeout for slow operations like cloud API queries.
     """
-    global _needs_warmup
-    
-    # Warmup on first call if needed (in the correct event loop)
-    if _needs_warmup and not _session_warmed_up:
+    # Warmup on the first call of each event loop if needed; not needed
+    # when calls to the local server are dispatched in-process
+    if (_needs_warmup and not can_dispatch_locally(mcp_http_base())
+            and not Streamable_HTTP_Manager.get(mcp_http_base()).warmup_attempted):
         logger.info("[MCP] First call - warming up persistent session...")
         await warmup_mcp_session()
     
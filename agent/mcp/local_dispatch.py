@@ -0,0 +1,121 @@
+"""
+In-process dispatch of MCP tool calls to the app's own MCP server.
+
+Local skills call tools on meca_mcp_server, which lives in this same process
+(gui/LocalServer.py serves it with uvicorn on its own thread and event loop).
+Going through streamable HTTP costs JSON-RPC serialization, HTTP framing and
+MCP session handling on every call. When the target URL is the local server,
+MCPClientManager.call_tool() hands the request straight to the server's
+registered CallToolRequest handler instead - the same handler the HTTP
+transport ends up in - so input validation, result normalization and the
+error result shape are identical. The handler runs on the server's event
+loop (tools keep their loop affinity), and the caller's timeout applies.
+
+Remote MCP servers, and calls made before the local server has started, keep
+using HTTP. Set ECAN_MCP_DIRECT_DISPATCH=0 to always use HTTP.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from mcp import types
+
+from agent.mcp.config import get_local_port
+from utils.logger_helper import logger_helper as logger
+
+
+_DIRECT_DISPATCH_ENV = "ECAN_MCP_DIRECT_DISPATCH"
+_LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+_lock = threading.Lock()
+_local_server = None  # mcp.server.lowlevel.Server
+_local_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class LocalDispatchUnavailable(RuntimeError):
+    """The local MCP server is not running in this process; use HTTP."""
+
+
+def direct_dispatch_enabled() -> bool:
+    return os.getenv(_DIRECT_DISPATCH_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def register_local_mcp_server(server, loop: Optional[asyncio.AbstractEventLoop] = None):
+    """Record the in-process MCP server and the event loop serving it.
+
+    Called from the server's own loop at startup (LocalServer lifespan).
+    """
+    global _local_server, _local_loop
+    with _lock:
+        _local_server = server
+        _local_loop = loop or asyncio.get_running_loop()
+    logger.info("[MCP] In-process tool dispatch available for the local MCP server")
+
+
+def unregister_local_mcp_server():
+    global _local_server, _local_loop
+    with _lock:
+        _local_server = None
+        _local_loop = None
+
+
+def _local_target():
+    with _lock:
+        server, loop = _local_server, _local_loop
+    if server is None or loop is None or loop.is_closed() or not loop.is_running():
+        return None
+    return server, loop
+
+
+def is_local_mcp_url(url: str) -> bool:
+    """True if `url` addresses this process's MCP endpoint (see config.mcp_http_base)."""
+    try:
+        parts = urlsplit(url)
+        port = parts.port or 80
+    except ValueError:
+        return False
+    return (
+        parts.scheme == "http"
+        and (parts.hostname or "").lower() in _LOCAL_HOSTS
+        and port == get_local_port()
+        and parts.path.rstrip("/") == "/mcp"
+    )
+
+
+def can_dispatch_locally(url: str) -> bool:
+    return direct_dispatch_enabled() and is_local_mcp_url(url) and _local_target() is not None
+
+
+async def _handle_call(server, tool_name: str, arguments: Any) -> types.CallToolResult:
+    handler = server.request_handlers.get(types.CallToolRequest)
+    if handler is None:
+        raise LocalDispatchUnavailable("local MCP server has no call_tool handler")
+    request = types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name=tool_name, arguments=arguments),
+    )
+    result = await handler(request)
+    return result.root
+
+
+async def call_tool_in_process(tool_name: str, arguments: Any, timeout: float = 60.0) -> types.CallToolResult:
+    """Call a tool on the local MCP server without the HTTP transport.
+
+    Returns the CallToolResult the HTTP client would have received. Raises
+    asyncio.TimeoutError after `timeout` seconds (the tool is cancelled), or
+    LocalDispatchUnavailable if the local server is not running.
+    """
+    target = _local_target()
+    if target is None:
+        raise LocalDispatchUnavailable("local MCP server is not running in this process")
+    server, loop = target
+
+    if loop is asyncio.get_running_loop():
+        return await asyncio.wait_for(_handle_call(server, tool_name, arguments), timeout=timeout)
+
+    future = asyncio.run_coroutine_threadsafe(_handle_call(server, tool_name, arguments), loop)
+    return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
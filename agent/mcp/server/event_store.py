@@ -1,13 +1,23 @@
 """
-In-memory event store for demonstrating resumability functionality.
+Event stores for streamable HTTP resumability.
 
-This is a simple implementation intended for examples and testing,
-not for production use where a persistent storage solution would be more appropriate.
+InMemoryEventStore is a simple implementation intended for examples and testing.
+BoundedEventStore is what the MCP server uses: memory is capped per stream and
+globally, idle streams expire, replay is a direct lookup by sequence number,
+and events can optionally be kept in SQLite so clients can resume after a
+server restart. create_event_store() builds the configured store.
 """
 
 import logging
-from collections import deque
-from dataclasses import dataclass
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
 from uuid import uuid4
 
 from mcp.server.streamable_http import (
@@ -102,4 +112,294 @@ class InMemoryEventStore(EventStore):
             elif event.event_id == last_event_id:
                 found_last = True
 
-        return stream_id
\ No newline at end of file
+        return stream_id
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    stream_key INTEGER NOT NULL,
+    seq        INTEGER NOT NULL,
+    stream_id  TEXT NOT NULL,
+    created    REAL NOT NULL,
+    message    TEXT NOT NULL,
+    PRIMARY KEY (stream_key, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_events_created ON events (created);
+"""
+
+# Most events the writer thread inserts per transaction
+_WRITE_BATCH = 256
+_STOP_WRITER = object()
+
+
+@dataclass
+class _Stream:
+    key: int
+    stream_id: StreamId
+    last_active: float
+    first_seq: int = 1
+    # seq -> message; seqs are contiguous from first_seq
+    events: dict[int, JSONRPCMessage] = field(default_factory=dict)
+
+    @property
+    def next_seq(self) -> int:
+        return self.first_seq + len(self.events)
+
+    def drop_oldest(self):
+        del self.events[self.first_seq]
+        self.first_seq += 1
+
+
+class BoundedEventStore(EventStore):
+    """
+    Event store with bounded memory and optional SQLite persistence.
+
+    Event IDs are "<stream key>-<seq>": the stream key is assigned when a stream
+    is first seen by this store instance and seq counts that stream's events,
+    so replay finds its starting point without scanning or a per-event index.
+
+    Memory holds at most max_events_per_stream per stream and max_total_events
+    overall (the oldest events of the least recently active stream go first).
+    Streams idle for idle_ttl seconds are dropped. With db_path, every event is
+    also written to SQLite by a writer thread that commits in batches; replay
+    falls back to it for events no longer in memory, including ones stored
+    before a restart. The database keeps events for idle_ttl seconds, up to
+    max_persisted_events.
+    """
+
+    def __init__(
+        self,
+        max_events_per_stream: int = 100,
+        max_total_events: int = 10_000,
+        idle_ttl: float = 3600.0,
+        db_path: Optional[str] = None,
+        max_persisted_events: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_events_per_stream = max_events_per_stream
+        self.max_total_events = max_total_events
+        self.idle_ttl = idle_ttl
+        self.max_persisted_events = max_persisted_events
+        self._clock = clock
+        self._streams: dict[StreamId, _Stream] = {}
+        # key -> stream, least recently active first
+        self._by_key: OrderedDict[int, _Stream] = OrderedDict()
+        self._total_events = 0
+        self._next_key = 1
+        self._last_sweep = clock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if db_path:
+            self._open_db(db_path)
+
+    # ---------------- persistence ----------------
+
+    def _open_db(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        row = self._db.execute("SELECT MAX(stream_key) FROM events").fetchone()
+        # Never reuse the keys of persisted streams, their event IDs are still valid
+        self._next_key = (row[0] or 0) + 1
+        self._prune_db(self._clock())
+        self._writer = threading.Thread(target=self._write_loop, name="mcp-event-store-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"Persistent MCP event store at {db_path}")
+
+    def _persist(self, stream: _Stream, seq: int, message: JSONRPCMessage, now: float):
+        self._writes.put((stream.key, seq, stream.stream_id, now, message))
+
+    def _write_loop(self):
+        """Insert queued events, one transaction for whatever has piled up."""
+        while True:
+            batch = [self._writes.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            events = [item for item in batch if item is not _STOP_WRITER]
+            try:
+                rows = [
+                    (key, seq, stream_id, created, message.model_dump_json(by_alias=True, exclude_none=True))
+                    for key, seq, stream_id, created, message in events
+                ]
+                if rows:
+                    with self._db_lock:
+                        self._db.executemany(
+                            "INSERT OR REPLACE INTO events (stream_key, seq, stream_id, created, message) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                        self._db.commit()
+            except Exception as e:
+                logger.warning(f"Failed to persist {len(events)} MCP events: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+            if len(events) < len(batch):
+                return
+
+    def flush(self):
+        """Block until the events stored so far are in the database."""
+        if self._writer is not None:
+            self._writes.join()
+
+    def _prune_db(self, now: float):
+        with self._db_lock:
+            self._db.execute("DELETE FROM events WHERE created < ?", (now - self.idle_ttl,))
+            excess = self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0] - self.max_persisted_events
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM events WHERE (stream_key, seq) IN "
+                    "(SELECT stream_key, seq FROM events ORDER BY created LIMIT ?)",
+                    (excess,),
+                )
+            self._db.commit()
+
+    def _load_after(self, key: int, seq: int) -> tuple[Optional[StreamId], list[tuple[int, JSONRPCMessage]]]:
+        self.flush()
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT stream_id FROM events WHERE stream_key = ? AND seq = ?", (key, seq)
+            ).fetchone()
+            if row is None:
+                return None, []
+            rows = self._db.execute(
+                "SELECT seq, message FROM events WHERE stream_key = ? AND seq > ? ORDER BY seq", (key, seq)
+            ).fetchall()
+        return row[0], [(s, JSONRPCMessage.model_validate_json(m)) for s, m in rows]
+
+    def close(self):
+        if self._writer is not None:
+            self._writes.put(_STOP_WRITER)
+            self._writer.join()
+            self._writer = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    # ---------------- memory bounds ----------------
+
+    def _drop_stream(self, stream: _Stream):
+        self._total_events -= len(stream.events)
+        self._streams.pop(stream.stream_id, None)
+        self._by_key.pop(stream.key, None)
+
+    def _sweep(self, now: float):
+        """Drop idle streams; runs at most every idle_ttl / 10 seconds."""
+        if now - self._last_sweep < self.idle_ttl / 10:
+            return
+        self._last_sweep = now
+        while self._by_key:
+            stream = next(iter(self._by_key.values()))
+            if now - stream.last_active < self.idle_ttl:
+                break
+            self._drop_stream(stream)
+        if self._db is not None:
+            self._prune_db(now)
+
+    def _enforce_total(self, current: _Stream):
+        while self._total_events > self.max_total_events:
+            oldest = next(iter(self._by_key.values()))
+            oldest.drop_oldest()
+            self._total_events -= 1
+            if not oldest.events and oldest is not current:
+                self._drop_stream(oldest)
+
+    # ---------------- EventStore ----------------
+
+    async def store_event(self, stream_id: StreamId, message: JSONRPCMessage) -> EventId:
+        """Stores an event and returns its "<stream key>-<seq>" ID."""
+        now = self._clock()
+        self._sweep(now)
+
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            stream = _Stream(key=self._next_key, stream_id=stream_id, last_active=now)
+            self._next_key += 1
+            self._streams[stream_id] = stream
+            self._by_key[stream.key] = stream
+        else:
+            stream.last_active = now
+            self._by_key.move_to_end(stream.key)
+
+        seq = stream.next_seq
+        stream.events[seq] = message
+        self._total_events += 1
+        if len(stream.events) > self.max_events_per_stream:
+            stream.drop_oldest()
+            self._total_events -= 1
+        self._enforce_total(stream)
+
+        if self._db is not None:
+            self._persist(stream, seq, message, now)
+        return f"{stream.key}-{seq}"
+
+    async def replay_events_after(
+        self,
+        last_event_id: EventId,
+        send_callback: EventCallback,
+    ) -> StreamId | None:
+        """Replays the events of last_event_id's stream that came after it."""
+        try:
+            key, seq = (int(part) for part in last_event_id.split("-", 1))
+        except ValueError:
+            logger.warning(f"Malformed event ID {last_event_id!r}")
+            return None
+
+        stream = self._by_key.get(key)
+        if stream is not None and stream.first_seq <= seq < stream.next_seq:
+            stream_id = stream.stream_id
+            # Snapshot first: the callback awaits, and new events may arrive meanwhile
+            pending = [(s, stream.events[s]) for s in range(seq + 1, stream.next_seq)]
+        elif self._db is not None:
+            stream_id, pending = self._load_after(key, seq)
+        else:
+            stream_id, pending = None, []
+
+        if stream_id is None:
+            logger.warning(f"Event ID {last_event_id} not found in store")
+            return None
+        for s, message in pending:
+            await send_callback(EventMessage(message, f"{key}-{s}"))
+        return stream_id
+
+    def stats(self) -> dict:
+        return {
+            "streams": len(self._streams),
+            "events": self._total_events,
+            "persistent": self._db is not None,
+        }
+
+
+_EVENT_STORE_ENV = "ECAN_MCP_EVENT_STORE"
+
+
+def create_event_store() -> Optional[EventStore]:
+    """Event store selected by ECAN_MCP_EVENT_STORE.
+
+    "memory" keeps events in a BoundedEventStore, "sqlite" also persists them
+    under appdata so streams can be resumed after a restart. Unset or "off"
+    disables resumability (returns None).
+    """
+    mode = os.getenv(_EVENT_STORE_ENV, "off").strip().lower()
+    if mode in ("", "off", "none", "0"):
+        return None
+    if mode == "memory":
+        return BoundedEventStore()
+    if mode == "sqlite":
+        try:
+            from config.app_info import app_info
+            base_dir = os.path.join(app_info.appdata_path, "mcp")
+        except Exception as e:
+            logger.warning(f"Failed to get appdata path: {e}")
+            base_dir = os.path.join(os.path.expanduser("~"), ".ecan", "mcp")
+        return BoundedEventStore(db_path=os.path.join(base_dir, "mcp_events.db"))
+    logger.warning(f"Unknown {_EVENT_STORE_ENV}={mode!r}, resumability disabled")
+    return None
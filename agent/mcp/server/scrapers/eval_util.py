@@ -1,7 +1,12 @@
 from __future__ import annotations
 import ast
+import functools
 import math
+import operator
 from typing import Any, Dict, List, Tuple, Optional
+
+import numpy as np
+
 from utils.logger_helper import logger_helper as logger
 from utils.logger_helper import get_traceback
 # -----------------------------
@@ -88,10 +93,10 @@ def _to_float_or_none(x: Any) -> Optional[float]:
         return None
 
 
-def _linear_interp_extrapolate(x: float, lut: Dict[str, Any]) -> float:
+def _lut_points(lut: Dict[str, Any]) -> Tuple[List[float], List[float]]:
     """
-    Piecewise-linear interpolation/extrapolation on a LUT mapping x->y.
-    Keys in lut can be str or numeric; we coerce to floats.
+    Coerce a LUT mapping x->y to floats and sort it by x.
+    Keys in lut can be str or numeric; invalid entries are skipped.
     """
     points: List[Tuple[float, float]] = []
     for k, v in lut.items():
@@ -104,10 +109,14 @@ def _linear_interp_extrapolate(x: float, lut: Dict[str, Any]) -> float:
         raise ValueError("Empty or invalid score_lut")
 
     points.sort(key=lambda t: t[0])
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
+    return [p[0] for p in points], [p[1] for p in points]
+
 
-    if len(points) == 1:
+def _interp_sorted(x: float, xs: List[float], ys: List[float]) -> float:
+    """
+    Piecewise-linear interpolation/extrapolation on points sorted by x.
+    """
+    if len(xs) == 1:
         return ys[0]
 
     # Left extrapolation
@@ -141,6 +150,15 @@ def _linear_interp_extrapolate(x: float, lut: Dict[str, Any]) -> float:
     return y0 + t * (y1 - y0)
 
 
+def _linear_interp_extrapolate(x: float, lut: Dict[str, Any]) -> float:
+    """
+    Piecewise-linear interpolation/extrapolation on a LUT mapping x->y.
+    Keys in lut can be str or numeric; we coerce to floats.
+    """
+    xs, ys = _lut_points(lut)
+    return _interp_sorted(x, xs, ys)
+
+
 def _collect_context_from_item(item: Dict[str, Any]) -> Dict[str, float]:
     """
     Create a flat variable context from the item for formula evaluation.
@@ -276,6 +294,33 @@ def _normalize_weights(weights: List[float]) -> List[float]:
     return [(w if w is not None else 0.0) / s for w in weights]
 
 
+def _combine_scores(scores: List[Optional[float]], weights: List[float]) -> Optional[float]:
+    """
+    Weighted combination of (sub)component scores; unscored entries are skipped.
+    Returns None if nothing was scored.
+    """
+    # Normalize weights (if all zero, fall back to equal weighting on available subs)
+    non_null_scores = [s for s in scores if s is not None]
+    if not non_null_scores:
+        return None
+
+    # If all provided weights are zero/missing, use equal weights among non-null subs
+    if sum(weights) == 0:
+        # distribute equally across scored subs
+        cnt = len(non_null_scores)
+        norm = [(1.0 / cnt if scores[i] is not None else 0.0) for i in range(len(scores))]
+    else:
+        # normalize over all, but zeros remain zero (unscored will be zero weight)
+        norm = _normalize_weights(weights)
+
+    total = 0.0
+    for i, s in enumerate(scores):
+        if s is None:
+            continue
+        total += norm[i] * s
+    return total
+
+
 def _score_component(
         item: Dict[str, Any],
         comp: Dict[str, Any],
@@ -292,36 +337,434 @@ def _score_component(
         sub_scores: List[Optional[float]] = []
         sub_weights: List[float] = []
         for sub_name in sub_names:
-            print("sub_name", sub_name)
             sub_comp = dict(rv[sub_name] or {})
             sub_comp.setdefault("name", sub_name)
             sc = _score_leaf_component(item, sub_comp, global_ctx)
             sub_scores.append(sc)
             sub_weights.append(_to_float_or_none(sub_comp.get("weight")) or 0.0)
 
-        # Normalize weights (if all zero, fall back to equal weighting on available subs)
-        non_null_scores = [s for s in sub_scores if s is not None]
-        if not non_null_scores:
+        return _combine_scores(sub_scores, sub_weights)
+
+    # Leaf component:
+    return _score_leaf_component(item, comp, global_ctx)
+
+
+def _score_item(item: Dict[str, Any], components: List[Dict[str, Any]], clamp: bool = False) -> Optional[float]:
+    """
+    Score a single item by walking the FOM components (reference path).
+    Top-level components are combined like nested subcomponents.
+    """
+    # Build a variable context once per item for formula evaluation
+    ctx = _collect_context_from_item(item)
+    comp_scores = [_score_component(item, comp, ctx) for comp in components]
+    comp_weights = [_to_float_or_none(comp.get("weight")) or 0.0 for comp in components]
+    score = _combine_scores(comp_scores, comp_weights)
+    if score is not None and clamp:
+        score = min(max(score, 0.0), 100.0)
+    return score
+
+
+# -----------------------------
+# Compiled FOM engine
+# -----------------------------
+# Formulas are validated and compiled once, LUTs are coerced and sorted once,
+# and a whole result set is scored column-wise. Rows where the array math hits
+# a non-finite intermediate (division by zero, sqrt of a negative, overflow...)
+# are re-evaluated with the compiled scalar formula, which raises exactly where
+# _safe_eval does, so scores match the per-item path.
+_ALLOWED_FUNC_VALUES = tuple(_ALLOWED_FUNCS.values())
+
+_SCALAR_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+_VECTOR_BINOPS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+    ast.Div: np.true_divide, ast.FloorDiv: np.floor_divide, ast.Mod: np.remainder,
+}
+# Functions whose libm results must match bit for bit are applied per element
+_ELEMENTWISE_FUNCS = {
+    "log": (math.log, (1, 2)), "log10": (math.log10, (1,)), "exp": (math.exp, (1,)),
+    "sin": (math.sin, (1,)), "cos": (math.cos, (1,)), "tan": (math.tan, (1,)),
+    "pow": (pow, (2,)),
+}
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+def _elementwise(func, size: int, *args) -> np.ndarray:
+    """Apply a Python scalar function per element; failures become NaN."""
+    cols = [np.broadcast_to(np.asarray(a, dtype=float), (size,)).tolist() for a in args]
+    out = np.empty(size)
+    for i, vals in enumerate(zip(*cols)):
+        try:
+            r = func(*vals)
+            out[i] = r if isinstance(r, (int, float)) else math.nan
+        except (ArithmeticError, ValueError, TypeError):
+            out[i] = math.nan
+    return out
+
+
+def _compile_scalar(n: ast.AST):
+    """Compile an AST node into a closure with _safe_eval's semantics."""
+    if isinstance(n, ast.Expression):
+        return _compile_scalar(n.body)
+    if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)):
+        value = float(n.value)
+        return lambda names: value
+    if isinstance(n, ast.Name):
+        name = n.id
+        func = _ALLOWED_FUNCS.get(name)
+
+        def _name(names):
+            if name in names:
+                return float(names[name])
+            if func is not None:
+                return func
+            raise ValueError(f"Unknown variable: {name}")
+        return _name
+    if isinstance(n, ast.UnaryOp) and isinstance(n.op, (ast.UAdd, ast.USub)):
+        operand = _compile_scalar(n.operand)
+        if isinstance(n.op, ast.UAdd):
+            return lambda names: +operand(names)
+        return lambda names: -operand(names)
+    if isinstance(n, ast.BinOp) and type(n.op) in _SCALAR_BINOPS:
+        op = _SCALAR_BINOPS[type(n.op)]
+        left, right = _compile_scalar(n.left), _compile_scalar(n.right)
+        return lambda names: op(left(names), right(names))
+    if isinstance(n, ast.Call):
+        func_fn = _compile_scalar(n.func)
+        arg_fns = [_compile_scalar(a) for a in n.args]
+
+        def _call(names):
+            func = func_fn(names)
+            if func not in _ALLOWED_FUNC_VALUES:
+                raise ValueError("Function not allowed")
+            return float(func(*[a(names) for a in arg_fns]))
+        return _call
+
+    def _unsupported(names):
+        raise ValueError(f"Unsupported expression element: {type(n).__name__}")
+    return _unsupported
+
+
+def _compile_vector(n: ast.AST, call_names: set):
+    """
+    Compile an AST node into a closure over column arrays.
+    Raises _NotVectorizable for constructs only the scalar path can reproduce
+    (integer-valued floor/ceil/round, tuples, callables used as values, ...).
+    """
+    if isinstance(n, ast.Expression):
+        return _compile_vector(n.body, call_names)
+    if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)):
+        value = float(n.value)
+        return lambda env: value
+    if isinstance(n, ast.Name):
+        if callable(_ALLOWED_FUNCS.get(n.id)):
+            raise _NotVectorizable(n.id)
+        name = n.id
+        return lambda env: env.columns[name]
+    if isinstance(n, ast.UnaryOp) and isinstance(n.op, (ast.UAdd, ast.USub)):
+        operand = _compile_vector(n.operand, call_names)
+        if isinstance(n.op, ast.UAdd):
+            return operand
+        return lambda env: env.check(np.negative(operand(env)))
+    if isinstance(n, ast.BinOp) and type(n.op) in _SCALAR_BINOPS:
+        left, right = _compile_vector(n.left, call_names), _compile_vector(n.right, call_names)
+        if isinstance(n.op, ast.Pow):
+            return lambda env: env.check(_elementwise(operator.pow, env.size, left(env), right(env)))
+        op = _VECTOR_BINOPS[type(n.op)]
+        return lambda env: env.check(op(left(env), right(env)))
+    if isinstance(n, ast.Call) and isinstance(n.func, ast.Name):
+        name = n.func.id
+        arg_fns = [_compile_vector(a, call_names) for a in n.args]
+        call_names.add(name)
+        if name == "abs" and len(arg_fns) == 1:
+            return lambda env: np.abs(arg_fns[0](env))
+        if name == "sqrt" and len(arg_fns) == 1:
+            return lambda env: env.check(np.sqrt(arg_fns[0](env)))
+        if name in ("min", "max") and len(arg_fns) >= 2:
+            reduce_op = np.minimum if name == "min" else np.maximum
+
+            def _minmax(env):
+                result = arg_fns[0](env)
+                for a in arg_fns[1:]:
+                    result = reduce_op(result, a(env))
+                return result
+            return _minmax
+        if name in _ELEMENTWISE_FUNCS and len(arg_fns) in _ELEMENTWISE_FUNCS[name][1]:
+            func = _ELEMENTWISE_FUNCS[name][0]
+            return lambda env: env.check(_elementwise(func, env.size, *[a(env) for a in arg_fns]))
+    raise _NotVectorizable(type(n).__name__)
+
+
+class _VectorEnv:
+    def __init__(self, columns: Dict[str, np.ndarray], size: int):
+        self.columns = columns
+        self.size = size
+        self.bad = np.zeros(size, dtype=bool)
+
+    def check(self, values):
+        """Flag rows with non-finite intermediates for the scalar path."""
+        self.bad |= ~np.isfinite(values)
+        return values
+
+
+class CompiledFormula:
+    """A score_formula validated once and compiled for scalar and column-wise use."""
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.error: Optional[Exception] = None
+        self.names: set = set()
+        self.call_names: set = set()
+        self._scalar = None
+        self._vector = None
+        try:
+            if not expr or not expr.strip():
+                raise ValueError("Empty expression")
+            node = ast.parse(expr, mode="eval")
+            for n in ast.walk(node):
+                if type(n) not in _ALLOWED_NODES:
+                    raise ValueError(f"Disallowed expression node: {type(n).__name__}")
+        except Exception as e:
+            self.error = e
+            return
+
+        self._scalar = _compile_scalar(node)
+        self.names = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+        try:
+            self._vector = _compile_vector(node, self.call_names)
+        except _NotVectorizable:
+            self._vector = None
+
+    def evaluate(self, names: Dict[str, float]) -> Optional[float]:
+        """Evaluate for one namespace; None where _safe_eval would raise."""
+        if self._scalar is None:
+            return None
+        try:
+            return float(self._scalar(names))
+        except Exception:
             return None
 
-        # If all provided weights are zero/missing, use equal weights among non-null subs
-        if sum(sub_weights) == 0:
-            # distribute equally across scored subs
-            cnt = sum(1 for s in sub_scores if s is not None)
-            norm = [(1.0 / cnt if sub_scores[i] is not None else 0.0) for i in range(len(sub_scores))]
+    def evaluate_many(self, namespaces: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate for many namespaces (each holding only the formula's names).
+        Returns (scores, valid) arrays.
+        """
+        size = len(namespaces)
+        scores = np.zeros(size)
+        valid = np.zeros(size, dtype=bool)
+        if self._scalar is None or size == 0:
+            return scores, valid
+
+        scalar_rows = range(size)
+        if self._vector is not None:
+            columns = {}
+            missing = np.zeros(size, dtype=bool)
+            for name in self.names - self.call_names:
+                default = _ALLOWED_FUNCS.get(name, math.nan)
+                col = np.fromiter((ns.get(name, default) for ns in namespaces), dtype=float, count=size)
+                if name not in _ALLOWED_FUNCS:
+                    missing |= np.fromiter((name not in ns for ns in namespaces), dtype=bool, count=size)
+                columns[name] = col
+            env = _VectorEnv(columns, size)
+            for col in columns.values():
+                env.check(col)
+            # A function name shadowed by an item field changes how the call resolves
+            for name in self.call_names:
+                env.bad |= np.fromiter((name in ns for ns in namespaces), dtype=bool, count=size)
+
+            with np.errstate(all="ignore"):
+                result = np.broadcast_to(np.asarray(self._vector(env), dtype=float), (size,))
+            env.check(result)
+            fast = ~env.bad & ~missing
+            scores[fast] = result[fast]
+            valid[fast] = True
+            scalar_rows = np.flatnonzero(env.bad & ~missing).tolist()
+
+        for i in scalar_rows:
+            score = self.evaluate(namespaces[i])
+            if score is not None:
+                scores[i] = score
+                valid[i] = True
+        return scores, valid
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_formula(expr: str) -> CompiledFormula:
+    """Compile a score_formula once; repeated formulas share the compiled callable."""
+    return CompiledFormula(expr)
+
+
+class CompiledLut:
+    """A score_lut coerced and sorted once into arrays."""
+
+    def __init__(self, lut: Any):
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        try:
+            self.xs, self.ys = _lut_points(lut)
+        except Exception:
+            pass
+        self._x = np.array(self.xs, dtype=float)
+        self._y = np.array(self.ys, dtype=float)
+        # Duplicate or non-finite breakpoints keep the per-value search semantics
+        self._vectorized = (
+            len(self.xs) >= 2
+            and bool(np.all(np.isfinite(self._x)) and np.all(np.isfinite(self._y)))
+            and bool(np.all(np.diff(self._x) > 0))
+        )
+
+    def evaluate_many(self, values: np.ndarray, has_value: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        size = len(values)
+        scores = np.zeros(size)
+        if not self.xs:
+            return scores, np.zeros(size, dtype=bool)
+        valid = has_value.copy()
+
+        if len(self.xs) == 1:
+            scores[valid] = self.ys[0]
+            return scores, valid
+
+        rows = np.flatnonzero(valid & np.isfinite(values)) if self._vectorized else np.array([], dtype=int)
+        if len(rows):
+            xp, fp = self._x, self._y
+            x = values[rows]
+            with np.errstate(all="ignore"):
+                left = fp[0] + (fp[1] - fp[0]) * ((x - xp[0]) / (xp[1] - xp[0]))
+                right = fp[-2] + (fp[-1] - fp[-2]) * ((x - xp[-2]) / (xp[-1] - xp[-2]))
+                idx = np.clip(np.searchsorted(xp, x, side="left"), 1, len(xp) - 1)
+                x0, x1, y0, y1 = xp[idx - 1], xp[idx], fp[idx - 1], fp[idx]
+                inner = np.where(xp[idx] == x, fp[idx], y0 + ((x - x0) / (x1 - x0)) * (y1 - y0))
+            scores[rows] = np.where(x <= xp[0], left, np.where(x >= xp[-1], right, inner))
+
+        done = np.zeros(size, dtype=bool)
+        done[rows] = True
+        for i in np.flatnonzero(valid & ~done).tolist():
+            try:
+                scores[i] = _interp_sorted(float(values[i]), self.xs, self.ys)
+            except Exception:
+                valid[i] = False
+        return scores, valid
+
+
+def _has_nested_components(item: Dict[str, Any]) -> bool:
+    return isinstance(item.get("fom"), dict) or isinstance(item.get("components"), list)
+
+
+class _CompiledLeaf:
+    def __init__(self, comp: Dict[str, Any]):
+        self.comp = comp
+        self.name = comp.get("name")
+        formula = (comp.get("score_formula") or "").strip()
+        self.formula = compile_formula(formula) if formula else None
+        lut = comp.get("score_lut") or {}
+        self.lut = CompiledLut(lut) if not self.formula and lut else None
+
+    def score(self, items: List[Dict[str, Any]], contexts: List[Optional[Dict[str, float]]]) -> Tuple[np.ndarray, np.ndarray]:
+        size = len(items)
+        if self.formula is None and self.lut is None:
+            return np.zeros(size), np.zeros(size, dtype=bool)
+
+        item_values = [_find_item_value_for_component(item, self.comp) for item in items]
+
+        if self.formula is None:
+            has_value = np.fromiter((v is not None for v in item_values), dtype=bool, count=size)
+            values = np.fromiter((math.nan if v is None else v for v in item_values), dtype=float, count=size)
+            return self.lut.evaluate_many(values, has_value)
+
+        namespaces = []
+        for item, ctx, value in zip(items, contexts, item_values):
+            ns = {}
+            for ref in self.formula.names:
+                # Offer both the component's name and a generic 'value' to formulas
+                if value is not None and (ref == "value" or (self.name and ref == self.name)):
+                    ns[ref] = value
+                elif ctx is not None:
+                    if ref in ctx:
+                        ns[ref] = ctx[ref]
+                else:
+                    v = item.get(ref)
+                    if isinstance(v, (int, float)):
+                        ns[ref] = float(v)
+            namespaces.append(ns)
+        return self.formula.evaluate_many(namespaces)
+
+
+def _combine_columns(scores: List[np.ndarray], valid: List[np.ndarray], weights: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Column-wise _combine_scores."""
+    size = len(scores[0]) if scores else 0
+    if not scores:
+        return np.zeros(size), np.zeros(size, dtype=bool)
+    any_valid = np.logical_or.reduce(valid)
+
+    if sum(weights) == 0:
+        cnt = np.add.reduce([v.astype(float) for v in valid])
+        with np.errstate(divide="ignore"):
+            equal = 1.0 / cnt
+        norm = [equal] * len(scores)
+    else:
+        norm = _normalize_weights(weights)
+
+    total = np.zeros(size)
+    with np.errstate(all="ignore"):
+        for w, s, v in zip(norm, scores, valid):
+            total = np.where(v, total + w * s, total)
+    return total, any_valid
+
+
+class _CompiledComponent:
+    def __init__(self, comp: Dict[str, Any]):
+        self.weight = _to_float_or_none(comp.get("weight")) or 0.0
+        rv = comp.get("raw_value")
+        self.subs: Optional[List[_CompiledLeaf]] = None
+        self.leaf: Optional[_CompiledLeaf] = None
+        if isinstance(rv, dict):
+            self.subs = []
+            for sub_name in rv.keys():
+                sub_comp = dict(rv[sub_name] or {})
+                sub_comp.setdefault("name", sub_name)
+                self.subs.append(_CompiledLeaf(sub_comp))
         else:
-            # normalize over all, but zeros remain zero (unscored will be zero weight)
-            norm = _normalize_weights(sub_weights)
+            self.leaf = _CompiledLeaf(comp)
 
-        total = 0.0
-        for i, s in enumerate(sub_scores):
-            if s is None:
-                continue
-            total += norm[i] * s
-        return total
+    def score(self, items, contexts) -> Tuple[np.ndarray, np.ndarray]:
+        if self.subs is None:
+            return self.leaf.score(items, contexts)
+        results = [sub.score(items, contexts) for sub in self.subs]
+        weights = [_to_float_or_none(sub.comp.get("weight")) or 0.0 for sub in self.subs]
+        return _combine_columns([r[0] for r in results], [r[1] for r in results], weights)
 
-    # Leaf component:
-    return _score_leaf_component(item, comp, global_ctx)
+
+class CompiledFom:
+    """A FOM form compiled for scoring whole result sets at once."""
+
+    def __init__(self, fom: Dict[str, Any]):
+        self.components = [_CompiledComponent(comp) for comp in (fom.get("components", []) or [])]
+
+    def score(self, items: List[Dict[str, Any]], clamp: bool = False) -> List[Optional[float]]:
+        """Scores for items, identical to scoring each item with _score_item()."""
+        if not items:
+            return []
+        if not self.components:
+            return [None] * len(items)
+        # Items carrying their own components need the full flattened context
+        contexts = [_collect_context_from_item(item) if _has_nested_components(item) else None for item in items]
+        results = [comp.score(items, contexts) for comp in self.components]
+        total, valid = _combine_columns(
+            [r[0] for r in results], [r[1] for r in results], [comp.weight for comp in self.components]
+        )
+        if clamp:
+            total = np.minimum(np.maximum(total, 0.0), 100.0)
+        return [s if ok else None for s, ok in zip(total.tolist(), valid.tolist())]
+
+
+def compile_fom(fom: Dict[str, Any]) -> CompiledFom:
+    return CompiledFom(fom)
 
 
 def calculate_score(fom: Dict[str, Any], items: List[Dict[str, Any]], clamp: bool = False) -> List[Dict[str, Any]]:
@@ -333,40 +776,17 @@ def calculate_score(fom: Dict[str, Any], items: List[Dict[str, Any]], clamp: boo
     - If an item doesn't provide a needed field, we fall back to the FOM template's 'raw_value'.
     - For nested components, subcomponent weights are respected; same at top-level.
     - If clamp=True, final score is clamped to [0, 100].
+    - Items that cannot be scored get score None.
     """
     try:
-        logger.debug("[eval_util] calculate_score", fom, items)
-        components = fom.get("components", []) or []
-
-        for item in items:
-            # Build a variable context once per item for formula evaluation
-            ctx = _collect_context_from_item(item)
-
-            comp_scores: List[Optional[float]] = []
-            comp_weights: List[float] = []
-
-            print("Item:", item)
-            for comp in components:
-                print("comp", comp)
-                s = _score_component(item, comp, ctx)
-                print("score:", s)
-                comp_scores.append(s)
-                comp_weights.append(_to_float_or_none(comp.get("weight")) or 0.0)
-
-            # Combine top-level
-            # If no scores at all, skip
-            if not any(s is not None for s in comp_scores):
-                item["score"] = None
-                continue
-
-            if sum(comp_weights) == 0:
-                # equal weighting among components that produced a score
-                cnt = sum(1 for s in comp_scores if s is not None)
-                print("cnt", cnt)
-
+        logger.debug(f"[eval_util] calculate_score: {len(fom.get('components', []) or [])} components, {len(items)} items")
+        scores = compile_fom(fom).score(items, clamp)
+        for item, score in zip(items, scores):
+            item["score"] = score
     except Exception as e:
         err_trace = get_traceback(e, "ErrorCalculateScores")
         logger.debug(err_trace)
+    return items
 
 
 def get_default_fom_form():
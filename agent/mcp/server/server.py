@@ -36,6 +36,7 @@ from browser_use.browser.events import SwitchTabEvent
 # Local application imports
 from agent.mcp.server.ads_power.ads_power import connect_to_adspower, connect_to_existing_chrome
 from agent.mcp.server.tool_schemas import get_tool_schemas
+from agent.mcp.server.tool_executor import run_tool
 from agent.mcp.server.api.ecan_ai.ecan_ai_api import (
     api_ecan_ai_get_nodes_prompts,
     api_ecan_ai_ocr_read_screen,
@@ -139,7 +140,7 @@ from app_context import AppContext
 from agent.ec_skills.ocr.image_prep import readRandomWindow8
 from utils.logger_helper import get_traceback
 from utils.logger_helper import logger_helper as logger
-from .event_store import InMemoryEventStore
+from .event_store import create_event_store
 
 
 server_main_win = None
@@ -231,7 +232,8 @@ async def unified_tool_handler(tool_name, args):
         # ContentBlock = TextContent | ImageContent | AudioContent | ResourceLink | EmbeddedResource
         # [TextContent(type="text", text=f"all completed fine")]
 
-        toolResult = await tool_func(login.main_win, args)
+        # Blocking tools run off the server loop, within their resource's concurrency limit
+        toolResult = await run_tool(tool_name, tool_func, login.main_win, args)
         logger.debug(f"[unified_tool_handler] {tool_name} completed successfully")
 
         return toolResult
@@ -2860,19 +2862,19 @@ def set_server_main_win(mw):
 
 
 # Create event store for resumability
-# The InMemoryEventStore enables resumability support for StreamableHTTP transport.
+# The event store enables resumability support for StreamableHTTP transport.
 # It stores SSE events with unique IDs, allowing clients to:
 #   1. Receive event IDs for each SSE message
 #   2. Resume streams by sending Last-Event-ID in GET requests
 #   3. Replay missed events after reconnection
-# Note: This in-memory implementation is for demonstration ONLY.
-# For production, use a persistent storage solution.
-event_store = InMemoryEventStore()
+# Off by default; ECAN_MCP_EVENT_STORE=memory keeps a bounded in-memory store,
+# =sqlite also persists events so streams survive a server restart.
+event_store = create_event_store()
 
 # Create the session manager with our app and event store
 session_manager = StreamableHTTPSessionManager(
     app=meca_mcp_server,
-    event_store=None,  # set to event_store to Enable resumability
+    event_store=event_store,  # None disables resumability
     json_response=True,
 )
 
@@ -0,0 +1,304 @@
+"""
+Tool execution layer for the local MCP server.
+
+Many tool handlers in server.py are `async def` but do blocking work
+(pyautogui/pynput input, Selenium, `requests` calls to the cloud API,
+subprocesses, file copies), and a few are plain functions. Awaited directly
+on the server's event loop, one such call stalls every other request the MCP
+server is handling. run_tool() classifies each tool and:
+
+- runs blocking tools on a bounded thread pool; coroutine tools classified as
+  blocking get a private event loop on their worker thread,
+- keeps the remaining async tools (browser_use sessions, asyncio-native work)
+  on the server loop, where their loop-bound objects live,
+- limits concurrency per shared resource - one mouse/keyboard tool at a time,
+  a few browser tools, ... - whether the tool runs on the loop or off it,
+- records queue wait (until a resource slot and worker are free) and run time
+  per tool; see get_tool_stats().
+
+A resource slot is held until the tool really finishes: if the caller is
+cancelled (e.g. a client timeout) while a worker is still moving the mouse,
+the next input tool waits for it.
+
+Tunables: ECAN_MCP_TOOL_WORKERS (thread pool size, default 8) and
+ECAN_MCP_<RESOURCE>_TOOL_LIMIT (e.g. ECAN_MCP_BROWSER_TOOL_LIMIT=4).
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger_helper import logger_helper as logger
+
+
+_WORKERS_ENV = "ECAN_MCP_TOOL_WORKERS"
+_DEFAULT_WORKERS = 8
+_SLOW_QUEUE_WAIT = 5.0  # seconds; waits longer than this are logged
+
+# Shared resources and how many tools may hold each at once
+DEFAULT_RESOURCE_LIMITS = {
+    "input": 1,    # physical mouse/keyboard and window focus
+    "screen": 2,   # screen capture + OCR
+    "browser": 3,  # Selenium / browser_use sessions
+}
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    blocking: bool = False
+    resource: Optional[str] = None
+
+
+_INPUT_BLOCKING = ToolPolicy(blocking=True, resource="input")
+_SCREEN_BLOCKING = ToolPolicy(blocking=True, resource="screen")
+_BROWSER_BLOCKING = ToolPolicy(blocking=True, resource="browser")
+_BROWSER_ASYNC = ToolPolicy(blocking=False, resource="browser")
+_BLOCKING = ToolPolicy(blocking=True)
+
+# Tools that are `async def` but block, or that share a resource. Tools not
+# listed here are async (or blocking, if they are plain functions) and
+# unlimited; "in_browser_*" tools share the browser limit.
+TOOL_POLICIES: Dict[str, ToolPolicy] = {
+    "mouse_click": _INPUT_BLOCKING,
+    "mouse_press_hold": _INPUT_BLOCKING,
+    "mouse_move": _INPUT_BLOCKING,
+    "mouse_drag_drop": _INPUT_BLOCKING,
+    "mouse_scroll": _INPUT_BLOCKING,
+    "mouse_act_on_screen": _INPUT_BLOCKING,
+    "keyboard_text_input": _INPUT_BLOCKING,
+    "keyboard_keys_input": _INPUT_BLOCKING,
+    "os_switch_to_app": _INPUT_BLOCKING,
+    "os_close_app": _INPUT_BLOCKING,
+    "os_screen_capture": _SCREEN_BLOCKING,
+    "os_screen_analyze": _SCREEN_BLOCKING,
+    "ecan_local_search_components": _BROWSER_BLOCKING,
+    "ecan_local_sort_search_results": _BROWSER_BLOCKING,
+    # browser_use sessions are bound to the server loop
+    "os_connect_to_adspower": _BROWSER_ASYNC,
+    "os_connect_to_chrome": _BROWSER_ASYNC,
+    "ecan_ai_new_chromiunm": _BROWSER_ASYNC,
+    "os_open_app": _BLOCKING,
+    "os_list_dir": _BLOCKING,
+    "os_make_dir": _BLOCKING,
+    "os_delete_dir": _BLOCKING,
+    "os_delete_file": _BLOCKING,
+    "os_move_file": _BLOCKING,
+    "os_copy_file_dir": _BLOCKING,
+    "os_seven_zip": _BLOCKING,
+    "os_reconnect_wifi": _BLOCKING,
+    "api_ecan_ai_query_components": _BLOCKING,
+    "api_ecan_ai_query_fom": _BLOCKING,
+    "api_ecan_ai_rerank_results": _BLOCKING,
+    "api_ecan_ai_show_status": _BLOCKING,
+}
+
+_PREFIX_POLICIES = (
+    ("in_browser_", _BROWSER_ASYNC),
+)
+
+
+def classify_tool(tool_name: str, tool_func: Callable) -> ToolPolicy:
+    """How `tool_func` must be run; plain (non-async) functions always block."""
+    policy = TOOL_POLICIES.get(tool_name)
+    if policy is None:
+        policy = next((p for prefix, p in _PREFIX_POLICIES if tool_name.startswith(prefix)), ToolPolicy())
+    if not policy.blocking and not inspect.iscoroutinefunction(tool_func):
+        policy = ToolPolicy(blocking=True, resource=policy.resource)
+    return policy
+
+
+def set_tool_policy(tool_name: str, blocking: bool = False, resource: Optional[str] = None):
+    TOOL_POLICIES[tool_name] = ToolPolicy(blocking=blocking, resource=resource)
+
+
+def resource_limit(resource: str) -> int:
+    env = os.getenv(f"ECAN_MCP_{resource.upper()}_TOOL_LIMIT")
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            logger.warning(f"[ToolExecutor] Ignoring invalid ECAN_MCP_{resource.upper()}_TOOL_LIMIT={env!r}")
+    return DEFAULT_RESOURCE_LIMITS.get(resource, 1)
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    off_loop: bool = False
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    run_total: float = 0.0
+    run_max: float = 0.0
+
+    def record(self, queue_wait: float, run_time: float, failed: bool):
+        self.calls += 1
+        self.errors += int(failed)
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.run_total += run_time
+        self.run_max = max(self.run_max, run_time)
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, ToolStats] = {}
+
+
+def get_tool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-tool counters: calls, errors, in_flight, queue wait and run time (seconds)."""
+    with _stats_lock:
+        return {name: asdict(s) for name, s in _stats.items()}
+
+
+def reset_tool_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _tool_stats(tool_name: str) -> ToolStats:
+    with _stats_lock:
+        return _stats.setdefault(tool_name, ToolStats())
+
+
+# ==================== Executor ====================
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_worker_local = threading.local()
+# Private event loops of the pool's worker threads -> True while one is running
+# a coroutine tool; shutdown_tool_executor() closes them (guarded by _executor_lock)
+_worker_loops: Dict[asyncio.AbstractEventLoop, bool] = {}
+
+# asyncio semaphores belong to one loop; keep a set per loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            try:
+                workers = max(1, int(os.getenv(_WORKERS_ENV, _DEFAULT_WORKERS)))
+            except ValueError:
+                workers = _DEFAULT_WORKERS
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-tool")
+            logger.info(f"[ToolExecutor] Started blocking tool pool with {workers} workers")
+        return _executor
+
+
+def shutdown_tool_executor(wait: bool = False):
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+        # Busy loops are closed by their worker once its tool returns
+        idle_loops = [loop for loop, busy in _worker_loops.items() if not busy]
+        _worker_loops.clear()
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+    for loop in idle_loops:
+        loop.close()
+
+
+def _semaphore(resource: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    sem = per_loop.get(resource)
+    if sem is None:
+        sem = per_loop[resource] = asyncio.Semaphore(resource_limit(resource))
+    return sem
+
+
+def _run_in_worker(tool_func: Callable, mainwin, args, timing: Dict[str, float]):
+    timing["started"] = time.perf_counter()
+    result = tool_func(mainwin, args)
+    if inspect.isawaitable(result):
+        result = _run_on_worker_loop(result)
+    return result
+
+
+def _run_on_worker_loop(awaitable):
+    with _executor_lock:
+        loop = getattr(_worker_local, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = _worker_local.loop = asyncio.new_event_loop()
+        _worker_loops[loop] = True
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        with _executor_lock:
+            orphaned = loop not in _worker_loops  # the pool was shut down meanwhile
+            if not orphaned:
+                _worker_loops[loop] = False
+        if orphaned:
+            loop.close()
+
+
+def _release_when_done(future, loop: asyncio.AbstractEventLoop, sem: asyncio.Semaphore):
+    def release(_):
+        try:
+            loop.call_soon_threadsafe(sem.release)
+        except RuntimeError:
+            pass  # loop already closed, and its semaphores with it
+
+    future.add_done_callback(release)
+
+
+async def _run_off_loop(tool_func: Callable, mainwin, args, timing: Dict[str, float], sem: Optional[asyncio.Semaphore]):
+    future = None
+    try:
+        future = _get_executor().submit(_run_in_worker, tool_func, mainwin, args, timing)
+        return await asyncio.wrap_future(future)
+    finally:
+        if sem is not None:
+            if future is None or future.done():
+                sem.release()
+            else:
+                # Caller gave up but the worker is still running: keep the slot until it ends
+                _release_when_done(future, asyncio.get_running_loop(), sem)
+
+
+async def run_tool(tool_name: str, tool_func: Callable, mainwin, args) -> Any:
+    """Run an MCP tool handler under its policy and record its timings."""
+    policy = classify_tool(tool_name, tool_func)
+    stats = _tool_stats(tool_name)
+    stats.off_loop = policy.blocking
+    sem = _semaphore(policy.resource) if policy.resource else None
+
+    queued = time.perf_counter()
+    timing: Dict[str, float] = {}
+    failed = True
+    with _stats_lock:
+        stats.in_flight += 1
+    try:
+        if sem is not None:
+            await sem.acquire()
+        if policy.blocking:
+            result = await _run_off_loop(tool_func, mainwin, args, timing, sem)
+        else:
+            timing["started"] = time.perf_counter()
+            try:
+                result = await tool_func(mainwin, args)
+            finally:
+                if sem is not None:
+                    sem.release()
+        failed = False
+        return result
+    finally:
+        ended = time.perf_counter()
+        started = timing.get("started", ended)
+        queue_wait = started - queued
+        with _stats_lock:
+            stats.in_flight -= 1
+            stats.record(queue_wait, ended - started, failed)
+        if queue_wait > _SLOW_QUEUE_WAIT:
+            logger.warning(f"[ToolExecutor] {tool_name} waited {queue_wait:.1f}s for "
+                           f"{policy.resource or 'a worker'} before running")
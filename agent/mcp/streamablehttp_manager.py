@@ -1,34 +1,44 @@
+import asyncio
 import anyio
-import anyio.abc
 from typing import Optional
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.session import ClientSession
+from utils.async_loop_pool import discard_loop_resource, loop_resource, spawn_detached
 from utils.logger_helper import logger_helper as logger
 from agent.ec_skills.system_proxy import create_mcp_httpx_client
 
 
 class Streamable_HTTP_Manager:
-    _instance: Optional["Streamable_HTTP_Manager"] = None
+    # One manager per event loop: its session task and streams are bound to the loop that opened them
+    _RESOURCE_KEY = "mcp.streamable_http_manager"
 
     def __init__(self, url: str) -> None:
         self._url = url
         self._lock = anyio.Lock()
-        self._tg: Optional[anyio.abc.TaskGroup] = None
+        self._runner: Optional[asyncio.Task] = None
         self._session: Optional[ClientSession] = None
         self._ready: Optional[anyio.Event] = None
-    # -------- singleton accessor ------------------------------------
+        # Set by warmup_mcp_session (agent.mcp.local_client) once it has tried this loop's session
+        self.warmup_attempted = False
+
+    # -------- per-loop accessor ------------------------------------
     @classmethod
     def get(cls, url: str) -> "Streamable_HTTP_Manager":
-        if cls._instance is None:
-            cls._instance = cls(url)
-        return cls._instance
-    
+        """Manager of the running event loop (pooled loops keep theirs between calls)."""
+        return loop_resource(cls._RESOURCE_KEY, lambda: cls(url))
+
     @classmethod
     def reset(cls) -> None:
-        """Reset the singleton instance to allow recreation on next get()."""
-        cls._instance = None
+        """Drop the running loop's manager to allow recreation on next get(); its session closes in the background."""
+        manager = discard_loop_resource(cls._RESOURCE_KEY)
+        if manager is not None:
+            spawn_detached(manager.close())
 
     # -------- public API  -------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
     async def session(self) -> ClientSession:
         async with self._lock:
             if self._session is None:
@@ -49,34 +59,25 @@ class Streamable_HTTP_Manager:
 
     async def close(self) -> None:
         async with self._lock:
-            if self._tg is not None:
-                # Cancel background tasks first
-                self._tg.cancel_scope.cancel()
-
-                # Store reference to avoid race conditions
-                tg_to_close = self._tg
-                self._tg = None
-                self._session = None
-                self._ready = None
-
-                # Close the task group safely
-                try:
-                    # Wait for tasks to be cancelled
-                    await anyio.sleep(0.1)  # Give tasks time to respond to cancellation
-                    await tg_to_close.__aexit__(None, None, None)
-                except (RuntimeError, anyio.get_cancelled_exc_class()) as e:
-                    # Handle task group exit errors gracefully
-                    logger.debug(f"StreamableHTTPManager: Task group exit error (expected during shutdown): {e}")
-                except Exception as e:
-                    logger.warning(f"StreamableHTTPManager: Unexpected error during close: {e}")
-                    # Don't re-raise to avoid breaking the shutdown process
+            runner, self._runner = self._runner, None
+            self._session = None
+            self._ready = None
+            await self._stop(runner)
 
     # -------- internal ----------------------------------------------
+    @staticmethod
+    async def _stop(runner: Optional[asyncio.Task]) -> None:
+        if runner is None or runner.done():
+            return
+        runner.cancel()
+        # Waits for the session and streams to close; asyncio.wait does not raise the runner's error
+        await asyncio.wait({runner}, timeout=5)
+
     async def _open(self) -> None:
         logger.debug("Streamable_HTTP_Manager: opening persistent session")
-        self._tg = anyio.create_task_group()
-        await self._tg.__aenter__()
-        self._ready = anyio.Event()
+        # A runner still initializing from a call that gave up waiting on it
+        await self._stop(self._runner)
+        ready = self._ready = anyio.Event()
 
         async def _runner() -> None:
             logger.debug(f"Streamable HTTP client opening: {self._url}")
@@ -90,15 +91,15 @@ class Streamable_HTTP_Manager:
 
                         logger.debug("Streamable HTTP client session created")
                         self._session = sess
-                        self._ready.set()
+                        ready.set()
                         logger.info("Streamable HTTP client ready")
                         await anyio.sleep_forever()   # keep everything alive
             except TimeoutError:
                 logger.error("Streamable HTTP client initialization timed out after 30s")
-                self._ready.set()  # Unblock waiters on timeout
+                ready.set()  # Unblock waiters on timeout
             except Exception as e:
                 logger.error(f"Streamable HTTP client error: {e}")
-                self._ready.set()  # Unblock waiters even on error
-                raise
+                ready.set()  # Unblock waiters even on error
 
-        self._tg.start_soon(_runner)
+        # The session outlives the call that opens it: cancel_leftovers must not close it
+        self._runner = spawn_detached(_runner())
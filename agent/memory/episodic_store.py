@@ -1,8 +1,11 @@
 """
 Episodic Store - Persistent storage for session records.
 
-Stores and retrieves SessionRecords as JSON files, organized by date.
+Stores SessionRecords in a SQLite database indexed by (date, agent_id,
+success, session_id), and daily reflections as JSON files.
 Provides methods for querying sessions by date range, agent, success status, etc.
+Sessions saved by older versions as one JSON file per session are imported
+into the database the first time the store is opened.
 
 Usage:
     from agent.memory.episodic_store import EpisodicStore
@@ -17,30 +20,65 @@ Usage:
     
     # Load sessions for date range
     sessions = store.load_sessions_for_range("2024-12-01", "2024-12-14")
+    
+    # Stream a large range without holding it in memory
+    for session in store.iter_sessions("2024-12-01", "2024-12-14", success_only=False):
+        ...
 """
 
 import json
 import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 
 from utils.logger_helper import logger_helper as logger
 from agent.memory.models import SessionRecord, ActionRecord, DailyReflection
 
 
+# Rows fetched per round-trip when streaming sessions
+STREAM_FETCH_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   TEXT NOT NULL,
+    date         TEXT NOT NULL,
+    agent_id     TEXT NOT NULL,
+    success      INTEGER,
+    start_time   TEXT NOT NULL,
+    action_count INTEGER NOT NULL DEFAULT 0,
+    error_count  INTEGER NOT NULL DEFAULT 0,
+    data         TEXT NOT NULL,
+    PRIMARY KEY (date, session_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date_agent_success
+    ON sessions (date, agent_id, success, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_session_id
+    ON sessions (session_id);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_LEGACY_MIGRATED_KEY = "legacy_json_migrated"
+
+
 class EpisodicStore:
     """
     Persistent storage for session records (episodic memory).
     
-    Stores sessions as JSON files organized by date:
+    Layout:
     {base_dir}/
-        sessions/
-            2024-12-14/
-                session_abc123.json
-                session_def456.json
+        episodic.db             # sessions table, one row per session
         reflections/
             2024-12-14.json
+        sessions/               # legacy per-session JSON files (imported once)
+            2024-12-14/
+                session_abc123.json
     """
     
     def __init__(self, base_dir: str | None = None):
@@ -61,41 +99,73 @@ class EpisodicStore:
         self.base_dir = Path(base_dir)
         self.sessions_dir = self.base_dir / "sessions"
         self.reflections_dir = self.base_dir / "reflections"
+        self.db_path = self.base_dir / "episodic.db"
+        self._write_lock = threading.Lock()
         
         # Create directories
-        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
         self.reflections_dir.mkdir(parents=True, exist_ok=True)
         
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self.migrate_legacy_sessions()
+        
         logger.debug(f"[EpisodicStore] Initialized at {self.base_dir}")
     
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection; commits on success, rolls back on error."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     # =========================================================================
     # Session Storage
     # =========================================================================
     
+    @staticmethod
+    def _session_row(session: SessionRecord) -> tuple:
+        """Row values for the sessions table."""
+        return (
+            session.session_id,
+            session.start_time.strftime("%Y-%m-%d"),
+            session.agent_id or "",
+            None if session.success is None else int(bool(session.success)),
+            session.start_time.isoformat(),
+            len(session.actions),
+            len(session.errors),
+            json.dumps(session.to_dict(), ensure_ascii=False),
+        )
+    
     def save_session(self, session: SessionRecord) -> str:
         """
         Save a session record to disk.
         
+        Saving a session again (same ID and date) replaces the stored record.
+        
         Args:
             session: SessionRecord to save
             
         Returns:
-            Path to saved file
+            Path to the database file holding the session
         """
-        # Determine date directory
-        date_str = session.start_time.strftime("%Y-%m-%d")
-        date_dir = self.sessions_dir / date_str
-        date_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save as JSON
-        filename = f"session_{session.session_id}.json"
-        filepath = date_dir / filename
-        
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
-            logger.debug(f"[EpisodicStore] Saved session {session.session_id} to {filepath}")
-            return str(filepath)
+            with self._write_lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions "
+                    "(session_id, date, agent_id, success, start_time, action_count, error_count, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._session_row(session),
+                )
+            logger.debug(f"[EpisodicStore] Saved session {session.session_id} to {self.db_path}")
+            return str(self.db_path)
         except Exception as e:
             logger.error(f"[EpisodicStore] Failed to save session: {e}")
             raise
@@ -106,25 +176,25 @@ class EpisodicStore:
         
         Args:
             session_id: Session ID to load
-            date_str: Optional date hint (YYYY-MM-DD) to speed up lookup
+            date_str: Optional date hint (YYYY-MM-DD); without it the most
+                recent session with this ID is returned
             
         Returns:
             SessionRecord or None if not found
         """
-        # If date provided, look directly
-        if date_str:
-            filepath = self.sessions_dir / date_str / f"session_{session_id}.json"
-            if filepath.exists():
-                return self._load_session_file(filepath)
-        
-        # Otherwise search all dates
-        for date_dir in sorted(self.sessions_dir.iterdir(), reverse=True):
-            if date_dir.is_dir():
-                filepath = date_dir / f"session_{session_id}.json"
-                if filepath.exists():
-                    return self._load_session_file(filepath)
-        
-        return None
+        with self._connect() as conn:
+            row = None
+            if date_str:
+                row = conn.execute(
+                    "SELECT data FROM sessions WHERE date = ? AND session_id = ?",
+                    (date_str, session_id),
+                ).fetchone()
+            if row is None:
+                row = conn.execute(
+                    "SELECT data FROM sessions WHERE session_id = ? ORDER BY date DESC LIMIT 1",
+                    (session_id,),
+                ).fetchone()
+        return self._decode_session(row[0]) if row else None
     
     def load_sessions_for_date(self, date_str: str) -> List[SessionRecord]:
         """
@@ -134,21 +204,9 @@ class EpisodicStore:
             date_str: Date in YYYY-MM-DD format
             
         Returns:
-            List of SessionRecords
+            List of SessionRecords, sorted by start time
         """
-        date_dir = self.sessions_dir / date_str
-        if not date_dir.exists():
-            return []
-        
-        sessions = []
-        for filepath in date_dir.glob("session_*.json"):
-            session = self._load_session_file(filepath)
-            if session:
-                sessions.append(session)
-        
-        # Sort by start time
-        sessions.sort(key=lambda s: s.start_time)
-        return sessions
+        return list(self.iter_sessions(date_str, date_str))
     
     def load_sessions_for_range(
         self,
@@ -169,29 +227,52 @@ class EpisodicStore:
         Returns:
             List of SessionRecords
         """
-        sessions = []
+        return list(self.iter_sessions(start_date, end_date, agent_id=agent_id, success_only=success_only))
+    
+    def iter_sessions(
+        self,
+        start_date: str,
+        end_date: str,
+        agent_id: str | None = None,
+        success_only: bool | None = None,
+    ) -> Iterator[SessionRecord]:
+        """
+        Stream sessions for a date range, ordered by date then start time.
         
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        Filtering happens in SQLite on the (date, agent_id, success) index and
+        rows are decoded in chunks, so large ranges are never held in memory.
         
-        current = start
-        while current <= end:
-            date_str = current.strftime("%Y-%m-%d")
-            day_sessions = self.load_sessions_for_date(date_str)
-            
-            for session in day_sessions:
-                # Apply filters
-                if agent_id and session.agent_id != agent_id:
-                    continue
-                if success_only is True and not session.success:
-                    continue
-                if success_only is False and session.success:
-                    continue
-                sessions.append(session)
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            agent_id: Filter by agent ID
+            success_only: If True, only successful sessions; if False, only
+                sessions that did not succeed (failed or unknown)
             
-            current += timedelta(days=1)
-        
-        return sessions
+        Yields:
+            SessionRecord
+        """
+        sql = "SELECT data FROM sessions WHERE date BETWEEN ? AND ?"
+        params: List[Any] = [start_date, end_date]
+        if agent_id:
+            sql += " AND agent_id = ?"
+            params.append(agent_id)
+        if success_only is True:
+            sql += " AND success = 1"
+        elif success_only is False:
+            sql += " AND (success = 0 OR success IS NULL)"
+        sql += " ORDER BY date, start_time"
+        
+        with self._connect() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(STREAM_FETCH_SIZE)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    session = self._decode_session(data)
+                    if session:
+                        yield session
     
     def get_session_dates(self) -> List[str]:
         """
@@ -200,14 +281,20 @@ class EpisodicStore:
         Returns:
             List of date strings (YYYY-MM-DD), sorted descending
         """
-        dates = []
-        for date_dir in self.sessions_dir.iterdir():
-            if date_dir.is_dir() and any(date_dir.glob("session_*.json")):
-                dates.append(date_dir.name)
-        return sorted(dates, reverse=True)
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT date FROM sessions ORDER BY date DESC").fetchall()
+        return [row[0] for row in rows]
+    
+    def _decode_session(self, data: str) -> Optional[SessionRecord]:
+        """Decode a stored session row."""
+        try:
+            return SessionRecord.from_dict(json.loads(data))
+        except Exception as e:
+            logger.warning(f"[EpisodicStore] Failed to decode session: {e}")
+            return None
     
     def _load_session_file(self, filepath: Path) -> Optional[SessionRecord]:
-        """Load a session from a JSON file."""
+        """Load a session from a legacy JSON file."""
         try:
             with open(filepath, "r", encoding="utf-8") as f:
                 data = json.load(f)
@@ -216,6 +303,49 @@ class EpisodicStore:
             logger.warning(f"[EpisodicStore] Failed to load {filepath}: {e}")
             return None
     
+    def migrate_legacy_sessions(self, force: bool = False) -> int:
+        """
+        Import sessions saved as one JSON file per session (sessions/{date}/).
+        
+        Runs once per store; the JSON files are left in place. Sessions
+        already in the database are not overwritten.
+        
+        Args:
+            force: Import again even if a previous migration completed
+            
+        Returns:
+            Number of sessions imported
+        """
+        if not self.sessions_dir.is_dir():
+            return 0
+        with self._connect() as conn:
+            done = conn.execute(
+                "SELECT value FROM store_meta WHERE key = ?", (_LEGACY_MIGRATED_KEY,)
+            ).fetchone()
+        if done and not force:
+            return 0
+        
+        imported = 0
+        with self._write_lock, self._connect() as conn:
+            for filepath in sorted(self.sessions_dir.glob("*/session_*.json")):
+                session = self._load_session_file(filepath)
+                if not session:
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO sessions "
+                    "(session_id, date, agent_id, success, start_time, action_count, error_count, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._session_row(session),
+                )
+                imported += cursor.rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                (_LEGACY_MIGRATED_KEY, datetime.now().isoformat()),
+            )
+        if imported:
+            logger.info(f"[EpisodicStore] Imported {imported} legacy session files from {self.sessions_dir}")
+        return imported
+    
     # =========================================================================
     # Reflection Storage
     # =========================================================================
@@ -290,20 +420,20 @@ class EpisodicStore:
         Returns:
             Dict with statistics
         """
+        sql = (
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(success = 1), 0), "
+            "COALESCE(SUM(success = 0), 0), "
+            "COALESCE(SUM(action_count), 0), "
+            "COALESCE(SUM(error_count), 0) "
+            "FROM sessions"
+        )
+        params: tuple = ()
         if date_str:
-            sessions = self.load_sessions_for_date(date_str)
-        else:
-            # Load all sessions (expensive for large stores)
-            sessions = []
-            for date in self.get_session_dates():
-                sessions.extend(self.load_sessions_for_date(date))
-        
-        total = len(sessions)
-        successful = sum(1 for s in sessions if s.success)
-        failed = sum(1 for s in sessions if s.success is False)
-        
-        total_actions = sum(len(s.actions) for s in sessions)
-        total_errors = sum(len(s.errors) for s in sessions)
+            sql += " WHERE date = ?"
+            params = (date_str,)
+        with self._connect() as conn:
+            total, successful, failed, total_actions, total_errors = conn.execute(sql, params).fetchone()
         
         return {
             "total_sessions": total,
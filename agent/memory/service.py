@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import threading
 import time
 import os
-from queue import Queue, Empty
+import uuid
+from collections import OrderedDict, deque
+from queue import Queue, Empty, Full
 from typing import List, Optional, Dict, Any, Tuple
 
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -12,7 +16,7 @@ from pydantic import BaseModel
 from utils.logger_helper import logger_helper as logger
 from agent.memory.models import MemoryItem, RetrievalQuery, RetrievedMemory
 from langchain_community.vectorstores import Chroma
-from langchain_core.embeddings import FakeEmbeddings
+from langchain_core.embeddings import Embeddings, FakeEmbeddings
 
 from agent.memory.embedding_utils import EmbeddingFactory
 
@@ -55,6 +59,7 @@ class MemoryManager:
         embedding_provider: str = None,
         collection_prefix: str = "ecan_mem_",
 		llm: BaseChatModel = None,
+		queue_maxsize: int = 2048,
     ) -> None:
 		self.agent_id = agent_id
 		# Resolve persist directory to a user-writable location when not provided
@@ -112,20 +117,50 @@ class MemoryManager:
 		# One Chroma instance per namespace key (lazy init)
 		self._stores: Dict[str, Chroma] = {}
 
-		# Background worker
-		self._queue: Queue[MemoryItem] = Queue()
+		# Background worker; the queue is bounded and put() drops items when it is full
+		self._queue_maxsize = queue_maxsize
+		self._queue: Queue[MemoryItem] = Queue(maxsize=queue_maxsize)
 		self._stop_event = threading.Event()
 		self._thread: Optional[threading.Thread] = None
 
-		# Tuning
+		# Tuning; the batch size adapts to the backlog between min and max
+		self._min_batch_size = 8
+		self._max_batch_size = 256
 		self._drain_batch_size = 32
 		self._drain_interval_sec = 0.25
+		self._target_drain_sec = 2.0
+		self._put_timeout_sec = 5.0
+
+		# Embeddings already computed, keyed by text hash (LRU, cleared when embeddings change)
+		self._embedding_cache: OrderedDict[str, List[float]] = OrderedDict()
+		self._embedding_cache_size = 4096
+		self._embedding_cache_lock = threading.Lock()
+
+		# Ingestion metrics, see get_metrics()
+		self._metrics_lock = threading.Lock()
+		self._metrics_window_sec = 60.0
+		self._ingest_window: deque = deque()  # (timestamp, items) per drain
+		self._started_at = time.time()
+		self._metrics: Dict[str, Any] = {
+			"enqueued": 0,
+			"dropped": 0,
+			"ingested": 0,
+			"failed": 0,
+			"drains": 0,
+			"embed_calls": 0,
+			"embed_latency_ms_last": 0.0,
+			"embed_latency_ms_total": 0.0,
+			"embedding_cache_hits": 0,
+			"embedding_cache_misses": 0,
+			"last_drain_ms": 0.0,
+		}
 
 	# ---------- lifecycle ----------
 	def start(self) -> None:
 		if self._thread and self._thread.is_alive():
 			return
 		self._stop_event.clear()
+		self._started_at = time.time()
 		self._thread = threading.Thread(
             target=self._worker_loop,
             name=f"MemoryMgr-{self.agent_id}",
@@ -147,25 +182,74 @@ class MemoryManager:
 		logger.info(f"[MemoryManager] stopped for agent={self.agent_id}")
 
 	# ---------- enqueue ----------
-	def put(self, item: MemoryItem) -> None:
-		"""Enqueue a memory item to be persisted."""
-		self._queue.put(item)
+	def put(self, item: MemoryItem, block: bool = False, timeout: float | None = None) -> bool:
+		"""Enqueue a memory item to be persisted.
+
+		Never waits by default, so callers on the skill execution path are not
+		held up: when the queue is full the item is dropped and counted in the
+		"dropped" metric. With block=True the caller waits up to timeout
+		seconds (default 5s) for the worker to catch up first.
+
+		Returns:
+			True if the item was queued.
+		"""
+		if block and timeout is None:
+			timeout = self._put_timeout_sec
+		try:
+			self._queue.put(item, block=block, timeout=timeout if block else None)
+		except Full:
+			with self._metrics_lock:
+				self._metrics["dropped"] += 1
+			logger.warning(f"[MemoryManager] queue full ({self._queue_maxsize}), dropped memory item for agent={self.agent_id}")
+			return False
+		with self._metrics_lock:
+			self._metrics["enqueued"] += 1
+		return True
+
+	# ---------- metrics ----------
+	def get_metrics(self) -> Dict[str, Any]:
+		"""Ingestion metrics, to tell whether memory ingestion keeps up with agent activity.
+
+		Returns:
+			dict with queue_depth/queue_capacity, batch_size, counters
+			(enqueued, dropped, ingested, failed, drains), items_per_sec over
+			the last minute, embedding latency and embedding cache hit counts.
+		"""
+		now = time.time()
+		with self._metrics_lock:
+			while self._ingest_window and self._ingest_window[0][0] < now - self._metrics_window_sec:
+				self._ingest_window.popleft()
+			window = max(1.0, min(self._metrics_window_sec, now - self._started_at))
+			items_per_sec = sum(n for _, n in self._ingest_window) / window
+			metrics = dict(self._metrics)
+		embed_total = metrics.pop("embed_latency_ms_total")
+		metrics.update(
+			agent_id=self.agent_id,
+			queue_depth=self._queue.qsize(),
+			queue_capacity=self._queue_maxsize,
+			batch_size=self._drain_batch_size,
+			items_per_sec=round(items_per_sec, 2),
+			embed_latency_ms_avg=round(embed_total / metrics["embed_calls"], 2) if metrics["embed_calls"] else 0.0,
+			embedding_cache_size=len(self._embedding_cache),
+		)
+		return metrics
 
 	# ---------- retrieval ----------
 	def retrieve(self, rq: RetrievalQuery) -> List[RetrievedMemory]:
 		store = self._get_store(rq.namespace)
+		filters = self._namespace_filter(rq.filters or {})
 		try:
 			docs_scores = store.similarity_search_with_score(
                 rq.query,
                 k=rq.k,
-                filter=rq.filters or {},
+                filter=filters,
             )
 		except TypeError:
 			# Some chroma versions use 'where' instead of 'filter'
 			docs_scores = store.similarity_search_with_score(
                 rq.query,
                 k=rq.k,
-                where=rq.filters or {},
+                where=filters,
             )
 		results: List[RetrievedMemory] = []
 		for doc, score in docs_scores:
@@ -200,19 +284,10 @@ class MemoryManager:
 	# ---------- internal ----------
 	def _worker_loop(self) -> None:
 		last_persist = time.time()
-		batch: List[MemoryItem] = []
 		while not self._stop_event.is_set():
-			try:
-				item = self._queue.get(timeout=self._drain_interval_sec)
-				batch.append(item)
-				if len(batch) >= self._drain_batch_size:
-					self._drain(batch)
-					batch = []
-			except Empty:
-				# time to drain partial batch
-				if batch:
-					self._drain(batch)
-					batch = []
+			batch = self._next_batch(wait=True)
+			if batch:
+				self._drain(batch)
 
 			# periodic persist & maintenance hooks
 			now = time.time()
@@ -226,27 +301,127 @@ class MemoryManager:
 				self.generate_episodic_summary()
 				self.accumulate_procedural_memory()
 				self.compress_and_prune()
+				logger.trace(f"[MemoryManager] ingestion metrics: {self.get_metrics()}")
 				last_persist = now
 
-		def _drain(self, items: List[MemoryItem]) -> None:
+		# Flush whatever is still queued so stop() does not lose items
+		while True:
+			batch = self._next_batch(wait=False)
+			if not batch:
+				break
+			self._drain(batch)
+
+	def _next_batch(self, wait: bool) -> List[MemoryItem]:
+		"""Take up to the current batch size of queued items, across namespaces.
+		Waits up to the drain interval for the first item only.
+		"""
+		batch: List[MemoryItem] = []
+		try:
+			if wait:
+				batch.append(self._queue.get(timeout=self._drain_interval_sec))
+			while len(batch) < self._drain_batch_size:
+				batch.append(self._queue.get_nowait())
+		except Empty:
+			pass
+		return batch
+
+	def _adapt_batch_size(self, elapsed: float) -> None:
+		"""Grow the batch while a backlog builds up, shrink it when drains get slow."""
+		size = self._drain_batch_size
+		if elapsed > self._target_drain_sec:
+			size = max(self._min_batch_size, size // 2)
+		elif self._queue.qsize() >= size:
+			size = min(self._max_batch_size, size * 2)
+		if size != self._drain_batch_size:
+			logger.debug(f"[MemoryManager] drain batch size {self._drain_batch_size} -> {size} (agent={self.agent_id})")
+			self._drain_batch_size = size
+
+	def _drain(self, items: List[MemoryItem]) -> None:
+		"""Embed a batch with one embedding call and write it per namespace."""
+		started = time.perf_counter()
+		ingested = 0
+		try:
+			try:
+				# Fills the embedding cache for the whole batch; add_texts below reads it
+				self._embed_texts([it.text for it in items])
+			except Exception as e:
+				logger.error(f"[MemoryManager] embedding failed for {len(items)} items: {e}")
+				with self._metrics_lock:
+					self._metrics["failed"] += len(items)
+				return
+
 			# group by namespace tuple
-			by_ns: Dict[Tuple[str, ...], List[MemoryItem]] = {}
-			for it in items:
-				by_ns.setdefault(it.namespace, []).append(it)
+			by_ns: Dict[Tuple[str, ...], List[int]] = {}
+			for i, it in enumerate(items):
+				by_ns.setdefault(tuple(it.namespace), []).append(i)
 
-			for ns, group in by_ns.items():
-				store = self._get_store(ns)
-				texts = [g.text for g in group]
+			for ns, indexes in by_ns.items():
+				group = [items[i] for i in indexes]
 				ns_key = self._namespace_key(ns)
 				metadatas = [
-                dict(g.metadata or {}, agent_id=self.agent_id, namespace=ns, namespace_key=ns_key)
-                for g in group
+					_chroma_metadata(dict(g.metadata or {}, agent_id=self.agent_id, namespace=ns, namespace_key=ns_key))
+					for g in group
 				]
-				ids = [g.id for g in group] if any(g.id for g in group) else None
+				ids = [g.id or str(uuid.uuid4()) for g in group]
 				try:
-					store.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+					store = self._get_store(ns)
+					# The store embeds through _StoreEmbeddings, which finds these texts in the cache
+					store.add_texts(texts=[g.text for g in group], metadatas=metadatas, ids=ids)
+					ingested += len(group)
 				except Exception as e:
-					logger.error(f"[MemoryManager] add_texts failed ns={ns}: {e}")
+					logger.error(f"[MemoryManager] upsert failed ns={ns}: {e}")
+					with self._metrics_lock:
+						self._metrics["failed"] += len(group)
+		finally:
+			elapsed = time.perf_counter() - started
+			with self._metrics_lock:
+				self._metrics["drains"] += 1
+				self._metrics["ingested"] += ingested
+				self._metrics["last_drain_ms"] = round(elapsed * 1000, 2)
+				if ingested:
+					self._ingest_window.append((time.time(), ingested))
+			self._adapt_batch_size(elapsed)
+
+	def _embed_texts(self, texts: List[str], record_metrics: bool = True) -> List[List[float]]:
+		"""Embed texts with a single embed_documents call for the cache misses."""
+		embeddings = self._embeddings
+		keys = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in texts]
+		found: Dict[str, List[float]] = {}
+		with self._embedding_cache_lock:
+			for key in keys:
+				if key in self._embedding_cache and key not in found:
+					self._embedding_cache.move_to_end(key)
+					found[key] = self._embedding_cache[key]
+		# unique texts still to embed, in first-seen order
+		missing: Dict[str, str] = {}
+		for key, t in zip(keys, texts):
+			if key not in found and key not in missing:
+				missing[key] = t
+
+		if missing:
+			t0 = time.perf_counter()
+			new_vectors = embeddings.embed_documents(list(missing.values()))
+			latency_ms = (time.perf_counter() - t0) * 1000
+			with self._metrics_lock:
+				self._metrics["embed_calls"] += 1
+				self._metrics["embed_latency_ms_last"] = round(latency_ms, 2)
+				self._metrics["embed_latency_ms_total"] += latency_ms
+			with self._embedding_cache_lock:
+				# Do not cache vectors from embeddings replaced meanwhile
+				cache = embeddings is self._embeddings
+				for key, vector in zip(missing, new_vectors):
+					found[key] = vector
+					if cache:
+						self._embedding_cache[key] = vector
+				while len(self._embedding_cache) > self._embedding_cache_size:
+					self._embedding_cache.popitem(last=False)
+
+		with self._metrics_lock:
+			self._metrics["embedding_cache_misses"] += len(missing)
+			# The stores' lookups of a batch just embedded are not hits worth reporting
+			if record_metrics:
+				self._metrics["embedding_cache_hits"] += len(texts) - len(missing)
+		return [found[key] for key in keys]
 
 	def _get_store(self, namespace: Tuple[str, ...]) -> Chroma:
 		ns_key = self._namespace_key(namespace)
@@ -255,12 +430,35 @@ class MemoryManager:
 		collection_name = f"{self._collection_prefix}{self.agent_id}_{ns_key}"
 		store = Chroma(
             collection_name=collection_name,
-            embedding_function=self._embeddings,
+            embedding_function=_StoreEmbeddings(self),
             persist_directory=self.persist_dir,
         )
 		self._stores[ns_key] = store
 		return store
 
+	def _namespace_filter(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+		"""Match a "namespace" filter against every form the namespace is stored in.
+
+		Chroma cannot store the namespace tuple itself, so it is kept JSON-encoded
+		(see _chroma_metadata). Filters may still give the tuple, its namespace
+		key, or a single plain name.
+		"""
+		value = filters.get("namespace")
+		if value is None or isinstance(value, dict):
+			return filters
+		if isinstance(value, str):
+			try:
+				decoded = json.loads(value)
+				namespace = tuple(decoded) if isinstance(decoded, list) else (value,)
+			except ValueError:
+				namespace = tuple(value.split("__"))
+		else:
+			namespace = tuple(value)
+		forms = [json.dumps(list(namespace), ensure_ascii=False), self._namespace_key(namespace)]
+		if isinstance(value, str):
+			forms.append(value)
+		return {**filters, "namespace": {"$in": list(dict.fromkeys(forms))}}
+
 	def _namespace_key(self, namespace: Tuple[str, ...]) -> str:
 		"""Create a stable string key for a hierarchical namespace tuple.
 		Use double underscores to avoid common collisions and keep readable.
@@ -288,8 +486,10 @@ class MemoryManager:
 			# Create new embeddings instance using EmbeddingFactory
 			new_embeddings = EmbeddingFactory.create_embeddings(provider_name, model_name)
 			
-			# Update the embeddings instance
-			self._embeddings = new_embeddings
+			# Update the embeddings instance; cached vectors belong to the old model
+			with self._embedding_cache_lock:
+				self._embeddings = new_embeddings
+				self._embedding_cache.clear()
 			
 			# Recreate all Chroma stores with new embeddings
 			# We need to persist old stores first, then recreate them
@@ -342,44 +542,75 @@ class MemoryManager:
 		new_store = self._get_store(new_ns)
 		new_store.add_texts(
 			texts=[text],
-			metadatas=[{**meta, "namespace": new_ns, "namespace_key": ns_key}],
+			metadatas=[_chroma_metadata({**meta, "namespace": new_ns, "namespace_key": ns_key})],
 			ids=[doc_id],
 		)
 
-def move_items(self, doc_ids: List[str], old_ns: Tuple[str, ...], new_ns: Tuple[str, ...]) -> None:
-	"""Move multiple items by id from old_ns collection to new_ns collection.
-	Fetch documents/metadatas in bulk via low-level Chroma get, best-effort delete
-	from old_ns, then reinsert into new_ns with updated namespace metadata.
-	"""
-	if not doc_ids:
-		return
-
-	old_store = self._get_store(old_ns)
-	# Fetch in bulk using low-level collection API
-	try:
-		client = old_store._collection  # caution: internal API
-		rec = client.get(ids=doc_ids, include=["ids", "documents", "metadatas"])
-		ids_found = rec.get("ids") or []
-		docs = rec.get("documents") or []
-		metas = rec.get("metadatas") or []
-		# Align by index; drop not-found docs
-		triples = [(i, d, m) for i, d, m in zip(ids_found, docs, metas) if d is not None]
-		if not triples:
+	def move_items(self, doc_ids: List[str], old_ns: Tuple[str, ...], new_ns: Tuple[str, ...]) -> None:
+		"""Move multiple items by id from old_ns collection to new_ns collection.
+		Fetch documents/metadatas in bulk via low-level Chroma get, best-effort delete
+		from old_ns, then reinsert into new_ns with updated namespace metadata.
+		"""
+		if not doc_ids:
 			return
-	except Exception:
-		raise
-
-	# Best-effort delete from old collection
-	try:
-		old_store.delete(ids=[i for i, _, _ in triples])
-	except Exception:
-		pass
-
-	# Insert into new namespace
-	ns_key = self._namespace_key(new_ns)
-	new_store = self._get_store(new_ns)
-	new_store.add_texts(
-		texts=[d for _, d, _ in triples],
-		metadatas=[{**(m or {}), "namespace": new_ns, "namespace_key": ns_key} for _, _, m in triples],
-		ids=[i for i, _, _ in triples],
-	)
\ No newline at end of file
+
+		old_store = self._get_store(old_ns)
+		# Fetch in bulk using low-level collection API
+		try:
+			client = old_store._collection  # caution: internal API
+			rec = client.get(ids=doc_ids, include=["ids", "documents", "metadatas"])
+			ids_found = rec.get("ids") or []
+			docs = rec.get("documents") or []
+			metas = rec.get("metadatas") or []
+			# Align by index; drop not-found docs
+			triples = [(i, d, m) for i, d, m in zip(ids_found, docs, metas) if d is not None]
+			if not triples:
+				return
+		except Exception:
+			raise
+
+		# Best-effort delete from old collection
+		try:
+			old_store.delete(ids=[i for i, _, _ in triples])
+		except Exception:
+			pass
+
+		# Insert into new namespace
+		ns_key = self._namespace_key(new_ns)
+		new_store = self._get_store(new_ns)
+		new_store.add_texts(
+			texts=[d for _, d, _ in triples],
+			metadatas=[_chroma_metadata({**(m or {}), "namespace": new_ns, "namespace_key": ns_key}) for _, _, m in triples],
+			ids=[i for i, _, _ in triples],
+		)
+
+
+class _StoreEmbeddings(Embeddings):
+	"""Embedding function of the manager's Chroma stores.
+
+	Documents go through the manager's embedding cache, so the public
+	add_texts() reuses the vectors a drain computed for its whole batch and
+	only embeds texts the cache no longer has.
+	"""
+
+	def __init__(self, manager: MemoryManager) -> None:
+		self._manager = manager
+
+	def embed_documents(self, texts: List[str]) -> List[List[float]]:
+		return self._manager._embed_texts(texts, record_metrics=False)
+
+	def embed_query(self, text: str) -> List[float]:
+		return self._manager._embeddings.embed_query(text)
+
+
+def _chroma_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+	"""Chroma only stores str/int/float/bool metadata values; encode the rest as JSON."""
+	safe: Dict[str, Any] = {}
+	for key, value in metadata.items():
+		if value is None:
+			continue
+		if isinstance(value, (str, int, float, bool)):
+			safe[key] = value
+		else:
+			safe[key] = json.dumps(value, default=str, ensure_ascii=False)
+	return safe
@@ -0,0 +1,150 @@
+"""
+Unit Tests for the SQLite-backed EpisodicStore
+
+Tests:
+1. Import of legacy per-session JSON files
+2. Lookup by session id with and without a date hint
+3. Range queries with agent/success filters and streaming iteration
+4. Aggregated statistics
+
+Run with:
+    pytest agent/memory/tests/test_episodic_store.py -v
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import types
+import unittest
+from datetime import datetime
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from agent.memory.models import ActionRecord, SessionRecord
+from agent.memory.episodic_store import EpisodicStore
+
+
+def make_session(session_id, day, agent_id="agent_a", success=True, hour=10, actions=0):
+    start = datetime(2024, 12, day, hour, 0, 0)
+    session = SessionRecord(
+        session_id=session_id,
+        agent_id=agent_id,
+        task=f"Task {session_id}",
+        start_time=start,
+        success=success,
+    )
+    for i in range(actions):
+        session.add_action(ActionRecord(
+            timestamp=start, session_id=session_id, step_number=i,
+            action_type="tool_call", action_name="search",
+        ))
+    return session
+
+
+class TestEpisodicStoreIndex(unittest.TestCase):
+    """Tests for indexed session storage."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = EpisodicStore(base_dir=self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_session_without_date(self):
+        self.store.save_session(make_session("dup", 12))
+        self.store.save_session(make_session("dup", 14, agent_id="agent_b"))
+        self.assertEqual(self.store.load_session("dup").agent_id, "agent_b")
+        self.assertEqual(self.store.load_session("dup", "2024-12-12").agent_id, "agent_a")
+        self.assertIsNone(self.store.load_session("missing"))
+
+    def test_save_again_replaces(self):
+        session = make_session("s1", 14, success=None)
+        self.store.save_session(session)
+        session.success = False
+        self.store.save_session(session)
+        sessions = self.store.load_sessions_for_date("2024-12-14")
+        self.assertEqual(len(sessions), 1)
+        self.assertIs(sessions[0].success, False)
+
+    def test_range_filters(self):
+        self.store.save_session(make_session("a1", 12, "agent_a", True))
+        self.store.save_session(make_session("a2", 13, "agent_a", False))
+        self.store.save_session(make_session("a3", 13, "agent_a", None, hour=8))
+        self.store.save_session(make_session("b1", 14, "agent_b", True))
+        self.store.save_session(make_session("a4", 15, "agent_a", True))
+
+        ids = lambda sessions: [s.session_id for s in sessions]
+        self.assertEqual(ids(self.store.load_sessions_for_range("2024-12-12", "2024-12-14")), ["a1", "a3", "a2", "b1"])
+        self.assertEqual(ids(self.store.load_sessions_for_range("2024-12-12", "2024-12-15", agent_id="agent_a", success_only=True)), ["a1", "a4"])
+        self.assertEqual(ids(self.store.load_sessions_for_range("2024-12-12", "2024-12-15", success_only=False)), ["a3", "a2"])
+        self.assertEqual(self.store.get_session_dates(), ["2024-12-15", "2024-12-14", "2024-12-13", "2024-12-12"])
+
+    def test_iter_sessions_streams(self):
+        for i in range(450):
+            self.store.save_session(make_session(f"s{i:04d}", 14, hour=i % 24))
+        stream = self.store.iter_sessions("2024-12-14", "2024-12-14")
+        self.assertIsInstance(stream, types.GeneratorType)
+        first = next(stream)
+        self.assertEqual(first.start_time.hour, 0)
+        self.assertEqual(1 + sum(1 for _ in stream), 450)
+
+    def test_range_query_uses_index(self):
+        with sqlite3.connect(self.store.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT data FROM sessions "
+                "WHERE date BETWEEN ? AND ? AND agent_id = ? AND success = 1",
+                ("2024-12-01", "2024-12-31", "agent_a"),
+            ).fetchall()
+        self.assertIn("idx_sessions_date_agent_success", " ".join(str(row) for row in plan))
+
+    def test_stats(self):
+        self.store.save_session(make_session("s1", 14, success=True, actions=3))
+        self.store.save_session(make_session("s2", 14, success=False, actions=1))
+        self.store.save_session(make_session("s3", 13, success=None))
+        stats = self.store.get_stats("2024-12-14")
+        self.assertEqual(stats["total_sessions"], 2)
+        self.assertEqual(stats["successful"], 1)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["total_actions"], 4)
+        self.assertEqual(self.store.get_stats()["total_sessions"], 3)
+
+
+class TestLegacyMigration(unittest.TestCase):
+    """Tests for importing the per-session JSON tree."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for day, session_id, success in [(13, "old1", True), (14, "old2", False)]:
+            date_dir = os.path.join(self.temp_dir, "sessions", f"2024-12-{day}")
+            os.makedirs(date_dir, exist_ok=True)
+            with open(os.path.join(date_dir, f"session_{session_id}.json"), "w", encoding="utf-8") as f:
+                json.dump(make_session(session_id, day, success=success, actions=2).to_dict(), f, indent=2)
+        with open(os.path.join(self.temp_dir, "sessions", "2024-12-14", "session_broken.json"), "w") as f:
+            f.write("{not json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_legacy_files_imported_once(self):
+        store = EpisodicStore(base_dir=self.temp_dir)
+        self.assertEqual(store.get_session_dates(), ["2024-12-14", "2024-12-13"])
+        loaded = store.load_session("old2")
+        self.assertIs(loaded.success, False)
+        self.assertEqual(len(loaded.actions), 2)
+
+        # Reopening does not import again, and does not overwrite newer data
+        updated = make_session("old1", 13, success=False)
+        store.save_session(updated)
+        reopened = EpisodicStore(base_dir=self.temp_dir)
+        self.assertIs(reopened.load_session("old1").success, False)
+        self.assertEqual(reopened.migrate_legacy_sessions(force=True), 0)
+        self.assertEqual(reopened.get_stats()["total_sessions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Unit Tests for MemoryManager background ingestion
+
+Tests:
+1. Queued items reach the vector stores (one embedding call per drain)
+2. Embedding cache keyed by text hash
+3. Bounded queue: put() never waits unless asked to, full queue drops and counts
+4. Adaptive batch size and ingestion metrics
+5. Namespace filters match the stored (JSON-encoded) namespace
+
+Run with:
+    pytest agent/memory/tests/test_memory_manager.py -v
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from agent.memory.models import MemoryItem
+from agent.memory.service import MemoryManager, _StoreEmbeddings
+
+
+class CountingEmbeddings:
+    """Embeddings stub recording each embed_documents call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class FakeStore:
+    """Vector store stub; embeds through its embedding function like Chroma.add_texts."""
+
+    def __init__(self, embedding_function):
+        self.embedding_function = embedding_function
+        self.upserts = []
+
+    def add_texts(self, texts, metadatas, ids):
+        embeddings = self.embedding_function.embed_documents(list(texts))
+        self.upserts.append(dict(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=list(texts)))
+
+    def persist(self):
+        pass
+
+
+class TestMemoryManagerIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = MemoryManager(
+            agent_id="agent_1",
+            persist_dir=self.temp_dir,
+            embedding_provider="OpenAI",
+            embedding_model="text-embedding-3-small",
+            queue_maxsize=16,
+        )
+        self.embeddings = CountingEmbeddings()
+        self.manager._embeddings = self.embeddings
+        self.stores = {}
+
+        def get_store(namespace):
+            key = self.manager._namespace_key(namespace)
+            if key not in self.stores:
+                self.stores[key] = FakeStore(_StoreEmbeddings(self.manager))
+            return self.stores[key]
+
+        self.manager._get_store = get_store
+
+    def tearDown(self):
+        self.manager.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _documents(self, ns_key):
+        store = self.stores.get(ns_key)
+        if not store:
+            return []
+        return [doc for call in store.upserts for doc in call["documents"]]
+
+    def test_drain_batches_across_namespaces(self):
+        items = [
+            MemoryItem(text="chat one", namespace=("chat",)),
+            MemoryItem(text="task one", namespace=("task", "t1"), id="fixed-id"),
+            MemoryItem(text="chat two", namespace=("chat",), metadata={"tags": ["a", "b"], "n": 1}),
+        ]
+        self.manager._drain(items)
+
+        self.assertEqual(len(self.embeddings.calls), 1)
+        self.assertEqual(self._documents("chat"), ["chat one", "chat two"])
+        self.assertEqual(self._documents("task__t1"), ["task one"])
+
+        task_call = self.stores["task__t1"].upserts[0]
+        self.assertEqual(task_call["ids"], ["fixed-id"])
+        self.assertEqual(task_call["embeddings"], [[8.0, 1.0]])
+        chat_meta = self.stores["chat"].upserts[0]["metadatas"][1]
+        self.assertEqual(chat_meta["namespace_key"], "chat")
+        self.assertEqual(chat_meta["n"], 1)
+        self.assertIsInstance(chat_meta["tags"], str)
+        self.assertIsInstance(chat_meta["namespace"], str)
+        self.assertEqual(self.manager.get_metrics()["ingested"], 3)
+
+    def test_embedding_cache(self):
+        self.manager._drain([MemoryItem(text="same"), MemoryItem(text="same"), MemoryItem(text="other")])
+        self.manager._drain([MemoryItem(text="same"), MemoryItem(text="new")])
+        self.assertEqual(self.embeddings.calls, [["same", "other"], ["new"]])
+
+        self.manager._drain([MemoryItem(text="other")])
+        self.assertEqual(len(self.embeddings.calls), 2)
+        metrics = self.manager.get_metrics()
+        self.assertEqual(metrics["embedding_cache_misses"], 3)
+        self.assertEqual(metrics["embedding_cache_hits"], 3)
+
+    def test_embedding_failure_counts_items(self):
+        def fail(texts):
+            raise RuntimeError("provider down")
+        self.embeddings.embed_documents = fail
+        self.manager._drain([MemoryItem(text="a"), MemoryItem(text="b")])
+        metrics = self.manager.get_metrics()
+        self.assertEqual(metrics["failed"], 2)
+        self.assertEqual(metrics["ingested"], 0)
+
+    def test_full_queue_drops_without_waiting(self):
+        for i in range(16):
+            self.assertTrue(self.manager.put(MemoryItem(text=f"item {i}")))
+        start = time.perf_counter()
+        self.assertFalse(self.manager.put(MemoryItem(text="overflow")))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        # Only an explicit blocking put waits for room
+        self.assertFalse(self.manager.put(MemoryItem(text="overflow"), block=True, timeout=0.01))
+        metrics = self.manager.get_metrics()
+        self.assertEqual(metrics["queue_depth"], 16)
+        self.assertEqual(metrics["enqueued"], 16)
+        self.assertEqual(metrics["dropped"], 2)
+
+    def test_worker_ingests_and_flushes_on_stop(self):
+        self.manager.start()
+        for i in range(40):
+            self.assertTrue(self.manager.put(MemoryItem(text=f"item {i}", namespace=("chat",)), block=True))
+        self.manager.stop(timeout=5.0)
+        self.assertEqual(len(self._documents("chat")), 40)
+        self.assertLessEqual(len(self.embeddings.calls), 40)
+        metrics = self.manager.get_metrics()
+        self.assertEqual(metrics["ingested"], 40)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertGreater(metrics["items_per_sec"], 0)
+
+    def test_namespace_filter_matches_stored_encoding(self):
+        stored = {"namespace": '["agent", "chat"]', "namespace_key": "agent__chat"}
+        for given in [("agent", "chat"), ["agent", "chat"], '["agent", "chat"]', "agent__chat"]:
+            with self.subTest(given=given):
+                where = self.manager._namespace_filter({"namespace": given, "n": 1})
+                self.assertEqual(where["n"], 1)
+                self.assertIn(stored["namespace"], where["namespace"]["$in"])
+        self.assertEqual(self.manager._namespace_filter({"n": 1}), {"n": 1})
+
+    def test_adaptive_batch_size(self):
+        for i in range(16):
+            self.manager.put(MemoryItem(text=f"item {i}"))
+        self.manager._drain_batch_size = 8
+        self.manager._adapt_batch_size(elapsed=0.01)
+        self.assertEqual(self.manager._drain_batch_size, 16)
+        self.manager._adapt_batch_size(elapsed=self.manager._target_drain_sec + 1)
+        self.assertEqual(self.manager._drain_batch_size, 8)
+        self.manager._adapt_batch_size(elapsed=self.manager._target_drain_sec + 1)
+        self.assertEqual(self.manager._drain_batch_size, self.manager._min_batch_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
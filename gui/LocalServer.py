@@ -9,6 +9,7 @@ import socket
 import time
 from starlette.applications import Starlette
 import typing
+import contextlib
 
 from utils.logger_helper import logger_helper as logger
 from utils.gui_dispatch import run_on_main_thread
@@ -262,7 +263,7 @@ class MCPHandler:
                 from agent.mcp.server.server import StreamableHTTPSessionManager
                 MCPHandler._session_manager_instance = StreamableHTTPSessionManager(
                     app=mcp_server_config.meca_mcp_server,
-                    event_store=None,
+                    event_store=getattr(mcp_server_config.session_manager, 'event_store', None),
                     json_response=True
                 )
 
@@ -383,6 +384,21 @@ class RouteBuilder:
 class AppBuilder:
     """Starlette application builder"""
 
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        """Let local MCP clients dispatch tool calls to this server in-process; stop the tool pool on exit"""
+        from agent.mcp.local_dispatch import register_local_mcp_server, unregister_local_mcp_server
+        server = getattr(mcp_server_config, 'meca_mcp_server', None)
+        if server is not None:
+            register_local_mcp_server(server, asyncio.get_running_loop())
+        try:
+            yield
+        finally:
+            unregister_local_mcp_server()
+            from agent.mcp.server.tool_executor import shutdown_tool_executor
+            shutdown_tool_executor()
+
     @staticmethod
     def create_app(request_handlers):
         """Create Starlette application"""
@@ -396,7 +412,8 @@ class AppBuilder:
 
         app_config = {
             'routes': routes,
-            'debug': mcp_server_config.is_development
+            'debug': mcp_server_config.is_development,
+            'lifespan': AppBuilder.lifespan,
         }
 
         logger.info("🔧 Created Starlette app of LcoalServer")
@@ -109,6 +109,7 @@ from qasync import QEventLoop
 from gui.tool.MainGUITool import FileResource, StaticResource
 from gui.encrypt import *
 from gui.unified_browser_manager import get_unified_browser_manager
+from gui.startup_dag import StartupDAG
 from auth.auth_manager import AuthManager
 
 print(TimeUtil.formatted_now_with_ms() + " load MainGui #5 finished...")
@@ -149,6 +150,10 @@ class MainWindow:
             'ui_ready': False,
             'critical_services_ready': False
         }
+
+        # Agent startup phase graph (skills/tasks/agents), see async_agents_init
+        self._startup_dag = None
+        self._agent_launch_tasks = []
         
         # Initialize shutdown flag
         self._shutting_down = False
@@ -781,7 +786,9 @@ class MainWindow:
             'critical_services_ready': self._initialization_status.get('critical_services_ready', False),
             'async_init_complete': self._initialization_status.get('async_init_complete', False),
             'fully_ready': self._initialization_status.get('fully_ready', False),
-            'sync_init_complete': self._initialization_status.get('sync_init_complete', False)
+            'sync_init_complete': self._initialization_status.get('sync_init_complete', False),
+            # Per-phase status/timings of the agent startup graph (empty until it starts)
+            'phases': self._startup_dag.get_timings() if self._startup_dag else {}
         }
 
 
@@ -1937,6 +1944,16 @@ class MainWindow:
             if not hasattr(self, 'mcp_client'):
                 missing_components.append('MCP Client')
             
+            # Startup phase graph: every phase starts as soon as its dependencies are done.
+            #   skill_sync (DB+cloud skills) ─> skills (compile + code skills) ─┐
+            #   task_sync (DB+cloud tasks) ─────────────────────────────> tasks ─┤
+            #   agent_sync (DB+cloud agents) ─────────────────────────────────> agents ─> agent_launch
+            # Code-built agents are launched as soon as each is built.
+            dag = StartupDAG("agent startup")
+            self._startup_dag = dag
+            self._agent_launch_tasks = []
+            agent_deps = ['agent_sync']
+
             if missing_components:
                 logger.warning(f"[MainWindow] ⚠️ Missing components: {missing_components}, skipping agent skills building")
                 self.agent_skills = []
@@ -1947,53 +1964,55 @@ class MainWindow:
                 # No need to copy example skills anymore
                 logger.info("[MainWindow] 📚 Skills will be loaded directly from resource/my_skills")
 
-                # Start skill building task (asynchronous)
-                agent_skills_task = asyncio.create_task(self._build_agent_skills_async())
-                
-                # Wait for skill building to complete
-                try:
-                    self.agent_skills = await agent_skills_task
-                    logger.info(f"[MainWindow] ✅ Agent skills built: {len(self.agent_skills)} skills")
-                except Exception as e:
-                    logger.warning(f"[MainWindow] ⚠️ Agent skills building failed: {e}")
-                    import traceback
-                    logger.error(f"[MainWindow] Skills building traceback: {traceback.format_exc()}")
-                    self.agent_skills = []
+                from agent.ec_skills.build_agent_skills import load_skill_sources
+                from agent.ec_agents.create_agent_tasks import load_agent_task_sources
 
-                # Start agent task building (asynchronous, parallel with skills)
-                logger.info("[MainWindow] 📝 Building agent tasks...")
-                agent_tasks_task = asyncio.create_task(self._build_agent_tasks_async())
+                async def build_skills():
+                    # Code skills build while the DB/cloud skill sync is still running
+                    self.agent_skills = await self._build_agent_skills_async(dag.result('skill_sync'))
+                    logger.info(f"[MainWindow] ✅ Agent skills built: {len(self.agent_skills)} skills")
+                    return self.agent_skills
 
-                # Wait for agent task building to complete
-                try:
-                    self.agent_tasks = await agent_tasks_task
+                async def build_tasks():
+                    task_sources = await self._get_startup_phase_result('task_sync', [])
+                    self.agent_tasks = await self._build_agent_tasks_async(task_sources)
                     logger.info(f"[MainWindow] ✅ Agent tasks built: {len(self.agent_tasks)} agent tasks")
-                except Exception as e:
-                    logger.warning(f"[MainWindow] ⚠️ Agent tasks building failed: {e}")
-                    import traceback
-                    logger.error(f"[MainWindow] Agent tasks building traceback: {traceback.format_exc()}")
-                    self.agent_tasks = []
+                    return self.agent_tasks
 
-            # Environment preparation (simplified handling)
-            logger.info("[MainWindow] 🔧 Environment preparation completed")
-            
-            # Ultra-parallel Agent construction and startup
-            try:
+                dag.add_phase('skill_sync', lambda: load_skill_sources(self))
+                dag.add_phase('skills', build_skills)
+                dag.add_phase('task_sync', lambda: load_agent_task_sources(self))
+                # Local code tasks look up their skills in self.agent_skills
+                dag.add_phase('tasks', build_tasks, deps=('skills', 'task_sync'))
+                agent_deps.extend(['skills', 'tasks'])
+
+            async def build_agents():
                 logger.info("[MainWindow] 🚀 Building and launching agents with ultra-parallel optimization...")
-                agents_built = await self._build_and_launch_agents_ultra_parallel()
-                
-                if agents_built:
-                    logger.info(f"[MainWindow] ✅ Successfully built and launched {len(self.agents)} agents")
+                agent_sources = await self._get_startup_phase_result('agent_sync', None)
+                return await self._build_and_launch_agents_ultra_parallel(agent_sources)
 
-                    # TODO: Merge agent.tasks from built agents into mainwin.agent_tasks, This step will be deprecated in the future
-                    self._merge_agent_tasks_to_memory()
-                else:
-                    logger.warning("[MainWindow] ⚠️ Agent ultra-parallel process completed with issues")
+            dag.add_phase('agent_sync', self._load_agent_sources_async)
+            dag.add_phase('agents', build_agents, deps=agent_deps)
+            # Launches wait for each agent's server; don't hold up initialization for them
+            dag.add_phase('agent_launch', self._wait_for_agent_launches, deps=('agents',), background=True)
 
-            except Exception as e:
-                logger.error(f"[MainWindow] ❌ Agent ultra-parallel process failed: {e}")
+            results = await dag.run()
+
+            # Environment preparation (simplified handling)
+            logger.info("[MainWindow] 🔧 Environment preparation completed")
+
+            agents_built = results.get('agents')
+            if isinstance(agents_built, Exception):
+                logger.error(f"[MainWindow] ❌ Agent ultra-parallel process failed: {agents_built}")
                 agents_built = False
-            
+            elif agents_built:
+                logger.info(f"[MainWindow] ✅ Successfully built {len(self.agents)} agents, launches running in background")
+
+                # TODO: Merge agent.tasks from built agents into mainwin.agent_tasks, This step will be deprecated in the future
+                self._merge_agent_tasks_to_memory()
+            else:
+                logger.warning("[MainWindow] ⚠️ Agent ultra-parallel process completed with issues")
+
             # Mark async initialization complete
             self._initialization_status['async_init_complete'] = True
             
@@ -2012,6 +2031,9 @@ class MainWindow:
             logger.info(f"   Phase 1 (Setup): {elapsed_phase1:.3f}s")
             logger.info(f"   Phase 2 (Parallel): {elapsed_phase2:.3f}s") 
             logger.info(f"   Phase 3 (Assembly): {elapsed_phase3:.3f}s")
+            for phase_name, timing in dag.get_timings().items():
+                if 'duration' in timing:
+                    logger.info(f"     - {phase_name}: {timing['duration']:.3f}s (started at +{timing['started']:.3f}s, {timing['status']})")
             logger.info(f"💻 System: CPU={cpu_count}, RAM={memory_gb:.1f}GB")
             logger.info("=" * 50)
 
@@ -2106,14 +2128,19 @@ class MainWindow:
             logger.warning(f"[MainWindow] ⚠️ MCP tools failed: {e}, using empty list")
             return []
 
-    async def _build_agent_skills_async(self):
-        """Optimized parallel agent skills building"""
+    async def _build_agent_skills_async(self, skill_sources=None):
+        """Optimized parallel agent skills building
+
+        Args:
+            skill_sources: Optional DB/cloud skill records (or an awaitable for them),
+                see build_agent_skills
+        """
         logger.info("[MainWindow] 🔧 Building agent skills in parallel...")
 
         try:
             # Use the async build_agent_skills function directly
             from agent.ec_skills.build_agent_skills import build_agent_skills
-            skills = await build_agent_skills(self)
+            skills = await build_agent_skills(self, skill_sources=skill_sources)
 
             logger.info(f"[MainWindow] ✅ Built {len(skills)} agent skills")
             return skills or []
@@ -2124,14 +2151,18 @@ class MainWindow:
             logger.debug(f"[MainWindow] Skills building traceback: {traceback.format_exc()}")
             return []
 
-    async def _build_agent_tasks_async(self):
-        """Optimized parallel agent tasks building"""
+    async def _build_agent_tasks_async(self, task_sources=None):
+        """Optimized parallel agent tasks building
+
+        Args:
+            task_sources: Optional preloaded DB/cloud agent tasks, see build_agent_tasks
+        """
         logger.info("[MainWindow] 📝 Building agent tasks in parallel...")
 
         try:
             # Use the async build_agent_tasks function directly
             from agent.ec_agents.create_agent_tasks import build_agent_tasks
-            agent_tasks = await build_agent_tasks(self)
+            agent_tasks = await build_agent_tasks(self, task_sources=task_sources)
 
             logger.info(f"[MainWindow] ✅ Built {len(agent_tasks)} agent tasks")
             return agent_tasks or []
@@ -2262,7 +2293,36 @@ class MainWindow:
             logger.debug(f"[MainWindow] Direct MCP tools failed: {e}")
             return []
 
-    async def _build_and_launch_agents_ultra_parallel(self):
+    async def _get_startup_phase_result(self, phase_name: str, default=None):
+        """Result of an agent startup phase, or default if the phase failed"""
+        try:
+            return await self._startup_dag.result(phase_name)
+        except Exception as e:
+            logger.warning(f"[MainWindow] ⚠️ Startup phase '{phase_name}' failed, using default: {e}")
+            return default
+
+    async def _load_agent_sources_async(self):
+        """Load local database and cloud agents in parallel (independent of skills)
+
+        Returns:
+            Tuple of (local_db_agents, cloud_agents) agent dict lists
+        """
+        local_db_agents, cloud_agents = await asyncio.gather(
+            self._load_local_db_agents(),
+            self._fetch_cloud_agents(),
+            return_exceptions=True
+        )
+
+        # Handle exceptions from parallel tasks
+        if isinstance(local_db_agents, Exception):
+            logger.error(f"[MainWindow] ❌ Failed to load local DB agents: {local_db_agents}")
+            local_db_agents = []
+        if isinstance(cloud_agents, Exception):
+            logger.error(f"[MainWindow] ❌ Failed to fetch cloud agents: {cloud_agents}")
+            cloud_agents = []
+        return local_db_agents, cloud_agents
+
+    async def _build_and_launch_agents_ultra_parallel(self, agent_sources=None):
         """
         Ultra-parallel agent build and launch
         
@@ -2270,6 +2330,13 @@ class MainWindow:
         1. Code-built agents (from builder functions)
         2. Local database agents (user-created via UI)
         3. Cloud agents (synced from cloud API)
+
+        Code-built agents take priority over DB/Cloud agents with the same name, so
+        each one is launched as soon as it is built; the rest launch after the merge.
+
+        Args:
+            agent_sources: Optional (local_db_agents, cloud_agents) already loaded by
+                _load_agent_sources_async; loaded here in parallel when not given
         
         Returns:
             bool: True if agents were successfully built and initialized
@@ -2280,30 +2347,36 @@ class MainWindow:
             
             # Initialize agents list
             self.agents = []
-            
+            launched_ids = set()
+
+            def launch_early(agent_name, agent):
+                launched_ids.add(id(agent))
+                logger.info(f"[MainWindow] 🚀 Launching {agent_name} agent early (code-built)")
+                self._launch_agents_async([agent])
+
             # Step 1: Parallel execution of THREE tasks
             logger.info("[MainWindow] 🔧 Starting 3-way parallel execution:")
             logger.info("[MainWindow]    1️⃣ Building code-built agents")
             logger.info("[MainWindow]    2️⃣ Loading local database agents")
             logger.info("[MainWindow]    3️⃣ Fetching cloud agents")
-            
-            built_agents, local_db_agents, cloud_agents = await asyncio.gather(
-                self._build_code_agents_async(),
-                self._load_local_db_agents(),
-                self._fetch_cloud_agents(),
-                return_exceptions=True
-            )
-            
+
+            if agent_sources is None:
+                built_agents, agent_sources = await asyncio.gather(
+                    self._build_code_agents_async(on_built=launch_early),
+                    self._load_agent_sources_async(),
+                    return_exceptions=True
+                )
+            else:
+                built_agents = await self._build_code_agents_async(on_built=launch_early)
+
             # Handle exceptions from parallel tasks
             if isinstance(built_agents, Exception):
                 logger.error(f"[MainWindow] ❌ Failed to build code agents: {built_agents}")
                 built_agents = []
-            if isinstance(local_db_agents, Exception):
-                logger.error(f"[MainWindow] ❌ Failed to load local DB agents: {local_db_agents}")
-                local_db_agents = []
-            if isinstance(cloud_agents, Exception):
-                logger.error(f"[MainWindow] ❌ Failed to fetch cloud agents: {cloud_agents}")
-                cloud_agents = []
+            if isinstance(agent_sources, Exception):
+                logger.error(f"[MainWindow] ❌ Failed to load DB/Cloud agents: {agent_sources}")
+                agent_sources = ([], [])
+            local_db_agents, cloud_agents = agent_sources
             
             logger.info(f"[MainWindow] 📊 Parallel loading completed:")
             logger.info(f"[MainWindow]    - Code-built: {len(built_agents)}, DB: {len(local_db_agents)}, Cloud: {len(cloud_agents)}")
@@ -2368,8 +2441,8 @@ class MainWindow:
                     logger.error(f"[AGENT_INVENTORY] Error inspecting agent {idx}: {e}")
             logger.info("[AGENT_INVENTORY] =============================================")
             
-            # Step 4: Launch agents in background (non-blocking)
-            self._launch_agents_async(self.agents)
+            # Step 4: Launch remaining agents in background (non-blocking)
+            self._launch_agents_async([agent for agent in self.agents if id(agent) not in launched_ids])
             
             total_time = time.time() - start_time
             logger.info(f"[MainWindow] 🎉 Ultra-parallel process completed in {total_time:.3f}s")
@@ -2383,9 +2456,12 @@ class MainWindow:
             logger.error(traceback.format_exc())
             return False
 
-    async def _build_code_agents_async(self):
+    async def _build_code_agents_async(self, on_built=None):
         """Build all code-built agents in parallel
         
+        Args:
+            on_built: Optional callback(agent_name, agent) called as soon as each agent is built
+
         Returns:
             List of successfully built (agent_name, agent) tuples
         """
@@ -2432,6 +2508,8 @@ class MainWindow:
                 try:
                     loop = asyncio.get_event_loop()
                     agent = await loop.run_in_executor(None, config['builder'], self)
+                    if agent and on_built:
+                        on_built(config['name'], agent)
                     return (config['name'], agent) if agent else None
                 except Exception as e:
                     logger.error(f"[MainWindow] ❌ Failed to build {config['name']}: {e}")
@@ -2476,7 +2554,7 @@ class MainWindow:
             
             if not launchable_agents:
                 logger.info("[MainWindow] 🔍 No launchable agents found")
-                return
+                return 0
             
             logger.info(f"[MainWindow] 🚀 Launching {len(launchable_agents)} agents in background (fire-and-forget)...")
             
@@ -2490,10 +2568,18 @@ class MainWindow:
             # Count results
             launched_count = sum(1 for r in results if r is True)
             logger.info(f"[MainWindow] 🎉 Background launch completed: {launched_count}/{len(launchable_agents)} agents launched")
+            return launched_count
         
         # Create task and run in background (fire-and-forget)
-        asyncio.create_task(launch_all_async())
+        launch_task = asyncio.create_task(launch_all_async())
+        self._agent_launch_tasks.append(launch_task)
         logger.info(f"[MainWindow] 🔥 Agent launch task created (running in background)")
+        return launch_task
+
+    async def _wait_for_agent_launches(self):
+        """Wait for all background agent launches started so far (startup 'agent_launch' phase)"""
+        results = await asyncio.gather(*self._agent_launch_tasks, return_exceptions=True)
+        return sum(r for r in results if isinstance(r, int))
     
     async def _launch_single_agent_with_name_async(self, agent_name: str, agent):
         """Asynchronously launch a single Agent (returns launch result)"""
@@ -3484,6 +3570,27 @@ class MainWindow:
         except Exception as e:
             logger.debug(f"[MainWindow] ❌ Error shutting down ThreadPoolExecutor: {e}")
 
+        # Shut down the shared skill scheduler
+        try:
+            from agent.ec_tasks.skill_scheduler import shutdown_skill_scheduler
+            shutdown_skill_scheduler()
+        except Exception as e:
+            logger.debug(f"[MainWindow] ❌ Error shutting down skill scheduler: {e}")
+
+        # Close the pooled A2A HTTP clients
+        try:
+            from agent.a2a.common.client.transport import shutdown_transport_pool
+            shutdown_transport_pool()
+        except Exception as e:
+            logger.debug(f"[MainWindow] ❌ Error closing A2A transport pool: {e}")
+
+        # Stop the pooled event loops used by run_async_in_sync
+        try:
+            from utils.async_loop_pool import shutdown_async_loop_pool
+            shutdown_async_loop_pool()
+        except Exception as e:
+            logger.debug(f"[MainWindow] ❌ Error shutting down async loop pool: {e}")
+
         # Close database services and connections
         try:
             # Close chat service
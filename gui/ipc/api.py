@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any, Callable, TypeVar, Generic, List
 from dataclasses import dataclass
 from .types import IPCResponse
 from .wc_service import IPCWCService
+from .run_state_delta import RunStateTracker
 from utils.logger_helper import logger_helper as logger
 import gui.ipc.w2p_handlers
 # Ensure context handlers are registered
@@ -43,6 +44,8 @@ class IPCAPI:
             if ipc_wc_service is None:
                 raise ValueError("IPC service must be provided for first initialization")
             self._ipc_wc_service: IPCWCService = ipc_wc_service
+            # Last run state sent per agentTaskId, for delta updates
+            self._run_state_tracker = RunStateTracker()
             self._initialized = True
             logger.info("IPC API initialized")
 
@@ -355,76 +358,85 @@ class IPCAPI:
         status: str,
         langgraph_state: dict,
         timestamp: int = None,
-        callback: Optional[Callable[[APIResponse[bool]], None]] = None
+        callback: Optional[Callable[[APIResponse[bool]], None]] = None,
+        force_full: bool = False
     ) -> None:
         """
         Update skill run statistics
+
+        Only the top-level state keys changed since the previous update of the
+        same agent_task_id are sent (stateMode='delta'); the first update, a
+        resync after a failed delivery, or force_full sends a full snapshot.
+        Frontends that miss a delta fetch the snapshot via 'get_skill_run_state'.
+        See gui/ipc/run_state_delta.py for the payload format.
+
         Args:
             agent_task_id: task ID
             langgraph_state: {status, node_name, node_state}
             timestamp: Notification timestamp
             callback: Callback function, receives APIResponse[bool]
+            force_full: Send the whole state even if a delta is possible
         """
-        # Make nodeState JSON-safe to avoid serialization errors (e.g., CallToolResult)
-        def _json_safe(value, depth=0):
-            try:
-                # Prevent extremely deep recursion
-                if depth > 6:
-                    return str(value)
-                if value is None or isinstance(value, (str, int, float, bool)):
-                    return value
-                if isinstance(value, dict):
-                    safe_dict = {}
-                    for k, v in value.items():
-                        # ensure keys are strings
-                        key = str(k)
-                        safe_dict[key] = _json_safe(v, depth + 1)
-                    return safe_dict
-                if isinstance(value, (list, tuple, set)):
-                    return [_json_safe(v, depth + 1) for v in value]
-                # objects with __dict__ (pydantic, dataclasses, etc.)
-                if hasattr(value, 'model_dump') and callable(getattr(value, 'model_dump')):
-                    try:
-                        return _json_safe(value.model_dump(mode="python"), depth + 1)
-                    except Exception:
-                        pass
-                if hasattr(value, '__dict__'):
-                    try:
-                        return _json_safe(vars(value), depth + 1)
-                    except Exception:
-                        pass
-                # Fallback to string representation
-                return str(value)
-            except Exception:
-                try:
-                    return str(value)
-                except Exception:
-                    return '<unserializable>'
-
-        safe_state = _json_safe(langgraph_state)
-
-        # Include both snake_case and camelCase for compatibility with different frontends
+        # Make nodeState JSON-safe to avoid serialization errors (e.g., CallToolResult);
+        # only the top-level values that changed since the last update are converted
+        state_fields, safe_state = self._run_state_tracker.encode_state(agent_task_id, langgraph_state,
+                                                                        force_full=force_full)
+
         params = {
             'agentTaskId': agent_task_id,
             # snake_case (legacy/current handlers)
             'current_node': current_node,
-            'nodeState': safe_state,
             # camelCase (new handlers)
             'currentNode': current_node,
-            'langgraphState': safe_state,
             'status': status,
             'timestamp': timestamp,
+            **state_fields,
         }
+        if not self._run_state_tracker.delta_enabled:
+            # Legacy payload: frontends that predate delta mode read either key
+            params['langgraphState'] = safe_state
+
         try:
             # Clear, distinguishable backend log for IPC emission
-            try:
-                node_keys = list(langgraph_state.keys()) if isinstance(langgraph_state, dict) else []
-            except Exception:
-                node_keys = []
-            logger.info(f"[SIM][BE][IPC] sending update_skill_run_stat: agentTaskId={agent_task_id}, current_node={current_node}, status={status}, nodeState.keys={node_keys}")
+            if state_fields['stateMode'] == 'delta':
+                node_keys = [op['path'][1:] for op in state_fields['statePatch']]
+            else:
+                node_keys = list(safe_state.keys()) if isinstance(safe_state, dict) else []
+            logger.info(f"[SIM][BE][IPC] sending update_skill_run_stat: agentTaskId={agent_task_id}, current_node={current_node}, status={status}, mode={state_fields['stateMode']}, seq={state_fields['stateSeq']}, keys={node_keys}")
         except Exception:
             pass
-        self._send_request('update_skill_run_stat', params, callback=callback)
+
+        def on_response(response: APIResponse[bool]) -> None:
+            if not response.success:
+                # The frontend may have missed this update; resync with a full snapshot
+                self._run_state_tracker.invalidate(agent_task_id)
+            if callback:
+                callback(response)
+
+        self._send_request('update_skill_run_stat', params, callback=on_response)
+
+    def get_run_state_snapshot(self, agent_task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the last run state sent for a task (full snapshot).
+
+        Args:
+            agent_task_id: task ID
+
+        Returns:
+            dict: {agentTaskId, stateEpoch, stateSeq, nodeState} or None if nothing was sent
+        """
+        return self._run_state_tracker.snapshot(agent_task_id)
+
+    def reset_run_state(self, agent_task_id: Optional[str] = None) -> None:
+        """
+        Start a new run state history: the next update is a full snapshot of a
+        new stateEpoch, so the frontend replaces whatever it cached for the task.
+        Called when a run starts and ends (run IDs such as the dev run's are reused).
+
+        Args:
+            agent_task_id: task ID, or None for all tasks
+        """
+        self._run_state_tracker.reset(agent_task_id)
 
     def update_task_stat(
         self,
@@ -0,0 +1,312 @@
+"""
+Incremental run-state streaming for update_skill_run_stat
+
+Each node transition used to ship the full LangGraph state (twice, as
+nodeState and langgraphState). RunStateTracker remembers the last state
+sent per agentTaskId and encodes the next one as a JSON-patch style list of
+top-level changes:
+
+    {'stateMode': 'full',  'stateEpoch': 'a1b2c3d4e5f6', 'stateSeq': 7, 'nodeState': {...}}
+    {'stateMode': 'delta', 'stateEpoch': 'a1b2c3d4e5f6', 'stateSeq': 8, 'baseSeq': 7,
+     'statePatch': [{'op': 'replace', 'path': '/messages', 'value': [...]},
+                    {'op': 'remove', 'path': '/tmp'}]}
+
+stateSeq restarts at 1 whenever a run's history starts over (run start/end,
+cache eviction, app restart); stateEpoch changes with it, so the frontend
+drops what it cached for an older epoch instead of ignoring the "stale"
+sequence numbers. The frontend applies a delta only on top of the matching
+epoch and baseSeq; on a gap (page reload, lost message) it asks for a
+snapshot via 'get_skill_run_state', and a failed delivery makes the next
+update full.
+
+encode_state() takes the raw state and only converts (json_safe) and compares
+the top-level values whose objects changed since the previous update, so an
+update costs about as much as what changed rather than the whole state.
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Set ECAN_RUN_STAT_DELTA=0 to always send full snapshots (legacy payload)
+RUN_STAT_DELTA_ENABLED = os.environ.get("ECAN_RUN_STAT_DELTA", "1") != "0"
+
+# Runs whose last state is remembered (least recently updated are dropped)
+RUN_STATE_CACHE_SIZE = 64
+
+# Send a full snapshot instead of a delta when most keys changed anyway
+FULL_SNAPSHOT_CHANGE_RATIO = 0.8
+
+# Dict/list levels below a top-level value checked for in-place changes
+# (state["messages"].append(...), state["attributes"]["x"]["y"] = ...)
+FINGERPRINT_DEPTH = 3
+
+_END = object()
+
+
+def json_safe(value, depth=0):
+    """
+    Convert a LangGraph state value to JSON-safe data.
+
+    Dict keys become strings, sequences become lists, pydantic models and
+    plain objects are expanded, and anything else (or anything nested deeper
+    than 6 levels) falls back to str().
+    """
+    try:
+        # Prevent extremely deep recursion
+        if depth > 6:
+            return str(value)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, dict):
+            safe_dict = {}
+            for k, v in value.items():
+                # ensure keys are strings
+                key = str(k)
+                safe_dict[key] = json_safe(v, depth + 1)
+            return safe_dict
+        if isinstance(value, (list, tuple, set)):
+            return [json_safe(v, depth + 1) for v in value]
+        # objects with __dict__ (pydantic, dataclasses, etc.)
+        if hasattr(value, 'model_dump') and callable(getattr(value, 'model_dump')):
+            try:
+                return json_safe(value.model_dump(mode="python"), depth + 1)
+            except Exception:
+                pass
+        if hasattr(value, '__dict__'):
+            try:
+                return json_safe(vars(value), depth + 1)
+            except Exception:
+                pass
+        # Fallback to string representation
+        return str(value)
+    except Exception:
+        try:
+            return str(value)
+        except Exception:
+            return '<unserializable>'
+
+
+def _fingerprint(value: Any, depth: int = FINGERPRINT_DEPTH, tokens: Optional[list] = None) -> list:
+    """
+    Objects a state value is made of, down to `depth` levels of dict/list items.
+
+    Two fingerprints whose objects are identical (`is`) mean the value did not
+    change, not even in place. Holding the objects keeps their ids from being
+    reused by new ones.
+    """
+    if tokens is None:
+        tokens = []
+    tokens.append(value)
+    if depth > 0:
+        if isinstance(value, dict):
+            for k, v in value.items():
+                tokens.append(k)
+                _fingerprint(v, depth - 1, tokens)
+            tokens.append(_END)
+        elif isinstance(value, list):
+            for v in value:
+                _fingerprint(v, depth - 1, tokens)
+            tokens.append(_END)
+    return tokens
+
+
+def _same_objects(old: list, new: list) -> bool:
+    return len(old) == len(new) and all(a is b for a, b in zip(old, new))
+
+
+def _pointer(key: str) -> str:
+    """JSON pointer for a top-level key (RFC 6901 escaping)."""
+    return '/' + key.replace('~', '~0').replace('/', '~1')
+
+
+def diff_top_level(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Diff two JSON-safe states by top-level key.
+
+    Args:
+        old: Previously sent state
+        new: Current state
+
+    Returns:
+        list: JSON-patch style operations turning old into new
+    """
+    ops = []
+    for key, value in new.items():
+        if key not in old:
+            ops.append({'op': 'add', 'path': _pointer(key), 'value': value})
+        elif old[key] != value:
+            ops.append({'op': 'replace', 'path': _pointer(key), 'value': value})
+    for key in old:
+        if key not in new:
+            ops.append({'op': 'remove', 'path': _pointer(key)})
+    return ops
+
+
+class RunStateTracker:
+    """
+    Thread-safe per-run memory of the last state sent to the frontend.
+    """
+
+    def __init__(self, max_runs: int = RUN_STATE_CACHE_SIZE, delta_enabled: bool = RUN_STAT_DELTA_ENABLED):
+        self._runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_runs = max_runs
+        self.delta_enabled = delta_enabled
+
+    def encode(self, agent_task_id: str, safe_state: Any, force_full: bool = False) -> Dict[str, Any]:
+        """
+        Encode a JSON-safe state as a full snapshot or a delta.
+
+        Args:
+            agent_task_id: Run the state belongs to
+            safe_state: State already passed through json_safe
+            force_full: Send a full snapshot regardless of history
+
+        Returns:
+            dict: Payload fields (stateMode, stateSeq and nodeState or baseSeq/statePatch)
+        """
+        with self._lock:
+            entry = self._runs.get(agent_task_id)
+            old_state = entry['state'] if entry else None
+        ops = None
+        if old_state is not None and isinstance(safe_state, dict):
+            ops = diff_top_level(old_state, safe_state)
+        return self._commit(agent_task_id, entry, safe_state, ops, {}, force_full)
+
+    def encode_state(self, agent_task_id: str, state: Any, force_full: bool = False) -> Tuple[Dict[str, Any], Any]:
+        """
+        Encode a raw LangGraph state, converting only the top-level values that changed.
+
+        A value whose objects are the same as in the previous update (see
+        _fingerprint) reuses its previous json_safe result and is not compared.
+
+        Args:
+            agent_task_id: Run the state belongs to
+            state: State as passed to update_run_stat
+            force_full: Send a full snapshot regardless of history
+
+        Returns:
+            tuple: (payload fields as from encode(), JSON-safe state)
+        """
+        if not isinstance(state, dict):
+            safe_state = json_safe(state)
+            return self.encode(agent_task_id, safe_state, force_full=force_full), safe_state
+
+        with self._lock:
+            entry = self._runs.get(agent_task_id)
+            old_sources = entry['sources'] if entry else {}
+            old_state = entry['state'] if entry else None
+
+        safe_state: Dict[str, Any] = {}
+        sources: Dict[str, Tuple[list, Any]] = {}
+        changed = []
+        for key, value in state.items():
+            key = str(key)
+            tokens = _fingerprint(value)
+            previous = old_sources.get(key)
+            if previous is not None and _same_objects(previous[0], tokens):
+                safe_value = previous[1]
+            else:
+                safe_value = json_safe(value, 1)
+                changed.append(key)
+            sources[key] = (tokens, safe_value)
+            safe_state[key] = safe_value
+
+        ops = None
+        if old_state is not None:
+            ops = []
+            for key in changed:
+                if key not in old_state:
+                    ops.append({'op': 'add', 'path': _pointer(key), 'value': safe_state[key]})
+                elif old_state[key] != safe_state[key]:
+                    ops.append({'op': 'replace', 'path': _pointer(key), 'value': safe_state[key]})
+            for key in old_state:
+                if key not in safe_state:
+                    ops.append({'op': 'remove', 'path': _pointer(key)})
+        return self._commit(agent_task_id, entry, safe_state, ops, sources, force_full), safe_state
+
+    def _commit(self, agent_task_id: str, entry: Optional[Dict[str, Any]], safe_state: Any,
+                ops: Optional[List[Dict[str, Any]]], sources: Dict[str, Tuple[list, Any]],
+                force_full: bool) -> Dict[str, Any]:
+        """Record safe_state as sent and build its payload; ops is the diff against entry's state."""
+        with self._lock:
+            current = self._runs.get(agent_task_id)
+            if current is not entry:
+                # Another update of this run got in between; ops is against an older state
+                ops = None
+            seq = current['seq'] + 1 if current else 1
+            epoch = current['epoch'] if current else uuid.uuid4().hex[:12]
+
+            payload = None
+            if (
+                self.delta_enabled
+                and not force_full
+                and ops is not None
+                and current is not None
+                and current['state'] is not None
+                and isinstance(safe_state, dict)
+            ):
+                if len(ops) <= FULL_SNAPSHOT_CHANGE_RATIO * max(1, len(safe_state)):
+                    payload = {
+                        'stateMode': 'delta',
+                        'stateEpoch': epoch,
+                        'stateSeq': seq,
+                        'baseSeq': current['seq'],
+                        'statePatch': ops,
+                    }
+            if payload is None:
+                payload = {'stateMode': 'full', 'stateEpoch': epoch, 'stateSeq': seq, 'nodeState': safe_state}
+
+            self._runs[agent_task_id] = {
+                'epoch': epoch,
+                'seq': seq,
+                'state': safe_state if isinstance(safe_state, dict) else None,
+                'raw': safe_state,
+                'sources': sources,
+            }
+            self._runs.move_to_end(agent_task_id)
+            while len(self._runs) > self._max_runs:
+                self._runs.popitem(last=False)
+            return payload
+
+    def snapshot(self, agent_task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Last state sent for a run, for frontends that lost track.
+
+        Returns:
+            dict: {'agentTaskId', 'stateEpoch', 'stateSeq', 'nodeState'} or None if unknown
+        """
+        with self._lock:
+            entry = self._runs.get(agent_task_id)
+            if entry is None:
+                return None
+            return {'agentTaskId': agent_task_id, 'stateEpoch': entry['epoch'], 'stateSeq': entry['seq'],
+                    'nodeState': entry['raw']}
+
+    def invalidate(self, agent_task_id: Optional[str] = None):
+        """
+        Make the next update of a run (or of every run) a full snapshot.
+
+        Args:
+            agent_task_id: Run to reset; None resets all runs
+        """
+        with self._lock:
+            runs = self._runs.values() if agent_task_id is None else filter(None, [self._runs.get(agent_task_id)])
+            for entry in runs:
+                entry['state'] = None
+
+    def reset(self, agent_task_id: Optional[str] = None):
+        """
+        Forget a run (or every run): its next update starts a new epoch at seq 1.
+
+        Args:
+            agent_task_id: Run to forget; None forgets all runs
+        """
+        with self._lock:
+            if agent_task_id is None:
+                self._runs.clear()
+            else:
+                self._runs.pop(agent_task_id, None)
@@ -410,6 +410,8 @@ def handle_search_chats(request: IPCRequest, params: Optional[dict]) -> IPCRespo
         userId (str): User ID to filter chats
         searchText (str): Text to search in message content
         deep (bool): Whether to include messages in response
+        limit (int, optional): Maximum number of chats to return
+        offset (int, optional): Number of ranked chats to skip
     """
     try:
         logger.debug(f"search chats handler called with request: {request}")
@@ -423,7 +425,9 @@ def handle_search_chats(request: IPCRequest, params: Optional[dict]) -> IPCRespo
         result = db_chat_service.search_chats_by_message_content(
             userId=userId,
             searchText=searchText,
-            deep=deep
+            deep=deep,
+            limit=params.get('limit'),
+            offset=params.get('offset', 0)
         )
         return create_success_response(request, result)
     except Exception as e:
@@ -485,6 +485,35 @@ def handle_request_skill_state(request: IPCRequest, params: Optional[Any]) -> IP
             f"Error during getting current skill state: {str(e)}"
         )
 
+@IPCHandlerRegistry.handler('get_skill_run_state')
+def handle_get_skill_run_state(request: IPCRequest, params: Optional[Dict[str, Any]]) -> IPCResponse:
+    """Return the full run state last sent for an agentTaskId
+
+    Used by the frontend to resync when it receives a delta run-state update
+    it cannot apply (page reload, missed update).
+
+    Args:
+        request: IPC request object
+        params: {'agentTaskId': str}
+
+    Returns:
+        str: JSON formatted response message with agentTaskId, stateSeq and nodeState
+    """
+    try:
+        agent_task_id = (params or {}).get('agentTaskId')
+        if not agent_task_id:
+            return create_error_response(request, 'INVALID_PARAMS', 'agentTaskId is required')
+
+        from gui.ipc.api import IPCAPI  # lazy import to avoid circular import
+        snapshot = IPCAPI.get_instance().get_run_state_snapshot(agent_task_id)
+        if snapshot is None:
+            return create_error_response(request, 'RUN_STATE_NOT_FOUND', f"No run state for {agent_task_id}")
+        return create_success_response(request, snapshot)
+
+    except Exception as e:
+        logger.error(f"Error in get skill run state handler: {e} {traceback.format_exc()}")
+        return create_error_response(request, 'GET_SKILL_RUN_STATE_ERROR', str(e))
+
 @IPCHandlerRegistry.handler('inject_skill_state')
 def handle_inject_skill_state(request: IPCRequest, params: Optional[Any]) -> IPCResponse:
     """Handle get available test items request
@@ -615,6 +644,8 @@ def handle_setup_sim_step(request: IPCRequest, params: Optional[Dict[str, Any]])
         try:
             from gui.ipc.api import IPCAPI  # lazy import to avoid circular import
             ipc = IPCAPI.get_instance()
+            # A new simulation reuses the 'sim' ID: start a new state history
+            ipc.reset_run_state('sim')
             ipc.update_run_stat(
                 agent_task_id='sim',
                 current_node=_SIM_CURRENT_NODE_ID or '',
@@ -4,17 +4,27 @@
 """
 Log Viewer Window
 Displays real-time and historical log information from logger_helper
+
+Files are read through utils.log_index: the viewer only ever reads the lines
+on screen, level filters come from the level index and searches stream
+through the file in the background, so multi-GB logs open in bounded memory.
 """
 
 import os
+import re
 import sys
+from array import array
+from collections import OrderedDict
 from datetime import datetime
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QPushButton, QTextEdit, QLabel, QComboBox,
+                               QPushButton, QLabel, QComboBox,
                                QCheckBox, QFileDialog, QMessageBox,
-                               QProgressBar, QStatusBar, QLineEdit)
-from PySide6.QtCore import QThread, Signal, Qt, QEvent
-from PySide6.QtGui import QFont, QTextCursor, QAction, QSyntaxHighlighter, QTextCharFormat, QColor
+                               QProgressBar, QStatusBar, QLineEdit, QTableView,
+                               QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyle, QApplication)
+from PySide6.QtCore import (QThread, Signal, Qt, QEvent, QTimer, QAbstractListModel,
+                            QModelIndex, QRect)
+from PySide6.QtGui import QFont, QAction, QColor, QKeySequence, QPalette
+from utils.log_index import LogIndex, compile_pattern
 from utils.logger_helper import logger_helper as logger
 from config.constants import APP_NAME
 
@@ -63,6 +73,11 @@ class LogViewerMessages:
             'logs_saved': 'Logs saved to: {filename}',
             'error_save': 'Failed to save logs:\n{error}',
             'viewing_history': '📜 Viewing history - Auto-scroll paused (scroll to bottom to resume)',
+            'regex': 'Regex',
+            'indexing': 'Indexing {filename}... {percent}%',
+            'searching': 'Searching... {count} lines matching \'{term}\'',
+            'search_truncated': 'Showing the first {count} lines matching \'{term}\'',
+            'invalid_pattern': 'Invalid regular expression: {error}',
         },
         'zh-CN': {
             'window_title': '日志查看器',
@@ -102,6 +117,11 @@ class LogViewerMessages:
             'logs_saved': '日志已保存到: {filename}',
             'error_save': '保存日志失败:\n{error}',
             'viewing_history': '📜 查看历史记录 - 自动滚动已暂停（滚动到底部以恢复）',
+            'regex': '正则',
+            'indexing': '正在索引 {filename}... {percent}%',
+            'searching': '搜索中... 已找到 {count} 行匹配 \'{term}\'',
+            'search_truncated': '仅显示前 {count} 行匹配 \'{term}\'',
+            'invalid_pattern': '无效的正则表达式: {error}',
         }
     }
     
@@ -136,124 +156,273 @@ def _get_log_viewer_messages():
     return _log_viewer_messages
 
 
-class LogFileWatcher(QThread):
-    """Thread to watch log file changes and emit new content"""
-    new_content = Signal(str)
-    
-    def __init__(self, log_file_path):
+class LogIndexThread(QThread):
+    """Opens (or builds) the index of a log file, then tails it: only appended bytes are read"""
+    progress = Signal(int)  # percent of the file indexed while opening
+    ready = Signal()
+    changed = Signal(bool)  # True when the file was rotated/truncated and re-indexed
+    error = Signal(str)
+
+    POLL_MS = 500
+    LEVEL_STEP_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, log_index, tail=True):
         super().__init__()
-        self.log_file_path = log_file_path
-        self.last_position = 0
+        self.log_index = log_index
+        self.tail = tail
         self.running = True
-        
+
     def run(self):
-        """Monitor log file for new content"""
+        try:
+            self.log_index.open(progress=self._report_progress, should_stop=self._stopping)
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        if not self.running:
+            return
+        self.ready.emit()
+
         while self.running:
             try:
-                if os.path.exists(self.log_file_path):
-                    with open(self.log_file_path, 'r', encoding='utf-8', errors='replace') as f:
-                        f.seek(self.last_position)
-                        new_content = f.read()
-                        if new_content:
-                            self.new_content.emit(new_content)
-                            self.last_position = f.tell()
-                
-                self.msleep(1000)  # Check every second
+                # The level pass runs in steps so appended lines still show up while it catches up
+                levels_grew = False
+                if not self.log_index.levels_complete:
+                    self.log_index.build_levels(should_stop=self._stopping, max_bytes=self.LEVEL_STEP_BYTES)
+                    levels_grew = True
+                if self.tail:
+                    update = self.log_index.refresh()
+                    if update.reset or update.lines:
+                        self.changed.emit(update.reset)
+                        levels_grew = False
+                if levels_grew:
+                    self.changed.emit(False)
+                if self.log_index.levels_complete:
+                    self.msleep(self.POLL_MS)
             except Exception as e:
-                logger.error(f"Error reading log file: {e}")
+                logger.error(f"[LogViewer] Error reading log file: {e}")
                 self.msleep(5000)  # Wait longer on error
-    
+
+    def _stopping(self):
+        return not self.running
+
+    def _report_progress(self, done, total):
+        self.progress.emit(int(done * 100 / total) if total else 100)
+
     def stop(self):
-        """Stop the watcher thread"""
+        """Stop the thread and save the index"""
         self.running = False
         self.wait()
+        self.log_index.close()
 
 
-class FileReaderThread(QThread):
-    """Background file reader to avoid blocking UI when loading large logs"""
-    loaded = Signal(str)
-    error = Signal(str)
+class LogSearchThread(QThread):
+    """Scans the index for a pattern and streams matching line numbers in batches"""
+    found = Signal(int, list)  # search id, line numbers
+    done = Signal(int, int, bool)  # search id, next line to scan once the file grows, hit the limit
 
-    def __init__(self, file_path: str):
+    def __init__(self, search_id, log_index, pattern, level, start_line, limit):
         super().__init__()
-        self.file_path = file_path
+        self.search_id = search_id
+        self.log_index = log_index
+        self.pattern = pattern
+        self.level = level
+        self.start_line = start_line
+        self.limit = limit
 
     def run(self):
+        next_line, count = self.start_line, 0
         try:
-            with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            self.loaded.emit(content)
+            for hits, next_line in self.log_index.search(self.pattern, self.start_line, self.level,
+                                                         should_stop=self.isInterruptionRequested):
+                if hits:
+                    hits = hits[:self.limit - count]
+                    count += len(hits)
+                    self.found.emit(self.search_id, hits)
+                if count >= self.limit:
+                    break
         except Exception as e:
-            self.error.emit(str(e))
+            logger.error(f"[LogViewer] Error searching logs: {e}")
+        self.done.emit(self.search_id, next_line, count >= self.limit)
 
 
-class LogHighlighter(QSyntaxHighlighter):
-    """Simple syntax highlighter for log levels and timestamps"""
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.fmt_debug = QTextCharFormat()
-        self.fmt_debug.setForeground(QColor('#7aa2f7'))
+class LogLineModel(QAbstractListModel):
+    """Virtual list over a LogIndex: only the pages being shown are read from disk"""
+    PAGE_LINES = 256
+    MAX_PAGES = 64
 
-        self.fmt_info = QTextCharFormat()
-        self.fmt_info.setForeground(QColor('#9ece6a'))
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log_index = None
+        self.level = None
+        self.matches = None
+        self.floor = 0  # rows hidden by "Clear"
+        self._rows = 0
+        self._pages = OrderedDict()
+
+    def set_source(self, log_index, level=None, matches=None):
+        """Show all lines, the lines of one level, or the lines numbered in `matches`"""
+        self.beginResetModel()
+        self.log_index, self.level, self.matches = log_index, level, matches
+        self.floor = 0
+        self._pages.clear()
+        self._rows = self._available()
+        self.endResetModel()
+
+    def _available(self):
+        if self.log_index is None:
+            return 0
+        if self.matches is not None:
+            total = len(self.matches)
+        elif self.level:
+            total = self.log_index.level_count(self.level)
+        else:
+            total = self.log_index.line_count
+        return max(0, total - self.floor)
+
+    def sync(self):
+        """Pick up rows appended to the index or the match list; returns how many were added"""
+        rows = self._available()
+        if rows < self._rows:
+            self.beginResetModel()
+            self._pages.clear()
+            self._rows = rows
+            self.endResetModel()
+            return 0
+        if rows == self._rows:
+            return 0
+        # The last cached page may have been a partial one
+        self._pages.pop((self._rows - 1) // self.PAGE_LINES, None)
+        added = rows - self._rows
+        self.beginInsertRows(QModelIndex(), self._rows, rows - 1)
+        self._rows = rows
+        self.endInsertRows()
+        return added
+
+    def clear_rows(self):
+        """Hide the rows shown so far; rows added later still appear"""
+        self.beginResetModel()
+        self.floor += self._rows
+        self._rows = 0
+        self._pages.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        page_no, offset = divmod(index.row(), self.PAGE_LINES)
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self.fetch(page_no * self.PAGE_LINES, self.PAGE_LINES)
+            self._pages[page_no] = page
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page[offset] if offset < len(page) else ""
 
-        self.fmt_warning = QTextCharFormat()
-        self.fmt_warning.setForeground(QColor('#e0af68'))
+    def fetch(self, row, count):
+        """Text of rows [row, row + count), read from the index"""
+        if self.log_index is None:
+            return []
+        first = self.floor + row
+        if self.matches is not None:
+            return self.log_index.read_line_numbers(self.matches[first:first + count])
+        if self.level:
+            return [text for _, text in self.log_index.read_level_lines(self.level, first, count)]
+        return self.log_index.read_lines(first, count)
 
-        self.fmt_error = QTextCharFormat()
-        self.fmt_error.setForeground(QColor('#f7768e'))
 
-        self.fmt_critical = QTextCharFormat()
-        self.fmt_critical.setForeground(QColor('#ff5370'))
-        self.fmt_critical.setFontWeight(600)
+class LogLineDelegate(QStyledItemDelegate):
+    """Paints a log line with its timestamp and level token colored"""
+    MAX_PAINT_CHARS = 2000
 
-        self.fmt_timestamp = QTextCharFormat()
-        self.fmt_timestamp.setForeground(QColor('#6b7280'))
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.color_timestamp = QColor('#6b7280')
+        debug, info, warning = QColor('#7aa2f7'), QColor('#9ece6a'), QColor('#e0af68')
+        error, critical = QColor('#f7768e'), QColor('#ff5370')
+        self.level_tokens = (
+            (' - DEBUG - ', debug), (' DEBUG ', debug),
+            (' - INFO - ', info), (' INFO ', info),
+            (' - WARNING - ', warning), (' WARNING ', warning),
+            (' - ERROR - ', error), (' ERROR ', error),
+            (' - CRITICAL - ', critical), (' CRITICAL ', critical),
+        )
 
-    def highlightBlock(self, text: str):
-        # Timestamp like 2025-11-06 12:00:00,123 or [2025-11-06 12:00:00]
-        # Light, non-intrusive coloring
-        ts_positions = []
-        # Find patterns without regex overhead in Qt loop
+    def _segments(self, text):
+        # Timestamp like 2025-11-06 12:00:00,123; found without regex overhead in the paint loop
+        ts_end = 0
         if len(text) >= 19 and text[4] == '-' and text[7] == '-' and (' ' in text[:20]):
-            ts_positions.append((0, min(len(text), 23)))
-        for start, length in ts_positions:
-            self.setFormat(start, length, self.fmt_timestamp)
-
+            ts_end = min(len(text), 23)
+        segments = [(text[:ts_end], self.color_timestamp)]
         upper = text.upper()
-        # Color per-level tokens but do not alter content
-        for token, fmt in (
-            (' - DEBUG - ', self.fmt_debug),
-            (' DEBUG ', self.fmt_debug),
-            (' - INFO - ', self.fmt_info),
-            (' INFO ', self.fmt_info),
-            (' - WARNING - ', self.fmt_warning),
-            (' WARNING ', self.fmt_warning),
-            (' - ERROR - ', self.fmt_error),
-            (' ERROR ', self.fmt_error),
-            (' - CRITICAL - ', self.fmt_critical),
-            (' CRITICAL ', self.fmt_critical),
-        ):
-            idx = upper.find(token)
+        for token, color in self.level_tokens:
+            idx = upper.find(token, ts_end)
             if idx != -1:
-                self.setFormat(idx, len(token), fmt)
+                segments += [(text[ts_end:idx], None), (text[idx:idx + len(token)], color),
+                             (text[idx + len(token):], None)]
+                break
+        else:
+            segments.append((text[ts_end:], None))
+        return [(segment, color) for segment, color in segments if segment]
+
+    def paint(self, painter, option, index):
+        text = (index.data(Qt.DisplayRole) or "")[:self.MAX_PAINT_CHARS]
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        painter.setFont(option.font)
+        metrics = option.fontMetrics
+        default_color = option.palette.color(QPalette.Text)
+        x, right = option.rect.left() + 4, option.rect.right()
+        for segment, color in self._segments(text):
+            width = metrics.horizontalAdvance(segment)
+            painter.setPen(color or default_color)
+            painter.drawText(QRect(x, option.rect.top(), width + 1, option.rect.height()),
+                             Qt.AlignLeft | Qt.AlignVCenter | Qt.TextExpandTabs, segment)
+            x += width
+            if x > right:
+                break
+        painter.restore()
 
 
 class LogViewer(QMainWindow):
     """Log Viewer Window for displaying real-time and historical logs"""
-    
+
+    LINE_WIDTH_CHARS = 400  # one fixed-width column; wide enough for typical lines
+    MAX_SEARCH_RESULTS = 100000
+    MAX_COPY_LINES = 100000
+    SAVE_CHUNK_LINES = 10000
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"{APP_NAME} - {_get_log_viewer_messages().get('window_title')}")
         self.setGeometry(100, 100, 1000, 700)
         
         # Initialize variables
-        self.log_watcher = None
+        self.log_index = None
+        self.log_indexer = None
+        self.search_thread = None
         self.auto_scroll = True
         self.current_log_file = None
         self.user_is_scrolling = False  # Track if user is manually scrolling
         self.last_scroll_position = 0  # Track last scroll position
         self.programmatic_scroll = False  # Flag to ignore programmatic scrolls
+
+        # Search state: matches accumulate in a compact array as the scan streams them in
+        self._search_id = 0
+        self._search_pattern = None
+        self._search_term = ""
+        self._search_matches = None
+        self._search_next_line = 0
+        self._search_truncated = False
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)
+        self._search_timer.timeout.connect(self._apply_view)
         
         # Set up UI
         self._setup_ui()
@@ -277,6 +446,9 @@ class LogViewer(QMainWindow):
                 # Just mark that this is user-initiated
                 self._mark_user_interaction()
             elif event.type() == QEvent.KeyPress:
+                if event.matches(QKeySequence.Copy):
+                    self._copy_selection()
+                    return True
                 # Check for scroll-related keys
                 key = event.key()
                 if key in [Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown,
@@ -302,15 +474,29 @@ class LogViewer(QMainWindow):
         control_panel = self._create_control_panel()
         main_layout.addWidget(control_panel)
         
-        # Log display area
-        self.log_display = QTextEdit()
-        self.log_display.setReadOnly(True)
+        # Log display area: a virtual table, so only visible lines are ever read or painted.
+        # A one-column QTableView with fixed row height keeps layout O(1) in the line
+        # count; QListView lays out every row and takes seconds per million lines.
+        self.line_model = LogLineModel(self)
+        self.log_display = QTableView()
+        self.log_display.setModel(self.line_model)
         self.log_display.setFont(QFont("Consolas", 10))
+        self.log_display.setShowGrid(False)
+        self.log_display.horizontalHeader().hide()
+        self.log_display.verticalHeader().hide()
+        metrics = self.log_display.fontMetrics()
+        self.log_display.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.log_display.verticalHeader().setDefaultSectionSize(metrics.height() + 2)
+        self.log_display.horizontalHeader().setDefaultSectionSize(metrics.horizontalAdvance('x') * self.LINE_WIDTH_CHARS)
+        self.log_display.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.log_display.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.log_display.setEditTriggers(QAbstractItemView.NoEditTriggers)
         # Preserve original log layout: no line wrapping
-        self.log_display.setLineWrapMode(QTextEdit.NoWrap)
+        self.log_display.setWordWrap(False)
+        self.log_display.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
 
-        # Highlighter for colored levels
-        self.highlighter = LogHighlighter(self.log_display.document())
+        # Colored timestamps and levels
+        self.log_display.setItemDelegate(LogLineDelegate(self.log_display))
 
         # Install event filter to catch wheel events and key presses
         self.log_display.installEventFilter(self)
@@ -365,6 +551,10 @@ class LogViewer(QMainWindow):
         self.search_box.textChanged.connect(self._search_logs)
         layout.addWidget(self.search_box)
 
+        self.regex_checkbox = QCheckBox(_get_log_viewer_messages().get('regex'))
+        self.regex_checkbox.toggled.connect(self._toggle_regex)
+        layout.addWidget(self.regex_checkbox)
+
         # Clear button
         self.clear_btn = QPushButton(_get_log_viewer_messages().get('clear'))
         self.clear_btn.clicked.connect(self._clear_logs)
@@ -453,7 +643,7 @@ class LogViewer(QMainWindow):
                 background-color: #23272e;
                 color: #e5e7eb;
             }
-            QTextEdit {
+            QTableView {
                 background-color: #111317;
                 color: #e5e7eb;
                 border: 1px solid #374151;
@@ -545,20 +735,25 @@ class LogViewer(QMainWindow):
             self._set_status_message(_get_log_viewer_messages().get('error_loading'))
 
     def _load_log_file(self, file_path):
-        """Load and display log file content asynchronously"""
+        """Open the log file through its index and start following it"""
         try:
+            self._stop_search()
+            self._stop_indexer()
+
             self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(0)
 
-            # Stop previous loader if any
-            if hasattr(self, '_file_loader') and self._file_loader and self._file_loader.isRunning():
-                self._file_loader.requestInterruption()
-                self._file_loader.wait(100)
+            self.log_index = LogIndex(file_path)
+            # Lines become visible as the index covers them
+            self.line_model.set_source(self.log_index, level=self._current_level())
 
-            self._file_loader = FileReaderThread(file_path)
-            self._file_loader.loaded.connect(self._on_file_loaded)
-            self._file_loader.error.connect(self._on_file_load_error)
-            self._file_loader.start()
+            self.log_indexer = LogIndexThread(self.log_index, tail=self.realtime_checkbox.isChecked())
+            self.log_indexer.progress.connect(self._on_index_progress)
+            self.log_indexer.ready.connect(self._on_index_ready)
+            self.log_indexer.changed.connect(self._on_index_changed)
+            self.log_indexer.error.connect(self._on_file_load_error)
+            self.log_indexer.start()
 
         except Exception as e:
             logger.error(f"Error loading log file {file_path}: {e}")
@@ -566,36 +761,38 @@ class LogViewer(QMainWindow):
                               _get_log_viewer_messages().get('error_load_file', error=str(e)))
             self.progress_bar.setVisible(False)
 
-    def _on_file_loaded(self, content: str):
+    def _stop_indexer(self):
+        if self.log_indexer:
+            self.log_indexer.stop()
+            self.log_indexer = None
+
+    def _on_index_progress(self, percent):
+        self.progress_bar.setValue(percent)
+        if self.current_log_file:
+            self._set_status_message(_get_log_viewer_messages().get(
+                'indexing', filename=os.path.basename(self.current_log_file), percent=percent))
+        self._sync_rows()
+
+    def _on_index_ready(self):
         # Remember if user was viewing history before loading new content
         was_viewing_history = self.user_is_scrolling
-        
-        # Set programmatic scroll flag to ignore scroll events during text setting
-        self.programmatic_scroll = True
-        self.log_display.setPlainText(content)
-        self.programmatic_scroll = False
 
-        # Start real-time monitoring if enabled
-        if self.realtime_checkbox.isChecked() and self.current_log_file:
-            self._start_realtime_monitoring(self.current_log_file)
+        self._apply_view()
+        # A filter or search reports its own status
+        if self.current_log_file and not self._current_level() and self._search_pattern is None:
+            self._set_status_message(_get_log_viewer_messages().get('loaded', filename=os.path.basename(self.current_log_file)))
 
         # Only auto-scroll if:
         # 1. Auto-scroll checkbox is enabled
         # 2. User was NOT viewing history (was at bottom before load)
         # This prevents interrupting users who are reading historical logs
         if self.auto_scroll and not was_viewing_history:
-            # Use QTimer.singleShot to scroll after the text is fully rendered
-            from PySide6.QtCore import QTimer
+            # Use QTimer.singleShot to scroll after the rows are laid out
             QTimer.singleShot(0, self._scroll_to_bottom)
-        else:
-            # If user was viewing history, reset the flag since content changed
-            # but don't scroll - let them stay where they were (or at top)
-            if was_viewing_history:
-                # Keep the scroll position at top or preserve it
-                cursor = self.log_display.textCursor()
-                cursor.movePosition(QTextCursor.Start)
-                self.log_display.setTextCursor(cursor)
-                self.user_is_scrolling = False  # Reset since content changed
+        elif was_viewing_history:
+            # Content changed: start from the top instead of a stale position
+            self._scroll_to_top()
+            self.user_is_scrolling = False
 
         self.progress_bar.setVisible(False)
 
@@ -604,62 +801,125 @@ class LogViewer(QMainWindow):
                           _get_log_viewer_messages().get('error_load_file', error=err))
         self.progress_bar.setVisible(False)
 
-    def _start_realtime_monitoring(self, file_path):
-        """Start real-time monitoring of log file"""
-        if self.log_watcher:
-            self.log_watcher.stop()
-
-        self.log_watcher = LogFileWatcher(file_path)
-        self.log_watcher.new_content.connect(self._append_new_content)
-        self.log_watcher.start()
-
-        logger.debug(f"Started real-time monitoring for: {file_path}")
-
-    def _append_new_content(self, content):
-        """Append new content to the log display"""
-        if content.strip():
-            # Check if scroll bar is at bottom BEFORE adding new content
-            # Also check if user is actively viewing history
-            was_at_bottom = self._is_at_bottom()
-            user_viewing_history = self.user_is_scrolling or not was_at_bottom
-            
-            # Save current scroll position if user is viewing history
-            scrollbar = self.log_display.verticalScrollBar()
-            saved_scroll_position = scrollbar.value() if user_viewing_history else None
-
-            # Set programmatic scroll flag to prevent scroll events from affecting user_is_scrolling
-            self.programmatic_scroll = True
-            
-            # Insert content at the end
-            cursor = self.log_display.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.log_display.setTextCursor(cursor)
-            self.log_display.insertPlainText(content)
-            
-            # Restore scroll position if user was viewing history
-            if user_viewing_history and saved_scroll_position is not None:
-                # Restore the saved scroll position
-                scrollbar.setValue(saved_scroll_position)
-            elif self.auto_scroll and was_at_bottom:
-                # Only auto-scroll if:
-                # 1. Auto-scroll checkbox is enabled
-                # 2. Scroll bar was at bottom before new content was added
-                # This ensures we don't interrupt users who are reading historical logs
-                self._scroll_to_bottom()
-            
-            self.programmatic_scroll = False
+    def _on_index_changed(self, reset):
+        """New lines were indexed (or the file was rotated and re-indexed)"""
+        if reset:
+            self._apply_view()
+            return
+        self._sync_rows()
+        # Follow new lines with the active search
+        if (self._search_pattern is not None and self.search_thread is None
+                and not self._search_truncated and self._search_next_line < self.log_index.line_count):
+            self._run_search(self._search_next_line)
+
+    def _sync_rows(self, follow=True):
+        """Show rows appended to the model, keeping the view at the bottom if it was there"""
+        # Check if scroll bar is at bottom BEFORE adding new rows
+        # Also check if user is actively viewing history
+        was_at_bottom = self._is_at_bottom()
+        user_viewing_history = self.user_is_scrolling or not was_at_bottom
+
+        # Set programmatic scroll flag to prevent scroll events from affecting user_is_scrolling
+        self.programmatic_scroll = True
+        added = self.line_model.sync()
+        # Rows are appended below the viewport, so a user reading history keeps their position
+        if added and follow and self.auto_scroll and not user_viewing_history:
+            self.log_display.scrollToBottom()
+        self.programmatic_scroll = False
+
+    def _current_level(self):
+        level = self.level_filter.currentText()
+        if level == _get_log_viewer_messages().get('filter_all') or level == "All":
+            return None
+        return level
+
+    def _apply_view(self):
+        """Point the display at all lines, one level, or the results of the search box"""
+        if self.log_index is None:
+            return
+        self._stop_search()
+        level = self._current_level()
+        term = self.search_box.text().strip()
+        if not term:
+            self._search_pattern = None
+            self.line_model.set_source(self.log_index, level=level)
+            if level:
+                self._set_status_message(_get_log_viewer_messages().get(
+                    'showing_level', count=self.line_model.rowCount(), level=level))
+            else:
+                self._set_status_message(_get_log_viewer_messages().get('showing_all_levels'))
+            return
+
+        try:
+            pattern = compile_pattern(term, regex=self.regex_checkbox.isChecked())
+        except re.error as e:
+            self._search_pattern = None
+            self.line_model.set_source(self.log_index, matches=array("q"))
+            self._set_status_message(_get_log_viewer_messages().get('invalid_pattern', error=str(e)))
+            return
+        self._search_pattern, self._search_term = pattern, term
+        self._search_matches = array("q")
+        self._search_next_line = 0
+        self._search_truncated = False
+        self.line_model.set_source(self.log_index, matches=self._search_matches)
+        self._run_search(0)
+
+    def _run_search(self, start_line):
+        self._search_id += 1
+        self.search_thread = LogSearchThread(self._search_id, self.log_index, self._search_pattern,
+                                             self._current_level(), start_line,
+                                             self.MAX_SEARCH_RESULTS - len(self._search_matches))
+        self.search_thread.found.connect(self._on_search_found)
+        self.search_thread.done.connect(self._on_search_done)
+        self.search_thread.start()
+
+    def _stop_search(self):
+        self._search_timer.stop()
+        if self.search_thread:
+            self.search_thread.requestInterruption()
+            self.search_thread.wait()
+            self.search_thread = None
+        # Results still queued from the stopped thread are ignored
+        self._search_id += 1
+
+    def _on_search_found(self, search_id, hits):
+        if search_id != self._search_id:
+            return
+        self._search_matches.extend(hits)
+        # The first scan starts at the top; a scan of appended lines follows the bottom
+        self._sync_rows(follow=self.search_thread is not None and self.search_thread.start_line > 0)
+        self._set_status_message(_get_log_viewer_messages().get(
+            'searching', count=len(self._search_matches), term=self._search_term))
+
+    def _on_search_done(self, search_id, next_line, truncated):
+        if search_id != self._search_id:
+            return
+        self.search_thread = None
+        self._search_next_line = next_line
+        self._search_truncated = truncated
+        count = len(self._search_matches)
+        if truncated:
+            self._set_status_message(_get_log_viewer_messages().get('search_truncated', count=count, term=self._search_term))
+        elif count:
+            self._set_status_message(_get_log_viewer_messages().get('found_lines', count=count, term=self._search_term))
+        else:
+            self._set_status_message(_get_log_viewer_messages().get('no_lines_found', term=self._search_term))
 
     def _scroll_to_bottom(self):
         """Scroll to the bottom of the log display"""
-        scrollbar = self.log_display.verticalScrollBar()
         self.programmatic_scroll = True  # Mark as programmatic scroll
-        scrollbar.setValue(scrollbar.maximum())
+        self.log_display.scrollToBottom()
+        self.programmatic_scroll = False
+
+    def _scroll_to_top(self):
+        self.programmatic_scroll = True
+        self.log_display.scrollToTop()
         self.programmatic_scroll = False
 
     def _is_at_bottom(self):
         """Check if scroll bar is at or near the bottom"""
         scrollbar = self.log_display.verticalScrollBar()
-        return scrollbar.value() >= scrollbar.maximum() - 20  # 20 pixel tolerance
+        return scrollbar.value() >= scrollbar.maximum() - 1  # 1 row tolerance
 
     def _on_scroll_changed(self, value):
         """Handle scroll bar value changes"""
@@ -717,13 +977,13 @@ class LogViewer(QMainWindow):
 
     def _toggle_realtime_monitoring(self, enabled):
         """Toggle real-time monitoring on/off"""
+        if self.log_indexer:
+            self.log_indexer.tail = enabled
         if enabled and self.current_log_file:
-            self._start_realtime_monitoring(self.current_log_file)
+            if not self.log_indexer:
+                self._load_log_file(self.current_log_file)
             self._set_status_message(_get_log_viewer_messages().get('realtime_enabled'))
         else:
-            if self.log_watcher:
-                self.log_watcher.stop()
-                self.log_watcher = None
             self._set_status_message(_get_log_viewer_messages().get('realtime_disabled'))
 
     def _toggle_auto_scroll(self, enabled):
@@ -735,114 +995,35 @@ class LogViewer(QMainWindow):
             self._scroll_to_bottom()
 
     def _filter_logs(self, level):
-        """Filter logs by level"""
+        """Filter logs by level (served from the level index, no re-read of the file)"""
         try:
             if not self.current_log_file:
                 return
-
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)
-
-            def do_filter(content: str, level_text: str):
-                all_text = _get_log_viewer_messages().get('filter_all')
-                if level_text == all_text or level_text == "All":
-                    return content, _get_log_viewer_messages().get('showing_all_levels')
-                lines = content.split('\n')
-                filtered = [line for line in lines if (f" - {level_text} - " in line) or (level_text.upper() in line)]
-                return '\n'.join(filtered), _get_log_viewer_messages().get('showing_level', count=len(filtered), level=level_text)
-
-            # Reuse file loader thread to avoid blocking
-            loader = FileReaderThread(self.current_log_file)
-
-            def on_loaded(content: str):
-                # Remember if user was viewing history before filtering
-                was_viewing_history = self.user_is_scrolling
-                
-                filtered_content, msg = do_filter(content, level)
-                
-                # Set programmatic scroll flag to ignore scroll events during text setting
-                self.programmatic_scroll = True
-                self.log_display.setPlainText(filtered_content)
-                self.programmatic_scroll = False
-                
-                self._set_status_message(msg)
-                
-                # Only auto-scroll if:
-                # 1. Auto-scroll checkbox is enabled
-                # 2. User was NOT viewing history (was at bottom before filter)
-                # This prevents interrupting users who are reading historical logs
-                if self.auto_scroll and not was_viewing_history:
-                    from PySide6.QtCore import QTimer
-                    QTimer.singleShot(0, self._scroll_to_bottom)
-                else:
-                    # If user was viewing history, reset the flag since content changed
-                    # but don't scroll - let them stay at top
-                    if was_viewing_history:
-                        cursor = self.log_display.textCursor()
-                        cursor.movePosition(QTextCursor.Start)
-                        self.log_display.setTextCursor(cursor)
-                        self.user_is_scrolling = False  # Reset since content changed
-                
-                self.progress_bar.setVisible(False)
-
-            def on_error(err: str):
-                logger.error(f"Error filtering logs: {err}")
-                self._set_status_message(_get_log_viewer_messages().get('error_filtering'))
-                self.progress_bar.setVisible(False)
-
-            loader.loaded.connect(on_loaded)
-            loader.error.connect(on_error)
-            loader.start()
-
-            self._filter_loader = loader
+            was_viewing_history = self.user_is_scrolling
+            self._apply_view()
+            # Only auto-scroll if the user was NOT viewing history before the filter changed
+            if self.auto_scroll and not was_viewing_history:
+                QTimer.singleShot(0, self._scroll_to_bottom)
+            elif was_viewing_history:
+                self._scroll_to_top()
+                self.user_is_scrolling = False  # Reset since content changed
 
         except Exception as e:
             logger.error(f"Error filtering logs: {e}")
             self._set_status_message(_get_log_viewer_messages().get('error_filtering'))
 
     def _search_logs(self, search_term):
-        """Search for specific text in logs"""
-        if not search_term.strip():
-            # If search is empty, reload original content
-            if self.current_log_file:
-                self._load_log_file(self.current_log_file)
-            return
-
+        """Search for specific text in logs (debounced; the scan runs in the background)"""
         try:
-            # Get current content
-            current_content = self.log_display.toPlainText()
-
-            if not current_content:
-                return
-
-            # Split into lines and search
-            lines = current_content.split('\n')
-            matching_lines = []
-
-            search_term_lower = search_term.lower()
-
-            for line in lines:
-                if search_term_lower in line.lower():
-                    matching_lines.append(line)
-
-            # Display matching lines
-            if matching_lines:
-                filtered_content = '\n'.join(matching_lines)
-                self.log_display.setPlainText(filtered_content)
-                self._set_status_message(_get_log_viewer_messages().get('found_lines', count=len(matching_lines), term=search_term))
-            else:
-                self.log_display.setPlainText("")
-                self._set_status_message(_get_log_viewer_messages().get('no_lines_found', term=search_term))
-
-            # Auto-scroll to top for search results
-            cursor = self.log_display.textCursor()
-            cursor.movePosition(QTextCursor.Start)
-            self.log_display.setTextCursor(cursor)
-
+            self._search_timer.start()
         except Exception as e:
             logger.error(f"Error searching logs: {e}")
             self._set_status_message(_get_log_viewer_messages().get('error_searching'))
 
+    def _toggle_regex(self, enabled):
+        if self.search_box.text().strip():
+            self._apply_view()
+
     def _refresh_logs(self):
         """Refresh the log display"""
         if self.current_log_file:
@@ -852,8 +1033,8 @@ class LogViewer(QMainWindow):
             self._load_current_log_file()
 
     def _clear_logs(self):
-        """Clear the log display"""
-        self.log_display.clear()
+        """Clear the log display; lines logged from now on still appear"""
+        self.line_model.clear_rows()
         self._set_status_message(_get_log_viewer_messages().get('display_cleared'))
 
     def _open_log_file(self):
@@ -870,7 +1051,7 @@ class LogViewer(QMainWindow):
             self._load_log_file(file_path)
 
     def _save_logs(self):
-        """Save current log content to a file"""
+        """Save the lines currently shown (all, filtered or search results) to a file"""
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             _get_log_viewer_messages().get('save_logs_title'),
@@ -881,7 +1062,9 @@ class LogViewer(QMainWindow):
         if file_path:
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.log_display.toPlainText())
+                    rows = self.line_model.rowCount()
+                    for start in range(0, rows, self.SAVE_CHUNK_LINES):
+                        f.write("".join(line + "\n" for line in self.line_model.fetch(start, self.SAVE_CHUNK_LINES)))
                 self._set_status_message(_get_log_viewer_messages().get('logs_saved', filename=os.path.basename(file_path)))
                 logger.info(f"Logs saved to: {file_path}")
             except Exception as e:
@@ -889,9 +1072,21 @@ class LogViewer(QMainWindow):
                 QMessageBox.warning(self, _get_log_viewer_messages().get('error_title'), 
                                   _get_log_viewer_messages().get('error_save', error=str(e)))
 
+    def _copy_selection(self):
+        """Copy the selected lines to the clipboard"""
+        ranges = sorted((r.top(), r.bottom()) for r in self.log_display.selectionModel().selection())
+        lines = []
+        for top, bottom in ranges:
+            count = min(bottom - top + 1, self.MAX_COPY_LINES - len(lines))
+            if count <= 0:
+                break
+            lines += self.line_model.fetch(top, count)
+        if lines:
+            QApplication.clipboard().setText("\n".join(lines))
+
     def closeEvent(self, event):
         """Handle window close event"""
-        if self.log_watcher:
-            self.log_watcher.stop()
+        self._stop_search()
+        self._stop_indexer()
         logger.info("Log Viewer window closed")
         event.accept()
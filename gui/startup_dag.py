@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dependency-aware startup phase runner for MainWindow
+Starts every phase as soon as its dependencies have finished so independent
+work overlaps, and records per-phase timings for progress reporting
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from utils.logger_helper import logger_helper as logger
+
+
+class StartupDAG:
+    """Run named async phases with dependencies between them
+
+    A phase that fails does not cancel its dependents: the failure is logged and
+    recorded, and dependents still run (each phase is expected to degrade
+    gracefully on missing inputs, as the startup code always has). Phases can
+    also await another phase's result part-way through via ``result(name)``,
+    for work that only needs a dependency for its last step.
+
+    Phases marked ``background`` are started like any other but ``run()`` does
+    not wait for them; their timings are filled in when they finish.
+    """
+
+    def __init__(self, name: str = "startup"):
+        self.name = name
+        self._phases: Dict[str, dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._timings: Dict[str, dict] = {}
+        self._start_time: Optional[float] = None
+
+    def add_phase(self, name: str, func: Callable[[], Awaitable[Any]],
+                  deps: Iterable[str] = (), background: bool = False) -> None:
+        """Register a phase; ``func`` is called with no arguments once ``deps`` are done"""
+        if name in self._phases:
+            raise ValueError(f"Duplicate startup phase: {name}")
+        self._phases[name] = {'func': func, 'deps': tuple(deps), 'background': background}
+        self._timings[name] = {'status': 'pending', 'deps': list(deps)}
+
+    def result(self, name: str) -> "asyncio.Task":
+        """Awaitable for a phase's result (only valid once run() has started)"""
+        return self._tasks[name]
+
+    def get_timings(self) -> Dict[str, dict]:
+        """Snapshot of per-phase status and timings (seconds, relative to run start)"""
+        return {name: dict(timing) for name, timing in self._timings.items()}
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all phases; returns {name: result or exception} for the foreground phases"""
+        self._check_graph()
+        self._start_time = time.time()
+
+        # Create every task up front so result() works from inside any phase
+        for name in self._phases:
+            self._tasks[name] = asyncio.create_task(self._run_phase(name))
+            if self._phases[name]['background']:
+                # Already logged in _run_phase; mark the exception as retrieved
+                self._tasks[name].add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        foreground = [name for name, phase in self._phases.items() if not phase['background']]
+        results = await asyncio.gather(*(self._tasks[name] for name in foreground), return_exceptions=True)
+
+        total = time.time() - self._start_time
+        logger.info(f"[StartupDAG] ✅ {self.name}: {len(foreground)} phases completed in {total:.3f}s")
+        for name in foreground:
+            timing = self._timings[name]
+            logger.info(f"[StartupDAG]    - {name}: {timing['status']} "
+                        f"(waited {timing.get('waited', 0.0):.3f}s, ran {timing.get('duration', 0.0):.3f}s)")
+        return dict(zip(foreground, results))
+
+    async def _run_phase(self, name: str) -> Any:
+        phase = self._phases[name]
+        timing = self._timings[name]
+
+        if phase['deps']:
+            # Failed dependencies are recorded on their own phase; keep going
+            await asyncio.gather(*(self._tasks[dep] for dep in phase['deps']), return_exceptions=True)
+
+        started = time.time()
+        timing['status'] = 'running'
+        timing['waited'] = started - self._start_time
+        timing['started'] = started - self._start_time
+        try:
+            result = await phase['func']()
+            timing['status'] = 'done'
+            return result
+        except Exception as e:
+            timing['status'] = 'failed'
+            timing['error'] = str(e)
+            logger.error(f"[StartupDAG] ❌ Phase '{name}' failed: {e}")
+            raise
+        finally:
+            finished = time.time()
+            timing['finished'] = finished - self._start_time
+            timing['duration'] = finished - started
+
+    def _check_graph(self) -> None:
+        for name, phase in self._phases.items():
+            for dep in phase['deps']:
+                if dep not in self._phases:
+                    raise ValueError(f"Startup phase '{name}' depends on unknown phase '{dep}'")
+
+        # Reject cycles, which would otherwise deadlock run()
+        visiting: List[str] = []
+        done = set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                cycle = visiting[visiting.index(name):] + [name]
+                raise ValueError(f"Startup phase cycle: {' -> '.join(cycle)}")
+            visiting.append(name)
+            for dep in self._phases[name]['deps']:
+                visit(dep)
+            visiting.pop()
+            done.add(name)
+
+        for name in self._phases:
+            visit(name)
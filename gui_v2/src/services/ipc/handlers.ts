@@ -21,6 +21,7 @@ import { useAvatarSceneStore } from '../../stores/avatarSceneStore';
 import { useRuntimeStateStore } from '@/modules/skill-editor/stores/runtime-state-store';
 import { logger } from '@/utils/logger';
 import { handleSendAllContexts, handleUpdateContexts } from './contextHandlers';
+import { resolveRunState, type RunStateParams } from './runStateDelta';
 
 import { handleOnboardingRequest, type OnboardingContext } from '../onboarding/onboardingService';
 import { avatarSceneOrchestrator } from '../avatarSceneOrchestrator';
@@ -351,7 +352,9 @@ export class IPCHandlers {
     }
 
     async updateSkillRunStat(request: IPCRequest): Promise<{ success: boolean }> {
-        const { agentTaskId, current_node, status, nodeState, timestamp } = request.params as { agentTaskId?: string, current_node?: string, status?: string, nodeState?: any, timestamp?: number };
+        const { agentTaskId, current_node, status, timestamp } = request.params as { agentTaskId?: string, current_node?: string, status?: string, timestamp?: number };
+        // Backend may send only the changed keys; rebuild the full state
+        const nodeState = await resolveRunState(request.params as RunStateParams);
 
         // Derive node id from nodeState when current_node is empty
         const thisNodeFromState =
@@ -368,7 +371,6 @@ export class IPCHandlers {
         // Derive thread id (prefer nodeState, fallback to langgraphState)
         const threadId =
           nodeState?.attributes?.thread_id ||
-          (request.params as any)?.langgraphState?.attributes?.thread_id ||
           undefined;
 
         // Verbose trace toggle (enable with: window.__RUN_TRACE__ = true)
@@ -762,7 +764,7 @@ export class IPCHandlers {
           logger.warn('updateSkillRunStat: failed to capture runtime state', e as any);
         }
 
-        eventBus.emit('chat:latestSkillRunStat', request.params);
+        eventBus.emit('chat:latestSkillRunStat', { ...(request.params as any), nodeState, langgraphState: nodeState });
         return { success: true };
     }
 
@@ -0,0 +1,127 @@
+/**
+ * Run-state delta decoding for update_skill_run_stat
+ *
+ * The backend sends the LangGraph state of a run either as a full snapshot
+ * (stateMode 'full') or as a JSON-patch style list of top-level changes on
+ * top of the previous update (stateMode 'delta', see gui/ipc/run_state_delta.py).
+ * This module keeps the last reconstructed state per agentTaskId and
+ * resyncs from 'get_skill_run_state' when a delta cannot be applied.
+ * stateSeq restarts whenever the backend starts a new history for a run
+ * (new run, cache eviction, app restart); stateEpoch tells those apart.
+ */
+import { get_ipc_api } from '../ipc_api';
+import { logger } from '@/utils/logger';
+
+export interface RunStatePatchOp {
+  op: 'add' | 'replace' | 'remove';
+  path: string;
+  value?: any;
+}
+
+export interface RunStateParams {
+  agentTaskId?: string;
+  stateMode?: 'full' | 'delta';
+  stateEpoch?: string;
+  stateSeq?: number;
+  baseSeq?: number;
+  statePatch?: RunStatePatchOp[];
+  nodeState?: any;
+  langgraphState?: any;
+}
+
+interface CachedRunState {
+  epoch?: string;
+  seq: number;
+  state: any;
+}
+
+// Runs remembered at once (oldest dropped first)
+const MAX_CACHED_RUNS = 64;
+
+const runStates = new Map<string, CachedRunState>();
+
+const remember = (agentTaskId: string, epoch: string | undefined, seq: number, state: any) => {
+  runStates.delete(agentTaskId);
+  runStates.set(agentTaskId, { epoch, seq, state });
+  while (runStates.size > MAX_CACHED_RUNS) {
+    const oldest = runStates.keys().next().value;
+    if (oldest === undefined) break;
+    runStates.delete(oldest);
+  }
+};
+
+const keyFromPointer = (path: string): string =>
+  path.slice(1).replace(/~1/g, '/').replace(/~0/g, '~');
+
+export function applyRunStatePatch(state: any, ops: RunStatePatchOp[]): any {
+  const next: Record<string, any> = { ...(state && typeof state === 'object' ? state : {}) };
+  for (const op of ops || []) {
+    const key = keyFromPointer(op.path);
+    if (op.op === 'remove') {
+      delete next[key];
+    } else {
+      next[key] = op.value;
+    }
+  }
+  return next;
+}
+
+async function fetchSnapshot(agentTaskId: string): Promise<any> {
+  const response = await get_ipc_api().executeRequest<{ stateEpoch?: string; stateSeq: number; nodeState: any }>(
+    'get_skill_run_state',
+    { agentTaskId },
+  );
+  if (!response?.success || !response.data) {
+    throw new Error(`run state snapshot unavailable for ${agentTaskId}: ${response?.error?.message ?? 'unknown error'}`);
+  }
+  const { stateEpoch, stateSeq, nodeState } = response.data;
+  const cached = runStates.get(agentTaskId);
+  // A newer update of the same history may have arrived while the snapshot was in flight
+  if (!cached || cached.epoch !== stateEpoch || cached.seq < stateSeq) {
+    remember(agentTaskId, stateEpoch, stateSeq, nodeState);
+  }
+  return runStates.get(agentTaskId)?.state;
+}
+
+/**
+ * Resolve the full run state carried (or implied) by an update.
+ * Throws when the state cannot be reconstructed so the backend answers
+ * with a full snapshot next time.
+ */
+export async function resolveRunState(params: RunStateParams): Promise<any> {
+  const { agentTaskId, stateMode, stateEpoch, stateSeq } = params;
+
+  // Legacy payload without delta support
+  if (!stateMode) return params.nodeState ?? params.langgraphState;
+
+  if (!agentTaskId || typeof stateSeq !== 'number') {
+    return params.nodeState;
+  }
+
+  // A different epoch means the backend started over: whatever is cached is obsolete
+  const cached = runStates.get(agentTaskId);
+  const current = cached && cached.epoch === stateEpoch ? cached : undefined;
+  if (current && stateSeq <= current.seq) {
+    // Stale or duplicate update; keep the newer state
+    return current.state;
+  }
+
+  if (stateMode === 'full') {
+    remember(agentTaskId, stateEpoch, stateSeq, params.nodeState);
+    return params.nodeState;
+  }
+
+  if (current && current.seq === params.baseSeq) {
+    const next = applyRunStatePatch(current.state, params.statePatch || []);
+    remember(agentTaskId, stateEpoch, stateSeq, next);
+    return next;
+  }
+
+  logger.debug(`[RunState] gap for ${agentTaskId}: have seq=${cached?.seq ?? 'none'}, base=${params.baseSeq}; fetching snapshot`);
+  return fetchSnapshot(agentTaskId);
+}
+
+export function clearRunState(agentTaskId?: string): void {
+  if (agentTaskId) runStates.delete(agentTaskId);
+  else runStates.clear();
+}
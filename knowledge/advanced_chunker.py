@@ -8,14 +8,28 @@ Supports multiple table formats:
 - Excel (via Markdown conversion)
 
 Provides intelligent chunking with metadata support.
+
+Table rows are not tokenized one by one: row sizes are estimated from their
+length with a calibrated tokens-per-char ratio, rows are packed over prefix
+sums of the estimates, and each chunk is encoded once to verify it fits.
 """
 
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import re
 import json
 from utils.logger_helper import logger_helper as logger
 
 
+# Rows tokenized exactly to calibrate the tokens-per-char estimate
+CALIBRATION_SAMPLE_ROWS = 64
+
+# Share of the token budget chunks are packed to by estimate; the margin keeps
+# re-packing after the exact check rare
+ESTIMATE_FILL_RATIO = 0.95
+
+
 class UniversalTableChunker:
     """Universal table chunker supporting multiple formats"""
     
@@ -31,6 +45,8 @@ class UniversalTableChunker:
         self.tokenizer = tokenizer
         self.chunk_token_size = chunk_token_size
         self.chunk_overlap_token_size = chunk_overlap_token_size
+        # True when the last chunk() result carries exact token counts of its content
+        self.exact_token_counts = False
         # Import here to avoid circular dependency
         try:
             from knowledge.lightrag_launcher import get_stop_controller
@@ -45,6 +61,70 @@ class UniversalTableChunker:
             logger.info("[TableChunker] 🛑 Stop requested, aborting chunking operation")
             raise InterruptedError("Chunking operation cancelled by user")
     
+    def _calibrate(self, rows: List[str]) -> Tuple[int, int]:
+        """Exact token and char counts of up to CALIBRATION_SAMPLE_ROWS rows spread over the table."""
+        step = max(1, len(rows) // CALIBRATION_SAMPLE_ROWS)
+        sample = rows[::step][:CALIBRATION_SAMPLE_ROWS]
+        tokens = sum(len(self.tokenizer.encode(row)) for row in sample)
+        chars = sum(len(row) + 1 for row in sample)
+        return tokens, chars
+    
+    def _pack_rows(
+        self,
+        rows: List[str],
+        render: Callable[[int, int, int], str],
+        limit: int,
+        first_overhead: int,
+        overhead: int,
+    ) -> List[Tuple[str, int, int, int]]:
+        """
+        Pack consecutive rows into chunks whose exact token count fits the limit.
+        
+        Row sizes are estimated from their length (tokens-per-char ratio from
+        a sample of rows, refined with every verified chunk) and chunk ends are
+        found by binary search over the prefix sums of the estimates. Each
+        chunk is then encoded once; if it overflows, rows move to the next
+        chunk. A single row larger than the limit becomes its own chunk.
+        
+        Args:
+            rows: Row texts
+            render: render(start, end, chunk_number) -> chunk content for rows[start:end]
+            limit: Maximum tokens of a rendered chunk
+            first_overhead: Tokens of the first chunk's header
+            overhead: Tokens of the header of later chunks
+            
+        Returns:
+            List of (content, tokens, start, end) with end exclusive
+        """
+        packed: List[Tuple[str, int, int, int]] = []
+        if not rows:
+            return packed
+        
+        prefix = list(accumulate((len(row) + 1 for row in rows), initial=0))
+        sample_tokens, sample_chars = self._calibrate(rows)
+        start = 0
+        while start < len(rows):
+            self._check_stop()
+            chars_per_token = max(1, sample_chars) / max(1, sample_tokens)
+            header = overhead if packed else first_overhead
+            room = max(0, limit - header) * ESTIMATE_FILL_RATIO * chars_per_token
+            end = max(start + 1, bisect_right(prefix, prefix[start] + room, lo=start + 1) - 1)
+            while True:
+                content = render(start, end, len(packed))
+                tokens = len(self.tokenizer.encode(content))
+                if tokens <= limit or end - start == 1:
+                    break
+                # Shed the overflow plus the fill margin from the end of the chunk
+                excess = (tokens - limit * ESTIMATE_FILL_RATIO) * chars_per_token
+                end = max(start + 1, min(end - 1, bisect_right(prefix, prefix[end] - excess, lo=start + 1) - 1))
+            packed.append((content, tokens, start, end))
+            sample_tokens += max(0, tokens - header)
+            sample_chars += prefix[end] - prefix[start]
+            start = end
+        
+        self.exact_token_counts = True
+        return packed
+    
     def chunk(self, content: str) -> List[Dict[str, Any]]:
         """
         Intelligently detect content type and chunk accordingly
@@ -56,6 +136,7 @@ class UniversalTableChunker:
             List of chunk dictionaries with keys: tokens, content, chunk_order_index
         """
         self._check_stop()
+        self.exact_token_counts = False
         
         # Detect content type and chunk accordingly
         if self._is_markdown_table(content):
@@ -226,39 +307,18 @@ class UniversalTableChunker:
             logger.info(f"[TableChunker] Header too long ({header_tokens} tokens), using simplified chunking without header repetition")
             return self._chunk_table_without_header_repeat(header_lines, data_lines)
         
-        # Chunk by rows
-        chunks = []
-        current_lines = []
-        current_tokens = 0
-        chunk_index = 0
-        
-        for line in data_lines:
-            self._check_stop()
-            line_tokens = len(self.tokenizer.encode(line))
-            
-            # If adding this line exceeds limit and we have content, create a chunk
-            if current_tokens + line_tokens > max_data_tokens and current_lines:
-                chunk_content = header_text + '\n' + '\n'.join(current_lines)
-                chunks.append({
-                    'tokens': header_tokens + current_tokens,
-                    'content': chunk_content.strip(),
-                    'chunk_order_index': chunk_index,
-                })
-                chunk_index += 1
-                current_lines = []
-                current_tokens = 0
-            
-            current_lines.append(line)
-            current_tokens += line_tokens
-        
-        # Last chunk
-        if current_lines:
-            chunk_content = header_text + '\n' + '\n'.join(current_lines)
-            chunks.append({
-                'tokens': header_tokens + current_tokens,
-                'content': chunk_content.strip(),
-                'chunk_order_index': chunk_index,
-            })
+        # Chunk by rows; header + rows stay within chunk_token_size - 10
+        packed = self._pack_rows(
+            data_lines,
+            lambda start, end, _: (header_text + '\n' + '\n'.join(data_lines[start:end])).strip(),
+            limit=self.chunk_token_size - 10,
+            first_overhead=header_tokens,
+            overhead=header_tokens,
+        )
+        chunks = [
+            {'tokens': tokens, 'content': chunk_content, 'chunk_order_index': chunk_index}
+            for chunk_index, (chunk_content, tokens, _, _) in enumerate(packed)
+        ]
         
         logger.info(f"[TableChunker] ✅ Generated {len(chunks)} chunks from Markdown table ({len(data_lines)} data rows)")
         return chunks if chunks else self._chunk_plain_text(content)
@@ -282,52 +342,31 @@ class UniversalTableChunker:
         if not table_title:
             table_title = "## Table Data"
         
-        # First chunk: include full header + as much data as fits
         header_text = '\n'.join(header_lines)
         header_tokens = len(self.tokenizer.encode(header_text))
-        
-        current_lines = []
-        current_tokens = header_tokens
-        first_chunk = True
-        start_row = 1
-        
-        for row_idx, line in enumerate(data_lines):
-            self._check_stop()
-            line_tokens = len(self.tokenizer.encode(line))
-            
-            if current_tokens + line_tokens > self.chunk_token_size - 20:
-                # Create chunk
-                if first_chunk:
-                    chunk_content = header_text + '\n' + '\n'.join(current_lines)
-                    first_chunk = False
-                else:
-                    chunk_content = f"{table_title} (Rows {start_row}-{start_row + len(current_lines) - 1})\n\n" + '\n'.join(current_lines)
-                
-                chunks.append({
-                    'tokens': current_tokens,
-                    'content': chunk_content.strip(),
-                    'chunk_order_index': chunk_index,
-                })
-                chunk_index += 1
-                start_row = row_idx + 1
-                current_lines = []
-                current_tokens = len(self.tokenizer.encode(f"{table_title} (Rows)"))
-            
-            current_lines.append(line)
-            current_tokens += line_tokens
-        
-        # Last chunk
-        if current_lines:
-            if first_chunk:
-                chunk_content = header_text + '\n' + '\n'.join(current_lines)
-            else:
-                chunk_content = f"{table_title} (Rows {start_row}-{start_row + len(current_lines) - 1})\n\n" + '\n'.join(current_lines)
-            
+        title_tokens = len(self.tokenizer.encode(f"{table_title} (Rows)"))
+        
+        def render(start: int, end: int, chunk_number: int) -> str:
+            rows_text = '\n'.join(data_lines[start:end])
+            if chunk_number == 0:
+                # First chunk: include full header + as much data as fits
+                return (header_text + '\n' + rows_text).strip()
+            return (f"{table_title} (Rows {start + 1}-{end})\n\n" + rows_text).strip()
+        
+        packed = self._pack_rows(
+            data_lines,
+            render,
+            limit=self.chunk_token_size - 20,
+            first_overhead=header_tokens,
+            overhead=title_tokens,
+        )
+        for chunk_content, tokens, _, _ in packed:
             chunks.append({
-                'tokens': current_tokens,
-                'content': chunk_content.strip(),
+                'tokens': tokens,
+                'content': chunk_content,
                 'chunk_order_index': chunk_index,
             })
+            chunk_index += 1
         
         logger.info(f"[TableChunker] ✅ Generated {len(chunks)} chunks (no header repeat, {len(data_lines)} data rows)")
         return chunks
@@ -532,7 +571,6 @@ class UniversalTableChunker:
         Converts to Markdown and chunks by rows.
         """
         chunks = []
-        current_lines = []
         
         # Prepare Header
         title = f"## Sheet: {sheet_name} {title_suffix}".strip()
@@ -545,46 +583,25 @@ class UniversalTableChunker:
         header_text = '\n'.join(md_header_lines)
         header_tokens = len(self.tokenizer.encode(header_text))
         
-        current_lines = []
-        current_tokens = header_tokens
-        chunk_idx = start_index
+        # Sanitize cells (remove newlines to keep MD format)
+        rows_md = ["| " + " | ".join(str(c).replace('\n', ' ') for c in row) + " |" for row in data_rows]
         
-        for row in data_rows:
-            self._check_stop()
-            # Sanitize cells (remove newlines to keep MD format)
-            clean_row = [str(c).replace('\n', ' ') for c in row]
-            row_md = "| " + " | ".join(clean_row) + " |"
-            row_tokens = len(self.tokenizer.encode(row_md))
-            
-            # Check limits
-            if current_tokens + row_tokens > self.chunk_token_size - 20:
-                if current_lines:
-                    # Flush current chunk
-                    chunks.append({
-                        'tokens': current_tokens,
-                        'content': header_text + '\n' + '\n'.join(current_lines),
-                        'chunk_order_index': chunk_idx
-                    })
-                    chunk_idx += 1
-                    current_lines = []
-                    current_tokens = header_tokens
-            
+        limit = self.chunk_token_size - 20
+        render = lambda start, end, _: header_text + '\n' + '\n'.join(rows_md[start:end])
+        packed = self._pack_rows(rows_md, render, limit=limit, first_overhead=header_tokens, overhead=header_tokens)
+        
+        for offset, (chunk_content, tokens, start, end) in enumerate(packed):
             # If a single row is massive (still > chunk_size after width-check?), truncate/split it
             # This handles the rare "single cell huge text" case
-            if row_tokens > self.chunk_token_size - header_tokens - 20:
-                 # Truncate for now (or could split further, but let's be safe)
-                 row_md = row_md[:(self.chunk_token_size - header_tokens - 50) * 4] + "..."
-                 row_tokens = len(self.tokenizer.encode(row_md))
-            
-            current_lines.append(row_md)
-            current_tokens += row_tokens
-            
-        # Flush last chunk
-        if current_lines:
+            if tokens > limit:
+                # Truncate for now (or could split further, but let's be safe)
+                rows_md[start] = rows_md[start][:(self.chunk_token_size - header_tokens - 50) * 4] + "..."
+                chunk_content = render(start, end, offset)
+                tokens = len(self.tokenizer.encode(chunk_content))
             chunks.append({
-                'tokens': current_tokens,
-                'content': header_text + '\n' + '\n'.join(current_lines),
-                'chunk_order_index': chunk_idx
+                'tokens': tokens,
+                'content': chunk_content,
+                'chunk_order_index': start_index + offset
             })
             
         return chunks
@@ -713,6 +730,7 @@ class UniversalTableChunker:
         """
         from lightrag.operate import chunking_by_token_size
         
+        self.exact_token_counts = False
         logger.debug("[TableChunker] Using LightRAG standard chunking")
         return chunking_by_token_size(
             self.tokenizer,
@@ -772,6 +790,11 @@ def universal_chunking_func(
             logger.warning(f"[TableChunker] Skipping chunk {i}: empty content")
             continue
         
+        # Table chunks were already encoded exactly while packing
+        if chunker.exact_token_counts and chunk.get('tokens', 0) > 0:
+            valid_chunks.append(chunk)
+            continue
+        
         # Try to encode with the actual tokenizer to verify it's valid
         try:
             tokens = tokenizer.encode(chunk_content)
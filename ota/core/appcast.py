@@ -9,18 +9,30 @@ Features:
 - Select best item for current platform/arch
 - Compare versions with simple, dependency-free semver-ish comparison
 - Support Ed25519 signature verification
+- Parse <sparkle:deltas> binary delta enclosures
 """
 from __future__ import annotations
 
 import re
 import platform as _platform
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 from utils.logger_helper import logger_helper as logger
 
 
+@dataclass
+class AppcastDelta:
+    from_version: str
+    url: str
+    length: Optional[int] = None
+    sha256: Optional[str] = None  # SHA-256 of the delta file
+    from_signature: Optional[str] = None  # SHA-256 of the package the delta applies to
+    signature: Optional[str] = None  # edSignature of the delta file (Ed25519, base64)
+    format: Optional[str] = None
+
+
 @dataclass
 class AppcastItem:
     version: str
@@ -33,6 +45,33 @@ class AppcastItem:
     alternate_url: Optional[str] = None  # Accelerated/alternate download URL
     description_html: Optional[str] = None
     pub_date: Optional[str] = None
+    deltas: List[AppcastDelta] = field(default_factory=list)
+
+
+def _parse_length(length_val: Optional[str]) -> Optional[int]:
+    try:
+        return int(length_val) if length_val else None
+    except ValueError:
+        return None
+
+
+def _parse_deltas(item: ET.Element, sparkle_ns: str) -> List[AppcastDelta]:
+    deltas: List[AppcastDelta] = []
+    for enclosure in item.findall(f'{{{sparkle_ns}}}deltas/enclosure'):
+        url = enclosure.get('url') or ''
+        from_version = enclosure.get(f"{{{sparkle_ns}}}deltaFrom") or ''
+        if not url or not from_version:
+            continue
+        deltas.append(AppcastDelta(
+            from_version=from_version,
+            url=url,
+            length=_parse_length(enclosure.get('length')),
+            sha256=enclosure.get(f"{{{sparkle_ns}}}deltaSha256") or None,
+            from_signature=enclosure.get(f"{{{sparkle_ns}}}deltaFromSha256") or None,
+            signature=enclosure.get(f"{{{sparkle_ns}}}edSignature") or None,
+            format=enclosure.get(f"{{{sparkle_ns}}}deltaFormat") or None,
+        ))
+    return deltas
 
 
 def parse_appcast(xml_text: str) -> List[AppcastItem]:
@@ -49,6 +88,7 @@ def parse_appcast(xml_text: str) -> List[AppcastItem]:
       - enclosure/@sparkle:alternateUrl (accelerated/alternate download URL)
       - item/description (release notes HTML)
       - item/pubDate
+      - item/sparkle:deltas/enclosure (binary deltas, see AppcastDelta)
     """
     ns = {
         'sparkle': 'http://www.andymatuschak.org/xml-namespaces/sparkle'
@@ -88,10 +128,7 @@ def parse_appcast(xml_text: str) -> List[AppcastItem]:
         pub_date_el = item.find('pubDate')
         pub_date = pub_date_el.text if pub_date_el is not None else None
 
-        try:
-            length = int(length_val) if length_val else None
-        except ValueError:
-            length = None
+        length = _parse_length(length_val)
 
         if not url or not version:
             continue
@@ -107,6 +144,7 @@ def parse_appcast(xml_text: str) -> List[AppcastItem]:
             alternate_url=alternate_url,
             description_html=desc_html,
             pub_date=pub_date,
+            deltas=_parse_deltas(item, ns['sparkle']),
         ))
 
     return items
@@ -0,0 +1,191 @@
+"""
+Binary delta packages for OTA updates
+
+A delta reconstructs the new installer package from the previously installed
+one. The format is a zstd frame compressed with the old package as a raw-content
+dictionary ("patch-from"), using a window large enough to reference the whole
+old file, so unchanged regions of the package cost only a few bytes.
+
+The server side (appcast generator) creates deltas with create_delta(); the
+client keeps the last verified package as a base (see PackageManager) and
+rebuilds the full package with apply_delta(), which verifies the SHA-256 of
+both the base and the result.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from utils.logger_helper import logger_helper as logger
+
+# Try to import zstandard library
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None
+    ZSTD_AVAILABLE = False
+
+
+DELTA_FORMAT = "zstd-patch"
+DELTA_SUFFIX = ".zstpatch"
+DEFAULT_LEVEL = 19
+# zstd's maximum window (2 GB); packages above this fall back to full downloads
+MAX_WINDOW_LOG = 31
+_IO_CHUNK = 1024 * 1024
+_FRAME_HEADER_MAX = 18
+
+
+class DeltaError(Exception):
+    """Delta creation/application failed (caller falls back to the full package)"""
+
+
+def delta_filename(new_filename: str, from_version: str) -> str:
+    """Name of the delta that upgrades `from_version` to the package `new_filename`"""
+    return f"{new_filename}.from-{from_version}{DELTA_SUFFIX}"
+
+
+def _window_log(*sizes: int) -> int:
+    window_log = max(20, max(sizes).bit_length())
+    if window_log > MAX_WINDOW_LOG:
+        raise DeltaError(f"Package too large for a delta ({max(sizes)} bytes)")
+    return window_log
+
+
+def _load_base(old_path: Path, expected_sha256: Optional[str] = None) -> bytes:
+    data = Path(old_path).read_bytes()
+    if expected_sha256:
+        actual = hashlib.sha256(data).hexdigest()
+        if actual.lower() != expected_sha256.lower():
+            raise DeltaError(f"Base package hash mismatch: expected {expected_sha256}, got {actual}")
+    return data
+
+
+def create_delta(old_path: Path, new_path: Path, delta_path: Path, level: int = DEFAULT_LEVEL) -> dict:
+    """Create a delta turning `old_path` into `new_path`
+
+    Returns:
+        dict with the delta's `file_size` and `sha256`, plus the
+        `from_signature` (SHA-256) of the old package and `format`
+    """
+    if not ZSTD_AVAILABLE:
+        raise DeltaError("zstandard library not available, cannot create delta packages")
+
+    old_path, new_path, delta_path = Path(old_path), Path(new_path), Path(delta_path)
+    base = _load_base(old_path)
+    window_log = _window_log(len(base), new_path.stat().st_size)
+
+    params = zstd.ZstdCompressionParameters.from_level(
+        level, window_log=window_log, enable_ldm=True, write_content_size=True,
+        write_checksum=True
+    )
+    cctx = zstd.ZstdCompressor(
+        dict_data=zstd.ZstdCompressionDict(base, dict_type=zstd.DICT_TYPE_RAWCONTENT),
+        compression_params=params,
+    )
+
+    tmp_path = delta_path.with_name(delta_path.name + ".tmp")
+    delta_hasher = hashlib.sha256()
+    try:
+        with open(new_path, "rb") as src, open(tmp_path, "wb") as dst:
+            writer = cctx.stream_writer(_HashingWriter(dst, delta_hasher), size=new_path.stat().st_size,
+                                        closefd=False)
+            for chunk in iter(lambda: src.read(_IO_CHUNK), b""):
+                writer.write(chunk)
+            writer.flush(zstd.FLUSH_FRAME)
+        os.replace(tmp_path, delta_path)
+    except Exception:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+    return {
+        "format": DELTA_FORMAT,
+        "file_size": delta_path.stat().st_size,
+        "sha256": delta_hasher.hexdigest(),
+        "from_signature": hashlib.sha256(base).hexdigest(),
+    }
+
+
+def apply_delta(old_path: Path, delta_path: Path, out_path: Path,
+                base_sha256: Optional[str] = None, expected_sha256: Optional[str] = None) -> str:
+    """Rebuild the new package from `old_path` + `delta_path` into `out_path`
+
+    Verifies the base against `base_sha256` and the result against
+    `expected_sha256` when given; on any failure `out_path` is not created.
+
+    Returns:
+        SHA-256 hex digest of the rebuilt package
+    """
+    if not ZSTD_AVAILABLE:
+        raise DeltaError("zstandard library not available, cannot apply delta packages")
+
+    out_path = Path(out_path)
+    base = _load_base(old_path, base_sha256)
+    try:
+        with open(delta_path, "rb") as f:
+            params = zstd.get_frame_parameters(f.read(_FRAME_HEADER_MAX))
+    except zstd.ZstdError as e:
+        raise DeltaError(f"Invalid delta package: {e}") from e
+    window_size = max(params.window_size, 1 << _window_log(len(base), max(params.content_size, 0)))
+
+    dctx = zstd.ZstdDecompressor(
+        dict_data=zstd.ZstdCompressionDict(base, dict_type=zstd.DICT_TYPE_RAWCONTENT),
+        max_window_size=window_size,
+    )
+
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    hasher = hashlib.sha256()
+    try:
+        with open(delta_path, "rb") as src, open(tmp_path, "wb") as dst:
+            reader = dctx.stream_reader(src)
+            for chunk in iter(lambda: reader.read(_IO_CHUNK), b""):
+                hasher.update(chunk)
+                dst.write(chunk)
+        digest = hasher.hexdigest()
+        if expected_sha256 and digest.lower() != expected_sha256.lower():
+            raise DeltaError(f"Rebuilt package hash mismatch: expected {expected_sha256}, got {digest}")
+        os.replace(tmp_path, out_path)
+        return digest
+    except zstd.ZstdError as e:
+        raise DeltaError(f"Failed to apply delta: {e}") from e
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def load_or_create_delta(old_path: Path, new_path: Path, delta_path: Path, level: int = DEFAULT_LEVEL) -> dict:
+    """create_delta() with a `<delta>.json` sidecar so unchanged deltas are not rebuilt"""
+    delta_path = Path(delta_path)
+    meta_path = delta_path.with_name(delta_path.name + ".json")
+    if delta_path.exists() and meta_path.exists():
+        try:
+            newest_input = max(Path(old_path).stat().st_mtime, Path(new_path).stat().st_mtime)
+            if delta_path.stat().st_mtime >= newest_input:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                # Sidecars without "sha256" predate the current metadata layout
+                if meta.get("file_size") == delta_path.stat().st_size and "sha256" in meta:
+                    return meta
+        except (OSError, ValueError) as e:
+            logger.warning(f"[DELTA] Ignoring stale delta metadata {meta_path.name}: {e}")
+
+    meta = create_delta(old_path, new_path, delta_path, level=level)
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it"""
+
+    def __init__(self, fh, hasher):
+        self._fh = fh
+        self._hasher = hasher
+
+    def write(self, data):
+        self._hasher.update(data)
+        return self._fh.write(data)
+
+    def flush(self):
+        return self._fh.flush()
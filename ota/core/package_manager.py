@@ -14,12 +14,14 @@ import time
 import sys
 import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urlparse
 
 import requests
 from utils.logger_helper import logger_helper as logger
 from ota.config.loader import ota_config
+from ota.core.range_downloader import RangeDownloader, DownloadCancelled
+from ota.core.delta import ZSTD_AVAILABLE, DeltaError, apply_delta
 
 # Try to import cryptography library
 try:
@@ -36,14 +38,17 @@ class UpdatePackage:
     """Update package information"""
     
     def __init__(self, version: str, download_url: str, file_size: int, 
-                 signature: str, description: str = "", alternate_url: str = None):
+                 signature: str, description: str = "", alternate_url: str = None,
+                 deltas: Optional[List[Dict[str, Any]]] = None):
         self.version = version
         self.download_url = download_url
         self.alternate_url = alternate_url  # Accelerated/alternate download URL
         self.file_size = file_size
         self.signature = signature
         self.description = description
+        self.deltas = deltas or []  # Binary deltas from previous versions (AppcastDelta dicts)
         self.download_path: Optional[Path] = None
+        self.file_hash: Optional[str] = None  # SHA-256 of download_path, set when downloaded
         self.is_downloaded = False
         self.is_verified = False
     
@@ -60,6 +65,9 @@ class PackageManager:
         self.current_package: Optional[UpdatePackage] = None
         self._downloaded_files = []  # Track downloaded files
         
+        # Verified packages kept (by SHA-256) as bases for binary delta updates
+        self.base_dir = self.download_dir / "base"
+        
         logger.info(f"Package manager initialized with download dir: {self.download_dir}")
         
         # Clean up old downloaded packages on startup
@@ -74,6 +82,12 @@ class PackageManager:
             cancel_check: Optional callable that returns True if download should be cancelled
             max_retries: Maximum number of retry attempts
         """
+        # A delta from a package we already have is usually a fraction of the full size
+        if self._try_delta_download(package, progress_callback, cancel_check):
+            return True
+        if cancel_check and cancel_check():
+            return False
+        
         # Try primary URL first, then alternate URL if available
         urls_to_try = []
         urls_to_try.append((package.download_url, "primary"))
@@ -123,163 +137,30 @@ class PackageManager:
                                     file_deleted = True  # Not deleted, but we have a new path
                                     break
                     
-                    # Start download with aggressive timeout settings
-                    logger.info(f"Initiating HTTP request to download URL...")
-                    import socket
-                    
-                    # Use shorter timeouts to detect slow connections quickly
+                    # Resumable download: a retry (or the alternate URL) continues from the
+                    # bytes already on disk instead of starting over
                     connect_timeout = 30  # 30s to establish connection
                     read_timeout = 15     # 15s between data chunks (aggressive!)
-                    
+                    downloader = RangeDownloader(
+                        download_url,
+                        download_path,
+                        expected_size=package.file_size,
+                        segments=ota_config.get('download_segments', 4),
+                        min_segment_size=int(ota_config.get('download_min_segment_mb', 8) * 1024 * 1024),
+                        connect_timeout=connect_timeout,
+                        read_timeout=read_timeout,
+                        progress_callback=progress_callback,
+                        cancel_check=cancel_check,
+                    )
+                    logger.info(f"Initiating HTTP request to download URL (connect_timeout={connect_timeout}s, read_timeout={read_timeout}s)...")
                     try:
-                        # Use simple requests.get with timeout tuple
-                        response = requests.get(
-                            download_url, 
-                            stream=True, 
-                            timeout=(connect_timeout, read_timeout)
-                        )
-                        response.raise_for_status()
-                        logger.info(f"HTTP connection established (connect_timeout={connect_timeout}s, read_timeout={read_timeout}s)")
-                    except requests.exceptions.Timeout as e:
-                        logger.warning(f"Connection/read timeout after {connect_timeout}s/{read_timeout}s: {e}")
-                        logger.warning(f"Switching to alternate URL if available...")
-                        raise
-                    except requests.exceptions.RequestException as e:
-                        logger.error(f"Request failed: {e}")
-                        raise
-                    
-                    total_size = int(response.headers.get('content-length', 0))
-                    downloaded_size = 0
-                    logger.info(f"Download started: total size = {total_size / (1024*1024):.2f} MB")
-                    
-                    # Track download progress for logging
-                    last_log_progress = -1
-                    download_start_time = time.time()
-                    chunk_count = 0
-                    slow_download_timeout = read_timeout  # Use same timeout for slow download detection
-                    # Thread-safe progress tracking
-                    progress_lock = threading.Lock()
-                    last_progress_size = 0
-                    download_stalled = threading.Event()
-                    
-                    def monitor_progress():
-                        """Background thread to monitor download progress"""
-                        nonlocal last_progress_size
-                        monitor_start = time.time()
-                        logger.info(f"[MONITOR] Progress monitor started, will check every {read_timeout}s")
-                        
-                        # Minimum acceptable speed: 100 KB/s (about 1.5 MB per 15s)
-                        min_bytes_per_interval = 100 * 1024 * read_timeout  # 100 KB/s
-                        
-                        while not download_stalled.is_set():
-                            time.sleep(read_timeout)
-                            
-                            with progress_lock:
-                                current_size = downloaded_size
-                            
-                            elapsed = time.time() - monitor_start
-                            bytes_downloaded_this_interval = current_size - last_progress_size
-                            
-                            if current_size == last_progress_size:
-                                # No progress in the last interval
-                                logger.warning(f"[MONITOR] No progress detected after {read_timeout}s!")
-                                logger.warning(f"[MONITOR] Downloaded: {current_size} bytes in {elapsed:.1f}s")
-                                logger.warning(f"[MONITOR] Triggering download abort to switch URL...")
-                                download_stalled.set()
-                                # Close the response to trigger exception in iter_content
-                                try:
-                                    response.close()
-                                except:
-                                    pass
-                                break
-                            elif bytes_downloaded_this_interval < min_bytes_per_interval:
-                                # Progress too slow
-                                speed_kbps = bytes_downloaded_this_interval / (1024 * read_timeout)
-                                logger.warning(f"[MONITOR] Download too slow: {speed_kbps:.1f} KB/s (minimum: 100 KB/s)")
-                                logger.warning(f"[MONITOR] Downloaded {bytes_downloaded_this_interval} bytes in {read_timeout}s")
-                                logger.warning(f"[MONITOR] Triggering download abort to switch to faster URL...")
-                                download_stalled.set()
-                                try:
-                                    response.close()
-                                except:
-                                    pass
-                                break
-                            else:
-                                speed_kbps = bytes_downloaded_this_interval / (1024 * read_timeout)
-                                logger.info(f"[MONITOR] Progress OK: {current_size} bytes ({current_size/(1024*1024):.2f} MB, speed: {speed_kbps:.1f} KB/s)")
-                                last_progress_size = current_size
-                    
-                    # Start progress monitor thread
-                    monitor_thread = threading.Thread(target=monitor_progress, daemon=True)
-                    monitor_thread.start()
-                    
-                    with open(download_path, 'wb') as f:
-                        try:
-                            logger.info(f"[DOWNLOAD] Starting iter_content loop with background monitor...")
-                            for chunk in response.iter_content(chunk_size=8192):
-                                # Check if monitor detected stall
-                                if download_stalled.is_set():
-                                    logger.warning(f"[DOWNLOAD] Monitor detected stall, aborting download")
-                                    raise requests.exceptions.Timeout("Download stalled: no progress detected by monitor")
-                                
-                                chunk_count += 1
-                                current_time = time.time()
-                                
-                                # Check for cancellation
-                                if cancel_check and cancel_check():
-                                    logger.info("Download cancelled by user")
-                                    # Stop monitor thread
-                                    download_stalled.set()
-                                    logger.info(f"[MONITOR] Stopped due to user cancellation")
-                                    f.close()
-                                    try:
-                                        download_path.unlink()
-                                        logger.info(f"Cleaned up partial download: {download_path}")
-                                    except Exception as e:
-                                        logger.warning(f"Failed to clean up partial download: {e}")
-                                    return False
-                                
-                                # Check for slow download (0% progress after timeout)
-                                if downloaded_size == 0:
-                                    elapsed = current_time - download_start_time
-                                    if elapsed > slow_download_timeout:
-                                        logger.warning(f"Download too slow: 0% progress after {slow_download_timeout}s (received {chunk_count} chunks)")
-                                        logger.warning(f"Switching to alternate URL if available...")
-                                        f.close()
-                                        try:
-                                            download_path.unlink()
-                                            logger.info(f"Cleaned up slow download: {download_path}")
-                                        except Exception as e:
-                                            logger.warning(f"Failed to clean up: {e}")
-                                        raise requests.exceptions.Timeout(f"Download stalled: 0% progress after {slow_download_timeout}s")
-                                
-                                if chunk:
-                                    f.write(chunk)
-                                    downloaded_size += len(chunk)
-                                    last_chunk_time = current_time
-                                    if progress_callback and total_size > 0:
-                                        progress = int((downloaded_size / total_size) * 100)
-                                        progress_callback(progress)
-                                        
-                                        # Log every 10% progress
-                                        if progress >= last_log_progress + 10:
-                                            logger.info(f"Download progress: {progress}% ({downloaded_size / (1024*1024):.2f} MB / {total_size / (1024*1024):.2f} MB)")
-                                            last_log_progress = progress
-                        except socket.timeout:
-                            logger.warning(f"Socket timeout after {slow_download_timeout}s - no data received")
-                            logger.warning(f"Downloaded {downloaded_size} bytes ({chunk_count} chunks) before timeout")
-                            logger.warning(f"Switching to alternate URL if available...")
-                            f.close()
-                            try:
-                                download_path.unlink()
-                                logger.info(f"Cleaned up timed-out download: {download_path}")
-                            except Exception as e:
-                                logger.warning(f"Failed to clean up: {e}")
-                            raise requests.exceptions.Timeout(f"Socket timeout: no data for {slow_download_timeout}s")
-                        finally:
-                            # Stop the monitor thread
-                            download_stalled.set()
-                            logger.info(f"[MONITOR] Stopping progress monitor")
+                        file_hash = downloader.download()
+                    except DownloadCancelled:
+                        logger.info(f"Cleaned up partial download: {download_path}")
+                        return False
+
+                    # SHA-256 computed while downloading, reused by verify_package
+                    package.file_hash = file_hash
                     
                     package.download_path = download_path
                     package.is_downloaded = True
@@ -323,6 +204,118 @@ class PackageManager:
         logger.error(f"Failed to download package after {max_retries} attempts")
         return False
     
+    def _select_delta(self, package: UpdatePackage) -> Optional[Tuple[Dict[str, Any], Path]]:
+        """Pick a delta whose base package is available locally"""
+        for delta in package.deltas:
+            from_signature = (delta.get('from_signature') or '').lower()
+            if not delta.get('url') or not from_signature:
+                continue
+            base_path = self.base_dir / from_signature
+            if base_path.is_file():
+                return delta, base_path
+        return None
+    
+    def _try_delta_download(self, package: UpdatePackage, progress_callback=None, cancel_check=None) -> bool:
+        """Download a binary delta and rebuild the full package from a local base
+        
+        Returns False (caller downloads the full package) when no delta applies or
+        anything fails; the rebuilt package is verified against the target SHA-256
+        when the appcast provides one.
+        """
+        if not package.deltas or not ZSTD_AVAILABLE or not ota_config.get('delta_updates', True):
+            return False
+        selected = self._select_delta(package)
+        if not selected:
+            logger.info("[DELTA] No local base package matches the published deltas, using full download")
+            return False
+        delta, base_path = selected
+        
+        filename = self._get_filename_from_url(package.download_url)
+        download_path = self.download_dir / filename
+        delta_path = self.download_dir / "deltas" / self._get_filename_from_url(delta['url'])
+        expected_hash = package.signature.lower() if package.signature and self._is_hash_signature(package.signature) and len(package.signature) == 64 else None
+        
+        try:
+            logger.info(f"[DELTA] Downloading delta from {delta.get('from_version')} ({delta.get('length') or 0:,} bytes): {delta['url']}")
+            delta_path.parent.mkdir(parents=True, exist_ok=True)
+            delta_hash = RangeDownloader(
+                delta['url'],
+                delta_path,
+                expected_size=delta.get('length') or 0,
+                segments=ota_config.get('download_segments', 4),
+                min_segment_size=int(ota_config.get('download_min_segment_mb', 8) * 1024 * 1024),
+                connect_timeout=30,
+                read_timeout=15,
+                progress_callback=progress_callback,
+                cancel_check=cancel_check,
+            ).download()
+            if delta.get('sha256') and delta_hash != delta['sha256'].lower():
+                raise DeltaError(f"Delta hash mismatch: expected {delta['sha256']}, got {delta_hash}")
+            
+            if download_path.exists():
+                download_path.unlink()
+            file_hash = apply_delta(base_path, delta_path, download_path,
+                                    base_sha256=delta['from_signature'], expected_sha256=expected_hash)
+        except DownloadCancelled:
+            # Keep the partial delta so a retry can resume it
+            logger.info("[DELTA] Delta download cancelled")
+            return False
+        except Exception as e:
+            logger.warning(f"[DELTA] Delta update failed, falling back to full download: {e}")
+            # The full download won't resume this delta, so drop its partial file and resume state
+            for leftover in (delta_path.with_name(delta_path.name + ".part"),
+                             delta_path.with_name(delta_path.name + ".part.json")):
+                try:
+                    leftover.unlink()
+                except OSError:
+                    pass
+            return False
+        finally:
+            if delta_path.exists():
+                try:
+                    delta_path.unlink()
+                except OSError:
+                    pass
+        
+        if package.file_size > 0 and download_path.stat().st_size != package.file_size:
+            logger.warning(f"[DELTA] Rebuilt package size mismatch: expected {package.file_size}, got {download_path.stat().st_size}")
+            download_path.unlink()
+            return False
+        
+        package.file_hash = file_hash
+        package.download_path = download_path
+        package.is_downloaded = True
+        self._downloaded_files.append(download_path)
+        self.current_package = package
+        if progress_callback:
+            progress_callback(100)
+        logger.info(f"[DELTA] ✅ Package rebuilt from delta: {download_path}")
+        return True
+    
+    def _remember_base_package(self, package: UpdatePackage, keep: int = 2):
+        """Keep a verified package as the base for future delta updates"""
+        if not ZSTD_AVAILABLE or not ota_config.get('delta_updates', True):
+            return
+        try:
+            file_hash = package.file_hash or self._calculate_file_hash(package.download_path)
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            base_path = self.base_dir / file_hash
+            if not base_path.exists():
+                tmp_path = self.base_dir / f"{file_hash}.tmp"
+                try:
+                    os.link(package.download_path, tmp_path)
+                except OSError:
+                    shutil.copy2(package.download_path, tmp_path)
+                os.replace(tmp_path, base_path)
+            os.utime(base_path)
+            
+            bases = sorted((p for p in self.base_dir.iterdir() if p.is_file()),
+                           key=lambda p: p.stat().st_mtime, reverse=True)
+            for old in bases[keep:]:
+                old.unlink()
+        except Exception as e:
+            logger.warning(f"[DELTA] Could not keep base package for delta updates: {e}")
+    
     def verify_package(self, package: UpdatePackage, public_key_path: Optional[str] = None) -> bool:
         """Verify update package"""
         if not package.is_downloaded or not package.download_path:
@@ -332,8 +325,8 @@ class PackageManager:
         try:
             logger.info(f"Verifying package: {package.version}")
             
-            # 1. Verify file integrity (hash)
-            file_hash = self._calculate_file_hash(package.download_path)
+            # 1. Verify file integrity (hash), reusing the hash computed during download
+            file_hash = package.file_hash or self._calculate_file_hash(package.download_path)
             logger.info(f"Package hash: {file_hash}")
             
             # 2. Basic hash/digital signature verification
@@ -370,6 +363,7 @@ class PackageManager:
                 return False
             
             package.is_verified = True
+            self._remember_base_package(package)
             logger.info("Package verification successful")
             return True
             
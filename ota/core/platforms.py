@@ -5,6 +5,7 @@ import tempfile
 import shutil
 import zipfile
 import sys
+from dataclasses import asdict
 from typing import Optional
 from urllib.parse import urlparse
 
@@ -183,6 +184,7 @@ class MacOSUpdater:
                     "file_size": selected.length or 0,
                     "signature": selected.ed_signature or "",
                     "description": selected.description_html or "",
+                    "deltas": [asdict(d) for d in selected.deltas],
                     "source": "macos_appcast"
                 }
                 return (True, update_info) if return_info else True
@@ -434,6 +436,7 @@ class WindowsUpdater:
                     "file_size": selected.length or 0,
                     "signature": selected.ed_signature or "",
                     "description": selected.description_html or "",
+                    "deltas": [asdict(d) for d in selected.deltas],
                     "source": "windows_appcast"
                 }
                 return (True, update_info) if return_info else True
@@ -0,0 +1,442 @@
+"""
+Resumable, segmented HTTP downloader for update packages
+
+Downloads into ``<dest>.part`` next to a small ``<dest>.part.json`` state file, so
+an interrupted download resumes with HTTP Range requests instead of starting over.
+When the server supports ranges and the file is large enough, the remaining bytes
+are split into segments fetched over parallel connections. The SHA-256 of the
+package is computed while it is downloaded: bytes are fed to the hasher as soon
+as the contiguous prefix of the file grows, so no extra full read is needed once
+the download finishes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import requests
+from utils.logger_helper import logger_helper as logger
+
+
+STATE_VERSION = 1
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+# Aim for reads of roughly this long, so cancel/stall checks stay responsive
+TARGET_READ_SECONDS = 0.25
+# Read-back block size when hashing bytes written by other segments
+HASH_BLOCK_SIZE = 1024 * 1024
+MONITOR_INTERVAL = 0.2
+STATE_SAVE_INTERVAL = 1.0
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadCancelled(Exception):
+    """Download was cancelled through cancel_check"""
+
+
+class DownloadStalled(requests.exceptions.Timeout):
+    """No (or too little) progress within the read timeout"""
+
+
+class _Segment:
+    """Byte range [start, end) of the target file and how much of it is written"""
+
+    def __init__(self, start: int, end: int, done: int = 0):
+        self.start = start
+        self.end = end
+        self.done = done
+
+    @property
+    def position(self) -> int:
+        return self.start + self.done
+
+    @property
+    def complete(self) -> bool:
+        # end < 0 means unknown length: complete only when the stream ends
+        return self.end >= 0 and self.position >= self.end
+
+    def to_dict(self) -> dict:
+        return {"start": self.start, "end": self.end, "done": self.done}
+
+
+class RangeDownloader:
+    """Download one URL to ``dest`` with resume, optional segmentation and streaming SHA-256"""
+
+    def __init__(self, url: str, dest: Path, expected_size: int = 0, segments: int = 4,
+                 min_segment_size: int = 8 * 1024 * 1024,
+                 connect_timeout: float = 30, read_timeout: float = 15,
+                 min_speed: int = 100 * 1024,
+                 progress_callback: Optional[Callable[[int], None]] = None,
+                 cancel_check: Optional[Callable[[], bool]] = None,
+                 session: Optional[requests.Session] = None):
+        self.url = url
+        self.dest = Path(dest)
+        self.part_path = self.dest.with_name(self.dest.name + ".part")
+        self.state_path = self.dest.with_name(self.dest.name + ".part.json")
+        self.expected_size = expected_size or 0
+        self.max_segments = max(1, int(segments or 1))
+        self.min_segment_size = max(MIN_CHUNK_SIZE, int(min_segment_size))
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.min_speed = min_speed
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.session = session or requests.Session()
+
+        self.total_size = 0
+        self.resumed_bytes = 0
+        self._validator: Optional[str] = None
+        self._segments: List[_Segment] = []
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._errors: List[BaseException] = []
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+        self._last_percent = -1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def download(self) -> str:
+        """Download to ``dest`` and return the SHA-256 hex digest of the file
+
+        Raises DownloadCancelled, DownloadStalled or requests exceptions. The
+        partial file is kept on network errors so the next call resumes; it is
+        removed on cancellation.
+        """
+        state = self._load_state()
+        first_index = 0
+        offset, end = 0, None
+        if state:
+            # The first request resumes the first unfinished segment
+            first_index = next(i for i, s in enumerate(state["segments"]) if s["start"] + s["done"] < s["end"])
+            first = state["segments"][first_index]
+            offset, end = first["start"] + first["done"], first["end"] - 1
+
+        response = self._open(offset, end, state["validator"] if state else None)
+        try:
+            if state and response.status_code == 206 and self._total_from(response) == state["size"]:
+                self._resume(state)
+                logger.info(f"[DOWNLOAD] Resuming {self.dest.name} at {self.resumed_bytes / (1024*1024):.2f} MB "
+                            f"of {self.total_size / (1024*1024):.2f} MB")
+            else:
+                if state:
+                    logger.info("[DOWNLOAD] Server did not accept the resume request or the file changed, restarting")
+                self._discard_partial()
+                first_index = 0
+                if response.status_code == 206 and offset > 0:
+                    # Partial body for the old range; a 200 is already the whole file
+                    response.close()
+                    response = self._open(0, None, None)
+                self._start_fresh(response)
+
+            self._run(response, first_index)
+        finally:
+            response.close()
+
+        os.replace(self.part_path, self.dest)
+        self._remove(self.state_path)
+        return self._hasher.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _open(self, start: int, end: Optional[int], validator: Optional[str]) -> requests.Response:
+        headers = {"Accept-Encoding": "identity", "Range": f"bytes={start}-{'' if end is None else end}"}
+        if validator:
+            # Server sends the full file (200) instead if the validator no longer matches
+            headers["If-Range"] = validator
+        response = self.session.get(self.url, headers=headers, stream=True,
+                                    timeout=(self.connect_timeout, self.read_timeout))
+        if response.status_code == 416 and start > 0:
+            response.close()
+            return self._open(0, None, None)
+        response.raise_for_status()
+        if response.status_code == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != start:
+                response.close()
+                raise requests.exceptions.ConnectionError(
+                    f"Unexpected Content-Range for bytes={start}-: {response.headers.get('Content-Range')}")
+        return response
+
+    def _total_from(self, response: requests.Response) -> int:
+        if response.status_code == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if match and match.group(3) != "*":
+                return int(match.group(3))
+            return 0
+        return int(response.headers.get("Content-Length", 0) or 0)
+
+    def _validator_from(self, response: requests.Response) -> Optional[str]:
+        etag = response.headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
+
+    def _resume(self, state: dict) -> None:
+        self.total_size = state["size"]
+        self._validator = state["validator"]
+        self._segments = [_Segment(s["start"], s["end"], s["done"]) for s in state["segments"]]
+        self.resumed_bytes = sum(s.done for s in self._segments)
+
+    def _start_fresh(self, response: requests.Response) -> None:
+        self.total_size = self._total_from(response)
+        self._validator = self._validator_from(response)
+        ranges_ok = response.status_code == 206 and self.total_size > 0
+
+        count = 1
+        if ranges_ok and self.max_segments > 1:
+            count = max(1, min(self.max_segments, self.total_size // self.min_segment_size))
+
+        if self.total_size > 0:
+            step = -(-self.total_size // count)
+            self._segments = [_Segment(i * step, min((i + 1) * step, self.total_size)) for i in range(count)]
+        else:
+            # Unknown size: one open-ended stream, no resume
+            self._segments = [_Segment(0, -1)]
+
+        with open(self.part_path, "wb") as f:
+            if self.total_size > 0:
+                f.truncate(self.total_size)
+        if ranges_ok:
+            self._save_state()
+        if count > 1:
+            logger.info(f"[DOWNLOAD] Server supports ranges, using {count} parallel connections")
+
+    # ------------------------------------------------------------------
+    # Download loop
+    # ------------------------------------------------------------------
+
+    def _run(self, first_response: requests.Response, first_index: int) -> None:
+        workers = []
+        for index, segment in enumerate(self._segments):
+            if segment.complete:
+                continue
+            response = first_response if index == first_index else None
+            worker = threading.Thread(target=self._worker, args=(segment, response),
+                                      name=f"ota-download-{index}", daemon=True)
+            workers.append(worker)
+
+        for worker in workers:
+            worker.start()
+        try:
+            self._monitor(workers)
+        finally:
+            self._abort.set()
+            for worker in workers:
+                worker.join()
+            if self._has_range_state():
+                self._save_state()
+
+        if self._errors:
+            raise self._errors[0]
+        self._catch_up_hash(final=True)
+        if self.total_size > 0 and self._hashed != self.total_size:
+            raise requests.exceptions.ConnectionError(
+                f"Incomplete download: {self._hashed} of {self.total_size} bytes")
+        self._report_progress()
+
+    def _monitor(self, workers) -> None:
+        last_save = time.time()
+        window_start = time.time()
+        window_bytes = self._downloaded()
+
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(MONITOR_INTERVAL / max(1, len(workers)))
+            if self._errors:
+                return
+
+            if self.cancel_check and self.cancel_check():
+                logger.info("Download cancelled by user")
+                self._abort.set()
+                for worker in workers:
+                    worker.join()
+                self._discard_partial()
+                raise DownloadCancelled()
+
+            self._catch_up_hash()
+            self._report_progress()
+
+            now = time.time()
+            if now - last_save >= STATE_SAVE_INTERVAL and self._has_range_state():
+                self._save_state()
+                last_save = now
+
+            # Same stall rules as before: no progress, or less than min_speed, per read_timeout window
+            if now - window_start >= self.read_timeout:
+                downloaded = self._downloaded()
+                delta = downloaded - window_bytes
+                if delta == 0:
+                    logger.warning(f"[MONITOR] No progress detected after {self.read_timeout}s!")
+                    raise DownloadStalled("Download stalled: no progress detected by monitor")
+                if delta < self.min_speed * self.read_timeout:
+                    speed_kbps = delta / (1024 * self.read_timeout)
+                    logger.warning(f"[MONITOR] Download too slow: {speed_kbps:.1f} KB/s "
+                                   f"(minimum: {self.min_speed / 1024:.0f} KB/s)")
+                    raise DownloadStalled(f"Download too slow: {speed_kbps:.1f} KB/s")
+                logger.info(f"[MONITOR] Progress OK: {downloaded / (1024*1024):.2f} MB "
+                            f"(speed: {delta / (1024 * self.read_timeout):.1f} KB/s)")
+                window_start = now
+                window_bytes = downloaded
+
+    def _worker(self, segment: _Segment, response: Optional[requests.Response]) -> None:
+        try:
+            if response is None:
+                response = self._open(segment.position, segment.end - 1, self._validator)
+                if response.status_code != 206:
+                    response.close()
+                    raise requests.exceptions.ConnectionError("Server stopped honouring range requests")
+            # Unbuffered, so bytes counted in segment.done are visible to _catch_up_hash
+            with open(self.part_path, "r+b", buffering=0) as f:
+                f.seek(segment.position)
+                chunk_size = MIN_CHUNK_SIZE
+                while not self._abort.is_set() and (segment.end < 0 or not segment.complete):
+                    want = chunk_size if segment.end < 0 else min(chunk_size, segment.end - segment.position)
+                    started = time.time()
+                    try:
+                        chunk = response.raw.read(want, decode_content=True)
+                    except requests.exceptions.RequestException:
+                        raise
+                    except Exception as e:
+                        # urllib3 / socket timeouts surface here; retry like any network error
+                        raise requests.exceptions.ConnectionError(f"Read failed: {e}") from e
+                    if not chunk:
+                        if segment.end < 0:
+                            break
+                        raise requests.exceptions.ConnectionError(
+                            f"Connection closed at byte {segment.position} (expected {segment.end})")
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[f.write(view):]
+                    with self._lock:
+                        # Hash in place while this segment is extending the hashed prefix
+                        if self._hashed == segment.position:
+                            self._hasher.update(chunk)
+                            self._hashed += len(chunk)
+                        segment.done += len(chunk)
+
+                    # Adapt the read size to throughput
+                    elapsed = time.time() - started
+                    if elapsed < TARGET_READ_SECONDS / 2 and len(chunk) == want:
+                        chunk_size = min(MAX_CHUNK_SIZE, chunk_size * 2)
+                    elif elapsed > TARGET_READ_SECONDS * 2:
+                        chunk_size = max(MIN_CHUNK_SIZE, chunk_size // 2)
+        except BaseException as e:
+            if not self._abort.is_set():
+                self._errors.append(e)
+            self._abort.set()
+        finally:
+            if response is not None:
+                response.close()
+
+    # ------------------------------------------------------------------
+    # Hashing / progress / state
+    # ------------------------------------------------------------------
+
+    def _contiguous_end(self) -> int:
+        end = 0
+        for segment in self._segments:
+            if segment.start != end:
+                break
+            end = segment.position
+            if not segment.complete or segment.end < 0:
+                break
+        return end
+
+    def _catch_up_hash(self, final: bool = False) -> None:
+        """Hash bytes written ahead of the hashed prefix by other segments (or resumed from disk)"""
+        limit = None if final else 32 * HASH_BLOCK_SIZE
+        with self._lock:
+            end = self._contiguous_end()
+            if self._hashed >= end:
+                return
+            with open(self.part_path, "rb") as f:
+                f.seek(self._hashed)
+                while self._hashed < end and (limit is None or limit > 0):
+                    block = f.read(min(HASH_BLOCK_SIZE, end - self._hashed))
+                    if not block:
+                        break
+                    self._hasher.update(block)
+                    self._hashed += len(block)
+                    if limit is not None:
+                        limit -= len(block)
+
+    def _downloaded(self) -> int:
+        with self._lock:
+            return sum(segment.done for segment in self._segments)
+
+    def _report_progress(self) -> None:
+        total = self.total_size or self.expected_size
+        if not self.progress_callback or total <= 0:
+            return
+        percent = min(100, int(self._downloaded() * 100 / total))
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress_callback(percent)
+
+    def _has_range_state(self) -> bool:
+        return self.total_size > 0 and len(self._segments) > 0 and self._segments[0].end >= 0 \
+            and self.state_path.exists()
+
+    def _save_state(self) -> None:
+        with self._lock:
+            state = {
+                "version": STATE_VERSION,
+                "url": self.url,
+                "size": self.total_size,
+                "validator": self._validator,
+                "segments": [segment.to_dict() for segment in self._segments],
+            }
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"[DOWNLOAD] Failed to save resume state: {e}")
+
+    def _load_state(self) -> Optional[dict]:
+        """Resume state for this URL, or None if there is nothing usable to resume"""
+        if not self.state_path.exists() or not self.part_path.exists():
+            return None
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            segments = state["segments"]
+            size = int(state["size"])
+            if state.get("version") != STATE_VERSION or size <= 0 or not segments:
+                return None
+            if self.expected_size and size != self.expected_size:
+                return None
+            # Another URL (e.g. the alternate mirror) only counts as the same file with a validator
+            if state.get("url") != self.url and not state.get("validator"):
+                return None
+            if self.part_path.stat().st_size != size:
+                return None
+            if not any(s["start"] + s["done"] < s["end"] for s in segments):
+                return None
+            return state
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"[DOWNLOAD] Ignoring unreadable resume state: {e}")
+            return None
+
+    def _discard_partial(self) -> None:
+        self._remove(self.part_path)
+        self._remove(self.state_path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"[DOWNLOAD] Failed to remove {path}: {e}")
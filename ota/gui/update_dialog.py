@@ -110,7 +110,8 @@ class DownloadWorker(QThread):
                 file_size=self.update_info.get('file_size', 0),
                 signature=self.update_info.get('signature', ''),
                 description=self.update_info.get('description', ''),
-                alternate_url=self.update_info.get('alternate_url', None)
+                alternate_url=self.update_info.get('alternate_url', None),
+                deltas=self.update_info.get('deltas')
             )
             
             self.status_updated.emit(_tr.tr("downloading"))
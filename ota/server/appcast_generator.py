@@ -2,10 +2,13 @@ import os
 import json
 import hashlib
 import re
+from glob import escape as glob_escape
 from pathlib import Path
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
 from utils.logger_helper import logger_helper as logger
+from ota.core.appcast import version_tuple
+from ota.core.delta import ZSTD_AVAILABLE, DeltaError, delta_filename, load_or_create_delta
 
 class AppcastGenerator:
     def __init__(self, server_root, signatures_dir, template_name='appcast_template.xml'):
@@ -194,10 +197,71 @@ class AppcastGenerator:
         
         return packages
 
+    def _find_previous_packages(self, dist_dir, filename, version, limit):
+        """
+        Find older builds of the same artifact (same name with another version)
+
+        Looks in dist_dir and dist_dir/history, where previous releases are archived.
+
+        Returns:
+            list: [(version, path)] newest first, at most `limit` entries
+        """
+        if not version or version not in filename or limit <= 0:
+            return []
+        prefix, suffix = filename.split(version, 1)
+        current = version_tuple(version)
+        found = {}
+        for search_dir in (Path(dist_dir), Path(dist_dir) / "history"):
+            if not search_dir.is_dir():
+                continue
+            for candidate in search_dir.glob(f"{glob_escape(prefix)}*{glob_escape(suffix)}"):
+                old_version = candidate.name[len(prefix):len(candidate.name) - len(suffix)]
+                if not candidate.is_file() or old_version == version or old_version in found:
+                    continue
+                if self._extract_version_from_filename(candidate.name) != old_version:
+                    continue
+                if version_tuple(old_version) < current:
+                    found[old_version] = candidate
+        ordered = sorted(found.items(), key=lambda kv: version_tuple(kv[0]), reverse=True)
+        return ordered[:limit]
+
+    def _build_deltas(self, base_url, dist_dir, filename, version, delta_count):
+        """
+        Create (or reuse) binary deltas from the last `delta_count` versions to `filename`
+
+        Deltas are written to dist_dir/deltas and served from /downloads/deltas/.
+
+        Returns:
+            list: template dicts for <sparkle:deltas>
+        """
+        if not ZSTD_AVAILABLE or delta_count <= 0:
+            return []
+        new_path = Path(dist_dir) / filename
+        deltas_dir = Path(dist_dir) / "deltas"
+        deltas = []
+        for old_version, old_path in self._find_previous_packages(dist_dir, filename, version, delta_count):
+            name = delta_filename(filename, old_version)
+            try:
+                deltas_dir.mkdir(parents=True, exist_ok=True)
+                meta = load_or_create_delta(old_path, new_path, deltas_dir / name)
+            except (DeltaError, OSError, MemoryError) as e:
+                logger.warning(f"[APPCAST] ⚠️  Delta {old_version} -> {version} skipped: {e}")
+                continue
+            logger.info(f"[APPCAST]    Delta from {old_version}: {meta['file_size']:,} bytes")
+            deltas.append({
+                'download_url': f'{base_url}/downloads/deltas/{name}',
+                'from_version': old_version,
+                'from_signature': meta['from_signature'],
+                'file_size': meta['file_size'],
+                'sha256': meta['sha256'],
+                'format': meta.get('format', ''),
+            })
+        return deltas
+
     # Legacy methods removed - use generate_dynamic() instead
     # Old signature-file-based methods are no longer needed
     
-    def generate_dynamic(self, base_url, dist_dir=None, version=None, language='en-US'):
+    def generate_dynamic(self, base_url, dist_dir=None, version=None, language='en-US', delta_count=3):
         """
         Dynamically generate appcast by scanning dist directory (with i18n support)
         No pre-generated signature files needed
@@ -207,6 +271,7 @@ class AppcastGenerator:
             dist_dir: Distribution directory (default: project_root/dist)
             version: Version number (default: auto-detect from VERSION file)
             language: Language code (e.g., 'en-US', 'zh-CN')
+            delta_count: Number of previous versions to publish binary deltas from (0 disables)
         
         Returns:
             str: Generated XML content or None if failed
@@ -258,7 +323,8 @@ class AppcastGenerator:
                     'version': pkg_version,
                     'os': os_type,
                     'file_size': data.get('file_size', 0),
-                    'signature': data.get('signature', '')
+                    'signature': data.get('signature', ''),
+                    'deltas': self._build_deltas(base_url, dist_dir, filename, data.get('version'), delta_count),
                 }
                 items.append(item)
             
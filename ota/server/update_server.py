@@ -492,12 +492,32 @@ def download_file(filename):
         file_size = actual_file.stat().st_size
         logger.info(f"✅ Serving file: {actual_file.name} ({file_size / 1024 / 1024:.2f} MB)")
         
-        return send_file(str(actual_file), as_attachment=True, download_name=filename)
+        # conditional=True: answer Range/If-Range requests (206) so clients can resume
+        return send_file(str(actual_file), as_attachment=True, download_name=filename, conditional=True)
         
     except Exception as e:
         logger.error(f"Download error: {e}")
         return jsonify({"error": f"Download failed: {str(e)}"}), 500
 
+@app.route('/downloads/deltas/<filename>', methods=['GET'])
+def download_delta(filename):
+    """Provide binary delta package download (exact name only, no fuzzy matching)"""
+    try:
+        project_root = Path(__file__).parent.parent.parent
+        deltas_dir = project_root / "dist" / "deltas"
+        delta_file = deltas_dir / filename
+
+        if Path(filename).name != filename or not delta_file.is_file():
+            logger.warning(f"Delta not found: {filename}")
+            return jsonify({"error": f"File not found: {filename}"}), 404
+
+        logger.info(f"✅ Serving delta: {filename} ({delta_file.stat().st_size / 1024 / 1024:.2f} MB)")
+        return send_file(str(delta_file), as_attachment=True, download_name=filename, conditional=True)
+
+    except Exception as e:
+        logger.error(f"Delta download error: {e}")
+        return jsonify({"error": f"Download failed: {str(e)}"}), 500
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check"""
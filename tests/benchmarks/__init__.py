@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for performance-sensitive paths.
+
+Each module is a standalone script, e.g.:
+    python -m tests.benchmarks.bench_task_dispatch
+"""
@@ -0,0 +1,151 @@
+"""
+Benchmark: one A2AServer (uvicorn server, thread, port) per agent vs the shared A2A gateway.
+
+For each roster size (default 1, 10 and 100 agents) a fresh interpreter builds
+the agents' A2AServers and starts them the way EC_Agent does, either
+"per-agent" (A2AServer.start() in its own daemon thread, one port each) or
+"gateway" (all registered on one A2AGateway). Startup time runs until every
+agent answers /ping; RSS is the process' resident memory after startup, with
+the baseline interpreter (imports done, no servers) shown separately.
+
+Usage:
+    python -m tests.benchmarks.bench_a2a_gateway [--agents 1 10 100]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+import psutil
+
+from agent.a2a.common.server import A2AGateway, A2AServer, InMemoryTaskManager
+from agent.a2a.common.server.gateway import agent_url
+from agent.a2a.common.types import (
+    AgentCapabilities, AgentCard, AgentSkill, Message, SendTaskResponse, TaskState, TaskStatus, TextPart,
+)
+from utils.logger_helper import logger_helper
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    """Completes every task with the agent's name"""
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    async def on_send_task(self, request):
+        await self.upsert_task(request.params)
+        message = Message(role="agent", parts=[TextPart(text=self.name)])
+        task = await self.update_store(request.params.id, TaskStatus(state=TaskState.COMPLETED, message=message), None)
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def make_card(agent_id, url):
+    return AgentCard(
+        id=agent_id, name=agent_id, description="benchmark agent", url=url, version="1.0.0",
+        capabilities=AgentCapabilities(streaming=False),
+        skills=[AgentSkill(id="echo", name="echo")],
+        defaultInputModes=["text"], defaultOutputModes=["text"],
+    )
+
+
+def free_ports(n):
+    import socket
+    sockets = [socket.socket() for _ in range(n)]
+    try:
+        for s in sockets:
+            s.bind(("127.0.0.1", 0))
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+async def wait_until_up(urls, timeout=60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2, trust_env=False) as client:
+        async def ping(url):
+            while time.monotonic() < deadline:
+                try:
+                    if (await client.get(url + "/ping")).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.01)
+            raise TimeoutError(url)
+
+        await asyncio.gather(*(ping(url) for url in urls))
+
+
+def start_per_agent(count):
+    urls = []
+    for i, port in enumerate(free_ports(count)):
+        url = f"http://127.0.0.1:{port}"
+        server = A2AServer(host="127.0.0.1", port=port, agent_card=make_card(f"agent-{i}", url),
+                           task_manager=EchoTaskManager(f"agent-{i}"))
+        threading.Thread(target=server.start, name=f"A2A-agent-{i}", daemon=True).start()
+        urls.append(url)
+    return urls
+
+
+def start_gateway(count):
+    gateway = A2AGateway(host="127.0.0.1", port=free_ports(1)[0])
+    base = f"http://127.0.0.1:{gateway.port}"
+    urls = []
+    for i in range(count):
+        url = agent_url(base, f"agent-{i}")
+        server = A2AServer(agent_card=make_card(f"agent-{i}", url), task_manager=EchoTaskManager(f"agent-{i}"))
+        gateway.register(f"agent-{i}", server)
+        gateway.start()
+        urls.append(url)
+    return urls
+
+
+def child(mode, count):
+    """Runs in a fresh interpreter so RSS and startup are not skewed by earlier runs"""
+    logger_helper.logger.setLevel(logging.ERROR)
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    start = time.perf_counter()
+    urls = (start_per_agent if mode == "per-agent" else start_gateway)(count)
+    asyncio.run(wait_until_up(urls))
+    startup = time.perf_counter() - start
+    print(json.dumps({"startup": startup, "rss": process.memory_info().rss, "baseline": baseline,
+                      "threads": threading.active_count(), "ports": len({u.split("/")[2] for u in urls})}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    for count in args.agents:
+        for mode in ("per-agent", "gateway"):
+            out = subprocess.run([sys.executable, "-m", "tests.benchmarks.bench_a2a_gateway", "--child", mode,
+                                  str(count)], capture_output=True, text=True, check=True,
+                                 cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"agents={count:<4} {mode:9}: startup {r['startup'] * 1000:8.1f} ms  "
+                  f"rss {r['rss'] / 2**20:6.1f} MiB (+{(r['rss'] - r['baseline']) / 2**20:5.1f} over imports)  "
+                  f"threads {r['threads']:4}  ports {r['ports']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark: A2A group sends with a fresh HTTP client per message vs the pooled transport.
+
+Starts N minimal keep-alive JSON-RPC "agents" on localhost (default 50, each on
+its own port, served from a separate thread/event loop) and fans a message out
+to all of them with asyncio.gather, as UnifiedMessenger.send_to_group does.
+"per-request" opens a new httpx.AsyncClient per message (the original
+A2AClient behaviour); "pooled" is A2AClient.send_task(url=...) on the shared
+A2ATransportPool. Reports group-send latency and TCP connections accepted.
+
+Usage:
+    python -m tests.benchmarks.bench_a2a_group_send [--agents 50] [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+
+from agent.a2a.common.client import A2AClient, A2ATransportPool
+from agent.a2a.common.types import Message, SendTaskRequest, TaskSendParams, TextPart
+from utils.logger_helper import logger_helper
+
+
+class LocalAgents:
+    """N keep-alive HTTP/1.1 JSON-RPC endpoints answering tasks/send"""
+
+    def __init__(self, count):
+        self.count = count
+        self.urls = []
+        self.connections = 0
+        self._servers = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def __enter__(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _shutdown(self):
+        for server in self._servers:
+            server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        for i in range(self.count):
+            server = self._loop.run_until_complete(
+                asyncio.start_server(lambda r, w, n=f"agent-{i}": self._serve(r, w, n), "127.0.0.1", 0)
+            )
+            self._servers.append(server)
+            self.urls.append(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/a2a/")
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _serve(self, reader, writer, name):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                request = json.loads(await reader.readexactly(length))
+                body = json.dumps({
+                    "jsonrpc": "2.0",
+                    "id": request["id"],
+                    "result": {
+                        "id": request["params"]["id"],
+                        "status": {"state": "completed",
+                                   "message": {"role": "agent", "parts": [{"type": "text", "text": name}]}},
+                    },
+                }).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def make_payload(session_id):
+    message = Message(role="user", parts=[TextPart(text="status update for the group")])
+    return TaskSendParams(id=str(uuid4()), sessionId=session_id, message=message,
+                          acceptedOutputModes=["text", "json"]).model_dump()
+
+
+async def per_request_send(url, payload):
+    async with httpx.AsyncClient(timeout=30, trust_env=False) as client:
+        response = await client.post(url, json=SendTaskRequest(params=payload).model_dump())
+        response.raise_for_status()
+        return response.json()
+
+
+async def run_rounds(agents, rounds, send):
+    latencies = []
+    for _ in range(rounds):
+        session_id = str(uuid4())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(send(url, make_payload(session_id)) for url in agents.urls))
+        latencies.append(time.perf_counter() - start)
+        assert len(results) == len(agents.urls)
+    return latencies
+
+
+def report(label, latencies, connections):
+    print(f"{label:12}: median {statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms  "
+          f"total {sum(latencies):6.2f} s  connections {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # Per-request debug logging would dominate both columns
+    logger_helper.logger.setLevel(logging.INFO)
+    print(f"agents={args.agents} rounds={args.rounds}")
+
+    with LocalAgents(args.agents) as agents:
+        before = agents.connections
+        old = asyncio.run(run_rounds(agents, args.rounds, per_request_send))
+        report("per-request", old, agents.connections - before)
+
+        async def pooled():
+            pool = A2ATransportPool()
+            client = A2AClient(url=agents.urls[0], timeout=30, transport=pool)
+
+            async def send(url, payload):
+                response = await client.send_task(payload, url=url)
+                assert response.result.status.message.parts[0].text == f"agent-{agents.urls.index(url)}"
+                return response
+
+            try:
+                return await run_rounds(agents, args.rounds, send)
+            finally:
+                await pool.aclose()
+
+        before = agents.connections
+        new = asyncio.run(pooled())
+        report("pooled", new, agents.connections - before)
+        print(f"speedup     : {sum(old) / sum(new):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark: calling coroutines from sync code through utils.async_loop_pool
+vs the old run_async_in_sync / run_async_in_worker_thread, which built a
+fresh event loop (and, for the worker variant, a fresh thread) per call.
+
+Scenarios, each as calls/sec plus p50/p99 latency per call:
+
+  noop   - `await asyncio.sleep(0)`: pure bridging overhead
+  http   - one GET to a local keep-alive HTTP server with httpx. A fresh loop
+           needs a new AsyncClient (and TCP connection) per call; the pool
+           reuses one per loop via loop_resource()
+  sleep  - `await asyncio.sleep(--sleep-ms)` from --threads caller threads at
+           once, like parallel LangGraph nodes waiting on an LLM
+
+Usage:
+    python -m tests.benchmarks.bench_async_loop_pool [--calls 2000] [--threads 16] [--sleep-ms 20] [--loops 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.async_loop_pool import AsyncLoopPool, loop_resource, run_in_fresh_loop
+
+
+def legacy_run_async_in_sync(awaitable):
+    """run_async_in_sync before the pool: a fresh loop on the caller thread."""
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(awaitable)
+    finally:
+        try:
+            pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+            for t in pending:
+                t.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        except Exception:
+            pass
+        loop.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def make_scenarios(url, sleep_s):
+    import httpx
+
+    async def noop():
+        await asyncio.sleep(0)
+
+    async def http_fresh_client():
+        async with httpx.AsyncClient(trust_env=False) as client:
+            return (await client.get(url)).status_code
+
+    async def http_pooled_client():
+        client = loop_resource("bench.httpx", lambda: httpx.AsyncClient(trust_env=False))
+        return (await client.get(url)).status_code
+
+    async def sleep():
+        await asyncio.sleep(sleep_s)
+
+    return noop, http_fresh_client, http_pooled_client, sleep
+
+
+def measure(call, calls, threads=1):
+    """Run `calls` calls of call() from `threads` threads; returns (calls/sec, sorted latencies)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        mine = []
+        for _ in range(n):
+            start = time.perf_counter()
+            call()
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for future in [executor.submit(worker, calls // threads) for _ in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, sorted(latencies)
+
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def report(label, result):
+    rate, latencies = result
+    print(f"  {label:<34} {rate:9.0f} calls/s   p50 {pct(latencies, 0.5):7.2f} ms   p99 {pct(latencies, 0.99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--sleep-ms", type=float, default=20)
+    parser.add_argument("--loops", type=int, default=4)
+    args = parser.parse_args()
+
+    server, url = start_server()
+    noop, http_fresh_client, http_pooled_client, sleep = make_scenarios(url, args.sleep_ms / 1000)
+    pool = AsyncLoopPool(max_loops=args.loops)
+    try:
+        print(f"noop coroutine, {args.calls} sequential calls:")
+        report("fresh loop on caller thread (old)", measure(lambda: legacy_run_async_in_sync(noop()), args.calls))
+        report("fresh thread + loop (old worker)", measure(lambda: run_in_fresh_loop(noop), args.calls))
+        report("pooled loop", measure(lambda: pool.run(noop), args.calls))
+
+        http_calls = max(1, args.calls // 4)
+        print(f"HTTP GET to {url}, {http_calls} sequential calls:")
+        report("fresh loop + new client (old)", measure(lambda: legacy_run_async_in_sync(http_fresh_client()),
+                                                         http_calls))
+        report("pooled loop + new client", measure(lambda: pool.run(http_fresh_client), http_calls))
+        report("pooled loop + per-loop client", measure(lambda: pool.run(http_pooled_client), http_calls))
+        print(f"HTTP GET, {http_calls} calls from {args.threads} threads:")
+        report("fresh loop + new client (old)", measure(lambda: legacy_run_async_in_sync(http_fresh_client()),
+                                                         http_calls, args.threads))
+        report("pooled loop + per-loop client", measure(lambda: pool.run(http_pooled_client), http_calls,
+                                                         args.threads))
+
+        sleep_calls = args.threads * max(1, args.calls // 100)
+        print(f"sleep {args.sleep_ms:g} ms, {sleep_calls} calls from {args.threads} threads:")
+        report("fresh loop on caller thread (old)", measure(lambda: legacy_run_async_in_sync(sleep()),
+                                                             sleep_calls, args.threads))
+        report(f"pooled, {args.loops} loops", measure(lambda: pool.run(sleep), sleep_calls, args.threads))
+        print(f"pool: {pool.stats()['loops']} loop thread(s) used")
+    finally:
+        pool.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
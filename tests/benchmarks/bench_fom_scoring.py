@@ -0,0 +1,92 @@
+"""
+Benchmark: per-item FOM scoring vs the compiled, column-wise engine.
+
+Builds synthetic parametric search results (default 50k parts) and scores
+them with a FOM form mixing formulas, LUTs and nested subcomponents. The
+"per-item" column walks every item through _score_item (one ast.parse and
+AST walk per formula and one LUT coercion/sort per lookup, as the original
+calculate_score did, minus its debug prints); "compiled" is calculate_score.
+Scores are checked to be identical.
+
+Usage:
+    python -m tests.benchmarks.bench_fom_scoring [--parts 50000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agent.mcp.server.scrapers.eval_util import _score_item, calculate_score, compile_formula
+from utils.logger_helper import logger_helper
+
+
+FOM = {
+    "components": [
+        {"name": "price", "raw_value": 125, "score_formula": "min(max(80 + (125 - price), 0), 100)", "score_lut": {}, "weight": 0.3},
+        {"name": "availability", "raw_value": 0, "score_formula": "", "score_lut": {"20": 100, "10": 80, "8": 60, "0": 0}, "weight": 0.2},
+        {
+            "name": "performance",
+            "raw_value": {
+                "vout_min": {"raw_value": 0, "score_formula": "min(max((vout_min - 2.5) / (3.0 - 2.5) * 100, 0), 100)", "weight": 0.4},
+                "vout_max": {"raw_value": 0, "score_formula": "min(max((vout_max - 3.5) / (3.0 - 3.5) * 100, 0), 100)", "weight": 0.3},
+                "current": {"raw_value": 0, "score_formula": "100 * sqrt(current / 1000)", "weight": 0.3},
+            },
+            "weight": 0.4,
+        },
+        {"name": "quality", "raw_value": 50, "score_formula": "", "score_lut": {"0": 0, "50": 70, "100": 100}, "weight": 0.1},
+    ]
+}
+
+
+def make_parts(n, seed=1):
+    rng = random.Random(seed)
+    parts = []
+    for i in range(n):
+        part = {
+            "part_number": f"LDO-{i:06d}",
+            "price": round(rng.uniform(10, 300), 2),
+            "availability": rng.randint(0, 30),
+            "vout_min": round(rng.uniform(0.8, 3.3), 3),
+            "vout_max": round(rng.uniform(3.0, 15.0), 2),
+            "current": rng.choice([50, 100, 150, 300, 500, 1000, 1500]),
+        }
+        if rng.random() < 0.8:
+            part["quality"] = rng.randint(0, 100)
+        parts.append(part)
+    return parts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=50000)
+    args = parser.parse_args()
+
+    # Per-item debug logging would dominate both columns
+    logger_helper.logger.setLevel(logging.INFO)
+
+    parts = make_parts(args.parts)
+    print(f"parts={args.parts} components={len(FOM['components'])}")
+
+    old_t, old_scores = timed(lambda: [_score_item(p, FOM["components"], clamp=True) for p in parts])
+    compile_formula.cache_clear()
+    new_t, scored = timed(lambda: calculate_score(FOM, [dict(p) for p in parts], clamp=True))
+    new_scores = [p["score"] for p in scored]
+    assert new_scores == old_scores, "compiled scores differ from the per-item path"
+
+    print(f"per-item : {old_t:8.3f} s  ({args.parts / old_t:10.0f} parts/s)")
+    print(f"compiled : {new_t:8.3f} s  ({args.parts / new_t:10.0f} parts/s, {old_t / new_t:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark: opening, paging, filtering, searching and tailing a multi-GB log
+with utils.log_index, vs the log viewer's old read-everything approach.
+
+Generates a synthetic logger_helper-format log of --size-mb (default 2048 MB;
+mixed levels, ~4% ERROR lines with tracebacks), or uses --file. Each mode runs
+in a fresh child process so its peak RSS is its own:
+
+  index  - cold open (line index), level pass, warm reopen from the saved
+           index, random pages, ERROR-filter pages, search (first results and
+           full scan) and tailing 1 MB appended to the log (removed again)
+  legacy - what FileReaderThread + _filter_logs did: read the whole file
+           into one string, then split it into lines to filter by level.
+           Runs on the first --legacy-mb (default 256) MB only, since a full
+           2 GB read needs several GB of RAM.
+
+Usage:
+    python -m tests.benchmarks.bench_log_index [--size-mb 2048] [--legacy-mb 256] [--file PATH] [--keep]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+LEVEL_MIX = ["DEBUG"] * 12 + ["INFO"] * 6 + ["WARNING"] + ["ERROR"]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def generate(path, size_mb, seed=1):
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        second = 0
+        while f.tell() < target:
+            lines = []
+            for i in range(20000):
+                second += 1
+                level = rng.choice(LEVEL_MIX)
+                stamp = f"2025-11-{6 + second // 86400 % 20:02d} {second // 3600 % 24:02d}:{second // 60 % 60:02d}:{second % 60:02d},{i % 1000:03d}"
+                lines.append(f"{stamp} - eCan - {level} - [Agent] task_id={second}-{i} skill=run_{rng.randrange(50)} "
+                             f"queue_depth={rng.randrange(100)} detail={'x' * rng.randrange(10, 90)}\n")
+                if level == "ERROR":
+                    lines.append(f'Traceback (most recent call last):\n  File "skill.py", line {i}, in run\n'
+                                 f"ValueError: bad input {second}\n")
+            f.write("".join(lines))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def child_index(path, index_dir):
+    from utils.log_index import LogIndex, compile_pattern
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    out = {"size_mb": os.path.getsize(path) / (1024 * 1024)}
+    index, out["cold_open_s"] = timed(lambda: LogIndex(path, index_dir=index_dir).open())
+    out["lines"] = index.line_count
+    _, out["levels_s"] = timed(index.build_levels)
+    out["index_kb"] = os.path.getsize(index.index_path) / 1024
+    index, out["warm_open_s"] = timed(lambda: LogIndex(path, index_dir=index_dir).open())
+    out["reused"] = index.reused
+
+    rng = random.Random(2)
+    pages = []
+    for _ in range(200):
+        start = rng.randrange(index.line_count)
+        pages.append(timed(lambda: index.read_lines(start, 100))[1])
+    out["page_ms"] = sorted(pages)
+    errors = index.level_count("ERROR")
+    out["errors"] = errors
+    level_pages = []
+    for _ in range(200):
+        start = rng.randrange(errors)
+        level_pages.append(timed(lambda: index.read_level_lines("ERROR", start, 100))[1])
+    out["error_page_ms"] = sorted(level_pages)
+
+    # A term on every line: time until the first screenful of results
+    start = time.perf_counter()
+    found = 0
+    for hits, _ in index.search(compile_pattern("skill=run_7 ", regex=False)):
+        found += len(hits)
+        if found >= 100:
+            break
+    out["search_first_s"] = time.perf_counter() - start
+    for key, pattern, level in (
+        ("search_text", compile_pattern("TASK_ID=12345-", regex=False), None),
+        ("search_regex", compile_pattern(r"task_id=1234\d-"), None),
+        ("search_error", compile_pattern("skill=run_7 ", regex=False), "ERROR"),
+    ):
+        hits, out[f"{key}_s"] = timed(lambda: sum(len(h) for h, _ in index.search(pattern, level=level)))
+        out[f"{key}_hits"] = hits
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2025-12-01 00:00:00,000 - eCan - INFO - appended line\n" * 20000)
+    update, out["tail_s"] = timed(index.refresh)
+    out["tail_lines"] = update.lines
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 20000 * 54)
+    index.close()
+    out["peak_rss_mb"] = peak_rss_mb()
+    return out
+
+
+def child_legacy(path, limit_mb):
+    out = {}
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read(limit_mb * 1024 * 1024)
+    out["read_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    lines = content.split("\n")
+    filtered = [line for line in lines if (" - ERROR - " in line) or ("ERROR" in line)]
+    out["filter_s"] = time.perf_counter() - start
+    out["errors"] = len(filtered)
+    start = time.perf_counter()
+    matches = [line for line in lines if "skill=run_7 " in line.lower()]
+    out["search_s"] = time.perf_counter() - start
+    out["search_hits"] = len(matches)
+    out["size_mb"] = limit_mb
+    out["peak_rss_mb"] = peak_rss_mb()
+    return out
+
+
+def run_child(mode, *args):
+    proc = subprocess.run([sys.executable, "-m", "tests.benchmarks.bench_log_index", "--child", mode, *args],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(
+                              os.path.abspath(__file__)))))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--legacy-mb", type=int, default=256)
+    parser.add_argument("--file", help="existing log to use instead of generating one")
+    parser.add_argument("--keep", action="store_true", help="keep the generated log")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path, extra = args.child[0], args.child[1], args.child[2]
+        result = child_index(path, extra) if mode == "index" else child_legacy(path, int(extra))
+        print(json.dumps(result))
+        return
+
+    tmp = tempfile.mkdtemp(prefix="bench_log_index_")
+    path = args.file
+    try:
+        if not path:
+            path = os.path.join(tmp, "eCan.log")
+            print(f"generating {args.size_mb} MB log ...", flush=True)
+            _, took = timed(lambda: generate(path, args.size_mb))
+            print(f"  done in {took:.1f} s")
+
+        r = run_child("index", path, os.path.join(tmp, ".logindex"))
+        print(f"indexed: {r['size_mb']:.0f} MB, {r['lines']:,} lines, index file {r['index_kb']:.0f} KB")
+        print(f"  cold open (line index)    {r['cold_open_s']:7.2f} s")
+        print(f"  level pass (background)   {r['levels_s']:7.2f} s")
+        print(f"  warm reopen (saved index) {r['warm_open_s'] * 1000:7.1f} ms  reused={r['reused']}")
+        print(f"  100-line page, random     p50 {pct(r['page_ms'], 0.5):6.2f} ms  p99 {pct(r['page_ms'], 0.99):6.2f} ms")
+        print(f"  100 ERROR lines, random   p50 {pct(r['error_page_ms'], 0.5):6.2f} ms  "
+              f"p99 {pct(r['error_page_ms'], 0.99):6.2f} ms  ({r['errors']:,} ERROR lines)")
+        print(f"  search, first 100 hits    {r['search_first_s'] * 1000:7.1f} ms")
+        print(f"  search text, full scan    {r['search_text_s']:7.2f} s  ({r['search_text_hits']:,} hits)")
+        print(f"  search regex, full scan   {r['search_regex_s']:7.2f} s  ({r['search_regex_hits']:,} hits)")
+        print(f"  search within ERROR       {r['search_error_s']:7.2f} s  ({r['search_error_hits']:,} hits)")
+        print(f"  tail 1 MB appended        {r['tail_s'] * 1000:7.1f} ms  ({r['tail_lines']:,} lines)")
+        print(f"  peak RSS                  {r['peak_rss_mb']:7.0f} MB")
+
+        legacy_mb = min(args.legacy_mb, int(r["size_mb"]))
+        r = run_child("legacy", path, str(legacy_mb))
+        print(f"legacy read-everything on the first {legacy_mb} MB:")
+        print(f"  read                      {r['read_s']:7.2f} s")
+        print(f"  filter ERROR (split)      {r['filter_s']:7.2f} s  ({r['errors']:,} lines)")
+        print(f"  search                    {r['search_s']:7.2f} s  ({r['search_hits']:,} hits)")
+        print(f"  peak RSS                  {r['peak_rss_mb']:7.0f} MB")
+        full_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"  => ~{r['peak_rss_mb'] / legacy_mb * full_mb / 1024:.1f} GB peak RSS for the full file")
+    finally:
+        if args.keep and not args.file:
+            print(f"kept {path}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
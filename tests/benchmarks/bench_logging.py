@@ -0,0 +1,142 @@
+"""
+Benchmark: per-call logging latency, synchronous handlers vs the queued pipeline.
+
+"sync" attaches the console (colorlog) and rotating file handlers directly to
+the logger, as logger_helper used to, so every call formats and writes in the
+calling thread. "queued" uses logger_helper.start_queued_logging(): calls only
+enqueue records, and one writer thread formats, writes and flushes per batch.
+Each run has T threads (default 8) each logging N lines (default 5000) of
+realistic length; the console stream is /dev/null. Reports per-call latency
+percentiles seen by the callers and total wall time including the drain.
+
+Also measures a disabled DEBUG line that logs a large run state: an eager
+f-string vs passing the object / a lazy() argument to logger_helper.
+
+Usage:
+    python -m tests.benchmarks.bench_logging [--threads 8] [--calls 5000]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import colorlog
+
+from utils.logger_helper import (
+    BatchedRotatingFileHandler, BatchedStreamHandler, lazy, logger_helper, start_queued_logging,
+)
+
+MESSAGE = "[A2A] Receiving incoming request to agent: bench agent, task_id=%s session=4f2a9c queue_depth=%d"
+
+
+def make_handlers(log_file, devnull):
+    console = BatchedStreamHandler(devnull)
+    console.setFormatter(colorlog.ColoredFormatter(
+        "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    file_handler = BatchedRotatingFileHandler(log_file, maxBytes=1024 * 1024 * 10, backupCount=5,
+                                              encoding="utf-8", errors="replace")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    return [console, file_handler]
+
+
+def hammer(bench_logger, threads, calls):
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        out = latencies[n]
+        barrier.wait()
+        for i in range(calls):
+            message = MESSAGE % (f"{n}-{i}", i)
+            start = time.perf_counter_ns()
+            bench_logger.info(message)
+            out.append(time.perf_counter_ns() - start)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sorted(x for per_thread in latencies for x in per_thread)
+
+
+def run_pipeline(mode, threads, calls):
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        bench_logger = logging.getLogger(f"bench-{mode}")
+        bench_logger.setLevel(logging.DEBUG)
+        bench_logger.propagate = False
+        handlers = make_handlers(os.path.join(tmp, "bench.log"), devnull)
+        listener = None
+        if mode == "sync":
+            for handler in handlers:
+                bench_logger.addHandler(handler)
+        else:
+            # Large enough that nothing is dropped: the comparison is about caller latency, not loss
+            queue_handler, listener = start_queued_logging(bench_logger, handlers, queue_size=threads * calls)
+        start = time.perf_counter()
+        latencies = hammer(bench_logger, threads, calls)
+        returned = time.perf_counter() - start
+        if listener:
+            listener.stop()
+        drained = time.perf_counter() - start
+        for handler in list(bench_logger.handlers):
+            bench_logger.removeHandler(handler)
+        for handler in handlers:
+            handler.close()
+        with open(os.path.join(tmp, "bench.log"), encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+    assert lines == threads * calls, (lines, threads * calls)
+    return latencies, returned, drained
+
+
+def pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] / 1000
+
+
+def disabled_debug(iterations):
+    state = {"messages": [f"message {i} " * 20 for i in range(200)], "attributes": {"k": list(range(500))}}
+    previous = logger_helper.logger.level
+    logger_helper.logger.setLevel(logging.INFO)
+    try:
+        results = {}
+        for label, call in (
+            ("eager f-string", lambda: logger_helper.debug(f"run state: {state}")),
+            ("object arg", lambda: logger_helper.debug("run state:", state)),
+            ("lazy() arg", lambda: logger_helper.debug("run state:", lazy(repr, state))),
+        ):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                call()
+            results[label] = (time.perf_counter() - start) / iterations * 1e9
+        return results
+    finally:
+        logger_helper.logger.setLevel(previous)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"threads={args.threads} calls/thread={args.calls}")
+    for mode in ("sync", "queued"):
+        latencies, returned, drained = run_pipeline(mode, args.threads, args.calls)
+        print(f"{mode:6}: p50 {pct(latencies, 0.5):7.1f} us  p99 {pct(latencies, 0.99):8.1f} us  "
+              f"max {latencies[-1] / 1000:9.1f} us  mean {statistics.fmean(latencies) / 1000:7.1f} us  "
+              f"callers done {returned:5.2f} s  written {drained:5.2f} s")
+
+    print("disabled DEBUG line logging a large run state:")
+    for label, ns in disabled_debug(2000).items():
+        print(f"  {label:15}: {ns / 1000:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
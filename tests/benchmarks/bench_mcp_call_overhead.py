@@ -0,0 +1,148 @@
+"""
+Benchmark: per-call overhead of MCP tool calls to the in-process server, over
+streamable HTTP vs in-process dispatch.
+
+Serves a minimal MCP server (one no-op "echo" tool) with uvicorn on a background
+thread, laid out like gui/LocalServer.py (its own event loop, /mcp/ endpoint,
+registered for in-process dispatch in the app lifespan), then times
+MCPClientManager.call_tool() from the main thread:
+"http" uses the persistent streamable HTTP session (ECAN_MCP_DIRECT_DISPATCH=0),
+"in-process" hands the call to the server's handler on its loop.
+
+Usage:
+    python -m tests.benchmarks.bench_mcp_call_overhead [--calls 500]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import uvicorn
+from mcp import types
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from agent.mcp.local_dispatch import register_local_mcp_server, unregister_local_mcp_server
+from utils.logger_helper import logger_helper
+
+
+def make_server():
+    server = Server("bench")
+
+    @server.list_tools()
+    async def list_tools():
+        return [types.Tool(name="echo", description="Echo text back",
+                           inputSchema={"type": "object", "properties": {"text": {"type": "string"}},
+                                        "required": ["text"]})]
+
+    @server.call_tool()
+    async def call_tool(name, args):
+        return [types.TextContent(type="text", text=args["text"])]
+
+    return server
+
+
+class LocalMCPServer:
+    """Runs `server` like LocalServer: uvicorn thread, /mcp/ mount, lifespan registration"""
+
+    def __init__(self, server):
+        self.server = server
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self._uvicorn = None
+        self._thread = None
+        self._saved_port = None
+
+    def __enter__(self):
+        manager = StreamableHTTPSessionManager(app=self.server, json_response=True)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with manager.run():
+                register_local_mcp_server(self.server, asyncio.get_running_loop())
+                try:
+                    yield
+                finally:
+                    unregister_local_mcp_server()
+
+        app = Starlette(routes=[Mount("/mcp", app=manager.handle_request)], lifespan=lifespan)
+        self._uvicorn = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning",
+                                                      log_config=None, loop="asyncio", http="h11"))
+        self._thread = threading.Thread(target=self._uvicorn.run, daemon=True)
+        self._thread.start()
+        while not self._uvicorn.started:
+            time.sleep(0.01)
+        self._saved_port = os.environ.get("ECAN_LOCAL_SERVER_PORT")
+        os.environ["ECAN_LOCAL_SERVER_PORT"] = str(self.port)
+        return self
+
+    def __exit__(self, *exc):
+        self._uvicorn.should_exit = True
+        # Its lifespan unregisters the in-process server; let that happen before another one starts
+        self._thread.join(5)
+        if self._saved_port is None:
+            os.environ.pop("ECAN_LOCAL_SERVER_PORT", None)
+        else:
+            os.environ["ECAN_LOCAL_SERVER_PORT"] = self._saved_port
+
+    @property
+    def url(self):
+        from agent.mcp.config import mcp_http_base
+        return mcp_http_base()
+
+
+async def time_calls(url, calls):
+    from agent.mcp.local_client import mcp_client_manager
+    # Warm up (opens the persistent HTTP session on the first call)
+    await mcp_client_manager.call_tool(url, "echo", {"text": "warmup"})
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        result = await mcp_client_manager.call_tool(url, "echo", {"text": f"call {i}"})
+        latencies.append(time.perf_counter() - start)
+        assert isinstance(result, types.CallToolResult) and result.content[0].text == f"call {i}"
+    await mcp_client_manager.close()
+    return latencies
+
+
+def report(label, latencies):
+    print(f"{label:11}: median {statistics.median(latencies) * 1e6:9.0f} us  "
+          f"mean {statistics.mean(latencies) * 1e6:9.0f} us  total {sum(latencies):6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    # Per-call debug logging would dominate both columns
+    logger_helper.logger.setLevel(logging.INFO)
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    print(f"calls={args.calls}")
+
+    with LocalMCPServer(make_server()) as local:
+        os.environ["ECAN_MCP_DIRECT_DISPATCH"] = "0"
+        http = asyncio.run(time_calls(local.url, args.calls))
+        report("http", http)
+
+        os.environ["ECAN_MCP_DIRECT_DISPATCH"] = "1"
+        direct = asyncio.run(time_calls(local.url, args.calls))
+        report("in-process", direct)
+        os.environ.pop("ECAN_MCP_DIRECT_DISPATCH", None)
+        print(f"speedup    : {statistics.median(http) / statistics.median(direct):.1f}x per call")
+
+
+if __name__ == "__main__":
+    main()
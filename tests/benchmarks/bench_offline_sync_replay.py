@@ -0,0 +1,165 @@
+"""
+Benchmark: replaying an offline sync backlog one task per request vs batched replay.
+
+Queues N skill changes in an OfflineSyncQueue (default 2000: adds plus repeated
+updates of the same skills, as an editing session while offline produces),
+then replays them against a local AppSync stand-in that answers the add/update/
+remove mutations with a fixed per-request latency (default 20 ms).
+The queue coalesces repeated updates as they are added, so both runs start
+from one task per skill. "per-task" replays them like the original
+OfflineSyncManager loop (one single-item mutation per task, sequentially);
+"batched" is sync_pending_queue(), which sends multi-item mutations per data
+type and operation and runs a few at once.
+
+Usage:
+    python -m tests.benchmarks.bench_offline_sync_replay [--changes 2000] [--skills 500] [--latency 0.02]
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agent.cloud_api.cloud_api_service import CloudAPIService, get_cloud_service
+from agent.cloud_api.offline_sync_manager import OfflineSyncManager
+from agent.cloud_api.offline_sync_queue import OfflineSyncQueue
+from utils.logger_helper import logger_helper
+
+_MUTATION = re.compile(r"mutation \w+ \{ (\w+)\(input: (.*)\) \{")
+_ITEM_ID = re.compile(r'(?:^|[{,]\s*)id: "([^"]*)"')
+_REMOVED_ID = re.compile(r'"([^"]*)"')
+
+
+class LocalAppSync:
+    """Minimal AppSync GraphQL endpoint for list mutations (add*/update*/remove*)"""
+
+    def __init__(self, latency=0.0, reject_ids=()):
+        self.latency = latency
+        self.reject_ids = set(reject_ids)
+        self.calls = []  # (mutation name, [item ids])
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/graphql"
+
+    def __enter__(self):
+        appsync = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                response = appsync.handle(body["query"])
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, query):
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.latency)
+            name, items = _MUTATION.search(query).groups()
+            pattern = _REMOVED_ID if name.startswith("remove") else _ITEM_ID
+            ids = pattern.findall(items)
+            with self._lock:
+                self.calls.append((name, ids))
+            if self.reject_ids.intersection(ids):
+                return {"data": {name: None}, "errors": [{"message": "rejected item"}]}
+            return {"data": {name: [{"id": i, "success": True, "error": None} for i in ids]}}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def items_sent(self):
+        return sum(len(ids) for _, ids in self.calls)
+
+
+@contextlib.contextmanager
+def cloud_endpoint(url):
+    """Point CloudAPIService at `url` with a dummy token (normally taken from the main window)"""
+    with mock.patch.object(CloudAPIService, "_get_auth_token", return_value="local-token"), \
+            mock.patch.object(CloudAPIService, "_get_api_endpoint", return_value=url):
+        yield
+
+
+def fill_queue(queue, changes, skills):
+    for i in range(changes):
+        skill_id = f"skill-{i % skills}"
+        queue.add("skill", {"id": skill_id, "name": f"{skill_id} v{i // skills}", "owner": "bench@example.com"},
+                  "add" if i < skills else "update")
+
+
+def per_task_replay(queue):
+    for task in queue.get_pending_tasks():
+        result = get_cloud_service(task["data_type"]).sync_to_cloud([task["data"]], operation=task["operation"],
+                                                                    timeout=10)
+        if result["success"]:
+            queue.mark_success(task["id"])
+        else:
+            queue.mark_failed(task["id"], ", ".join(result["errors"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--changes", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    # Per-request logging would dominate both columns
+    logger_helper.logger.setLevel(logging.ERROR)
+    print(f"changes={args.changes} skills={args.skills} latency={args.latency * 1000:.0f} ms")
+
+    for label in ("per-task", "batched"):
+        with tempfile.TemporaryDirectory() as tmp, LocalAppSync(latency=args.latency) as appsync, \
+                cloud_endpoint(appsync.url), contextlib.redirect_stdout(open(os.devnull, "w")):
+            queue = OfflineSyncQueue(cache_dir=tmp)
+            start = time.perf_counter()
+            fill_queue(queue, args.changes, args.skills)
+            queued = time.perf_counter() - start
+            start = time.perf_counter()
+            if label == "per-task":
+                per_task_replay(queue)
+            else:
+                manager = OfflineSyncManager(sync_queue=queue)
+                manager.sync_pending_queue()
+                manager.stop_auto_retry()
+            replayed = time.perf_counter() - start
+            remaining = queue.get_stats()["pending_count"]
+            queue.close()
+        sys.stdout.write(f"{label:9}: queue {queued:6.2f} s  replay {replayed:6.2f} s  requests {len(appsync.calls):5}  "
+                         f"items {appsync.items_sent():5}  left {remaining}\n")
+
+
+if __name__ == "__main__":
+    main()
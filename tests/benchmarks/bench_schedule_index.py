@@ -0,0 +1,113 @@
+"""
+Benchmark: full-scan find_tasks_ready_to_run vs ScheduleIndex.
+
+Builds synthetic scheduled tasks (mixed seconds..years repeats) and times
+scheduler ticks. The "scan" column clears the parse cache before every tick
+to reproduce the per-tick strptime cost of the original scheduler.
+
+Usage:
+    python -m tests.benchmarks.bench_schedule_index [--tasks 10000] [--ticks 50]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agent.ec_tasks.models import RepeatType, TaskSchedule
+from agent.ec_tasks.scheduler import (
+    SCHEDULE_DATETIME_FMT,
+    ScheduleIndex,
+    _parse_schedule_cached,
+    find_tasks_ready_to_run,
+)
+from utils.logger_helper import logger_helper
+
+
+def make_tasks(n, t0, seed=1):
+    rng = random.Random(seed)
+    kinds = [
+        (RepeatType.BY_MINUTES, 30),
+        (RepeatType.BY_HOURS, 1),
+        (RepeatType.BY_HOURS, 6),
+        (RepeatType.BY_DAYS, 1),
+        (RepeatType.BY_WEEKS, 1),
+        (RepeatType.BY_MONTHS, 1),
+        (RepeatType.BY_YEARS, 1),
+    ]
+    tasks = []
+    for i in range(n):
+        repeat_type, number = rng.choice(kinds)
+        # Schedules started years ago stress the month/year bound calculation
+        start = t0 - timedelta(days=rng.randint(0, 3650), seconds=rng.randint(0, 86400), microseconds=i)
+        end = t0 + timedelta(days=rng.randint(30, 3650))
+        tasks.append(SimpleNamespace(
+            name=f"task{i}",
+            trigger="schedule",
+            schedule=TaskSchedule(
+                repeat_type=repeat_type,
+                repeat_number=number,
+                repeat_unit="",
+                start_date_time=start.strftime(SCHEDULE_DATETIME_FMT),
+                end_date_time=end.strftime(SCHEDULE_DATETIME_FMT),
+                time_out=60,
+            ),
+            # Already ran recently: the common steady state
+            last_run_datetime=t0 - timedelta(seconds=1),
+            already_run_flag=True,
+        ))
+    return tasks
+
+
+def bench_scan(tasks, t0, ticks):
+    start = time.perf_counter()
+    for i in range(ticks):
+        _parse_schedule_cached.cache_clear()
+        find_tasks_ready_to_run(tasks, now=t0 + timedelta(seconds=i))
+    return (time.perf_counter() - start) / ticks
+
+
+def bench_index(tasks, t0, ticks):
+    index = ScheduleIndex()
+    build_start = time.perf_counter()
+    find_tasks_ready_to_run(tasks, index=index, now=t0)
+    build = time.perf_counter() - build_start
+
+    start = time.perf_counter()
+    for i in range(1, ticks + 1):
+        find_tasks_ready_to_run(tasks, index=index, now=t0 + timedelta(seconds=i))
+    per_tick = (time.perf_counter() - start) / ticks
+    return build, per_tick, index.seconds_until_next_due(now=t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    # Per-task debug logging would dominate both variants
+    logger_helper.logger.setLevel(logging.INFO)
+
+    t0 = datetime(2025, 6, 1, 12, 0, 0)
+    scan_tasks = make_tasks(args.tasks, t0)
+    index_tasks = make_tasks(args.tasks, t0)
+
+    scan = bench_scan(scan_tasks, t0, args.ticks)
+    build, tick, next_due = bench_index(index_tasks, t0, args.ticks)
+
+    print(f"tasks={args.tasks} ticks={args.ticks}")
+    print(f"full scan      : {scan * 1000:9.2f} ms/tick")
+    print(f"index build    : {build * 1000:9.2f} ms (once)")
+    print(f"index          : {tick * 1000:9.2f} ms/tick  ({scan / tick if tick else float('inf'):.0f}x)")
+    print(f"next due in    : {next_due:.0f} s (schedule loop sleeps this long)")
+
+
+if __name__ == "__main__":
+    main()
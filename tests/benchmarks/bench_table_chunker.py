@@ -0,0 +1,196 @@
+"""
+Benchmark: per-row tokenization vs estimate-and-verify packing in UniversalTableChunker.
+
+Builds a synthetic spreadsheet (default 500k rows) in the two formats the
+chunker sees most, a Markdown table and LightRAG's "Sheet:" Excel extraction,
+and times universal_chunking_func against the original pipeline ("per-row",
+kept here as a reference): one encode and stop check per row, then one more
+encode per chunk for validation. New chunks are checked to stay within the
+token limit and to keep every row in order.
+
+Uses tiktoken's cl100k_base when it can be loaded; offline, a byte-level
+tiktoken encoding with the same split pattern stands in (same per-call
+overhead, cheaper BPE).
+
+Usage:
+    python -m tests.benchmarks.bench_table_chunker [--rows 500000] [--chunk-size 1200]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import tiktoken
+
+from knowledge.advanced_chunker import UniversalTableChunker, universal_chunking_func
+from utils.logger_helper import logger_helper
+
+CL100K_PATTERN = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+
+
+class Tokenizer:
+    """Same shape as LightRAG's Tokenizer wrapper."""
+
+    def __init__(self, model_name, tokenizer):
+        self.model_name = model_name
+        self.tokenizer = tokenizer
+
+    def encode(self, content):
+        return self.tokenizer.encode(content)
+
+    def decode(self, tokens):
+        return self.tokenizer.decode(tokens)
+
+
+def load_tokenizer():
+    try:
+        return Tokenizer("cl100k_base", tiktoken.get_encoding("cl100k_base"))
+    except Exception:
+        byte_level = tiktoken.Encoding(
+            name="bench_bytes",
+            pat_str=CL100K_PATTERN,
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={},
+        )
+        return Tokenizer("bench_bytes", byte_level)
+
+
+def make_rows(n, seed=1):
+    rng = random.Random(seed)
+    cities = ["Berlin", "Lisbon", "Osaka", "Austin", "Lagos", "Lima", "Oslo"]
+    rows = []
+    for i in range(n):
+        rows.append([
+            f"SKU-{i:07d}",
+            rng.choice(cities),
+            str(rng.randint(1, 5000)),
+            f"{rng.random() * 1000:.2f}",
+            "in stock" if rng.random() < 0.8 else "backorder",
+        ])
+    return ["id", "city", "qty", "price", "status"], rows
+
+
+def make_markdown(header, rows):
+    lines = ["## Sheet: Inventory", "", "| " + " | ".join(header) + " |", "|" + "|".join(["---"] * len(header)) + "|"]
+    lines.extend("| " + " | ".join(row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def make_excel(header, rows):
+    return "Sheet: Inventory\n" + "\n".join("\t".join(r) for r in [header] + rows)
+
+
+# ---------------------------------------------------------------------------
+# Reference: the original one-encode-per-row loops
+# ---------------------------------------------------------------------------
+
+def per_row_markdown_chunks(chunker, header_text, data_lines):
+    header_tokens = len(chunker.tokenizer.encode(header_text))
+    max_data_tokens = chunker.chunk_token_size - header_tokens - 10
+    chunks, current_lines, current_tokens = [], [], 0
+    for line in data_lines:
+        chunker._check_stop()
+        line_tokens = len(chunker.tokenizer.encode(line))
+        if current_tokens + line_tokens > max_data_tokens and current_lines:
+            chunks.append({
+                'tokens': header_tokens + current_tokens,
+                'content': (header_text + '\n' + '\n'.join(current_lines)).strip(),
+                'chunk_order_index': len(chunks),
+            })
+            current_lines, current_tokens = [], 0
+        current_lines.append(line)
+        current_tokens += line_tokens
+    if current_lines:
+        chunks.append({
+            'tokens': header_tokens + current_tokens,
+            'content': (header_text + '\n' + '\n'.join(current_lines)).strip(),
+            'chunk_order_index': len(chunks),
+        })
+    return chunks
+
+
+def per_row_standard_table(chunker, sheet_name, header, data_rows, start_index=0):
+    title = f"## Sheet: {sheet_name}".strip()
+    header_text = '\n'.join([title, "", "| " + " | ".join(header) + " |", "|" + "|".join(["---"] * len(header)) + "|"])
+    header_tokens = len(chunker.tokenizer.encode(header_text))
+    chunks, current_lines, current_tokens, chunk_idx = [], [], header_tokens, start_index
+    for row in data_rows:
+        chunker._check_stop()
+        row_md = "| " + " | ".join(str(c).replace('\n', ' ') for c in row) + " |"
+        row_tokens = len(chunker.tokenizer.encode(row_md))
+        if current_tokens + row_tokens > chunker.chunk_token_size - 20 and current_lines:
+            chunks.append({'tokens': current_tokens, 'content': header_text + '\n' + '\n'.join(current_lines), 'chunk_order_index': chunk_idx})
+            chunk_idx += 1
+            current_lines, current_tokens = [], header_tokens
+        if row_tokens > chunker.chunk_token_size - header_tokens - 20:
+            row_md = row_md[:(chunker.chunk_token_size - header_tokens - 50) * 4] + "..."
+            row_tokens = len(chunker.tokenizer.encode(row_md))
+        current_lines.append(row_md)
+        current_tokens += row_tokens
+    if current_lines:
+        chunks.append({'tokens': current_tokens, 'content': header_text + '\n' + '\n'.join(current_lines), 'chunk_order_index': chunk_idx})
+    return chunks
+
+
+def validated(tokenizer, chunks):
+    """The per-chunk validation encode of the original universal_chunking_func."""
+    for chunk in chunks:
+        chunk['tokens'] = len(tokenizer.encode(chunk['content']))
+    return chunks
+
+
+def check_chunks(tokenizer, chunks, rows, chunk_size):
+    seen = []
+    for chunk in chunks:
+        assert chunk['tokens'] == len(tokenizer.encode(chunk['content'])), "token count is not exact"
+        assert chunk['tokens'] <= chunk_size, f"chunk over limit: {chunk['tokens']}"
+        seen.extend(line.split(' | ')[0][2:] for line in chunk['content'].split('\n') if line.startswith('| SKU-'))
+    assert seen == [row[0] for row in rows], "rows lost or reordered"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def report(label, rows, old, new, old_chunks, new_chunks):
+    print(f"{label:<9} per-row  : {old:8.2f} s  ({rows / old:10.0f} rows/s, {len(old_chunks)} chunks)")
+    print(f"{label:<9} estimate : {new:8.2f} s  ({rows / new:10.0f} rows/s, {len(new_chunks)} chunks, {old / new:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--chunk-size", type=int, default=1200)
+    args = parser.parse_args()
+
+    # Per-chunk info logging is negligible, debug output is not
+    logger_helper.logger.setLevel(logging.INFO)
+
+    tokenizer = load_tokenizer()
+    chunker = UniversalTableChunker(tokenizer, args.chunk_size, 100)
+    header, rows = make_rows(args.rows)
+    print(f"rows={args.rows} chunk_size={args.chunk_size} tokenizer={tokenizer.model_name}")
+
+    markdown = make_markdown(header, rows)
+    md_lines = markdown.split('\n')
+    old_t, old_chunks = timed(lambda: validated(tokenizer, per_row_markdown_chunks(chunker, '\n'.join(md_lines[:4]), md_lines[4:])))
+    new_t, new_chunks = timed(lambda: universal_chunking_func(tokenizer, markdown, chunk_token_size=args.chunk_size))
+    check_chunks(tokenizer, new_chunks, rows, args.chunk_size)
+    report("markdown", args.rows, old_t, new_t, old_chunks, new_chunks)
+
+    excel = make_excel(header, rows)
+    old_t, old_chunks = timed(lambda: validated(tokenizer, per_row_standard_table(chunker, "Inventory", header, rows)))
+    new_t, new_chunks = timed(lambda: universal_chunking_func(tokenizer, excel, chunk_token_size=args.chunk_size))
+    check_chunks(tokenizer, new_chunks, rows, args.chunk_size)
+    report("excel", args.rows, old_t, new_t, old_chunks, new_chunks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: enqueue-to-dispatch latency of TaskRunner.launch_unified_run.
+
+Starts one queue-triggered worker per simulated agent, enqueues messages and
+measures the time from ``queue.put`` to ``_submit_task_execution``. Also
+reports process CPU time consumed while all agents sit idle.
+
+Usage:
+    python -m tests.benchmarks.bench_task_dispatch [--agents 1 10 100] [--messages 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agent.a2a.common.types import TaskState, TaskStatus
+from agent.ec_tasks.models import ManagedTask
+from agent.ec_tasks.runner import TaskRunner
+
+
+def _start_agents(n_agents, tmpdir, latencies, lock):
+    workers = []
+    for i in range(n_agents):
+        agent = SimpleNamespace(
+            card=SimpleNamespace(name=f"BenchAgent{i}"),
+            mainwin=SimpleNamespace(my_ecb_data_homepath=tmpdir),
+            tasks=[],
+        )
+        runner = TaskRunner(agent)
+        task = ManagedTask(
+            id=f"bench-task-{i}",
+            name=f"bench task {i}",
+            status=TaskStatus(state=TaskState.WORKING),
+            skill=SimpleNamespace(name="bench", runnable=object()),
+        )
+
+        def fake_submit(task, msg, trigger_type, dev_init_state):
+            elapsed = time.perf_counter() - msg["enqueued_at"]
+            with lock:
+                latencies.append(elapsed)
+
+        runner._submit_task_execution = fake_submit
+        thread = threading.Thread(
+            target=runner.launch_unified_run,
+            kwargs={"task2run": task, "trigger_type": "a2a_queue"},
+            daemon=True,
+        )
+        thread.start()
+        workers.append((runner, task, thread))
+    return workers
+
+
+def run(n_agents, n_messages, idle_sec):
+    tmpdir = tempfile.mkdtemp()
+    latencies = []
+    lock = threading.Lock()
+    workers = _start_agents(n_agents, tmpdir, latencies, lock)
+    time.sleep(0.2)
+
+    # Idle CPU: all workers blocked on empty queues
+    cpu_start = time.process_time()
+    time.sleep(idle_sec)
+    idle_cpu = time.process_time() - cpu_start
+
+    # Bursts of back-to-back messages to every agent
+    expected = n_agents * n_messages
+    for _, task, _ in workers:
+        for m in range(n_messages):
+            task.queue.put({"id": m, "enqueued_at": time.perf_counter()})
+
+    deadline = time.time() + 30
+    while len(latencies) < expected and time.time() < deadline:
+        time.sleep(0.01)
+
+    for runner, _, thread in workers:
+        runner.close()
+    for _, _, thread in workers:
+        thread.join(timeout=2)
+
+    samples = sorted(latencies)
+    if not samples:
+        return {"agents": n_agents, "dispatched": 0}
+    return {
+        "agents": n_agents,
+        "dispatched": len(samples),
+        "expected": expected,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "max_ms": samples[-1] * 1000,
+        "idle_cpu_ms": idle_cpu * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--idle-sec", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'agents':>7} {'msgs':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'idle cpu ms':>12}")
+    for n in args.agents:
+        r = run(n, args.messages, args.idle_sec)
+        if not r["dispatched"]:
+            print(f"{n:>7} no messages dispatched")
+            continue
+        print(
+            f"{r['agents']:>7} {r['dispatched']:>7} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+            f"{r['max_ms']:>9.3f} {r['idle_cpu_ms']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
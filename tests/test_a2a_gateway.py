@@ -0,0 +1,85 @@
+"""
+Tests for the shared A2A gateway (agent.a2a.common.server.gateway)
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+from uuid import uuid4
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ValueError:
+        # Replaced by a stub in sys.modules (e.g. by test_mcp_server_tools)
+        return False
+
+
+@unittest.skipIf(not all(_available(m) for m in ("httpx", "uvicorn", "starlette", "sse_starlette", "psutil")),
+                 "A2A server dependencies not available")
+class TestA2AGateway(unittest.TestCase):
+    def setUp(self):
+        from agent.a2a.common.server import A2AGateway
+        from tests.benchmarks.bench_a2a_gateway import free_ports
+        self.gateway = A2AGateway(host="127.0.0.1", port=free_ports(1)[0])
+        self.base = f"http://127.0.0.1:{self.gateway.port}"
+        self.assertTrue(self.gateway.start())
+
+    def tearDown(self):
+        self.gateway.stop()
+
+    def _register(self, agent_id):
+        from agent.a2a.common.server import A2AServer
+        from agent.a2a.common.server.gateway import agent_url
+        from tests.benchmarks.bench_a2a_gateway import EchoTaskManager, make_card
+        card = make_card(agent_id, agent_url(self.base, agent_id))
+        self.gateway.register(agent_id, A2AServer(agent_card=card, task_manager=EchoTaskManager(agent_id)))
+        return card
+
+    def _send(self, url, headers=None):
+        import httpx
+        from agent.a2a.common.types import Message, SendTaskRequest, TaskSendParams, TextPart
+        params = TaskSendParams(id=str(uuid4()), sessionId="s", message=Message(role="user", parts=[TextPart(text="hi")]))
+        return httpx.post(url, json=SendTaskRequest(params=params).model_dump(), headers=headers, trust_env=False)
+
+    def test_agents_are_routed_by_path_and_header(self):
+        import httpx
+        cards = [self._register(f"agent {i}") for i in range(3)]
+        for card in cards:
+            self.assertEqual(card.url, f"{self.base}/agents/agent%20{card.id[-1]}")
+            response = self._send(card.url + "/a2a/")
+            self.assertEqual(response.json()["result"]["status"]["message"]["parts"][0]["text"], card.id)
+            served = httpx.get(card.url + "/.well-known/agent.json", trust_env=False).json()
+            self.assertEqual(served, card.model_dump(exclude_none=True))
+            self.assertEqual(httpx.get(card.url + "/ping", trust_env=False).json(), {"status": "ok"})
+
+        response = self._send(self.base + "/a2a/", headers={"X-A2A-Agent": "agent 1"})
+        self.assertEqual(response.json()["result"]["status"]["message"]["parts"][0]["text"], "agent 1")
+        self.assertEqual(self._send(self.base + "/a2a/").status_code, 404)
+        self.assertEqual(httpx.get(self.base + "/ping", trust_env=False).json(), {"status": "ok", "agents": 3})
+
+    def test_agents_come_and_go_without_restart(self):
+        import httpx
+        card = self._register("a")
+        self.assertEqual(self._send(card.url + "/a2a/").status_code, 200)
+        self.assertTrue(self.gateway.unregister("a"))
+        self.assertFalse(self.gateway.unregister("a"))
+        self.assertEqual(self._send(card.url + "/a2a/").status_code, 404)
+        self.assertEqual(httpx.get(card.url + "/ping", trust_env=False).status_code, 404)
+
+        card = self._register("b")
+        self.assertEqual(self._send(card.url + "/a2a/").status_code, 200)
+        # Task manager errors are passed through unchanged
+        response = httpx.post(card.url + "/a2a/", content=b"not json", trust_env=False)
+        self.assertEqual((response.status_code, response.json()["error"]["code"]), (400, -32700))
+        self.assertTrue(self.gateway.start())
+        self.assertEqual(self.gateway.agent_ids(), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the pooled A2A HTTP transport (agent.a2a.common.client.transport)
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import unittest
+from uuid import uuid4
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@unittest.skipIf(importlib.util.find_spec("httpx") is None or importlib.util.find_spec("pydantic") is None,
+                 "httpx/pydantic not available")
+class TestA2ATransportPool(unittest.TestCase):
+    def setUp(self):
+        from tests.benchmarks.bench_a2a_group_send import LocalAgents
+        self.agents = LocalAgents(5).__enter__()
+
+    def tearDown(self):
+        self.agents.__exit__(None, None, None)
+
+    def _payload(self):
+        from tests.benchmarks.bench_a2a_group_send import make_payload
+        return make_payload(str(uuid4()))
+
+    def test_recipient_key(self):
+        from agent.a2a.common.client.transport import recipient_key
+        self.assertEqual(recipient_key("http://LocalHost/a2a/"), "http://localhost:80")
+        self.assertEqual(recipient_key("https://agent.example.com/a2a/"), "https://agent.example.com:443")
+        self.assertEqual(recipient_key("http://127.0.0.1:5001/x"), recipient_key("http://127.0.0.1:5001/y"))
+
+    def test_concurrent_fan_out_reaches_each_recipient_over_kept_alive_connections(self):
+        from agent.a2a.common.client import A2AClient, A2ATransportPool
+
+        async def main():
+            pool = A2ATransportPool()
+            client = A2AClient(url=self.agents.urls[0], timeout=10, transport=pool)
+            rounds = []
+            try:
+                for _ in range(3):
+                    responses = await asyncio.gather(
+                        *(client.send_task(self._payload(), url=url) for url in self.agents.urls)
+                    )
+                    rounds.append([r.result.status.message.parts[0].text for r in responses])
+                return rounds, client.url, pool.stats()
+            finally:
+                await pool.aclose()
+
+        rounds, url, stats = asyncio.run(main())
+        expected = [f"agent-{i}" for i in range(len(self.agents.urls))]
+        self.assertEqual(rounds, [expected] * 3)
+        # The shared client's recipient is untouched by per-call URLs
+        self.assertEqual(url, self.agents.urls[0])
+        self.assertEqual(stats["async_recipients"], len(self.agents.urls))
+        self.assertEqual(self.agents.connections, len(self.agents.urls))
+
+    def test_clients_are_per_event_loop_and_sync_clients_shared(self):
+        from agent.a2a.common.client import A2AClient, A2ATransportPool
+        pool = A2ATransportPool()
+        url = self.agents.urls[0]
+
+        async def get_client():
+            return pool.get_async_client(url, trust_env=False)
+
+        first, second = asyncio.run(get_client()), asyncio.run(get_client())
+        self.assertIsNot(first, second)
+
+        client = A2AClient(url=url, timeout=10, transport=pool)
+        for _ in range(3):
+            response = client.sync_send_task(self._payload())
+            self.assertEqual(response.result.status.message.parts[0].text, "agent-0")
+        self.assertIs(pool.get_sync_client(url, trust_env=False), pool.get_sync_client(url + "other", trust_env=False))
+        self.assertEqual(self.agents.connections, 1)
+        pool.close()
+        self.assertEqual(pool.stats()["sync_recipients"], 0)
+
+    def test_shutdown_closes_the_shared_pool(self):
+        from agent.a2a.common.client.transport import get_transport_pool, shutdown_transport_pool
+        pool = get_transport_pool()
+        client = pool.get_sync_client(self.agents.urls[0], trust_env=False)
+        shutdown_transport_pool()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(get_transport_pool(), pool)
+        shutdown_transport_pool()
+
+
+if __name__ == "__main__":
+    unittest.main()
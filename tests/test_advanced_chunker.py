@@ -0,0 +1,103 @@
+"""
+Tests for row packing in UniversalTableChunker (knowledge.advanced_chunker)
+
+Covers:
+- Every Markdown chunk repeats the header and stays within the token limit
+- Rows overflow into the next chunk in order, none lost or split,
+  also when the length-based estimate is off
+- A single row larger than the limit becomes its own chunk
+- Wide headers: only the first chunk carries the header, later ones a row range title
+"""
+
+import os
+import re
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge.advanced_chunker import UniversalTableChunker
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word; deterministic and dependency-free."""
+
+    def encode(self, content):
+        return re.findall(r"\S+", content)
+
+
+HEADER = ["## Sheet: Parts", "| part | value | note |", "| --- | --- | --- |"]
+
+
+def make_rows(count, words=lambda i: 3):
+    return [f"| P{i} | {i * 7} | " + " ".join(f"w{i}_{k}" for k in range(words(i))) + " |" for i in range(count)]
+
+
+class TestTableRowPacking(unittest.TestCase):
+    def _chunker(self, chunk_size):
+        chunker = UniversalTableChunker(WordTokenizer(), chunk_token_size=chunk_size, chunk_overlap_token_size=0)
+        chunker.stop_controller = None
+        return chunker
+
+    def _data_rows(self, chunk):
+        return [line for line in chunk["content"].split("\n") if line.startswith("| P")]
+
+    def _assert_exact_and_within(self, chunks, limit):
+        for chunk in chunks:
+            self.assertEqual(chunk["tokens"], len(WordTokenizer().encode(chunk["content"])))
+            self.assertLessEqual(chunk["tokens"], limit)
+
+    def test_every_chunk_repeats_the_header(self):
+        rows = make_rows(400)
+        chunks = self._chunker(300)._chunk_markdown_table("\n".join(HEADER + rows))
+
+        self.assertGreater(len(chunks), 5)
+        for index, chunk in enumerate(chunks):
+            self.assertTrue(chunk["content"].startswith("\n".join(HEADER) + "\n"))
+            self.assertEqual(chunk["chunk_order_index"], index)
+        self._assert_exact_and_within(chunks, 300 - 10)
+        self.assertEqual([row for chunk in chunks for row in self._data_rows(chunk)], rows)
+
+    def test_rows_overflow_in_order_when_the_estimate_is_off(self):
+        # The calibration sample (every 4th row here) only sees short rows
+        rows = make_rows(256, words=lambda i: 2 if i % 4 == 0 else 40)
+        chunker = self._chunker(400)
+        chunks = chunker._chunk_markdown_table("\n".join(HEADER + rows))
+
+        self.assertTrue(chunker.exact_token_counts)
+        self._assert_exact_and_within(chunks, 400 - 10)
+        self.assertEqual([row for chunk in chunks for row in self._data_rows(chunk)], rows)
+        # Chunks are filled, not one row each
+        self.assertLess(len(chunks), len(rows) // 3)
+
+    def test_a_row_larger_than_the_limit_gets_its_own_chunk(self):
+        rows = make_rows(60, words=lambda i: 500 if i == 30 else 3)
+        chunks = self._chunker(200)._chunk_markdown_table("\n".join(HEADER + rows))
+
+        giant = [chunk for chunk in chunks if rows[30] in self._data_rows(chunk)]
+        self.assertEqual(len(giant), 1)
+        self.assertEqual(self._data_rows(giant[0]), [rows[30]])
+        self.assertGreater(giant[0]["tokens"], 200)
+        self._assert_exact_and_within([chunk for chunk in chunks if chunk is not giant[0]], 200 - 10)
+        self.assertEqual([row for chunk in chunks for row in self._data_rows(chunk)], rows)
+
+    def test_wide_header_is_only_in_the_first_chunk(self):
+        header = ["## Sheet: Wide", "| " + " | ".join(f"column_{c}" for c in range(120)) + " |",
+                  "| " + " | ".join("---" for _ in range(120)) + " |"]
+        rows = make_rows(200)
+        chunks = self._chunker(300)._chunk_markdown_table("\n".join(header + rows))
+
+        self.assertTrue(chunks[0]["content"].startswith(header[0] + "\n" + header[1]))
+        start = len(self._data_rows(chunks[0])) + 1
+        for chunk in chunks[1:]:
+            count = len(self._data_rows(chunk))
+            self.assertTrue(chunk["content"].startswith(f"## Sheet: Wide (Rows {start}-{start + count - 1})\n"))
+            self.assertNotIn("column_0", chunk["content"])
+            start += count
+        self._assert_exact_and_within(chunks[1:], 300 - 20)
+        self.assertEqual([row for chunk in chunks for row in self._data_rows(chunk)], rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Query-count regression tests for DBAgentService listings
+
+get_agents_by_owner, query_agents_with_relations and
+query_tasks_with_relations must issue a constant number of SQL statements
+no matter how many agents (with skills, tasks, orgs and avatars) exist.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from agent.db.core.base import get_engine
+from agent.db.models.agent_model import DBAgent, DBAgentTask
+from agent.db.models.association_models import DBAgentOrgRel, DBAgentSkillRel, DBAgentTaskRel
+from agent.db.models.avatar_model import DBAvatarResource
+from agent.db.models.org_model import DBAgentOrg
+from agent.db.models.skill_model import DBAgentSkill
+from agent.db.services.db_agent_service import DBAgentService
+from agent.db.services.db_avatar_service import DBAvatarService
+
+OWNER = "owner@example.com"
+
+
+class QueryCounter:
+    """Count SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+class TestAgentListingQueryCount(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(os.path.join(self.tmpdir.name, "agents.db"))
+        self.service = DBAgentService(engine=self.engine)
+        self.avatar_service = DBAvatarService(engine=self.engine)
+        self.service._get_avatar_service = lambda: self.avatar_service
+        self.main_window = SimpleNamespace(
+            get_server_base_url=lambda: "http://127.0.0.1:4668",
+            agent_skills=[],
+            agent_tasks=[],
+        )
+        self._next = 0
+
+        with self.service.session_scope() as s:
+            s.add(DBAgentOrg(id="org-1", name="Org"))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _add_agents(self, n):
+        """Add n agents, each with 2 skills, 2 tasks, an org and an uploaded avatar."""
+        with self.service.session_scope() as s:
+            for _ in range(n):
+                i = self._next
+                self._next += 1
+                s.add(DBAvatarResource(id=f"avatar-{i}", resource_type="uploaded", image_path=f"/img/{i}.png"))
+                s.add(DBAgent(id=f"agent-{i}", name=f"Agent {i}", owner=OWNER, avatar_resource_id=f"avatar-{i}"))
+                s.add(DBAgentOrgRel(agent_id=f"agent-{i}", org_id="org-1"))
+                for k in range(2):
+                    s.add(DBAgentSkill(id=f"skill-{i}-{k}", name=f"Skill {i}.{k}", owner=OWNER, version="1.0"))
+                    s.add(DBAgentSkillRel(agent_id=f"agent-{i}", skill_id=f"skill-{i}-{k}"))
+                    s.add(DBAgentTask(id=f"task-{i}-{k}", name=f"Task {i}.{k}", owner=OWNER, org_id="org-1"))
+                    s.add(DBAgentTaskRel(agent_id=f"agent-{i}", task_id=f"task-{i}-{k}", status="running"))
+            # Every other agent reports to the first one
+            s.flush()
+            for agent in s.query(DBAgent).all():
+                if agent.id != "agent-0" and int(agent.id.split("-")[1]) % 2:
+                    agent.supervisor_id = "agent-0"
+
+    def _count(self, fn):
+        with patch("app_context.AppContext.get_main_window", return_value=self.main_window):
+            with QueryCounter(self.engine) as counter:
+                result = fn()
+        self.assertTrue(result["success"], result.get("error"))
+        return counter.count, result
+
+    def _assert_constant(self, fn):
+        self._add_agents(3)
+        small, small_result = self._count(fn)
+        self._add_agents(27)
+        large, large_result = self._count(fn)
+        self.assertEqual(small, large, f"query count grew from {small} to {large}")
+        return small_result, large_result
+
+    def test_get_agents_by_owner(self):
+        _, result = self._assert_constant(lambda: self.service.get_agents_by_owner(OWNER))
+        self.assertEqual(len(result["data"]), 30)
+        agent = next(a for a in result["data"] if a["id"] == "agent-5")
+        self.assertEqual(agent["org_id"], "org-1")
+        self.assertEqual(sorted(sk["id"] for sk in agent["skills"]), ["skill-5-0", "skill-5-1"])
+        self.assertEqual(sorted(t["id"] for t in agent["tasks"]), ["task-5-0", "task-5-1"])
+        self.assertEqual(agent["avatar"]["id"], "avatar-5")
+        self.assertTrue(agent["avatar"]["imageUrl"].endswith("/img/5.png"))
+
+    def test_query_agents_with_relations(self):
+        _, result = self._assert_constant(lambda: self.service.query_agents_with_relations())
+        self.assertEqual(result["total"], 30)
+        agent = next(a for a in result["data"] if a["id"] == "agent-3")
+        self.assertEqual(agent["skills_count"], 2)
+        self.assertEqual(agent["active_tasks_count"], 2)
+        self.assertEqual(agent["supervisor"]["id"], "agent-0")
+        self.assertEqual(agent["avatar"]["id"], "avatar-3")
+
+    def test_query_agents_with_relations_org_filter(self):
+        self._add_agents(2)
+        result = self.service.query_agents_with_relations(org_id="org-1")
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(self.service.query_agents_with_relations(org_id="missing")["total"], 0)
+
+    def test_query_tasks_with_relations(self):
+        _, result = self._assert_constant(lambda: self.service.query_tasks_with_relations())
+        self.assertEqual(result["total"], 60)
+        task = next(t for t in result["data"] if t["id"] == "task-4-1")
+        self.assertEqual(task["agent_id"], "agent-4")
+        self.assertEqual(task["organization"]["id"], "org-1")
+
+        filtered = self.service.query_tasks_with_relations(agent_id="agent-4")
+        self.assertEqual(sorted(t["id"] for t in filtered["data"]), ["task-4-0", "task-4-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Tests for the pooled sync-to-async bridge (utils.async_loop_pool)
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.async_loop_pool import AsyncLoopPool, loop_resource, spawn_detached
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestAsyncLoopPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = AsyncLoopPool(max_loops=2)
+
+    def tearDown(self):
+        self.pool.shutdown(timeout=5)
+
+    def test_sequential_calls_reuse_one_loop(self):
+        async def where():
+            await asyncio.sleep(0)
+            return asyncio.get_running_loop(), threading.current_thread().name, request_id.get()
+
+        request_id.set("req-1")
+        first = self.pool.run(where())
+        second = self.pool.run(where)  # a factory works too
+        self.assertIs(first[0], second[0])
+        self.assertEqual(first[1:], ("AsyncLoop-1", "req-1"))
+        self.assertEqual(self.pool.stats()["loops"], 1)
+
+        async def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.pool.run(fail())
+
+    def test_busy_loops_grow_the_pool_up_to_the_cap_then_use_fresh_loops(self):
+        release = threading.Event()
+
+        async def wait_for_release():
+            await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+            return threading.current_thread().name
+
+        futures = [self.pool.submit(wait_for_release) for _ in range(3)]
+        time.sleep(0.05)
+        stats = self.pool.stats()
+        self.assertEqual((stats["loops"], stats["inflight"], stats["fresh_loop_calls"]), (2, 2, 1))
+        release.set()
+        self.assertEqual(sorted(f.result(5) for f in futures), ["AsyncLoop-1", "AsyncLoop-2", "async-oneoff"])
+        self.assertEqual(self.pool.stats()["inflight"], 0)
+
+    def test_call_past_the_cap_can_be_cancelled(self):
+        pool = AsyncLoopPool(max_loops=1)
+        release = threading.Event()
+        cancelled = threading.Event()
+
+        async def forever():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        try:
+            busy = pool.submit(lambda: asyncio.get_running_loop().run_in_executor(None, release.wait, 5))
+            future = pool.submit(forever)
+            time.sleep(0.05)
+            self.assertTrue(future.cancel())
+            self.assertTrue(cancelled.wait(5))
+            release.set()
+            busy.result(5)
+        finally:
+            release.set()
+            pool.shutdown(timeout=5)
+
+    def test_cancel_and_timeout_stop_the_coroutine(self):
+        cancelled = threading.Event()
+        started = threading.Event()
+
+        async def forever():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        future = self.pool.submit(forever)
+        self.assertTrue(started.wait(5))
+        self.assertTrue(future.cancel())
+        self.assertTrue(cancelled.wait(5))
+        with self.assertRaises(CancelledError):
+            future.result(5)
+
+        cancelled.clear()
+        start = time.perf_counter()
+        with self.assertRaises(asyncio.TimeoutError):
+            self.pool.run(forever, timeout=0.05)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(cancelled.wait(5))
+
+    def test_leftover_tasks_are_only_cancelled_on_request(self):
+        async def spawn():
+            return asyncio.get_running_loop().create_task(asyncio.sleep(60))
+
+        async def spawn_in_background():
+            return spawn_detached(asyncio.sleep(60))
+
+        kept = self.pool.run(spawn)
+        dropped = self.pool.run(spawn, cancel_leftovers=True)
+        detached = self.pool.run(spawn_in_background, cancel_leftovers=True)
+        self.assertTrue(dropped.cancelled())
+        self.assertFalse(kept.done())
+        self.assertFalse(detached.done())
+
+    def test_loop_resources_are_reused_and_closed_on_shutdown(self):
+        async def client():
+            return loop_resource("client", _Client)
+
+        first = self.pool.run(client)
+        self.assertIs(self.pool.run(client), first)
+        self.pool.shutdown(timeout=5)
+        self.assertTrue(first.closed)
+        with self.assertRaises(RuntimeError):
+            self.pool.submit(client)
+
+    def test_nested_calls_from_a_pool_loop_do_not_deadlock(self):
+        pool = self.pool
+
+        async def inner():
+            return threading.current_thread().name
+
+        async def outer():
+            # A sync helper called from a coroutine that itself bridges to async
+            return await asyncio.get_running_loop().run_in_executor(None, pool.run, inner()), pool.run(inner())
+
+        via_executor, nested = self.pool.run(outer, timeout=5)
+        self.assertTrue(via_executor.startswith("AsyncLoop-"))
+        self.assertEqual(nested, "async-oneoff")
+
+    def test_call_waiting_on_a_nested_call_at_the_cap_does_not_deadlock(self):
+        pool = AsyncLoopPool(max_loops=1)
+        executor = ThreadPoolExecutor(1)
+
+        async def inner():
+            return threading.current_thread().name
+
+        async def outer():
+            # Blocks the only pool loop until a call made from another thread finishes
+            return executor.submit(pool.run, inner).result(timeout=5)
+
+        try:
+            self.assertEqual(pool.run(outer, timeout=10), "async-oneoff")
+            self.assertEqual(pool.stats()["loops"], 1)
+        finally:
+            executor.shutdown()
+            pool.shutdown(timeout=5)
+
+    def test_disabled_pool_uses_a_fresh_loop_per_call(self):
+        pool = AsyncLoopPool(max_loops=0)
+
+        async def loop():
+            return asyncio.get_running_loop()
+
+        self.assertIsNot(pool.run(loop), pool.run(loop))
+        self.assertEqual(pool.stats()["loops"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for the chat message full-text index
+
+Covers:
+- Index kept in sync by add_message, submit_form, delete_message, delete_chat
+- Ranking, snippets, pagination and member filtering
+- Short queries (LIKE path) and the scan fallback
+- Migration 3.0.7 -> 3.0.8 backfill
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from agent.db.core.base import get_engine
+from agent.db.migrations.versions.migration_307_to_308 import Migration_307_to_308
+from agent.db.services.db_chat_service import DBChatService
+from agent.db.utils.message_search import MESSAGE_FTS_TABLE, SNIPPET_OPEN, extract_searchable_text
+
+
+class ChatSearchTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.engine = get_engine(os.path.join(self.tmpdir.name, "chat.db"))
+        self.service = DBChatService(engine=self.engine)
+        self._ts = 1000
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _chat(self, chat_id, user_ids):
+        # A per-chat agent member keeps create_chat from deduplicating chats
+        members = [{"userId": uid, "role": "user", "name": uid} for uid in user_ids]
+        members.append({"userId": f"agent-{chat_id}", "role": "agent", "name": chat_id})
+        result = self.service.create_chat(members=members, name=chat_id, id=chat_id)
+        self.assertTrue(result["success"], result)
+
+    def _msg(self, chat_id, text_value, msg_id=None):
+        self._ts += 1
+        result = self.service.add_message(
+            chatId=chat_id, role="user", content={"type": "text", "text": text_value},
+            senderId="u1", createAt=self._ts, id=msg_id,
+        )
+        self.assertTrue(result["success"], result)
+        return result["id"]
+
+    def _fts_rows(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {MESSAGE_FTS_TABLE}")).scalar()
+
+    def _search(self, query, user="u1", **kwargs):
+        result = self.service.search_chats_by_message_content(userId=user, searchText=query, **kwargs)
+        self.assertTrue(result["success"], result)
+        return result
+
+
+class TestIndexSync(ChatSearchTestBase):
+    """Test the index follows message writes."""
+
+    def test_add_and_delete_message(self):
+        self._chat("c1", ["u1", "agent"])
+        m1 = self._msg("c1", "The quarterly REPORT is ready")
+        self._msg("c1", "unrelated chatter")
+        self.assertEqual(self._fts_rows(), 2)
+        self.assertTrue(self.service.search_index.available)
+
+        result = self._search("report")
+        self.assertEqual([c["id"] for c in result["data"]], ["c1"])
+        self.assertEqual(result["data"][0]["matchMessageId"], m1)
+
+        self.service.delete_message("c1", m1)
+        self.assertEqual(self._fts_rows(), 1)
+        self.assertEqual(self._search("report")["data"], [])
+
+    def test_delete_chat_removes_rows(self):
+        self._chat("c1", ["u1"])
+        self._chat("c2", ["u1", "other"])
+        self._msg("c1", "alpha beta")
+        self._msg("c2", "alpha gamma")
+        self.service.delete_chat("c1")
+        self.assertEqual(self._fts_rows(), 1)
+        self.assertEqual([c["id"] for c in self._search("alpha")["data"]], ["c2"])
+
+    def test_submit_form_reindexes(self):
+        self._chat("c1", ["u1"])
+        form_msg = self.service.add_message(
+            chatId="c1", role="assistant", senderId="agent", createAt=1,
+            content={"type": "form", "text": "Shipping", "form": {"id": "f1", "fields": [{"value": "Berlin"}]}},
+        )["id"]
+        self.assertEqual(len(self._search("berlin")["data"]), 1)
+
+        self.service.submit_form("c1", form_msg, "f1", {"id": "f1", "fields": [{"value": "Lisbon"}]})
+        self.assertEqual(self._search("berlin")["data"], [])
+        self.assertEqual(len(self._search("lisbon")["data"]), 1)
+        self.assertEqual(self._fts_rows(), 1)
+
+
+class TestSearch(ChatSearchTestBase):
+    """Test ranking, snippets and pagination."""
+
+    def test_member_filter(self):
+        self._chat("mine", ["u1"])
+        self._chat("theirs", ["u2"])
+        self._msg("mine", "invoice 42")
+        self._msg("theirs", "invoice 43")
+        self.assertEqual([c["id"] for c in self._search("invoice")["data"]], ["mine"])
+        self.assertEqual([c["id"] for c in self._search("invoice", user="u2")["data"]], ["theirs"])
+
+    def test_snippet_and_match_count(self):
+        self._chat("c1", ["u1"])
+        self._msg("c1", "deploy failed on staging")
+        self._msg("c1", "deploy succeeded after retry")
+        hit = self._search("deploy")["data"][0]
+        self.assertEqual(hit["matchCount"], 2)
+        self.assertIn(SNIPPET_OPEN, hit["matchSnippet"])
+
+    def test_pagination_and_total(self):
+        for i in range(7):
+            self._chat(f"c{i}", ["u1"])
+            self._msg(f"c{i}", f"budget item {i}")
+        first = self._search("budget", limit=3, offset=0)
+        second = self._search("budget", limit=3, offset=3)
+        past_end = self._search("budget", limit=3, offset=20)
+        self.assertEqual(first["total"], 7)
+        self.assertEqual(len(first["data"]), 3)
+        self.assertEqual(len(second["data"]), 3)
+        self.assertFalse({c["id"] for c in first["data"]} & {c["id"] for c in second["data"]})
+        self.assertEqual(past_end["data"], [])
+        self.assertEqual(past_end["total"], 7)
+
+    def test_short_query_uses_substring(self):
+        self._chat("c1", ["u1"])
+        self._msg("c1", "Plan B is fine")
+        result = self._search("b ")
+        self.assertEqual([c["id"] for c in result["data"]], ["c1"])
+        self.assertIn(SNIPPET_OPEN + "B", result["data"][0]["matchSnippet"])
+
+    def test_special_characters(self):
+        self._chat("c1", ["u1"])
+        self._msg("c1", 'he said "100% done" (ok)')
+        self.assertEqual(len(self._search('"100% done"')["data"]), 1)
+        self.assertEqual(len(self._search("0%")["data"]), 1)
+        self.assertEqual(self._search("50%")["data"], [])
+
+    def test_scan_fallback_matches(self):
+        self._chat("c1", ["u1"])
+        self._chat("c2", ["u1"])
+        self._msg("c1", "shared keyword here")
+        self._msg("c2", "nothing")
+        indexed = {c["id"] for c in self._search("keyword")["data"]}
+        self.service.search_index.available = False
+        scanned = {c["id"] for c in self._search("keyword")["data"]}
+        self.assertEqual(indexed, scanned)
+
+
+class TestBackfillMigration(ChatSearchTestBase):
+    """Test migration 3.0.7 -> 3.0.8 backfills existing messages."""
+
+    def test_backfill(self):
+        self._chat("c1", ["u1"])
+        self._msg("c1", "legacy message one")
+        self._msg("c1", "legacy message two")
+        with self.engine.connect() as conn:
+            conn.execute(text(f"DROP TABLE {MESSAGE_FTS_TABLE}"))
+            conn.commit()
+
+        migration = Migration_307_to_308(self.engine)
+        self.assertTrue(migration.upgrade(None))
+        self.assertTrue(migration.validate_postconditions(None))
+        self.assertEqual(self._fts_rows(), 2)
+        self.assertEqual(self._search("legacy")["data"][0]["matchCount"], 2)
+
+    def test_extract_searchable_text(self):
+        content = {"type": "form", "text": "Title", "form": {"fields": [{"label": "City", "value": None}]}, "message": "m"}
+        self.assertEqual(extract_searchable_text(content), "Title City m")
+        self.assertEqual(extract_searchable_text("plain"), "plain")
+        self.assertEqual(extract_searchable_text(None), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the LightRAG document extraction pool (third_party/lightrag_custom/document_routes_custom.py)
+
+Covers:
+- The router's lifespan is merged into the app's and gives it its own pool
+- XLSX extraction runs in a worker process
+- The worker processes are gone once the app shuts down
+"""
+
+import asyncio
+import importlib.util
+import io
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add project root and the custom LightRAG modules to path (as knowledge/lightrag_launcher.py does)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+sys.path.insert(0, os.path.join(_ROOT, "third_party", "lightrag_custom"))
+
+
+def _available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ValueError:
+        # Replaced by a stub in sys.modules (e.g. by test_mcp_server_tools)
+        return False
+
+
+def _xlsx_bytes():
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Parts"
+    sheet.append(["part", "value"])
+    sheet.append(["R1", 10])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@unittest.skipIf(not all(_available(m) for m in ("lightrag", "fastapi", "openpyxl", "aiofiles", "pipmaster")),
+                 "lightrag / fastapi / openpyxl not installed")
+class TestExtractionPoolLifespan(unittest.TestCase):
+    def test_app_lifespan_runs_extraction_in_a_pool_and_stops_it(self):
+        # lightrag.api.config parses the command line on import
+        with mock.patch.object(sys, "argv", sys.argv[:1]):
+            import document_routes_custom as routes
+        from contextlib import asynccontextmanager
+        from fastapi import FastAPI
+
+        events = []
+
+        @asynccontextmanager
+        async def server_lifespan(app):
+            events.append("server up")
+            yield
+            events.append("server down")
+
+        app = FastAPI(lifespan=server_lifespan)
+        app.include_router(routes.router)
+        outer = routes._extraction_resources
+
+        async def serve():
+            async with app.router.lifespan_context(app):
+                resources = routes._get_extraction_resources()
+                self.assertIsNot(resources, outer)
+                content = await routes._extract_file_content_async(_xlsx_bytes(), Path("parts.xlsx"))
+                executor = resources.executor()
+                processes = list(executor._processes.values())
+                return resources, content, processes
+
+        with mock.patch.dict(os.environ, {"LIGHTRAG_EXTRACT_WORKERS": "1"}):
+            resources, content, processes = asyncio.run(serve())
+
+        self.assertEqual(events, ["server up", "server down"])
+        self.assertEqual(content, "Sheet: Parts\npart\tvalue\nR1\t10\n\n")
+        self.assertEqual(len(processes), 1)
+        self.assertNotEqual(processes[0].pid, os.getpid())
+        # Shut down with the app: workers exited, nothing left for the next use to inherit
+        self.assertFalse(any(p.is_alive() for p in processes))
+        self.assertIsNone(resources._executor)
+        self.assertIs(routes._extraction_resources, outer)
+
+    def test_default_pool_is_shut_down_at_exit(self):
+        with mock.patch.object(sys, "argv", sys.argv[:1]):
+            import document_routes_custom as routes
+
+        with mock.patch.object(routes, "_extraction_resources", None), \
+                mock.patch.object(routes.atexit, "register") as register:
+            resources = routes._get_extraction_resources()
+            self.assertIs(routes._get_extraction_resources(), resources)
+        register.assert_called_once_with(resources.reset_executor, True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 import json
+import os
+import tempfile
+from unittest import mock
 from agent.ec_skills.flowgram2langgraph import flowgram2langgraph
+from agent.ec_skills import flowgram2langgraph_v2 as v2
 
 
 class Flowgram2LangGraphTests(unittest.TestCase):
@@ -235,5 +239,76 @@ class Flowgram2LangGraphTests(unittest.TestCase):
         self.assertTrue(wf is not None)
 
 
+class FlowgramV2CompileCacheTests(unittest.TestCase):
+    FLOW = {
+        "skillName": "cached demo",
+        "workFlow": {
+            "nodes": [
+                {"id": "start", "type": "start"},
+                {"id": "a", "type": "code", "data": {"script": {"content": "def main(state):\n    return state\n"}}},
+                {"id": "end", "type": "end"},
+            ],
+            "edges": [
+                {"sourceNodeID": "start", "targetNodeID": "a"},
+                {"sourceNodeID": "a", "targetNodeID": "end"},
+            ],
+        },
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+        def user_dir(user_email=None, subdir=None):
+            path = os.path.join(self.tmp.name, subdir or "")
+            os.makedirs(path, exist_ok=True)
+            return path
+
+        patcher = mock.patch.object(v2, "ensure_user_data_dir", side_effect=user_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(v2.clear_v2_compile_cache)
+        v2.clear_v2_compile_cache()
+
+    def test_key_tracks_graph_content_only(self):
+        key = v2._v2_cache_key(self.FLOW, None)
+        renamed = {**self.FLOW, "skillName": "other"}
+        self.assertEqual(key, v2._v2_cache_key(renamed, None))
+        changed = json.loads(json.dumps(self.FLOW))
+        changed["workFlow"]["nodes"][1]["id"] = "b"
+        self.assertNotEqual(key, v2._v2_cache_key(changed, None))
+
+    def test_preprocessing_reused_from_memory_and_disk(self):
+        with mock.patch.object(v2, "_v2_preprocess", wraps=v2._v2_preprocess) as pre, \
+                mock.patch("agent.ec_skills.flowgram2langgraph.flowgram2langgraph", return_value=(None, [])) as v1:
+            v2.flowgram2langgraph_v2(self.FLOW)
+            v2.flowgram2langgraph_v2(self.FLOW)
+            v2.clear_v2_compile_cache()  # memory only; the file stays
+            v2.flowgram2langgraph_v2(self.FLOW)
+        self.assertEqual(pre.call_count, 1)
+        flows = [c.args[0] for c in v1.call_args_list]
+        self.assertEqual(flows[0], flows[1])
+        self.assertEqual(flows[0], flows[2])
+        self.assertIsNot(flows[0]["workFlow"], flows[1]["workFlow"])
+
+    def test_disk_writes_are_pruned_periodically(self):
+        with mock.patch.object(v2, "_V2_DISK_CACHE_MAX_FILES", 2), \
+                mock.patch.object(v2, "_V2_DISK_CACHE_PRUNE_EVERY", 3), \
+                mock.patch.object(v2, "_v2_disk_puts", 0), \
+                mock.patch.object(v2, "_v2_prune_disk_cache", wraps=v2._v2_prune_disk_cache) as prune:
+            for i in range(7):
+                v2._v2_cache_put(f"key{i}", {"n": i})
+            v2._v2_flush_writes()
+        self.assertEqual(prune.call_count, 3)  # puts 0, 3 and 6
+        cache_dir = os.path.join(self.tmp.name, v2._V2_CACHE_SUBDIR)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_debug_dumps_are_opt_in(self):
+        with mock.patch.dict(os.environ, {v2._V2_DEBUG_ENV: ""}), \
+                mock.patch.object(v2, "_v2_submit_debug") as submit:
+            v2._v2_preprocess(self.FLOW, None, "cached_demo")
+        submit.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,166 @@
+"""
+Tests for the compiled FOM scoring engine in eval_util
+
+calculate_score must produce the same scores as walking every item through
+the per-item reference path (_score_item / _safe_eval).
+"""
+
+import copy
+import math
+import os
+import random
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.mcp.server.scrapers.eval_util import (
+    _linear_interp_extrapolate,
+    _safe_eval,
+    _score_item,
+    calculate_score,
+    compile_formula,
+    get_default_fom_form,
+)
+
+
+FORMULAS = [
+    "80 + (125-price)",
+    "min(max((value - 2.5) / (3.0 - 2.5) * 100, 0), 100)",
+    "100 * qty / (qty + 1000)",
+    "sqrt(value) * 10",                 # negative values fail
+    "log(value, 10) + exp(-value / 50)",
+    "pow(value, 0.5) + value ** 2 / 7",
+    "100 / (value - 3)",                # division by zero for value == 3
+    "value // 7 + value % 7 - abs(-value)",
+    "floor(value / 3) * ceil(value) + round(value)",
+    "pi * e + sin(value) + cos(value) + tan(value) + log10(value)",
+    "unknown_field + 1",
+    "min(value)",                       # one-argument min always fails
+    "round(value, 2)",                  # float ndigits always fails
+    "(value, 1)",
+    "'text'",
+    "value if value else 0",            # disallowed node
+    "value +",                          # syntax error
+    "max(price, 1e308 * 10) - 1e308",   # overflow to inf without an exception
+    "value",
+]
+
+LUTS = [
+    {"20": 100, "10": 80, "8": 60},
+    {"1": 10},
+    {"0": 0, "5": 50, "5.0": 70, "10": 20},  # duplicate breakpoint
+    {"a": 1, "b": 2},                         # invalid
+    {"-10": 0, "0": 100, "50": "25"},
+]
+
+
+def _make_fom(rng):
+    components = []
+    for i in range(rng.randint(1, 4)):
+        if rng.random() < 0.3:
+            subs = {}
+            for j in range(rng.randint(1, 3)):
+                subs[f"sub{i}_{j}"] = _make_leaf(rng, f"sub{i}_{j}")
+            components.append({"name": f"comp{i}", "raw_value": subs, "weight": rng.choice([0, 0.2, 0.5, 1])})
+        else:
+            leaf = _make_leaf(rng, rng.choice(["price", "qty", f"comp{i}"]))
+            components.append(leaf)
+    return {"components": components}
+
+
+def _make_leaf(rng, name):
+    leaf = {"name": name, "raw_value": rng.choice([0, 3, 125, None]), "weight": rng.choice([0, 0.3, 0.7, -1])}
+    if rng.random() < 0.65:
+        leaf["score_formula"] = rng.choice(FORMULAS)
+        leaf["score_lut"] = {}
+    else:
+        leaf["score_formula"] = ""
+        leaf["score_lut"] = rng.choice(LUTS)
+    return leaf
+
+
+def _make_item(rng, i):
+    item = {"id": i}
+    for name in ("price", "qty", "value", "comp0", "comp1", "sub0_0", "sub1_1", "speed"):
+        if rng.random() < 0.7:
+            item[name] = rng.choice([0, 3, 5, 10, -4, rng.uniform(-50, 200), rng.randint(0, 10000), True])
+    if rng.random() < 0.05:
+        item["min"] = 1.0  # shadows a function name
+    if rng.random() < 0.05:
+        item["components"] = [{"name": "price", "raw_value": rng.uniform(0, 300)}]
+    return item
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is b
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return a == b
+
+
+class TestCompiledFormula(unittest.TestCase):
+    def test_matches_safe_eval(self):
+        rng = random.Random(7)
+        for formula in FORMULAS:
+            compiled = compile_formula(formula)
+            namespaces = []
+            for _ in range(200):
+                ns = {name: rng.choice([0.0, 3.0, -2.5, rng.uniform(-100, 100)]) for name in ("value", "price", "qty")}
+                namespaces.append(ns)
+            scores, valid = compiled.evaluate_many(namespaces)
+            for ns, score, ok in zip(namespaces, scores.tolist(), valid.tolist()):
+                try:
+                    expected = _safe_eval(formula, ns)
+                except Exception:
+                    expected = None
+                self.assertTrue(_same(score if ok else None, expected), (formula, ns, score, ok, expected))
+
+    def test_compiled_once(self):
+        self.assertIs(compile_formula("value * 2"), compile_formula("value * 2"))
+
+
+class TestLut(unittest.TestCase):
+    def test_interpolation(self):
+        lut = {"20": 100, "10": 80, "8": 60}
+        self.assertEqual(_linear_interp_extrapolate(10, lut), 80.0)
+        self.assertEqual(_linear_interp_extrapolate(15, lut), 90.0)
+        self.assertEqual(_linear_interp_extrapolate(6, lut), 40.0)
+        self.assertEqual(_linear_interp_extrapolate(30, lut), 120.0)
+
+
+class TestCalculateScore(unittest.TestCase):
+    def test_default_form(self):
+        fom = get_default_fom_form()
+        items = [{"price": 100, "availability": 12, "current": 2, "speed": 20}, {}]
+        scored = calculate_score(fom, copy.deepcopy(items))
+        for item, result in zip(items, scored):
+            self.assertTrue(_same(result["score"], _score_item(item, fom["components"])))
+        self.assertIsNotNone(scored[0]["score"])
+
+    def test_matches_per_item_path(self):
+        rng = random.Random(42)
+        for _ in range(60):
+            fom = _make_fom(rng)
+            items = [_make_item(rng, i) for i in range(rng.randint(0, 80))]
+            clamp = rng.random() < 0.5
+            scored = calculate_score(fom, copy.deepcopy(items), clamp=clamp)
+            self.assertEqual(len(scored), len(items))
+            for item, result in zip(items, scored):
+                expected = _score_item(item, fom["components"], clamp)
+                self.assertTrue(_same(result["score"], expected), (fom, item, result["score"], expected))
+
+    def test_clamp(self):
+        fom = {"components": [{"name": "price", "score_formula": "200 - price", "weight": 1}]}
+        scored = calculate_score(fom, [{"price": -50}, {"price": 150}, {"price": 250}], clamp=True)
+        self.assertEqual([item["score"] for item in scored], [100.0, 50.0, 0.0])
+
+    def test_unscorable_items(self):
+        fom = {"components": [{"name": "price", "score_formula": "", "score_lut": {}, "weight": 1}]}
+        self.assertEqual(calculate_score(fom, [{"price": 1}]), [{"price": 1, "score": None}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Tests for the persistent log line index (utils.log_index)
+
+Covers:
+- Pages of lines and of one level match a plain read of the file
+- Tailing appended bytes, including a partial last line
+- Rotation / truncation detection
+- Reusing the saved index, and rejecting it after the file changed
+- Incremental regex search with a level filter and resume
+"""
+
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_index import LEVELS, LogIndex, compile_pattern
+
+_HEADER = re.compile(r"\d{4}-\d\d-\d\d [\d:,.]{12} - [^ \n]+ - ([A-Z]+) - ")
+
+
+def make_lines(n, seed=3):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        level = rng.choice(["DEBUG", "DEBUG", "INFO", "INFO", "WARNING", "ERROR", "TRACE"])
+        lines.append(f"2025-11-06 12:{i // 60 % 60:02d}:{i % 60:02d},{i % 1000:03d} - eCan - {level} - "
+                     f"[Agent] step {i} 状态 ok {'x' * rng.randrange(0, 120)}")
+        if level == "ERROR":
+            lines += ["Traceback (most recent call last):", f'  File "skill.py", line {i}, in run',
+                      "ValueError: message says - ERROR - but is not a header"]
+        if i % 997 == 0:
+            lines.append("y" * 3000)  # longer than a block
+    return lines
+
+
+def level_of(line):
+    match = _HEADER.match(line)
+    return match.group(1) if match and match.group(1) in LEVELS else None
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "eCan.log")
+        self.lines = make_lines(3000)
+        self._write(self.lines)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write(self, lines, mode="w"):
+        with open(self.path, mode, encoding="utf-8", newline="\n") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+    def _index(self, **kwargs):
+        # Small blocks so a few hundred KB spans hundreds of blocks
+        return LogIndex(self.path, block_bytes=kwargs.pop("block_bytes", 2048), **kwargs).open()
+
+    def _assert_matches(self, index, lines):
+        self.assertEqual(index.line_count, len(lines))
+        rng = random.Random(5)
+        for start in [0, len(lines) - 50] + [rng.randrange(len(lines)) for _ in range(30)]:
+            self.assertEqual(index.read_lines(start, 70), lines[start:start + 70])
+        for level in LEVELS:
+            expected = [(n, line) for n, line in enumerate(lines) if level_of(line) == level]
+            self.assertEqual(index.level_count(level), len(expected), level)
+            self.assertEqual(index.read_level_lines(level, 0, len(expected) + 5), expected)
+            if expected:
+                middle = len(expected) // 2
+                self.assertEqual(index.read_level_lines(level, middle, 40), expected[middle:middle + 40])
+
+    def test_pages_and_levels_match_the_file(self):
+        index = self._index()
+        self.assertGreater(len(index._offsets), 100)
+        self.assertTrue(index.levels_complete)
+        self._assert_matches(index, self.lines)
+        picks = [3, 4, 500, 2999, len(self.lines) - 1]
+        self.assertEqual(index.read_line_numbers(picks), [self.lines[n] for n in picks])
+
+    def test_levels_pass_after_a_large_backlog(self):
+        index = LogIndex(self.path, block_bytes=2048)
+        index.levels_inline_bytes = 0  # treat the whole file as a backlog
+        index.open()
+        self.assertFalse(index.levels_complete)
+        self.assertEqual(index.level_count("ERROR"), 0)
+        # Appended while the level pass is pending: extends the last block and adds new ones
+        more = make_lines(400, seed=9)
+        self._write(more, "a")
+        index.refresh()
+        with mock.patch("utils.log_index.READ_CHUNK", 4096):
+            self.assertFalse(index.build_levels(max_bytes=1))
+            self.assertGreater(index.level_count("DEBUG"), 0)
+            self.assertTrue(index.build_levels())
+        self._assert_matches(index, self.lines + more)
+
+    def test_tail_only_indexes_complete_appended_lines(self):
+        index = self._index()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("2025-11-06 13:00:00,000 - eCan - ERROR - tail one\n2025-11-06 13:00:01,000 - eCan - INF")
+        update = index.refresh()
+        self.assertEqual((update.reset, update.lines), (False, 1))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("O - tail two\n")
+        self.assertEqual(index.refresh().lines, 1)
+        self.assertEqual(index.refresh().lines, 0)
+        expected = self.lines + ["2025-11-06 13:00:00,000 - eCan - ERROR - tail one",
+                                 "2025-11-06 13:00:01,000 - eCan - INFO - tail two"]
+        self._assert_matches(index, expected)
+
+    def test_rotation_and_truncation_rebuild_the_index(self):
+        index = self._index()
+        generation = index.generation
+        os.rename(self.path, self.path + ".1")
+        rotated = make_lines(50, seed=11)
+        self._write(rotated)
+        update = index.refresh()
+        self.assertTrue(update.reset)
+        self.assertGreater(index.generation, generation)
+        self._assert_matches(index, rotated)
+
+        # Same inode, rewritten in place with different content
+        replaced = make_lines(60, seed=12)
+        self._write(replaced)
+        self.assertTrue(index.refresh().reset)
+        self._assert_matches(index, replaced)
+
+    def test_saved_index_is_reused_until_the_file_changes(self):
+        first = self._index()
+        first.close()
+        self.assertTrue(os.path.exists(first.index_path))
+        more = make_lines(200, seed=4)
+        self._write(more, "a")
+
+        reopened = self._index()
+        self.assertTrue(reopened.reused)
+        self._assert_matches(reopened, self.lines + more)
+        reopened.close()
+
+        self._write(make_lines(3000, seed=8))  # different head
+        rebuilt = self._index()
+        self.assertFalse(rebuilt.reused)
+        self._assert_matches(rebuilt, make_lines(3000, seed=8))
+
+    def test_incremental_search_with_level_filter_and_resume(self):
+        index = self._index()
+        pattern = compile_pattern(r"step \d*7 ")
+        batches = list(index.search(pattern))
+        found = [n for hits, _ in batches for n in hits]
+        expected = [n for n, line in enumerate(self.lines) if re.search(r"step \d*7 ", line)]
+        self.assertEqual(found, expected)
+        self.assertEqual(batches[-1][1], index.line_count)
+
+        hits = [n for hits, _ in index.search(compile_pattern("STEP 1", regex=False), level="ERROR") for n in hits]
+        self.assertEqual(hits, [n for n, line in enumerate(self.lines)
+                                if "step 1" in line and level_of(line) == "ERROR"])
+        # Continuation lines match text but have no level
+        self.assertTrue(any("- ERROR -" in self.lines[n] for n in
+                            (n for hits, _ in index.search(compile_pattern("says - ERROR")) for n in hits)))
+
+        start = index.line_count
+        self._write(["2025-11-06 14:00:00,000 - eCan - INFO - step 77 late"], "a")
+        index.refresh()
+        self.assertEqual([n for hits, _ in index.search(pattern, start_line=start) for n in hits], [start])
+        with self.assertRaises(re.error):
+            compile_pattern("(unclosed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+"""
+Tests for the queued logging pipeline and lazy log arguments (utils.logger_helper)
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_helper import (
+    BatchedRotatingFileHandler,
+    BatchedStreamHandler,
+    lazy,
+    lazy_truncate,
+    logger_helper,
+    start_queued_logging,
+)
+
+
+class _GatedHandler(logging.Handler):
+    """Collects messages; blocks the writer thread until the gate opens."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.entered.set()
+        self.gate.wait(5)
+        self.messages.append((record.levelname, self.format(record)))
+
+
+class TestQueuedLogging(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger(f"test-pipeline-{self.id()}")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.listener = None
+
+    def tearDown(self):
+        if self.listener:
+            self.listener.stop()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+
+    def test_records_from_many_threads_reach_the_file_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "app.log")
+            handler = BatchedRotatingFileHandler(path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+            _, self.listener = start_queued_logging(self.logger, [handler], queue_size=10000)
+            self.assertEqual(self.listener._thread.name, "LogWriter")
+
+            def worker(n):
+                for i in range(200):
+                    self.logger.info("thread %d line %d", n, i)
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                self.logger.exception("failed")
+            self.listener.stop()
+            self.listener = None
+            handler.close()
+
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        for n in range(5):
+            mine = [line for line in lines if line.startswith(f"INFO thread {n} ")]
+            self.assertEqual(mine, [f"INFO thread {n} line {i}" for i in range(200)])
+        self.assertEqual(lines[1000], "ERROR failed")
+        self.assertIn("ValueError: boom", lines[-1])
+
+    def test_full_queue_drops_debug_but_keeps_warnings(self):
+        handler = _GatedHandler()
+        queue_handler, self.listener = start_queued_logging(self.logger, [handler], queue_size=3)
+        self.logger.debug("first")
+        self.assertTrue(handler.entered.wait(5))  # the writer is now stuck on "first"
+        for i in range(10):
+            self.logger.debug("filler %d", i)
+        self.assertEqual(queue_handler.dropped, 7)
+
+        warned = threading.Thread(target=self.logger.warning, args=("must not be lost",))
+        warned.start()
+        time.sleep(0.05)
+        self.assertTrue(warned.is_alive())  # waits for room instead of dropping
+        handler.gate.set()
+        warned.join(5)
+        self.listener.stop()
+        self.listener = None
+
+        notice = "[Logger] ⚠️ 7 log records dropped (queue full)"
+        messages = [m for _, m in handler.messages]
+        self.assertIn(("WARNING", notice), handler.messages)
+        self.assertEqual([m for m in messages if m != notice],
+                         ["first", "filler 0", "filler 1", "filler 2", "must not be lost"])
+
+    def test_block_policy_never_drops(self):
+        handler = _GatedHandler()
+        queue_handler, self.listener = start_queued_logging(self.logger, [handler], queue_size=2, overflow="block")
+        producer = threading.Thread(target=lambda: [self.logger.debug("line %d", i) for i in range(20)])
+        producer.start()
+        time.sleep(0.05)
+        self.assertTrue(producer.is_alive())
+        handler.gate.set()
+        producer.join(5)
+        self.listener.stop()
+        self.listener = None
+        self.assertEqual(queue_handler.dropped, 0)
+        self.assertEqual([m for _, m in handler.messages], [f"line {i}" for i in range(20)])
+
+    def test_console_with_a_bad_descriptor_is_dropped_once(self):
+        class BadDescriptorStream:
+            closed = False
+            writes = 0
+
+            def write(self, text):
+                self.writes += 1
+                raise OSError(9, "Bad file descriptor")
+
+            def flush(self):
+                raise OSError(9, "Bad file descriptor")
+
+        stream = BadDescriptorStream()
+        console = BatchedStreamHandler(stream)
+        collected = _GatedHandler()
+        collected.gate.set()
+        errors = []
+        console.handleError = errors.append
+        _, self.listener = start_queued_logging(self.logger, [console, collected])
+        for i in range(100):
+            self.logger.info("line %d", i)
+        self.listener.stop()
+        self.listener = None
+
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(errors, [])
+        # The other handlers keep getting every record
+        self.assertEqual(len(collected.messages), 100)
+
+
+class TestLazyArguments(unittest.TestCase):
+    def setUp(self):
+        self._level = logger_helper.logger.level
+
+    def tearDown(self):
+        logger_helper.logger.setLevel(self._level)
+
+    def test_lazy_args_are_only_rendered_when_enabled(self):
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "rendered"
+
+        logger_helper.logger.setLevel(logging.INFO)
+        logger_helper.debug("state:", lazy(expensive))
+        self.assertEqual(calls, [])
+        self.assertFalse(logger_helper.is_enabled_for(logging.DEBUG))
+
+        self.assertEqual(logger_helper._join_message_args("state:", lazy(expensive)), "state: rendered")
+        self.assertEqual(calls, [1])
+        self.assertTrue(str(lazy_truncate("x" * 1000, 50)).startswith("x" * 47 + "..."))
+
+
+class TestShutdownRegistration(unittest.TestCase):
+    def test_falls_back_to_atexit_without_threading_register_atexit(self):
+        import types
+        from unittest import mock
+        from utils import logger_helper as module
+
+        threading_without_hook = types.SimpleNamespace(
+            **{k: v for k, v in vars(threading).items() if k != "_register_atexit"})
+        helper = object.__new__(module.LoggerHelper)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(module, "LOG_ASYNC", True), \
+                mock.patch.object(module, "threading", threading_without_hook), \
+                mock.patch.object(module.atexit, "register") as register:
+            helper.setup(f"test-pipeline-{self.id()}", os.path.join(tmp, "app.log"), logging.DEBUG)
+            try:
+                register.assert_called_once_with(helper.shutdown)
+            finally:
+                helper.shutdown()
+                for handler in list(helper.logger.handlers):
+                    helper.logger.removeHandler(handler)
+                    handler.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
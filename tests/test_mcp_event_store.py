@@ -0,0 +1,139 @@
+"""
+Tests for the bounded / persistent MCP event store (agent.mcp.server.event_store)
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ValueError:
+        # Replaced by a stub in sys.modules (e.g. by test_mcp_server_tools)
+        return False
+
+
+def _message(n):
+    from mcp.types import JSONRPCMessage, JSONRPCNotification
+    return JSONRPCMessage(JSONRPCNotification(jsonrpc="2.0", method="notifications/progress", params={"n": n}))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@unittest.skipIf(not _available("mcp"), "mcp not available")
+class TestBoundedEventStore(unittest.TestCase):
+    def _store(self, **kwargs):
+        from agent.mcp.server.event_store import BoundedEventStore
+        self.clock = _Clock()
+        return BoundedEventStore(clock=self.clock, **kwargs)
+
+    def _store_all(self, store, stream_id, count, start=0):
+        return [asyncio.run(store.store_event(stream_id, _message(start + i))) for i in range(count)]
+
+    def _replay(self, store, event_id):
+        replayed = []
+
+        async def collect(event):
+            replayed.append((event.event_id, event.message.root.params["n"]))
+
+        stream_id = asyncio.run(store.replay_events_after(event_id, collect))
+        return stream_id, replayed
+
+    def test_replay_returns_only_later_events_of_the_same_stream(self):
+        store = self._store()
+        a = self._store_all(store, "a", 5)
+        self._store_all(store, "b", 3)
+        stream_id, replayed = self._replay(store, a[1])
+        self.assertEqual(stream_id, "a")
+        self.assertEqual(replayed, [(a[2], 2), (a[3], 3), (a[4], 4)])
+        self.assertEqual(self._replay(store, a[4]), ("a", []))
+        self.assertEqual(self._replay(store, "not-an-id"), (None, []))
+        self.assertEqual(self._replay(store, "99-1"), (None, []))
+
+    def test_per_stream_and_global_limits(self):
+        store = self._store(max_events_per_stream=4, max_total_events=6)
+        a = self._store_all(store, "a", 6)
+        self.assertEqual(store.stats()["events"], 4)
+        # Evicted events can no longer be resumed from
+        self.assertIsNone(self._replay(store, a[0])[0])
+        self.assertEqual(len(self._replay(store, a[2])[1]), 3)
+
+        self._store_all(store, "b", 4)
+        self.assertEqual(store.stats()["events"], 6)
+        # The least recently active stream gave way
+        self.assertEqual(self._replay(store, a[4])[1], [(a[5], 5)])
+        self.assertIsNone(self._replay(store, a[3])[0])
+
+    def test_idle_streams_expire(self):
+        store = self._store(idle_ttl=100)
+        a = self._store_all(store, "a", 2)
+        self.clock.now += 60
+        self._store_all(store, "b", 1)
+        self.clock.now += 60
+        self._store_all(store, "b", 1)
+        self.assertEqual(store.stats(), {"streams": 1, "events": 2, "persistent": False})
+        self.assertIsNone(self._replay(store, a[0])[0])
+
+    def test_events_survive_restart_with_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "events.db")
+            store = self._store(db_path=db_path, max_events_per_stream=2)
+            a = self._store_all(store, "a", 4)
+            # Older than the in-memory window: served from the database
+            self.assertEqual(self._replay(store, a[0])[1], [(a[1], 1), (a[2], 2), (a[3], 3)])
+            store.close()
+
+            restarted = self._store(db_path=db_path)
+            stream_id, replayed = self._replay(restarted, a[1])
+            self.assertEqual(stream_id, "a")
+            self.assertEqual(replayed, [(a[2], 2), (a[3], 3)])
+            # New streams get fresh keys, old event IDs keep pointing at old events
+            new = self._store_all(restarted, "a", 1)
+            self.assertNotEqual(new[0].split("-")[0], a[0].split("-")[0])
+            self.assertEqual(self._replay(restarted, a[3]), ("a", []))
+
+            # Expired events are pruned from the database on the next sweep
+            self.clock.now += restarted.idle_ttl + 1
+            self._store_all(restarted, "c", 1)
+            self.assertIsNone(self._replay(restarted, a[1])[0])
+            restarted.close()
+
+    def test_sqlite_commits_are_batched_on_the_writer_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(db_path=os.path.join(tmp, "events.db"), max_events_per_stream=2)
+            commits = []
+            caller = threading.current_thread()
+            stored = threading.Event()
+
+            def trace(sql):
+                if threading.current_thread() is not caller:
+                    stored.wait(5)  # hold the writer until every event is queued
+                if sql == "COMMIT":
+                    commits.append(threading.current_thread().name)
+
+            store._db.set_trace_callback(trace)
+            a = self._store_all(store, "a", 10)
+            stored.set()
+            self.assertEqual(self._replay(store, a[0])[1], [(a[i], i) for i in range(1, 10)])
+            self.assertLessEqual(len(commits), 2)
+            self.assertEqual(set(commits), {"mcp-event-store-writer"})
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
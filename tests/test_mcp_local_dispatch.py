@@ -0,0 +1,109 @@
+"""
+Tests for in-process dispatch of MCP tool calls to the local server (agent.mcp.local_dispatch)
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ValueError:
+        # Replaced by a stub in sys.modules (e.g. by test_mcp_server_tools)
+        return False
+
+
+class TestLocalMCPUrl(unittest.TestCase):
+    @unittest.skipIf(not _available("mcp"), "mcp not available")
+    def test_only_local_endpoint_matches(self):
+        from agent.mcp.local_dispatch import is_local_mcp_url
+        with mock.patch.dict(os.environ, {"ECAN_LOCAL_SERVER_PORT": "4668"}):
+            self.assertTrue(is_local_mcp_url("http://127.0.0.1:4668/mcp/"))
+            self.assertTrue(is_local_mcp_url("http://localhost:4668/mcp"))
+            self.assertFalse(is_local_mcp_url("http://127.0.0.1:4669/mcp/"))
+            self.assertFalse(is_local_mcp_url("http://10.0.0.5:4668/mcp/"))
+            self.assertFalse(is_local_mcp_url("https://mcp.example.com/mcp/"))
+            self.assertFalse(is_local_mcp_url("http://127.0.0.1:4668/sse"))
+
+
+@unittest.skipIf(not all(_available(m) for m in ("mcp", "uvicorn", "starlette")),
+                 "mcp/uvicorn/starlette not available")
+class TestInProcessDispatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from mcp import types
+        from tests.benchmarks.bench_mcp_call_overhead import LocalMCPServer, make_server
+
+        server = make_server()
+        cls.tool_threads = []
+
+        @server.list_tools()
+        async def list_tools():
+            schema = {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}
+            return [types.Tool(name=name, inputSchema=schema) for name in ("echo", "fail", "slow")]
+
+        @server.call_tool()
+        async def call_tool(name, args):
+            cls.tool_threads.append(threading.current_thread())
+            if name == "fail":
+                raise RuntimeError("tool exploded")
+            if name == "slow":
+                await asyncio.sleep(5)
+            return [types.TextContent(type="text", text=args["text"])]
+
+        cls.local = LocalMCPServer(server).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.local.__exit__(None, None, None)
+
+    def _call(self, tool, args, direct, timeout=10.0):
+        from agent.mcp.local_client import mcp_client_manager
+
+        async def main():
+            try:
+                return await mcp_client_manager.call_tool(self.local.url, tool, args, timeout=timeout)
+            finally:
+                await mcp_client_manager.close()
+
+        with mock.patch.dict(os.environ, {"ECAN_MCP_DIRECT_DISPATCH": "1" if direct else "0"}):
+            return asyncio.run(main())
+
+    def test_results_match_http(self):
+        cases = [("echo", {"text": "hi"}), ("fail", {"text": "x"}), ("echo", {}), ("missing", {"text": "x"})]
+        for tool, args in cases:
+            with self.subTest(tool=tool, args=args):
+                http = self._call(tool, args, direct=False)
+                direct = self._call(tool, args, direct=True)
+                self.assertEqual(type(direct), type(http))
+                self.assertEqual(direct.isError, http.isError)
+                self.assertEqual([c.text for c in direct.content], [c.text for c in http.content])
+
+    def test_direct_call_skips_http_and_runs_on_server_loop(self):
+        from agent.mcp import local_client
+        self.tool_threads.clear()
+        with mock.patch.dict(os.environ, {"ECAN_MCP_DIRECT_DISPATCH": "1"}), \
+                mock.patch.object(local_client.Streamable_HTTP_Manager, "get") as get_session, \
+                mock.patch.object(local_client, "streamablehttp_client") as ephemeral:
+            result = asyncio.run(local_client.mcp_client_manager.call_tool(self.local.url, "echo", {"text": "fast"}))
+        get_session.assert_not_called()
+        ephemeral.assert_not_called()
+        self.assertEqual(result.content[0].text, "fast")
+        self.assertIsNot(self.tool_threads[-1], threading.current_thread())
+
+    def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            self._call("slow", {"text": "x"}, direct=True, timeout=0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for the per-loop persistent MCP session (agent.mcp.streamablehttp_manager)
+
+Covers:
+- The session opened during a pool call survives that call's cancel_leftovers
+  and is reused by the next call on the same loop
+- Pool shutdown closes it
+- Warmup happens per event loop
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _available(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ValueError:
+        # Replaced by a stub in sys.modules (e.g. by test_mcp_server_tools)
+        return False
+
+
+@unittest.skipIf(not all(_available(m) for m in ("mcp", "uvicorn", "starlette")),
+                 "mcp/uvicorn/starlette not available")
+class TestPersistentSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from mcp import types
+        from tests.benchmarks.bench_mcp_call_overhead import LocalMCPServer, make_server
+
+        server = make_server()
+
+        @server.list_tools()
+        async def list_tools():
+            schema = {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}
+            return [types.Tool(name="echo", inputSchema=schema)]
+
+        @server.call_tool()
+        async def call_tool(name, args):
+            return [types.TextContent(type="text", text=args["text"])]
+
+        cls.local = LocalMCPServer(server).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.local.__exit__(None, None, None)
+
+    def test_session_outlives_the_call_that_opened_it(self):
+        from agent.mcp.streamablehttp_manager import Streamable_HTTP_Manager
+        from utils.async_loop_pool import AsyncLoopPool
+
+        async def call(text):
+            mgr = Streamable_HTTP_Manager.get(self.local.url)
+            session = await asyncio.wait_for(mgr.session(), timeout=10)
+            result = await asyncio.wait_for(session.call_tool("echo", {"text": text}), timeout=10)
+            return session, mgr._runner, result.content[0].text
+
+        pool = AsyncLoopPool(max_loops=1)
+        try:
+            first = pool.run(lambda: call("one"), cancel_leftovers=True)
+            second = pool.run(lambda: call("two"), cancel_leftovers=True)
+        finally:
+            pool.shutdown(timeout=5)
+
+        self.assertEqual((first[2], second[2]), ("one", "two"))
+        self.assertIs(second[0], first[0])
+        self.assertIs(second[1], first[1])
+        self.assertTrue(first[1].done())
+
+    def test_each_event_loop_warms_up_its_own_session(self):
+        from agent.mcp import local_client
+        from agent.mcp.streamablehttp_manager import Streamable_HTTP_Manager
+
+        async def warm_up():
+            mgr = Streamable_HTTP_Manager.get(self.local.url)
+            try:
+                return await local_client.warmup_mcp_session(), mgr.is_open, mgr.warmup_attempted
+            finally:
+                await mgr.close()
+
+        with mock.patch.object(local_client, "mcp_http_base", return_value=self.local.url):
+            self.assertEqual(asyncio.run(warm_up()), (True, True, True))
+            self.assertEqual(asyncio.run(warm_up()), (True, True, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
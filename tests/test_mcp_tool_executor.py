@@ -0,0 +1,145 @@
+"""
+Tests for the MCP tool execution layer (agent.mcp.server.tool_executor)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def blocking_tool(mainwin, args):
+    # `async def` but blocks, like mouse_click / selenium tools
+    time.sleep(args["input"]["seconds"])
+    return [threading.current_thread().name]
+
+
+def sync_tool(mainwin, args):
+    return [threading.current_thread().name]
+
+
+async def async_tool(mainwin, args):
+    await asyncio.sleep(args["input"]["seconds"])
+    return [threading.current_thread().name]
+
+
+class TestToolExecutor(unittest.TestCase):
+    def setUp(self):
+        from agent.mcp.server import tool_executor
+        self.executor = tool_executor
+        tool_executor.reset_tool_stats()
+
+    def tearDown(self):
+        self.executor.shutdown_tool_executor(wait=True)
+
+    def test_classification(self):
+        classify = self.executor.classify_tool
+        self.assertEqual(classify("mouse_click", blocking_tool), self.executor.ToolPolicy(True, "input"))
+        self.assertEqual(classify("in_browser_go_to_url", async_tool), self.executor.ToolPolicy(False, "browser"))
+        self.assertEqual(classify("os_wait", async_tool), self.executor.ToolPolicy(False, None))
+        self.assertTrue(classify("api_ecan_ai_get_nodes_prompts", sync_tool).blocking)
+
+    def test_blocking_tools_leave_the_loop_responsive(self):
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            tick_task = asyncio.create_task(ticker())
+            results = await asyncio.gather(
+                self.executor.run_tool("os_copy_file_dir", blocking_tool, None, {"input": {"seconds": 0.3}}),
+                self.executor.run_tool("api_ecan_ai_get_nodes_prompts", sync_tool, None, {}),
+                self.executor.run_tool("os_wait", async_tool, None, {"input": {"seconds": 0.05}}),
+            )
+            tick_task.cancel()
+            return results, ticks
+
+        start = time.perf_counter()
+        (blocked, synced, awaited), ticks = asyncio.run(main())
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertGreater(ticks, 10)
+        self.assertTrue(blocked[0].startswith("mcp-tool"))
+        self.assertTrue(synced[0].startswith("mcp-tool"))
+        self.assertEqual(awaited[0], threading.current_thread().name)
+
+    def test_input_tools_run_one_at_a_time_and_record_stats(self):
+        async def main():
+            return await asyncio.gather(*(
+                self.executor.run_tool(name, blocking_tool, None, {"input": {"seconds": 0.1}})
+                for name in ("mouse_click", "keyboard_text_input", "mouse_move")
+            ))
+
+        start = time.perf_counter()
+        asyncio.run(main())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+
+        stats = self.executor.get_tool_stats()
+        waits = sorted(stats[name]["queue_wait_max"] for name in ("mouse_click", "keyboard_text_input", "mouse_move"))
+        self.assertLess(waits[0], 0.05)
+        self.assertGreaterEqual(waits[2], 0.18)
+        for name in ("mouse_click", "keyboard_text_input", "mouse_move"):
+            self.assertEqual(stats[name]["calls"], 1)
+            self.assertEqual(stats[name]["in_flight"], 0)
+            self.assertTrue(stats[name]["off_loop"])
+            self.assertGreaterEqual(stats[name]["run_total"], 0.09)
+
+    def test_cancelled_caller_keeps_the_resource_until_the_tool_ends(self):
+        async def main():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self.executor.run_tool("mouse_click", blocking_tool, None, {"input": {"seconds": 0.3}}), 0.05)
+            started = time.perf_counter()
+            await self.executor.run_tool("mouse_move", blocking_tool, None, {"input": {"seconds": 0}})
+            return time.perf_counter() - started
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.2)
+        self.assertEqual(self.executor.get_tool_stats()["mouse_click"]["errors"], 1)
+
+    def test_failed_submit_releases_the_resource(self):
+        async def main():
+            with mock.patch.object(self.executor, "_get_executor", side_effect=RuntimeError("pool shut down")):
+                with self.assertRaises(RuntimeError):
+                    await self.executor.run_tool("mouse_click", blocking_tool, None, {"input": {"seconds": 0}})
+            return await asyncio.wait_for(
+                self.executor.run_tool("mouse_move", sync_tool, None, {}), 1)
+
+        self.assertTrue(asyncio.run(main())[0].startswith("mcp-tool"))
+
+    def test_shutdown_closes_worker_event_loops(self):
+        loops = []
+
+        async def loop_tool(mainwin, args):
+            loops.append(asyncio.get_running_loop())
+            time.sleep(args["input"]["seconds"])
+            return []
+
+        async def main():
+            await self.executor.run_tool("os_copy_file_dir", loop_tool, None, {"input": {"seconds": 0}})
+            # Still running when the pool shuts down
+            return asyncio.create_task(
+                self.executor.run_tool("os_move_file", loop_tool, None, {"input": {"seconds": 0.2}}))
+
+        async def shut_down_while_running():
+            task = await main()
+            await asyncio.sleep(0.05)
+            self.executor.shutdown_tool_executor()
+            await task
+
+        asyncio.run(shut_down_while_running())
+        self.assertEqual(len(loops), 2)
+        self.assertTrue(all(loop.is_closed() for loop in loops))
+        self.assertEqual(self.executor._worker_loops, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for the offline sync queue and batched replay
+(agent.cloud_api.offline_sync_queue / offline_sync_manager)
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestOfflineSyncQueue(unittest.TestCase):
+    def setUp(self):
+        from agent.cloud_api.offline_sync_queue import OfflineSyncQueue
+        self.tmp = tempfile.mkdtemp()
+        self.queue = OfflineSyncQueue(cache_dir=self.tmp)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_updates_coalesce_and_delete_supersedes(self):
+        q = self.queue
+        add_id = q.add("skill", {"id": "s1", "name": "v1"}, "add")
+        self.assertEqual(q.add("skill", {"id": "s1", "name": "v2"}, "update"), add_id)
+        self.assertEqual(q.add("skill", {"id": "s1", "name": "v3"}, "update"), add_id)
+        q.add("skill", {"id": "s2", "name": "other"}, "update")
+        pending = q.get_pending_tasks()
+        self.assertEqual([(t["operation"], t["data"]["name"]) for t in pending], [("add", "v3"), ("update", "other")])
+        self.assertEqual(pending[0]["revision"], 2)
+
+        q.add("skill", {"id": "s1"}, "delete")
+        # A re-add after the delete is a new task, replayed after it
+        q.add("skill", {"id": "s1", "name": "again"}, "add")
+        self.assertEqual([(t["data"]["id"], t["operation"]) for t in q.get_pending_tasks()],
+                         [("s2", "update"), ("s1", "delete"), ("s1", "add")])
+
+    def test_partial_updates_merge_into_the_pending_task(self):
+        q = self.queue
+        update_id = q.add("skill", {"id": "s1", "name": "renamed"}, "update")
+        self.assertEqual(q.add("skill", {"id": "s1", "description": "new text"}, "update"), update_id)
+        q.add("skill", {"id": "s1", "name": "renamed again"}, "update")
+        [task] = q.get_pending_tasks()
+        self.assertEqual(task["data"], {"id": "s1", "name": "renamed again", "description": "new text"})
+
+    def test_success_keeps_task_that_changed_since_it_was_read(self):
+        q = self.queue
+        task_id = q.add("skill", {"id": "s1", "name": "v1"}, "add")
+        read = q.get_pending_tasks()[0]
+        q.add("skill", {"id": "s1", "name": "v2"}, "update")
+        q.mark_success(task_id, read["revision"])
+        self.assertEqual(q.get_pending_tasks()[0]["data"]["name"], "v2")
+        q.mark_success(task_id)
+        self.assertEqual(q.get_stats()["pending_count"], 0)
+
+    def test_retries_persistence_and_legacy_import(self):
+        from agent.cloud_api.offline_sync_queue import OfflineSyncQueue
+        q = self.queue
+        task_id = q.add("agent", {"id": "a1"}, "add")
+        for _ in range(3):
+            q.mark_failed(task_id, "offline")
+        self.assertEqual(q.get_stats()["failed_by_type"], {"agent": 1})
+        q.close()
+
+        legacy = [{"id": "tool_add_1", "data_type": "tool", "operation": "add", "data": {"id": "t1"},
+                   "created_at": "2025-01-01T00:00:00", "retry_count": 0, "status": "pending"}]
+        with open(os.path.join(self.tmp, "pending_sync.json"), "w", encoding="utf-8") as f:
+            json.dump(legacy, f)
+
+        self.queue = q = OfflineSyncQueue(cache_dir=self.tmp)
+        self.assertEqual(q.get_stats()["pending_by_type"], {"tool": 1})
+        self.assertEqual(q.get_failed_tasks()[0]["last_error"], "offline")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "pending_sync.json")))
+        self.assertEqual(q.retry_all_failed(), 1)
+        self.assertEqual(q.remove_tasks_by_resource("agent", "a1", operation="add"), 1)
+        self.assertEqual([t["id"] for t in q.get_pending_tasks()], ["tool_add_1"])
+
+
+@unittest.skipIf(importlib.util.find_spec("aiolimiter") is None or importlib.util.find_spec("aiohttp") is None,
+                 "cloud_api dependencies not available")
+class TestBatchedReplay(unittest.TestCase):
+    def setUp(self):
+        from agent.cloud_api.offline_sync_queue import OfflineSyncQueue
+        self.tmp = tempfile.mkdtemp()
+        self.queue = OfflineSyncQueue(cache_dir=self.tmp)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _replay(self, appsync, **kwargs):
+        from agent.cloud_api.offline_sync_manager import OfflineSyncManager
+        from tests.benchmarks.bench_offline_sync_replay import cloud_endpoint
+        manager = OfflineSyncManager(sync_queue=self.queue)
+        try:
+            # appsync_http_request prints every raw response
+            with cloud_endpoint(appsync.url), contextlib.redirect_stdout(io.StringIO()):
+                return manager.sync_pending_queue(**kwargs)
+        finally:
+            manager.stop_auto_retry()
+
+    def test_batches_by_type_and_operation_in_resource_order(self):
+        from tests.benchmarks.bench_offline_sync_replay import LocalAppSync
+        for i in range(30):
+            self.queue.add("skill", {"id": f"s{i}", "name": "new"}, "add")
+        self.queue.add("skill", {"id": "s0", "name": "newer"}, "update")  # coalesced into the add
+        self.queue.add("skill", {"id": "s1"}, "delete")
+        self.queue.add("skill", {"id": "s1", "name": "re-added"}, "add")
+        self.queue.add("tool", {"id": "t1", "name": "tool"}, "add")
+
+        with LocalAppSync(latency=0.05) as appsync:
+            result = self._replay(appsync, batch_size=10, max_parallel=3)
+
+        self.assertEqual((result["total"], result["synced"], result["failed"]), (32, 32, 0))
+        self.assertEqual(self.queue.get_stats()["pending_count"], 0)
+        self.assertEqual(appsync.items_sent(), 32)
+        # Round 1: 3 skill add batches (29 items), the s1 delete (it superseded the first add), tool add.
+        # Round 2: the s1 re-add, which must reach the cloud after the delete
+        self.assertEqual(len(appsync.calls), 6)
+        self.assertGreater(appsync.max_in_flight, 1)
+        self.assertLessEqual(appsync.max_in_flight, 3)
+        self.assertEqual(appsync.calls[-1], ("addAgentSkills", ["s1"]))
+        self.assertIn(("removeAgentSkills", ["s1"]), appsync.calls[:-1])
+
+    def test_rejected_batch_isolates_bad_item(self):
+        from tests.benchmarks.bench_offline_sync_replay import LocalAppSync
+        for i in range(4):
+            self.queue.add("skill", {"id": f"s{i}", "name": "x"}, "add")
+
+        with LocalAppSync(reject_ids={"s2"}) as appsync:
+            result = self._replay(appsync)
+
+        self.assertEqual((result["synced"], result["failed"]), (3, 1))
+        pending = self.queue.get_pending_tasks()
+        self.assertEqual([(t["data"]["id"], t["retry_count"]) for t in pending], [("s2", 1)])
+
+    def test_unreachable_cloud_stops_replay(self):
+        import socket
+        for i in range(20):
+            self.queue.add("skill", {"id": f"s{i}", "name": "x"}, "add")
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            closed_url = f"http://127.0.0.1:{s.getsockname()[1]}/graphql"
+
+        class Closed:
+            url = closed_url
+
+        result = self._replay(Closed(), batch_size=5, max_parallel=1)
+        self.assertEqual((result["synced"], result["failed"], result["skipped"]), (0, 5, 15))
+        self.assertEqual(self.queue.get_stats()["pending_count"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import hashlib
+import os
+import tempfile
+import threading
+import importlib.util
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def _make_versions(size=2 * 1024 * 1024):
+    old = os.urandom(size)
+    new = old[:4096] + b'patched' * 300 + old[4096:size // 2] + os.urandom(2048) + old[size // 2:]
+    return old, new
+
+
+@unittest.skipIf(importlib.util.find_spec('zstandard') is None, 'zstandard not available')
+class TestDeltaFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.old, self.new = _make_versions()
+        (self.dir / 'old.pkg').write_bytes(self.old)
+        (self.dir / 'new.pkg').write_bytes(self.new)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_is_small_and_verified(self):
+        from ota.core.delta import create_delta, apply_delta
+        meta = create_delta(self.dir / 'old.pkg', self.dir / 'new.pkg', self.dir / 'p.zstpatch')
+        self.assertLess(meta['file_size'], len(self.new) // 50)
+        self.assertEqual(meta['from_signature'], hashlib.sha256(self.old).hexdigest())
+        self.assertEqual(meta['sha256'], hashlib.sha256((self.dir / 'p.zstpatch').read_bytes()).hexdigest())
+
+        digest = apply_delta(self.dir / 'old.pkg', self.dir / 'p.zstpatch', self.dir / 'out.pkg',
+                             base_sha256=meta['from_signature'],
+                             expected_sha256=hashlib.sha256(self.new).hexdigest())
+        self.assertEqual(digest, hashlib.sha256(self.new).hexdigest())
+        self.assertEqual((self.dir / 'out.pkg').read_bytes(), self.new)
+
+    def test_wrong_base_or_target_rejected(self):
+        from ota.core.delta import create_delta, apply_delta, DeltaError
+        create_delta(self.dir / 'old.pkg', self.dir / 'new.pkg', self.dir / 'p.zstpatch')
+        with self.assertRaises(DeltaError):
+            apply_delta(self.dir / 'old.pkg', self.dir / 'p.zstpatch', self.dir / 'out.pkg', expected_sha256='0' * 64)
+        (self.dir / 'other.pkg').write_bytes(os.urandom(len(self.old)))
+        with self.assertRaises(DeltaError):
+            apply_delta(self.dir / 'other.pkg', self.dir / 'p.zstpatch', self.dir / 'out.pkg')
+        self.assertFalse((self.dir / 'out.pkg').exists())
+
+
+@unittest.skipIf(importlib.util.find_spec('zstandard') is None or importlib.util.find_spec('flask') is None,
+                 'zstandard/Flask not available')
+class TestAppcastDeltas(unittest.TestCase):
+    def test_generated_appcast_lists_deltas(self):
+        from ota.server.appcast_generator import AppcastGenerator
+        from ota.core.appcast import parse_appcast
+        server_root = Path(__file__).resolve().parent.parent / 'ota' / 'server'
+        old, new = _make_versions(256 * 1024)
+        with tempfile.TemporaryDirectory() as tmp:
+            dist = Path(tmp)
+            (dist / 'history').mkdir()
+            (dist / 'eCan-1.1.0-windows-amd64-Setup.exe').write_bytes(new)
+            (dist / 'history' / 'eCan-1.0.0-windows-amd64-Setup.exe').write_bytes(old)
+            (dist / 'history' / 'eCan-1.0.0-macos-aarch64.pkg').write_bytes(old)
+
+            with tempfile.TemporaryDirectory() as out:
+                gen = AppcastGenerator(str(server_root), str(server_root))
+                gen.server_root = out  # write appcast.xml outside the source tree
+                xml = gen.generate_dynamic('http://example.test', dist_dir=dist, version='1.1.0')
+
+            items = parse_appcast(xml)
+            self.assertEqual(len(items), 1)
+            self.assertEqual(len(items[0].deltas), 1)
+            delta = items[0].deltas[0]
+            self.assertEqual(delta.from_version, '1.0.0')
+            self.assertEqual(delta.from_signature, hashlib.sha256(old).hexdigest())
+            self.assertEqual(delta.sha256, hashlib.sha256((dist / 'deltas' / Path(delta.url).name).read_bytes()).hexdigest())
+            self.assertIsNone(delta.signature)  # edSignature is reserved for Ed25519 signatures
+            self.assertTrue(delta.url.endswith('/downloads/deltas/eCan-1.1.0-windows-amd64-Setup.exe.from-1.0.0.zstpatch'))
+            self.assertEqual(delta.length, (dist / 'deltas' / Path(delta.url).name).stat().st_size)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(importlib.util.find_spec('zstandard') is None or importlib.util.find_spec('requests') is None,
+                 'zstandard/requests not available')
+class TestPackageManagerDelta(unittest.TestCase):
+    def setUp(self):
+        from ota.core.delta import create_delta
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / 'www'
+        (self.root / 'deltas').mkdir(parents=True)
+        self.old, self.new = _make_versions()
+        (self.root / 'old.pkg').write_bytes(self.old)
+        (self.root / 'app-1.1.0.pkg').write_bytes(self.new)
+        meta = create_delta(self.root / 'old.pkg', self.root / 'app-1.1.0.pkg', self.root / 'deltas' / 'd.zstpatch')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=str(self.root)))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.full_url = f'{base}/app-1.1.0.pkg'
+        self.delta = {'from_version': '1.0.0', 'url': f'{base}/deltas/d.zstpatch', 'length': meta['file_size'],
+                      'sha256': meta['sha256'], 'from_signature': meta['from_signature'], 'format': meta['format']}
+
+        from ota.core.package_manager import PackageManager
+        self.pm = PackageManager(download_dir=str(Path(self.tmp.name) / 'dl'))
+        self.pm.base_dir.mkdir(parents=True)
+        (self.pm.base_dir / meta['from_signature']).write_bytes(self.old)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _package(self, signature):
+        from ota.core.package_manager import UpdatePackage
+        return UpdatePackage('1.1.0', self.full_url, len(self.new), signature, deltas=[self.delta])
+
+    def test_rebuilds_from_delta(self):
+        from unittest import mock
+        pkg = self._package(hashlib.sha256(self.new).hexdigest())
+        with mock.patch('ota.core.package_manager.RangeDownloader', wraps=__import__(
+                'ota.core.range_downloader', fromlist=['RangeDownloader']).RangeDownloader) as downloader:
+            self.assertTrue(self.pm.download_package(pkg))
+        self.assertEqual([c.args[0] for c in downloader.call_args_list], [self.delta['url']])
+        self.assertEqual(pkg.download_path.read_bytes(), self.new)
+        self.assertEqual(pkg.file_hash, hashlib.sha256(self.new).hexdigest())
+
+        # Once verified, the new package becomes the base for the next delta
+        with mock.patch.object(self.pm, '_verify_package_format', return_value=True), \
+                mock.patch.object(self.pm, '_basic_malware_scan', return_value=True):
+            self.assertTrue(self.pm.verify_package(pkg))
+        self.assertTrue((self.pm.base_dir / pkg.file_hash).is_file())
+
+    def test_mismatch_falls_back_to_full_download(self):
+        self.delta['from_signature'] = hashlib.sha256(self.old).hexdigest()
+        (self.pm.base_dir / self.delta['from_signature']).write_bytes(os.urandom(1024))  # corrupted base
+        pkg = self._package(hashlib.sha256(self.new).hexdigest())
+        self.assertTrue(self.pm.download_package(pkg))
+        self.assertEqual(pkg.download_path.read_bytes(), self.new)
+
+    def test_failed_delta_download_leaves_no_partial_files(self):
+        import requests
+        from unittest import mock
+        from ota.core.range_downloader import RangeDownloader
+
+        class InterruptedDownloader(RangeDownloader):
+            def download(self):
+                self.part_path.write_bytes(b'\0' * 64)
+                self.state_path.write_text('{}', encoding='utf-8')
+                raise requests.ConnectionError('connection reset')
+
+        pkg = self._package(hashlib.sha256(self.new).hexdigest())
+        def downloader(url, *args, **kwargs):
+            return (InterruptedDownloader if url == self.delta['url'] else RangeDownloader)(url, *args, **kwargs)
+
+        with mock.patch('ota.core.package_manager.RangeDownloader', side_effect=downloader):
+            self.assertTrue(self.pm.download_package(pkg))
+        self.assertEqual(pkg.download_path.read_bytes(), self.new)
+        self.assertEqual(list((self.pm.download_dir / 'deltas').iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 12345)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD like update_server's send_file(conditional=True)"""
+
+    etag = '"v1"'
+    support_ranges = True
+    fail_after = None  # close the connection after this many body bytes (once)
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests_seen.append(self.headers.get('Range'))
+        data = PAYLOAD
+        start, end = 0, len(data) - 1
+        partial = False
+        header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if cls.support_ranges and header and (if_range is None or if_range == cls.etag):
+            m = re.match(r'bytes=(\d+)-(\d*)', header)
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else len(data) - 1
+            partial = True
+        body = data[start:end + 1]
+        self.send_response(206 if partial else 200)
+        if partial:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', cls.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if cls.fail_after is not None:
+            limit, cls.fail_after = cls.fail_after, None
+            self.wfile.write(body[:limit])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@unittest.skipIf(importlib.util.find_spec('requests') is None, 'requests not available')
+class TestRangeDownloader(unittest.TestCase):
+    def setUp(self):
+        _RangeHandler.etag = '"v1"'
+        _RangeHandler.support_ranges = True
+        _RangeHandler.fail_after = None
+        _RangeHandler.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _RangeHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/downloads/pkg.zip'
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = Path(self.tmp.name) / 'pkg.zip'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _downloader(self, **kwargs):
+        from ota.core.range_downloader import RangeDownloader
+        kwargs.setdefault('min_segment_size', 1024 * 1024)
+        kwargs.setdefault('read_timeout', 5)
+        kwargs.setdefault('min_speed', 0)
+        return RangeDownloader(self.url, self.dest, **kwargs)
+
+    def test_segmented_download_hashes_while_writing(self):
+        progress = []
+        digest = self._downloader(segments=4, progress_callback=progress.append).download()
+        self.assertEqual(self.dest.read_bytes(), PAYLOAD)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+        self.assertEqual(progress[-1], 100)
+        # One open-ended probe plus one request per extra segment
+        self.assertEqual(len(_RangeHandler.requests_seen), 3)
+        self.assertFalse(Path(str(self.dest) + '.part').exists())
+        self.assertFalse(Path(str(self.dest) + '.part.json').exists())
+
+    def test_resume_after_connection_drop(self):
+        import requests
+        _RangeHandler.fail_after = 1024 * 1024
+        with self.assertRaises(requests.exceptions.RequestException):
+            self._downloader(segments=1).download()
+        state = json.loads(Path(str(self.dest) + '.part.json').read_text())
+        self.assertGreater(state['segments'][0]['done'], 0)
+
+        downloader = self._downloader(segments=1)
+        digest = downloader.download()
+        self.assertGreater(downloader.resumed_bytes, 0)
+        self.assertTrue(_RangeHandler.requests_seen[-1].startswith(f"bytes={downloader.resumed_bytes}-"))
+        self.assertEqual(self.dest.read_bytes(), PAYLOAD)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+
+    def test_changed_file_restarts(self):
+        import requests
+        _RangeHandler.fail_after = 512 * 1024
+        with self.assertRaises(requests.exceptions.RequestException):
+            self._downloader(segments=1).download()
+        _RangeHandler.etag = '"v2"'  # If-Range no longer matches -> full 200 response
+        downloader = self._downloader(segments=1)
+        digest = downloader.download()
+        self.assertEqual(downloader.resumed_bytes, 0)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+
+    def test_server_without_ranges(self):
+        _RangeHandler.support_ranges = False
+        digest = self._downloader(segments=4).download()
+        self.assertEqual(self.dest.read_bytes(), PAYLOAD)
+        self.assertEqual(digest, hashlib.sha256(PAYLOAD).hexdigest())
+        self.assertEqual(len(_RangeHandler.requests_seen), 1)
+
+    def test_cancel_removes_partial(self):
+        from ota.core.range_downloader import DownloadCancelled
+        with self.assertRaises(DownloadCancelled):
+            self._downloader(segments=2, cancel_check=lambda: True).download()
+        self.assertFalse(Path(str(self.dest) + '.part').exists())
+        self.assertFalse(self.dest.exists())
+
+    def test_package_manager_reuses_download_hash(self):
+        from unittest import mock
+        from ota.core.package_manager import PackageManager, UpdatePackage
+        pm = PackageManager(download_dir=self.tmp.name)
+        pkg = UpdatePackage('1.0.0', self.url, len(PAYLOAD), hashlib.sha256(PAYLOAD).hexdigest())
+        self.assertTrue(pm.download_package(pkg))
+        self.assertEqual(pkg.file_hash, hashlib.sha256(PAYLOAD).hexdigest())
+        with mock.patch.object(pm, '_calculate_file_hash') as calc, \
+                mock.patch.object(pm, '_verify_package_format', return_value=True), \
+                mock.patch.object(pm, '_basic_malware_scan', return_value=True):
+            self.assertTrue(pm.verify_package(pkg))
+            calc.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+"""
+Tests for delta run-state streaming in IPCAPI.update_run_stat
+
+Covers:
+- Full snapshot first, top-level deltas afterwards
+- Applying the patches reproduces the state
+- Resync after failed delivery, force_full and snapshots
+- A new epoch when a run's history starts over
+- Legacy (delta disabled) payload
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.ipc.api import IPCAPI
+from gui.ipc.run_state_delta import RunStateTracker, diff_top_level, json_safe
+
+
+def apply_patch(state, ops):
+    """Python mirror of applyRunStatePatch in gui_v2/src/services/ipc/runStateDelta.ts."""
+    state = dict(state)
+    for op in ops:
+        key = op['path'][1:].replace('~1', '/').replace('~0', '~')
+        if op['op'] == 'remove':
+            state.pop(key, None)
+        else:
+            state[key] = op['value']
+    return state
+
+
+class FakeWCService:
+    """Records requests and answers them with a configurable status."""
+
+    def __init__(self):
+        self.sent = []
+        self.succeed = True
+
+    def send_request(self, method, params, meta, callback):
+        self.sent.append((method, params))
+        if callback:
+            if self.succeed:
+                callback({'status': 'success', 'result': True, 'error': None})
+            else:
+                callback({'status': 'error', 'result': None, 'error': {'message': 'frontend gone'}})
+
+
+class TestRunStateTracker(unittest.TestCase):
+
+    def test_full_then_delta(self):
+        tracker = RunStateTracker()
+        first = tracker.encode("run", {"a": 1, "messages": ["hi"], "tmp": 0, "x": 1, "y": 2})
+        self.assertEqual(first["stateMode"], "full")
+        self.assertEqual(first["stateSeq"], 1)
+
+        second = tracker.encode("run", {"a": 1, "messages": ["hi", "there"], "new": True, "x": 1, "y": 2})
+        self.assertEqual(second["stateMode"], "delta")
+        self.assertEqual(second["baseSeq"], 1)
+        self.assertEqual(
+            sorted((op["op"], op["path"]) for op in second["statePatch"]),
+            [("add", "/new"), ("remove", "/tmp"), ("replace", "/messages")],
+        )
+
+    def test_unchanged_state_sends_empty_patch(self):
+        tracker = RunStateTracker()
+        tracker.encode("run", {"a": 1})
+        update = tracker.encode("run", {"a": 1})
+        self.assertEqual(update["stateMode"], "delta")
+        self.assertEqual(update["statePatch"], [])
+
+    def test_patches_reproduce_state(self):
+        tracker = RunStateTracker()
+        states = [
+            {"messages": [], "attributes": {"thread_id": "t1"}, "a/b": 1, "c~d": 0, "k0": 0, "k1": 1},
+            {"messages": ["m1"], "attributes": {"thread_id": "t1"}, "a/b": 2, "c~d": 0, "k0": 0, "k1": 1},
+            {"messages": ["m1", "m2"], "attributes": {"thread_id": "t1", "n": 1}, "c~d": 0, "k0": 0, "k1": 1},
+        ]
+        mirror = None
+        for state in states:
+            update = tracker.encode("run", state)
+            if update["stateMode"] == "full":
+                mirror = update["nodeState"]
+            else:
+                mirror = apply_patch(mirror, update["statePatch"])
+            self.assertEqual(mirror, state)
+
+    def test_mostly_changed_state_is_sent_full(self):
+        tracker = RunStateTracker()
+        tracker.encode("run", {"a": 1, "b": 2})
+        self.assertEqual(tracker.encode("run", {"a": 3, "b": 4})["stateMode"], "full")
+
+    def test_invalidate_and_snapshot(self):
+        tracker = RunStateTracker()
+        tracker.encode("run", {"a": 1, "b": 1, "c": 1})
+        tracker.invalidate("run")
+        update = tracker.encode("run", {"a": 2, "b": 1, "c": 1})
+        self.assertEqual(update["stateMode"], "full")
+        self.assertEqual(update["stateSeq"], 2)
+        self.assertEqual(tracker.snapshot("run"), {"agentTaskId": "run", "stateEpoch": update["stateEpoch"],
+                                                   "stateSeq": 2, "nodeState": {"a": 2, "b": 1, "c": 1}})
+        self.assertIsNone(tracker.snapshot("other"))
+
+    def test_runs_are_independent_and_bounded(self):
+        tracker = RunStateTracker(max_runs=2)
+        for run in ("r1", "r2", "r3"):
+            self.assertEqual(tracker.encode(run, {"a": 1})["stateMode"], "full")
+        self.assertIsNone(tracker.snapshot("r1"))
+        self.assertEqual(tracker.encode("r3", {"a": 1})["stateMode"], "delta")
+
+    def test_new_history_gets_a_new_epoch(self):
+        tracker = RunStateTracker(max_runs=1)
+        first = tracker.encode("run", {"a": 1})
+        self.assertEqual(tracker.encode("run", {"a": 1})["stateEpoch"], first["stateEpoch"])
+
+        tracker.reset("run")
+        restarted = tracker.encode("run", {"a": 1})
+        self.assertEqual((restarted["stateMode"], restarted["stateSeq"]), ("full", 1))
+        self.assertNotEqual(restarted["stateEpoch"], first["stateEpoch"])
+
+        tracker.encode("other", {"a": 1})  # evicts "run"
+        evicted = tracker.encode("run", {"a": 1})
+        self.assertEqual(evicted["stateSeq"], 1)
+        self.assertNotEqual(evicted["stateEpoch"], restarted["stateEpoch"])
+
+    def test_encode_state_converts_only_changed_values(self):
+        class Dumped:
+            dumps = 0
+
+            def model_dump(self, mode="python"):
+                Dumped.dumps += 1
+                return {"big": "value"}
+
+        tracker = RunStateTracker()
+        state = {"result": Dumped(), "messages": ["hi"], "attributes": {"search": {"u1": 1}}, "n": 0, "m": 0}
+        first, safe = tracker.encode_state("run", state)
+        self.assertEqual(first["stateMode"], "full")
+        self.assertEqual(safe["result"], {"big": "value"})
+        self.assertEqual(Dumped.dumps, 1)
+
+        # In-place changes of the same objects, a few levels down
+        state["messages"].append("there")
+        state["attributes"]["search"]["u2"] = 2
+        second, _ = tracker.encode_state("run", state)
+        self.assertEqual(Dumped.dumps, 1)  # untouched value: neither converted nor compared
+        self.assertEqual(second["stateMode"], "delta")
+        self.assertEqual(second["statePatch"], [
+            {"op": "replace", "path": "/messages", "value": ["hi", "there"]},
+            {"op": "replace", "path": "/attributes", "value": {"search": {"u1": 1, "u2": 2}}},
+        ])
+
+        # A new object with an equal value is converted but not sent
+        state["attributes"] = {"search": {"u1": 1, "u2": 2}}
+        self.assertEqual(tracker.encode_state("run", state)[0]["statePatch"], [])
+
+        # encode() and encode_state() share one history
+        self.assertEqual(tracker.encode("run", json_safe(state))["statePatch"], [])
+        self.assertEqual(tracker.encode_state("run", state)[0]["statePatch"], [])
+        self.assertEqual(Dumped.dumps, 3)
+
+    def test_diff_escapes_pointer(self):
+        self.assertEqual(diff_top_level({}, {"a/b~": 1}), [{"op": "add", "path": "/a~1b~0", "value": 1}])
+
+    def test_json_safe(self):
+        class Obj:
+            def __init__(self):
+                self.x = {1: (2, 3)}
+        self.assertEqual(json_safe({"o": Obj(), "s": {4}}), {"o": {"x": {"1": [2, 3]}}, "s": [4]})
+
+
+class TestUpdateRunStat(unittest.TestCase):
+
+    def setUp(self):
+        IPCAPI._instance = None
+        IPCAPI._initialized = False
+        self.service = FakeWCService()
+        self.api = IPCAPI(self.service)
+
+    def tearDown(self):
+        IPCAPI._instance = None
+        IPCAPI._initialized = False
+
+    def _send(self, state, **kwargs):
+        self.api.update_run_stat("run-1", "node", "running", state, timestamp=1, **kwargs)
+        method, params = self.service.sent[-1]
+        self.assertEqual(method, "update_skill_run_stat")
+        return params
+
+    def test_delta_payload_has_no_duplicate_state(self):
+        big = {"messages": ["x" * 1000] * 50, "attributes": {"thread_id": "t"}, "step": 0}
+        full = self._send(big)
+        self.assertEqual(full["stateMode"], "full")
+        self.assertNotIn("langgraphState", full)
+
+        delta = self._send(dict(big, step=1))
+        self.assertEqual(delta["stateMode"], "delta")
+        self.assertNotIn("nodeState", delta)
+        self.assertEqual(delta["statePatch"], [{"op": "replace", "path": "/step", "value": 1}])
+        self.assertEqual(delta["current_node"], "node")
+        self.assertEqual(delta["currentNode"], "node")
+
+    def test_failed_delivery_resyncs(self):
+        self._send({"a": 1, "b": 1, "c": 1})
+        self.service.succeed = False
+        self.assertEqual(self._send({"a": 2, "b": 1, "c": 1})["stateMode"], "delta")
+        self.service.succeed = True
+        self.assertEqual(self._send({"a": 3, "b": 1, "c": 1})["stateMode"], "full")
+
+    def test_force_full_and_snapshot(self):
+        self._send({"a": 1, "b": 1, "c": 1})
+        self.assertEqual(self._send({"a": 1, "b": 1, "c": 1}, force_full=True)["stateMode"], "full")
+        self.assertEqual(self.api.get_run_state_snapshot("run-1")["nodeState"], {"a": 1, "b": 1, "c": 1})
+        epoch = self.api.get_run_state_snapshot("run-1")["stateEpoch"]
+        self.api.reset_run_state()
+        restarted = self._send({"a": 1, "b": 1, "c": 1})
+        self.assertEqual((restarted["stateMode"], restarted["stateSeq"]), ("full", 1))
+        self.assertNotEqual(restarted["stateEpoch"], epoch)
+
+    def test_legacy_payload_when_disabled(self):
+        self.api._run_state_tracker.delta_enabled = False
+        self._send({"a": 1})
+        params = self._send({"a": 1})
+        self.assertEqual(params["stateMode"], "full")
+        self.assertEqual(params["nodeState"], {"a": 1})
+        self.assertEqual(params["langgraphState"], {"a": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Tests for event-driven dispatch in TaskRunner.launch_unified_run
+
+Covers:
+- Wait timeout computation
+- Immediate dispatch of queued messages
+- Back-to-back draining without an inter-loop delay
+- Wakeup signals never reaching skills
+- stop() waking idle workers
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.a2a.common.types import TaskState, TaskStatus
+from agent.ec_tasks.models import ManagedTask
+from agent.ec_tasks.runner import TaskRunner
+from agent.ec_tasks.dispatch import (
+    MIN_QUEUE_WAIT_SEC,
+    compute_queue_wait_timeout,
+    is_shutdown_signal,
+    is_wakeup_signal,
+    wake_queue,
+)
+
+
+def _make_runner(tmpdir):
+    agent = SimpleNamespace(
+        card=SimpleNamespace(name="DispatchTestAgent"),
+        mainwin=SimpleNamespace(my_ecb_data_homepath=tmpdir),
+        tasks=[],
+    )
+    return TaskRunner(agent)
+
+
+def _make_task():
+    return ManagedTask(
+        id="task-dispatch",
+        name="dispatch task",
+        status=TaskStatus(state=TaskState.WORKING),
+        skill=SimpleNamespace(name="skill", runnable=object()),
+    )
+
+
+class TestComputeQueueWaitTimeout(unittest.TestCase):
+    """Test the queue wait timeout computation."""
+
+    def test_idle_uses_idle_wait(self):
+        self.assertEqual(compute_queue_wait_timeout(None, 600, idle_wait_sec=30), 30)
+
+    def test_pending_waits_until_deadline(self):
+        timeout = compute_queue_wait_timeout(100.0, 600, idle_wait_sec=1000, now=650.0)
+        self.assertAlmostEqual(timeout, 50.0)
+
+    def test_pending_capped_by_idle_wait(self):
+        timeout = compute_queue_wait_timeout(100.0, 600, idle_wait_sec=30, now=110.0)
+        self.assertEqual(timeout, 30)
+
+    def test_expired_deadline_never_spins(self):
+        timeout = compute_queue_wait_timeout(100.0, 600, idle_wait_sec=30, now=10_000.0)
+        self.assertEqual(timeout, MIN_QUEUE_WAIT_SEC)
+
+
+class TestSignals(unittest.TestCase):
+    """Test wakeup/shutdown signal helpers."""
+
+    def test_wake_queue(self):
+        task = _make_task()
+        self.assertTrue(wake_queue(task.queue, "test"))
+        msg = task.queue.get_nowait()
+        self.assertTrue(is_wakeup_signal(msg))
+        self.assertFalse(is_shutdown_signal(msg))
+
+    def test_wake_none_queue(self):
+        self.assertFalse(wake_queue(None))
+
+    def test_plain_messages_are_not_signals(self):
+        self.assertFalse(is_wakeup_signal({"type": "async_callback"}))
+        self.assertFalse(is_wakeup_signal("text"))
+
+
+class TestUnifiedRunDispatch(unittest.TestCase):
+    """Test the event-driven unified run loop."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.runner = _make_runner(self.tmpdir)
+        self.task = _make_task()
+        self.submitted = []
+        self.submit_event = threading.Event()
+
+        def fake_submit(task, msg, trigger_type, dev_init_state):
+            self.submitted.append((time.perf_counter(), msg))
+            self.submit_event.set()
+
+        patcher = patch.object(self.runner, "_submit_task_execution", side_effect=fake_submit)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.worker = threading.Thread(
+            target=self.runner.launch_unified_run,
+            kwargs={"task2run": self.task, "trigger_type": "a2a_queue"},
+            daemon=True,
+        )
+        self.worker.start()
+
+    def tearDown(self):
+        self.runner.close()
+        self.worker.join(timeout=2)
+
+    def test_message_dispatched_immediately(self):
+        start = time.perf_counter()
+        self.task.queue.put({"id": "m1"})
+        self.assertTrue(self.submit_event.wait(timeout=2))
+        self.assertLess(self.submitted[0][0] - start, 0.25)
+
+    def test_back_to_back_messages_drained(self):
+        start = time.perf_counter()
+        for i in range(20):
+            self.task.queue.put({"id": f"m{i}"})
+        deadline = time.time() + 2
+        while len(self.submitted) < 20 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.submitted), 20)
+        # The old loop slept 1s between messages
+        self.assertLess(self.submitted[-1][0] - start, 0.5)
+
+    def test_wakeup_not_submitted(self):
+        wake_queue(self.task.queue, "test")
+        self.task.queue.put({"id": "after-wake"})
+        self.assertTrue(self.submit_event.wait(timeout=2))
+        self.assertEqual([m for _, m in self.submitted], [{"id": "after-wake"}])
+
+    def test_stop_wakes_idle_worker(self):
+        time.sleep(0.05)
+        start = time.perf_counter()
+        self.runner.stop()
+        self.worker.join(timeout=2)
+        self.assertFalse(self.worker.is_alive())
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Tests for schedule parsing, month/year arithmetic and ScheduleIndex
+
+ScheduleIndex must select the same tasks, in the same order, as a full
+find_tasks_ready_to_run scan.
+"""
+
+import copy
+import os
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.ec_tasks.models import RepeatType, TaskSchedule
+from agent.ec_tasks.scheduler import (
+    SCHEDULE_DATETIME_FMT,
+    ScheduleIndex,
+    _calculate_runtime_bounds,
+    find_tasks_ready_to_run,
+    parse_schedule,
+)
+
+
+def _fmt(dt):
+    return dt.strftime(SCHEDULE_DATETIME_FMT)
+
+
+def _make_task(name, repeat_type, repeat_number, start, end):
+    return SimpleNamespace(
+        name=name,
+        trigger="schedule",
+        schedule=TaskSchedule(
+            repeat_type=repeat_type,
+            repeat_number=repeat_number,
+            repeat_unit="",
+            start_date_time=_fmt(start),
+            end_date_time=_fmt(end),
+            time_out=60,
+        ),
+        last_run_datetime=None,
+        already_run_flag=False,
+    )
+
+
+class TestScheduleParsing(unittest.TestCase):
+    """Test cached schedule parsing."""
+
+    def test_identical_schedules_share_parse(self):
+        start = datetime(2025, 1, 1, 8, 0, 0)
+        a = _make_task("a", RepeatType.BY_DAYS, 1, start, start + timedelta(days=30))
+        b = _make_task("b", RepeatType.BY_DAYS, 1, start, start + timedelta(days=30))
+        self.assertIs(parse_schedule(a.schedule), parse_schedule(b.schedule))
+        self.assertEqual(parse_schedule(a.schedule).start_time, start)
+
+    def test_invalid_datetime_raises(self):
+        schedule = TaskSchedule(
+            repeat_type=RepeatType.BY_DAYS, repeat_number=1, repeat_unit="",
+            start_date_time="not a date", end_date_time="not a date", time_out=60,
+        )
+        with self.assertRaises(ValueError):
+            parse_schedule(schedule)
+
+
+class TestMonthArithmetic(unittest.TestCase):
+    """Test arithmetic month/year bounds."""
+
+    def test_monthly_bounds(self):
+        start = datetime(2025, 1, 15, 9, 0, 0)
+        last, nxt = _calculate_runtime_bounds(RepeatType.BY_MONTHS, 1, start, datetime(2025, 6, 20))
+        self.assertEqual(last, datetime(2025, 6, 15, 9, 0, 0))
+        self.assertEqual(nxt, datetime(2025, 7, 15, 9, 0, 0))
+
+    def test_same_month_before_runtime(self):
+        start = datetime(2025, 1, 15, 9, 0, 0)
+        last, nxt = _calculate_runtime_bounds(RepeatType.BY_MONTHS, 1, start, datetime(2025, 6, 10))
+        self.assertEqual(last, datetime(2025, 5, 15, 9, 0, 0))
+        self.assertEqual(nxt, datetime(2025, 6, 15, 9, 0, 0))
+
+    def test_month_end_does_not_drift(self):
+        start = datetime(2025, 1, 31)
+        last, nxt = _calculate_runtime_bounds(RepeatType.BY_MONTHS, 1, start, datetime(2025, 3, 5))
+        self.assertEqual(last, datetime(2025, 2, 28))
+        self.assertEqual(nxt, datetime(2025, 3, 31))
+
+    def test_before_start(self):
+        start = datetime(2030, 1, 1)
+        last, nxt = _calculate_runtime_bounds(RepeatType.BY_MONTHS, 2, start, datetime(2025, 1, 1))
+        self.assertEqual(last, start)
+        self.assertEqual(nxt, datetime(2030, 3, 1))
+
+    def test_yearly_bounds(self):
+        start = datetime(2020, 2, 29)
+        last, nxt = _calculate_runtime_bounds(RepeatType.BY_YEARS, 1, start, datetime(2025, 6, 1))
+        self.assertEqual(last, datetime(2025, 2, 28))
+        self.assertEqual(nxt, datetime(2026, 2, 28))
+
+
+class TestScheduleIndex(unittest.TestCase):
+    """Test ScheduleIndex against the full scan."""
+
+    def _random_tasks(self, n, t0, seed=7):
+        rng = random.Random(seed)
+        kinds = [
+            (RepeatType.BY_SECONDS, 30),
+            (RepeatType.BY_MINUTES, 1),
+            (RepeatType.BY_MINUTES, 5),
+            (RepeatType.BY_HOURS, 1),
+            (RepeatType.BY_DAYS, 1),
+            (RepeatType.BY_MONTHS, 1),
+        ]
+        tasks = []
+        for i in range(n):
+            repeat_type, unit = rng.choice(kinds)
+            start = t0 + timedelta(seconds=rng.randint(-7200, 1800), microseconds=i)
+            end = start + timedelta(hours=rng.choice([1, 6, 48]))
+            tasks.append(_make_task(f"t{i}", repeat_type, unit * rng.randint(1, 3), start, end))
+        return tasks
+
+    def test_matches_full_scan(self):
+        t0 = datetime(2025, 3, 1, 12, 0, 0)
+        scan_tasks = self._random_tasks(60, t0)
+        index_tasks = copy.deepcopy(scan_tasks)
+        index = ScheduleIndex()
+
+        now = t0
+        for _ in range(1500):
+            now += timedelta(seconds=2)
+            expected = find_tasks_ready_to_run(scan_tasks, now=now)
+            actual = find_tasks_ready_to_run(index_tasks, index=index, now=now)
+            self.assertEqual(
+                getattr(expected, "name", None), getattr(actual, "name", None),
+                f"diverged at {now}",
+            )
+
+    def test_sleep_until_next_due(self):
+        t0 = datetime(2025, 3, 1, 12, 0, 0)
+        task = _make_task("later", RepeatType.BY_HOURS, 1, t0 + timedelta(minutes=10), t0 + timedelta(days=1))
+        index = ScheduleIndex()
+        self.assertIsNone(index.pop_ready([task], now=t0))
+        self.assertAlmostEqual(index.seconds_until_next_due(now=t0), 600, delta=0.01)
+
+    def test_removed_and_edited_tasks(self):
+        t0 = datetime(2025, 3, 1, 12, 0, 0)
+        task = _make_task("edit", RepeatType.BY_HOURS, 1, t0 + timedelta(hours=5), t0 + timedelta(days=1))
+        index = ScheduleIndex()
+        self.assertIsNone(index.pop_ready([task], now=t0))
+        self.assertEqual(len(index), 1)
+
+        # Editing the schedule is picked up without an explicit invalidate
+        task.schedule.start_date_time = _fmt(t0 - timedelta(minutes=1))
+        self.assertIs(index.pop_ready([task], now=t0), task)
+
+        self.assertIsNone(index.pop_ready([], now=t0))
+        self.assertEqual(len(index), 0)
+        self.assertIsNone(index.seconds_until_next_due(now=t0))
+
+    def test_non_schedule_tasks_ignored(self):
+        t0 = datetime(2025, 3, 1, 12, 0, 0)
+        task = _make_task("msg", RepeatType.BY_MINUTES, 1, t0 - timedelta(hours=1), t0 + timedelta(days=1))
+        task.trigger = "message"
+        index = ScheduleIndex()
+        self.assertIsNone(index.pop_ready([task], now=t0))
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
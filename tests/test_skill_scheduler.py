@@ -0,0 +1,221 @@
+"""
+Tests for the process-wide fair-share skill scheduler (agent.ec_tasks.skill_scheduler)
+
+Covers:
+- Bounded total concurrency and per-agent caps
+- Priority order with aging
+- Fair share between a busy and a quiet agent
+- Trigger loops not consuming skill workers
+- Stress: hundreds of simulated tasks from many agents, none starves
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.ec_tasks.models import PriorityType
+from agent.ec_tasks.skill_scheduler import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_MESSAGE,
+    PRIORITY_SCHEDULED,
+    SkillScheduler,
+    priority_for_trigger,
+)
+
+
+class _Gate:
+    """Blocks skill runs until released, recording start order and peak concurrency."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.started = []
+        self.running = 0
+        self.peak = 0
+        self.peak_by_agent = {}
+        self._by_agent = {}
+
+    def run(self, agent_id, label):
+        with self.lock:
+            self.started.append(label)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self._by_agent[agent_id] = self._by_agent.get(agent_id, 0) + 1
+            self.peak_by_agent[agent_id] = max(self.peak_by_agent.get(agent_id, 0), self._by_agent[agent_id])
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+            self._by_agent[agent_id] -= 1
+        return label
+
+
+class TestSkillScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = None
+
+    def tearDown(self):
+        if self.scheduler:
+            self.scheduler.shutdown()
+
+    def _wait_for(self, predicate, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            self.assertLess(time.monotonic(), deadline, "condition not reached")
+            time.sleep(0.005)
+
+    def test_trigger_priorities(self):
+        self.assertEqual(priority_for_trigger("chat_queue"), PRIORITY_INTERACTIVE)
+        self.assertEqual(priority_for_trigger("dev"), PRIORITY_INTERACTIVE)
+        self.assertEqual(priority_for_trigger("a2a_queue"), PRIORITY_MESSAGE)
+        self.assertEqual(priority_for_trigger("schedule"), PRIORITY_SCHEDULED)
+        self.assertEqual(priority_for_trigger("schedule", PriorityType.ASAP), PRIORITY_MESSAGE)
+        self.assertEqual(priority_for_trigger("chat_queue", PriorityType.URGENT), PRIORITY_INTERACTIVE)
+
+    def test_concurrency_is_bounded_and_per_agent_cap_holds(self):
+        self.scheduler = SkillScheduler(max_workers=4, agent_quota=2, aging_sec=0)
+        gate = _Gate()
+        futures = [self.scheduler.submit("a", gate.run, "a", f"a{i}") for i in range(6)]
+        futures += [self.scheduler.submit("b", gate.run, "b", f"b{i}") for i in range(6)]
+        self._wait_for(lambda: len(gate.started) == 4)
+        time.sleep(0.05)
+        self.assertEqual(gate.running, 4)
+        self.assertEqual(self.scheduler.stats()["queued"], 8)
+        gate.release.set()
+        self.assertEqual(sorted(f.result(5) for f in futures), sorted([f"a{i}" for i in range(6)] + [f"b{i}" for i in range(6)]))
+        self.assertEqual(gate.peak, 4)
+        self.assertEqual(gate.peak_by_agent, {"a": 2, "b": 2})
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["running"], stats["queued"]), (0, 0))
+        self.assertEqual(stats["agents"]["a"]["completed"], 6)
+
+    def test_priority_order_and_aging(self):
+        clock = [0.0]
+        self.scheduler = SkillScheduler(max_workers=1, aging_sec=10, clock=lambda: clock[0])
+        gate = _Gate()
+        blocker = self.scheduler.submit("x", gate.run, "x", "blocker")
+        self._wait_for(lambda: gate.started == ["blocker"])
+
+        self.scheduler.submit("x", gate.run, "x", "scheduled-old", priority=PRIORITY_SCHEDULED)
+        clock[0] = 15.0  # the old scheduled run has aged one level
+        self.scheduler.submit("x", gate.run, "x", "scheduled", priority=PRIORITY_SCHEDULED)
+        self.scheduler.submit("x", gate.run, "x", "message", priority=PRIORITY_MESSAGE)
+        self.scheduler.submit("y", gate.run, "y", "chat", priority=PRIORITY_INTERACTIVE)
+        self.assertEqual(self.scheduler.stats()["queued_by_priority"],
+                         {PRIORITY_INTERACTIVE: 1, PRIORITY_MESSAGE: 1, PRIORITY_SCHEDULED: 2})
+
+        gate.release.set()
+        blocker.result(5)
+        self._wait_for(lambda: len(gate.started) == 5)
+        # The aged scheduled run ties with the message run and was queued first
+        self.assertEqual(gate.started, ["blocker", "chat", "scheduled-old", "message", "scheduled"])
+
+    def test_quiet_agent_is_not_queued_behind_a_busy_one(self):
+        self.scheduler = SkillScheduler(max_workers=2, aging_sec=0)
+        gate = _Gate()
+        for i in range(20):
+            self.scheduler.submit("busy", gate.run, "busy", f"busy{i}")
+        self._wait_for(lambda: len(gate.started) == 2)
+        self.scheduler.submit("quiet", gate.run, "quiet", "quiet0")
+        self.scheduler.submit("quiet", gate.run, "quiet", "quiet1")
+        gate.release.set()
+        self._wait_for(lambda: len(gate.started) == 22)
+        # Both quiet runs start as soon as workers free up, not after the busy backlog
+        self.assertLessEqual(gate.started.index("quiet1"), 5)
+
+    def test_trigger_loops_do_not_use_skill_workers(self):
+        self.scheduler = SkillScheduler(max_workers=2)
+        stop = threading.Event()
+        loops = [self.scheduler.start_loop(f"loop{i}", stop.wait) for i in range(40)]
+        # Far more loops than workers, yet skill runs still go through
+        self.assertEqual(self.scheduler.submit("a", lambda: "ran").result(5), "ran")
+        self.assertEqual(self.scheduler.stats()["loops"], 40)
+        stop.set()
+        self.assertTrue(all(f.result(5) for f in loops))
+        self._wait_for(lambda: self.scheduler.stats()["loops"] == 0)
+
+    def test_errors_propagate_and_shutdown_cancels_queued_runs(self):
+        self.scheduler = SkillScheduler(max_workers=1)
+        with self.assertRaises(ZeroDivisionError):
+            self.scheduler.submit("a", lambda: 1 / 0).result(5)
+        gate = _Gate()
+        running = self.scheduler.submit("a", gate.run, "a", "running")
+        self._wait_for(lambda: gate.started == ["running"])
+        queued = self.scheduler.submit("a", gate.run, "a", "queued")
+        self.scheduler.shutdown()
+        self.assertTrue(queued.cancelled())
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit("a", gate.run, "a", "late")
+        gate.release.set()
+        self.assertEqual(running.result(5), "running")
+
+
+class TestSkillSchedulerStress(unittest.TestCase):
+    WORKERS = 8
+    AGENTS = 30
+    SKILL_SEC = 0.005
+
+    def _flood(self, aging_sec):
+        """
+        200 scheduled runs from 30 agents are queued, then chat runs from the
+        same agents arrive faster than the pool can serve them for 0.6 s.
+        Returns (finish offset of each scheduled run, chat runs, end of flood, stats).
+        """
+        scheduler = SkillScheduler(max_workers=self.WORKERS, aging_sec=aging_sec)
+        rng = random.Random(7)
+        lock = threading.Lock()
+        in_flight = [0, 0]
+        start = time.monotonic()
+
+        def skill():
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(self.SKILL_SEC)
+            with lock:
+                in_flight[0] -= 1
+            return time.monotonic() - start
+
+        try:
+            scheduled = [scheduler.submit(f"agent-{i % self.AGENTS}", skill, priority=PRIORITY_SCHEDULED)
+                         for i in range(200)]
+            chats = []
+            while time.monotonic() - start < 0.6:
+                chats += [scheduler.submit(f"agent-{rng.randrange(self.AGENTS)}", skill, priority=PRIORITY_INTERACTIVE)
+                          for _ in range(40)]
+                time.sleep(0.02)
+            flood_end = time.monotonic() - start
+            finished = [f.result(30) for f in scheduled]
+            for f in chats:
+                f.result(30)
+            stats = scheduler.stats()
+        finally:
+            scheduler.shutdown()
+        self.assertLessEqual(in_flight[1], self.WORKERS)
+        return finished, len(chats), flood_end, stats
+
+    def test_hundreds_of_tasks_none_starves(self):
+        finished, chats, flood_end, stats = self._flood(aging_sec=0.05)
+        self.assertGreater(chats, 600)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(sum(a["completed"] for a in stats["agents"].values()), 200 + chats)
+        self.assertEqual(len(stats["agents"]), self.AGENTS)
+        # Every background run got through while chat was still saturating the pool
+        self.assertLess(max(finished), flood_end)
+        self.assertLess(stats["wait_max_by_priority"][PRIORITY_SCHEDULED], flood_end)
+
+    def test_without_aging_background_runs_wait_out_the_flood(self):
+        # Control for the test above: strict priorities alone starve scheduled runs
+        finished, _, flood_end, _ = self._flood(aging_sec=0)
+        # Only the runs picked up before the first chat burst get through in time
+        self.assertLess(sum(t < flood_end for t in finished), 20)
+        self.assertGreater(sorted(finished)[len(finished) // 2], flood_end)
+
+
+if __name__ == "__main__":
+    unittest.main()
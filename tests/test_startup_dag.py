@@ -0,0 +1,138 @@
+"""
+Tests for the MainWindow startup phase graph (gui.startup_dag)
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.startup_dag import StartupDAG
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestStartupDAG(unittest.TestCase):
+    def test_independent_phases_overlap(self):
+        events = []
+
+        def phase(name, delay):
+            async def run():
+                events.append(("start", name))
+                await asyncio.sleep(delay)
+                events.append(("end", name))
+                return name
+            return run
+
+        async def main():
+            dag = StartupDAG()
+            dag.add_phase("skills", phase("skills", 0.05))
+            dag.add_phase("task_sync", phase("task_sync", 0.05))
+            dag.add_phase("tasks", phase("tasks", 0.0), deps=("skills", "task_sync"))
+            return await dag.run(), dag.get_timings()
+
+        results, timings = _run(main())
+        self.assertEqual(results, {"skills": "skills", "task_sync": "task_sync", "tasks": "tasks"})
+        # Both sources start before either finishes; the dependent starts after both
+        self.assertEqual({e for e in events[:2]}, {("start", "skills"), ("start", "task_sync")})
+        self.assertEqual(events[-2:], [("start", "tasks"), ("end", "tasks")])
+        self.assertGreaterEqual(timings["tasks"]["started"], timings["skills"]["finished"])
+        self.assertTrue(all(t["status"] == "done" for t in timings.values()))
+
+    def test_partial_dependency_via_result(self):
+        async def main():
+            dag = StartupDAG()
+            order = []
+
+            async def sync():
+                await asyncio.sleep(0.02)
+                order.append("sync")
+                return [1, 2]
+
+            async def build():
+                order.append("build started")
+                sources = await dag.result("sync")
+                return sum(sources)
+
+            dag.add_phase("sync", sync)
+            dag.add_phase("build", build)
+            results = await dag.run()
+            return results, order
+
+        results, order = _run(main())
+        self.assertEqual(results["build"], 3)
+        self.assertEqual(order, ["build started", "sync"])
+
+    def test_failed_phase_does_not_block_dependents(self):
+        async def main():
+            dag = StartupDAG()
+
+            async def fail():
+                raise RuntimeError("cloud down")
+
+            async def dependent():
+                return "ran"
+
+            dag.add_phase("sync", fail)
+            dag.add_phase("build", dependent, deps=("sync",))
+            return await dag.run(), dag.get_timings()
+
+        results, timings = _run(main())
+        self.assertIsInstance(results["sync"], RuntimeError)
+        self.assertEqual(results["build"], "ran")
+        self.assertEqual(timings["sync"]["status"], "failed")
+        self.assertEqual(timings["sync"]["error"], "cloud down")
+
+    def test_background_phase_not_awaited(self):
+        async def main():
+            dag = StartupDAG()
+            release = asyncio.Event()
+
+            async def agents():
+                return True
+
+            async def launch():
+                await release.wait()
+                return 2
+
+            dag.add_phase("agents", agents)
+            dag.add_phase("agent_launch", launch, deps=("agents",), background=True)
+            results = await dag.run()
+            await asyncio.sleep(0.01)
+            running = dag.get_timings()["agent_launch"]["status"]
+            release.set()
+            launched = await dag.result("agent_launch")
+            return results, running, launched, dag.get_timings()["agent_launch"]["status"]
+
+        results, running, launched, finished = _run(main())
+        self.assertEqual(results, {"agents": True})
+        self.assertEqual(running, "running")
+        self.assertEqual(launched, 2)
+        self.assertEqual(finished, "done")
+
+    def test_invalid_graphs(self):
+        async def noop():
+            return None
+
+        dag = StartupDAG()
+        dag.add_phase("a", noop, deps=("missing",))
+        with self.assertRaises(ValueError):
+            _run(dag.run())
+
+        dag = StartupDAG()
+        dag.add_phase("a", noop, deps=("b",))
+        dag.add_phase("b", noop, deps=("a",))
+        with self.assertRaises(ValueError):
+            _run(dag.run())
+
+        with self.assertRaises(ValueError):
+            dag.add_phase("a", noop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Tests for the single-thread TimerService
+
+Covers:
+- All timers multiplexed on one thread
+- Ordering and re-arming for earlier deadlines
+- Replacing a timer with the same correlation ID (and its stale heap entry)
+- Stress: 50k concurrent timers with bulk cancellation
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.ec_tasks.timer_service import TimerService
+from utils.logger_helper import logger_helper
+
+
+class TestTimerServiceScheduling(unittest.TestCase):
+    """Test ordering and thread usage."""
+
+    def setUp(self):
+        self.timer_service = TimerService()
+
+    def tearDown(self):
+        self.timer_service.clear_all()
+
+    def test_fires_in_deadline_order(self):
+        fired = []
+        done = threading.Event()
+
+        def make_callback(name):
+            def callback():
+                fired.append(name)
+                if len(fired) == 3:
+                    done.set()
+            return callback
+
+        self.timer_service.start_timer("slow", "task-1", 0.3, make_callback("slow"))
+        self.timer_service.start_timer("mid", "task-1", 0.2, make_callback("mid"))
+        # Earlier than the timer the thread is already sleeping on
+        self.timer_service.start_timer("fast", "task-1", 0.05, make_callback("fast"))
+
+        self.assertTrue(done.wait(timeout=2))
+        self.assertEqual(fired, ["fast", "mid", "slow"])
+
+    def test_single_thread_for_all_timers(self):
+        before = threading.active_count()
+        for i in range(200):
+            self.timer_service.start_timer(f"c{i}", "task-1", 5.0, lambda: None)
+        self.assertLessEqual(threading.active_count() - before, 1)
+
+    def test_thread_exits_when_idle(self):
+        fired = threading.Event()
+        self.timer_service.start_timer("once", "task-1", 0.01, fired.set)
+        self.assertTrue(fired.wait(timeout=1))
+        deadline = time.time() + 1
+        while self.timer_service._thread is not None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(self.timer_service._thread)
+
+        # Restarts lazily
+        fired.clear()
+        self.timer_service.start_timer("again", "task-1", 0.01, fired.set)
+        self.assertTrue(fired.wait(timeout=1))
+
+    def test_restart_same_correlation_id(self):
+        fired = []
+        first = self.timer_service.start_timer("dup", "task-1", 0.05, lambda: fired.append("first"))
+        second = self.timer_service.start_timer("dup", "task-1", 0.1, lambda: fired.append("second"))
+        time.sleep(0.3)
+        self.assertTrue(first.cancelled)
+        self.assertTrue(second.fired)
+        self.assertEqual(fired, ["second"])
+
+    def test_stale_entry_of_a_replaced_timer_keeps_the_task_index(self):
+        fired = []
+        self.timer_service.start_timer("dup", "task-1", 0.05, lambda: fired.append("first"))
+        second = self.timer_service.start_timer("dup", "task-1", 5.0, lambda: fired.append("second"))
+        time.sleep(0.2)  # the first timer's heap entry pops (and is skipped) by now
+        self.assertEqual(self.timer_service.cancel_all_for_task("task-1"), 1)
+        self.assertTrue(second.cancelled)
+        self.assertEqual(self.timer_service.pending_count(), 0)
+        self.assertEqual(fired, [])
+
+    def test_handle_cancel_directly(self):
+        fired = threading.Event()
+        handle = self.timer_service.start_timer("direct", "task-1", 0.05, fired.set)
+        handle.cancel()
+        time.sleep(0.2)
+        self.assertFalse(fired.is_set())
+        self.assertIsNone(self.timer_service.get_timer("direct"))
+
+    def test_compaction_forgets_handles_cancelled_directly(self):
+        service = TimerService(clock=_FakeClock())
+        handles = [service.start_timer(f"c{i}", f"task-{i % 3}", 60.0, lambda: None) for i in range(3000)]
+        for handle in handles[:1000]:
+            handle.cancel()
+        # Enough cancel_timer() calls to trigger a heap compaction
+        for handle in handles[1000:2501]:
+            service.cancel_timer(handle.correlation_id)
+
+        self.assertEqual(len(service._heap), 499)
+        self.assertEqual(set(service._timers), {h.correlation_id for h in handles[2501:]})
+        self.assertEqual(sum(len(ids) for ids in service._by_task.values()), 499)
+        self.assertEqual(len(service._callbacks), 499)
+        service.clear_all()
+
+    def test_callback_error_does_not_stop_service(self):
+        fired = threading.Event()
+
+        def bad():
+            raise RuntimeError("boom")
+
+        self.timer_service.start_timer("bad", "task-1", 0.01, bad)
+        self.timer_service.start_timer("good", "task-1", 0.05, fired.set)
+        self.assertTrue(fired.wait(timeout=1))
+
+
+class _FakeClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimerServiceStress(unittest.TestCase):
+    """Stress test with many concurrent timers."""
+
+    N_TIMERS = 50_000
+    N_TASKS = 100
+
+    def setUp(self):
+        # Per-timer debug lines would dominate the timing
+        self._level = logger_helper.logger.level
+        logger_helper.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        logger_helper.logger.setLevel(self._level)
+
+    def test_50k_concurrent_timers(self):
+        # Frozen while timers are created and cancelled, so none can expire mid-setup
+        clock = _FakeClock()
+        timer_service = TimerService(clock=clock)
+        fired = []
+        lock = threading.Lock()
+
+        def make_callback(corr_id):
+            def callback():
+                with lock:
+                    fired.append(corr_id)
+            return callback
+
+        threads_before = threading.active_count()
+        start = time.perf_counter()
+        for i in range(self.N_TIMERS):
+            corr_id = f"task-{i % self.N_TASKS}:{i}"
+            delay = 1.0 + (i % 500) / 1000.0
+            timer_service.start_timer(corr_id, f"task-{i % self.N_TASKS}", delay, make_callback(corr_id))
+        start_elapsed = time.perf_counter() - start
+
+        self.assertLessEqual(threading.active_count() - threads_before, 1)
+        self.assertEqual(timer_service.pending_count(), self.N_TIMERS)
+
+        # Cancel every even task in bulk and a slice of the rest individually
+        cancelled = 0
+        for t in range(0, self.N_TASKS, 2):
+            cancelled += timer_service.cancel_all_for_task(f"task-{t}")
+        for i in range(1, 2000, 2):
+            if timer_service.cancel_timer(f"task-{i % self.N_TASKS}:{i}"):
+                cancelled += 1
+        self.assertEqual(cancelled, self.N_TIMERS // 2 + 1000)
+
+        expected = self.N_TIMERS - cancelled
+        clock.now += 2.0  # past every deadline; the timer thread sees it on its next wakeup
+        deadline = time.time() + 20
+        while len(fired) < expected and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.1)
+
+        self.assertEqual(len(fired), expected)
+        self.assertEqual(len(set(fired)), expected)
+        self.assertTrue(all(int(c.split(":")[0].split("-")[1]) % 2 == 1 for c in fired))
+        self.assertEqual(timer_service.pending_count(), 0)
+        # Starting 50k timers should be far cheaper than 50k threads
+        self.assertLess(start_elapsed, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
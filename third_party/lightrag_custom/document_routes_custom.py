@@ -3,6 +3,11 @@ This module contains all document-related routes for the LightRAG API.
 """
 
 import asyncio
+import atexit
+import os
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from lightrag.utils import logger, get_pinyin_sort_key
 import aiofiles
 import shutil
@@ -915,6 +920,367 @@ def get_unique_filename_in_enqueued(target_dir: Path, original_name: str) -> str
     return f"{base_name}_{timestamp}{extension}"
 
 
+# ========== eCan.ai Custom: Worker-Pool Extraction ==========
+# Parsing PDF/DOCX/PPTX/XLSX is CPU-bound; it runs in a process pool so the
+# server's event loop stays responsive and bulk scans scale with cores.
+# LIGHTRAG_EXTRACT_WORKERS sets the pool size (0 = parse on a thread instead).
+_PARSED_EXTENSIONS = (".pdf", ".docx", ".pptx", ".xlsx")
+
+_TEXT_EXTENSIONS = (
+    ".txt", ".md", ".html", ".htm", ".tex", ".json", ".xml", ".yaml", ".yml",
+    ".rtf", ".odt", ".epub", ".csv", ".log", ".conf", ".ini", ".properties",
+    ".sql", ".bat", ".sh", ".c", ".cpp", ".py", ".java", ".js", ".ts", ".swift",
+    ".go", ".rb", ".php", ".css", ".scss", ".less",
+)
+
+class FileExtractionError(Exception):
+    """Extraction failure reported as an error document."""
+
+    def __init__(self, error_description: str, original_error: str, log_message: str):
+        super().__init__(error_description, original_error, log_message)
+        self.error_description = error_description
+        self.original_error = original_error
+        self.log_message = log_message
+
+
+def get_extraction_workers() -> int:
+    """Number of extraction worker processes (LIGHTRAG_EXTRACT_WORKERS, default: CPU count)"""
+    try:
+        return max(0, int(os.getenv("LIGHTRAG_EXTRACT_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+class ExtractionResources:
+    """Extraction process pool and enqueue lock of one server app
+
+    Both are created on first use, from the app's event loop, and released
+    by extraction_lifespan when the app stops.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._enqueue_lock: Optional[asyncio.Lock] = None
+
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        """The process pool, or None when extraction runs on threads (0 workers)"""
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def enqueue_lock(self) -> asyncio.Lock:
+        if self._enqueue_lock is None:
+            self._enqueue_lock = asyncio.Lock()
+        return self._enqueue_lock
+
+    def reset_executor(self, wait: bool = False):
+        """Shut down the process pool, cancelling queued parses; the next use starts a new one"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Resources of the running app (installed by extraction_lifespan); a default
+# set is created on demand when the pipeline runs outside an app, and its pool
+# is shut down at interpreter exit since no lifespan owns it
+_extraction_resources: Optional[ExtractionResources] = None
+
+
+def _get_extraction_resources() -> ExtractionResources:
+    global _extraction_resources
+    if _extraction_resources is None:
+        _extraction_resources = ExtractionResources(get_extraction_workers())
+        atexit.register(_extraction_resources.reset_executor, True)
+    return _extraction_resources
+
+
+def shutdown_extraction_executor():
+    """Shut down the extraction process pool, cancelling queued parses"""
+    if _extraction_resources is not None:
+        _extraction_resources.reset_executor()
+
+
+@asynccontextmanager
+async def extraction_lifespan(app):
+    """Give the app its own extraction resources; stop the worker processes when it shuts down"""
+    global _extraction_resources
+    previous = _extraction_resources
+    resources = _extraction_resources = ExtractionResources(get_extraction_workers())
+    try:
+        yield
+    finally:
+        if _extraction_resources is resources:
+            _extraction_resources = previous
+        # Wait for the workers to exit so none outlive the server
+        await asyncio.to_thread(resources.reset_executor, True)
+
+
+# include_router merges the router's lifespan into the app's
+router.lifespan_context = extraction_lifespan
+
+
+def _is_stop_requested() -> bool:
+    try:
+        from knowledge.lightrag_launcher import get_stop_controller
+        return get_stop_controller().is_stop_requested()
+    except Exception:
+        return False  # If stop controller not available, continue normally
+
+
+def _extract_file_content(
+    file: bytes,
+    file_path: Path,
+    document_loading_engine: str,
+    pdf_decrypt_password: Optional[str],
+) -> str:
+    """Extract text from raw file bytes based on the file extension
+
+    Runs in an extraction worker process, so it only uses its arguments
+    (not global_args).
+
+    Args:
+        file: Raw file bytes
+        file_path: Path to the file (used by DOCLING and for messages)
+        document_loading_engine: global_args.document_loading_engine
+        pdf_decrypt_password: global_args.pdf_decrypt_password
+
+    Returns:
+        str: Extracted content
+
+    Raises:
+        FileExtractionError: If the file cannot be extracted
+    """
+    ext = file_path.suffix.lower()
+    content = ""
+
+    if ext in _TEXT_EXTENSIONS:
+        try:
+            # Try to decode as UTF-8
+            content = file.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise FileExtractionError(
+                "[File Extraction]UTF-8 encoding error, please convert it to UTF-8 before processing",
+                f"File is not valid UTF-8 encoded text: {str(e)}",
+                f"[File Extraction]File {file_path.name} is not valid UTF-8 encoded text. Please convert it to UTF-8 before processing.",
+            )
+
+        # Validate content
+        if not content or len(content.strip()) == 0:
+            raise FileExtractionError(
+                "[File Extraction]Empty file content",
+                "File contains no content or only whitespace",
+                f"[File Extraction]Empty content in file: {file_path.name}",
+            )
+
+        # Check if content looks like binary data string representation
+        if content.startswith("b'") or content.startswith('b"'):
+            raise FileExtractionError(
+                "[File Extraction]Binary data in text file",
+                "File appears to contain binary data representation instead of text",
+                f"[File Extraction]File {file_path.name} appears to contain binary data representation instead of text",
+            )
+        return content
+
+    if ext in _PARSED_EXTENSIONS and document_loading_engine == "DOCLING":
+        label = ext[1:].upper()
+        try:
+            if not pm.is_installed("docling"):  # type: ignore
+                pm.install("docling")
+            from docling.document_converter import DocumentConverter  # type: ignore
+
+            converter = DocumentConverter()
+            result = converter.convert(file_path)
+            return result.document.export_to_markdown()
+        except Exception as e:
+            raise FileExtractionError(
+                f"[File Extraction]{label} processing error",
+                f"Failed to extract text from {label}: {str(e)}",
+                f"[File Extraction]Error processing {label} {file_path.name}: {str(e)}",
+            )
+
+    match ext:
+        case ".pdf":
+            try:
+                if not pm.is_installed("pypdf2"):  # type: ignore
+                    pm.install("pypdf2")
+                if not pm.is_installed("pycryptodome"):  # type: ignore
+                    pm.install("pycryptodome")
+                from PyPDF2 import PdfReader  # type: ignore
+                from io import BytesIO
+
+                pdf_file = BytesIO(file)
+                reader = PdfReader(pdf_file)
+
+                # Check if PDF is encrypted
+                if reader.is_encrypted:
+                    if not pdf_decrypt_password:
+                        # PDF is encrypted but no password provided
+                        raise FileExtractionError(
+                            "[File Extraction]PDF is encrypted but no password provided",
+                            "Please set PDF_DECRYPT_PASSWORD environment variable to decrypt this PDF file",
+                            f"[File Extraction]PDF is encrypted but no password provided: {file_path.name}",
+                        )
+
+                    # Try to decrypt with password
+                    try:
+                        decrypt_result = reader.decrypt(pdf_decrypt_password)
+                    except Exception as decrypt_error:
+                        # Decryption process error
+                        raise FileExtractionError(
+                            "[File Extraction]PDF decryption failed",
+                            f"Error during PDF decryption: {str(decrypt_error)}",
+                            f"[File Extraction]PDF decryption error for {file_path.name}: {str(decrypt_error)}",
+                        )
+                    if decrypt_result == 0:
+                        # Password is incorrect
+                        raise FileExtractionError(
+                            "[File Extraction]Failed to decrypt PDF - incorrect password",
+                            "The provided PDF_DECRYPT_PASSWORD is incorrect for this file",
+                            f"[File Extraction]Incorrect PDF password: {file_path.name}",
+                        )
+
+                # Extract text from PDF (encrypted PDFs are now decrypted, unencrypted PDFs proceed directly)
+                for page in reader.pages:
+                    content += page.extract_text() + "\n"
+            except FileExtractionError:
+                raise
+            except Exception as e:
+                raise FileExtractionError(
+                    "[File Extraction]PDF processing error",
+                    f"Failed to extract text from PDF: {str(e)}",
+                    f"[File Extraction]Error processing PDF {file_path.name}: {str(e)}",
+                )
+
+        case ".docx":
+            try:
+                if not pm.is_installed("python-docx"):  # type: ignore
+                    try:
+                        pm.install("python-docx")
+                    except Exception:
+                        pm.install("docx")
+                from docx import Document  # type: ignore
+                from io import BytesIO
+
+                docx_file = BytesIO(file)
+                doc = Document(docx_file)
+                content = "\n".join(
+                    [paragraph.text for paragraph in doc.paragraphs]
+                )
+            except Exception as e:
+                raise FileExtractionError(
+                    "[File Extraction]DOCX processing error",
+                    f"Failed to extract text from DOCX: {str(e)}",
+                    f"[File Extraction]Error processing DOCX {file_path.name}: {str(e)}",
+                )
+
+        case ".pptx":
+            try:
+                if not pm.is_installed("python-pptx"):  # type: ignore
+                    pm.install("pptx")
+                from pptx import Presentation  # type: ignore
+                from io import BytesIO
+
+                pptx_file = BytesIO(file)
+                prs = Presentation(pptx_file)
+                for slide in prs.slides:
+                    for shape in slide.shapes:
+                        if hasattr(shape, "text"):
+                            content += shape.text + "\n"
+            except Exception as e:
+                raise FileExtractionError(
+                    "[File Extraction]PPTX processing error",
+                    f"Failed to extract text from PPTX: {str(e)}",
+                    f"[File Extraction]Error processing PPTX {file_path.name}: {str(e)}",
+                )
+
+        case ".xlsx":
+            try:
+                if not pm.is_installed("openpyxl"):  # type: ignore
+                    pm.install("openpyxl")
+                from openpyxl import load_workbook  # type: ignore
+                from io import BytesIO
+
+                xlsx_file = BytesIO(file)
+                wb = load_workbook(xlsx_file)
+                for sheet in wb:
+                    content += f"Sheet: {sheet.title}\n"
+
+                    # ========== eCan.ai Custom: Empty Column Cleaning ==========
+                    # Fix: Excel files may have 16384 columns but only a few have data
+                    # This reduces memory usage by 99%+ and prevents LLM timeouts
+                    rows = list(sheet.iter_rows(values_only=True))
+
+                    # Find max non-empty column index across ALL rows
+                    max_col_idx = 0
+                    for row in rows:
+                        for i in range(len(row) - 1, -1, -1):
+                            if row[i] is not None and str(row[i]).strip():
+                                max_col_idx = max(max_col_idx, i)
+                                break
+
+                    # Output only columns with data
+                    for row in rows:
+                        trimmed_row = row[:max_col_idx + 1] if max_col_idx > 0 else row
+                        content += (
+                            "\t".join(
+                                str(cell) if cell is not None else ""
+                                for cell in trimmed_row
+                            )
+                            + "\n"
+                        )
+                    # ========== End eCan.ai Custom ==========
+                    content += "\n"
+            except Exception as e:
+                raise FileExtractionError(
+                    "[File Extraction]XLSX processing error",
+                    f"Failed to extract text from XLSX: {str(e)}",
+                    f"[File Extraction]Error processing XLSX {file_path.name}: {str(e)}",
+                )
+
+        case _:
+            raise FileExtractionError(
+                f"[File Extraction]Unsupported file type: {ext}",
+                f"File extension {ext} is not supported",
+                f"[File Extraction]Unsupported file type: {file_path.name} (extension {ext})",
+            )
+
+    return content
+
+
+async def _extract_file_content_async(file: bytes, file_path: Path) -> str:
+    """Extract file content off the event loop
+
+    Text formats are decoded inline; PDF/DOCX/PPTX/XLSX are parsed in the
+    extraction process pool (or a thread when the pool is disabled).
+    """
+    args = (
+        file,
+        file_path,
+        global_args.document_loading_engine,
+        global_args.pdf_decrypt_password,
+    )
+    if file_path.suffix.lower() not in _PARSED_EXTENSIONS:
+        return _extract_file_content(*args)
+
+    resources = _get_extraction_resources()
+    executor = resources.executor()
+    if executor is None:
+        return await asyncio.to_thread(_extract_file_content, *args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, _extract_file_content, *args
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. crashed parser); replace the pool and parse this file on a thread
+        logger.warning(
+            f"[File Extraction]Extraction worker pool broke while parsing {file_path.name}, retrying in thread"
+        )
+        resources.reset_executor()
+        return await asyncio.to_thread(_extract_file_content, *args)
+# ========== End eCan.ai Custom ==========
+
+
 async def pipeline_enqueue_file(
     rag: LightRAG, file_path: Path, track_id: str = None
 ) -> tuple[bool, str]:
@@ -930,14 +1296,9 @@ async def pipeline_enqueue_file(
 
     # ========== eCan.ai Custom: Stop Controller Check ==========
     # Check if stop has been requested before processing
-    try:
-        from knowledge.lightrag_launcher import get_stop_controller
-        controller = get_stop_controller()
-        if controller.is_stop_requested():
-            logger.info(f"[eCan.ai] Stop requested, skipping file: {file_path.name}")
-            return False, track_id or generate_track_id("cancelled")
-    except Exception:
-        pass  # If stop controller not available, continue normally
+    if _is_stop_requested():
+        logger.info(f"[eCan.ai] Stop requested, skipping file: {file_path.name}")
+        return False, track_id or generate_track_id("cancelled")
     # ========== End eCan.ai Custom ==========
 
     # Generate track_id if not provided
@@ -946,7 +1307,6 @@ async def pipeline_enqueue_file(
 
     try:
         content = ""
-        ext = file_path.suffix.lower()
         file_size = 0
 
         # Get file size for error reporting
@@ -1000,359 +1360,21 @@ async def pipeline_enqueue_file(
             )
             return False, track_id
 
-        # Process based on file type
+        # ========== eCan.ai Custom: Worker-Pool Extraction ==========
         try:
-            match ext:
-                case (
-                    ".txt"
-                    | ".md"
-                    | ".html"
-                    | ".htm"
-                    | ".tex"
-                    | ".json"
-                    | ".xml"
-                    | ".yaml"
-                    | ".yml"
-                    | ".rtf"
-                    | ".odt"
-                    | ".epub"
-                    | ".csv"
-                    | ".log"
-                    | ".conf"
-                    | ".ini"
-                    | ".properties"
-                    | ".sql"
-                    | ".bat"
-                    | ".sh"
-                    | ".c"
-                    | ".cpp"
-                    | ".py"
-                    | ".java"
-                    | ".js"
-                    | ".ts"
-                    | ".swift"
-                    | ".go"
-                    | ".rb"
-                    | ".php"
-                    | ".css"
-                    | ".scss"
-                    | ".less"
-                ):
-                    try:
-                        # Try to decode as UTF-8
-                        content = file.decode("utf-8")
-
-                        # Validate content
-                        if not content or len(content.strip()) == 0:
-                            error_files = [
-                                {
-                                    "file_path": str(file_path.name),
-                                    "error_description": "[File Extraction]Empty file content",
-                                    "original_error": "File contains no content or only whitespace",
-                                    "file_size": file_size,
-                                }
-                            ]
-                            await rag.apipeline_enqueue_error_documents(
-                                error_files, track_id
-                            )
-                            logger.error(
-                                f"[File Extraction]Empty content in file: {file_path.name}"
-                            )
-                            return False, track_id
-
-                        # Check if content looks like binary data string representation
-                        if content.startswith("b'") or content.startswith('b"'):
-                            error_files = [
-                                {
-                                    "file_path": str(file_path.name),
-                                    "error_description": "[File Extraction]Binary data in text file",
-                                    "original_error": "File appears to contain binary data representation instead of text",
-                                    "file_size": file_size,
-                                }
-                            ]
-                            await rag.apipeline_enqueue_error_documents(
-                                error_files, track_id
-                            )
-                            logger.error(
-                                f"[File Extraction]File {file_path.name} appears to contain binary data representation instead of text"
-                            )
-                            return False, track_id
-
-                    except UnicodeDecodeError as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]UTF-8 encoding error, please convert it to UTF-8 before processing",
-                                "original_error": f"File is not valid UTF-8 encoded text: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]File {file_path.name} is not valid UTF-8 encoded text. Please convert it to UTF-8 before processing."
-                        )
-                        return False, track_id
-
-                case ".pdf":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("pypdf2"):  # type: ignore
-                                pm.install("pypdf2")
-                            if not pm.is_installed("pycryptodome"):  # type: ignore
-                                pm.install("pycryptodome")
-                            from PyPDF2 import PdfReader  # type: ignore
-                            from io import BytesIO
-
-                            pdf_file = BytesIO(file)
-                            reader = PdfReader(pdf_file)
-
-                            # Check if PDF is encrypted
-                            if reader.is_encrypted:
-                                pdf_password = global_args.pdf_decrypt_password
-                                if not pdf_password:
-                                    # PDF is encrypted but no password provided
-                                    error_files = [
-                                        {
-                                            "file_path": str(file_path.name),
-                                            "error_description": "[File Extraction]PDF is encrypted but no password provided",
-                                            "original_error": "Please set PDF_DECRYPT_PASSWORD environment variable to decrypt this PDF file",
-                                            "file_size": file_size,
-                                        }
-                                    ]
-                                    await rag.apipeline_enqueue_error_documents(
-                                        error_files, track_id
-                                    )
-                                    logger.error(
-                                        f"[File Extraction]PDF is encrypted but no password provided: {file_path.name}"
-                                    )
-                                    return False, track_id
-
-                                # Try to decrypt with password
-                                try:
-                                    decrypt_result = reader.decrypt(pdf_password)
-                                    if decrypt_result == 0:
-                                        # Password is incorrect
-                                        error_files = [
-                                            {
-                                                "file_path": str(file_path.name),
-                                                "error_description": "[File Extraction]Failed to decrypt PDF - incorrect password",
-                                                "original_error": "The provided PDF_DECRYPT_PASSWORD is incorrect for this file",
-                                                "file_size": file_size,
-                                            }
-                                        ]
-                                        await rag.apipeline_enqueue_error_documents(
-                                            error_files, track_id
-                                        )
-                                        logger.error(
-                                            f"[File Extraction]Incorrect PDF password: {file_path.name}"
-                                        )
-                                        return False, track_id
-                                except Exception as decrypt_error:
-                                    # Decryption process error
-                                    error_files = [
-                                        {
-                                            "file_path": str(file_path.name),
-                                            "error_description": "[File Extraction]PDF decryption failed",
-                                            "original_error": f"Error during PDF decryption: {str(decrypt_error)}",
-                                            "file_size": file_size,
-                                        }
-                                    ]
-                                    await rag.apipeline_enqueue_error_documents(
-                                        error_files, track_id
-                                    )
-                                    logger.error(
-                                        f"[File Extraction]PDF decryption error for {file_path.name}: {str(decrypt_error)}"
-                                    )
-                                    return False, track_id
-
-                            # Extract text from PDF (encrypted PDFs are now decrypted, unencrypted PDFs proceed directly)
-                            for page in reader.pages:
-                                content += page.extract_text() + "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]PDF processing error",
-                                "original_error": f"Failed to extract text from PDF: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing PDF {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case ".docx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("python-docx"):  # type: ignore
-                                try:
-                                    pm.install("python-docx")
-                                except Exception:
-                                    pm.install("docx")
-                            from docx import Document  # type: ignore
-                            from io import BytesIO
-
-                            docx_file = BytesIO(file)
-                            doc = Document(docx_file)
-                            content = "\n".join(
-                                [paragraph.text for paragraph in doc.paragraphs]
-                            )
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]DOCX processing error",
-                                "original_error": f"Failed to extract text from DOCX: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing DOCX {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case ".pptx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("python-pptx"):  # type: ignore
-                                pm.install("pptx")
-                            from pptx import Presentation  # type: ignore
-                            from io import BytesIO
-
-                            pptx_file = BytesIO(file)
-                            prs = Presentation(pptx_file)
-                            for slide in prs.slides:
-                                for shape in slide.shapes:
-                                    if hasattr(shape, "text"):
-                                        content += shape.text + "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]PPTX processing error",
-                                "original_error": f"Failed to extract text from PPTX: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing PPTX {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case ".xlsx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("openpyxl"):  # type: ignore
-                                pm.install("openpyxl")
-                            from openpyxl import load_workbook  # type: ignore
-                            from io import BytesIO
-
-                            xlsx_file = BytesIO(file)
-                            wb = load_workbook(xlsx_file)
-                            for sheet in wb:
-                                content += f"Sheet: {sheet.title}\n"
-                                
-                                # ========== eCan.ai Custom: Empty Column Cleaning ==========
-                                # Fix: Excel files may have 16384 columns but only a few have data
-                                # This reduces memory usage by 99%+ and prevents LLM timeouts
-                                rows = list(sheet.iter_rows(values_only=True))
-                                
-                                # Find max non-empty column index across ALL rows
-                                max_col_idx = 0
-                                for row in rows:
-                                    for i in range(len(row) - 1, -1, -1):
-                                        if row[i] is not None and str(row[i]).strip():
-                                            max_col_idx = max(max_col_idx, i)
-                                            break
-                                
-                                # Output only columns with data
-                                for row in rows:
-                                    trimmed_row = row[:max_col_idx + 1] if max_col_idx > 0 else row
-                                    content += (
-                                        "\t".join(
-                                            str(cell) if cell is not None else ""
-                                            for cell in trimmed_row
-                                        )
-                                        + "\n"
-                                    )
-                                # ========== End eCan.ai Custom ==========
-                                content += "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]XLSX processing error",
-                                "original_error": f"Failed to extract text from XLSX: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing XLSX {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case _:
-                    error_files = [
-                        {
-                            "file_path": str(file_path.name),
-                            "error_description": f"[File Extraction]Unsupported file type: {ext}",
-                            "original_error": f"File extension {ext} is not supported",
-                            "file_size": file_size,
-                        }
-                    ]
-                    await rag.apipeline_enqueue_error_documents(error_files, track_id)
-                    logger.error(
-                        f"[File Extraction]Unsupported file type: {file_path.name} (extension {ext})"
-                    )
-                    return False, track_id
-
+            content = await _extract_file_content_async(file, file_path)
+        except FileExtractionError as e:
+            error_files = [
+                {
+                    "file_path": str(file_path.name),
+                    "error_description": e.error_description,
+                    "original_error": e.original_error,
+                    "file_size": file_size,
+                }
+            ]
+            await rag.apipeline_enqueue_error_documents(error_files, track_id)
+            logger.error(e.log_message)
+            return False, track_id
         except Exception as e:
             error_files = [
                 {
@@ -1368,6 +1390,12 @@ async def pipeline_enqueue_file(
             )
             return False, track_id
 
+        # Stop may have been requested while the file was being parsed
+        if _is_stop_requested():
+            logger.info(f"[eCan.ai] Stop requested, not enqueuing file: {file_path.name}")
+            return False, track_id
+        # ========== End eCan.ai Custom ==========
+
         # Insert into the RAG queue
         if content:
             # Check if content contains only whitespace characters
@@ -1387,9 +1415,11 @@ async def pipeline_enqueue_file(
                 return False, track_id
 
             try:
-                await rag.apipeline_enqueue_documents(
-                    content, file_paths=file_path.name, track_id=track_id
-                )
+                # Files are extracted concurrently; doc status writes stay serialized
+                async with _get_extraction_resources().enqueue_lock():
+                    await rag.apipeline_enqueue_documents(
+                        content, file_paths=file_path.name, track_id=track_id
+                    )
 
                 logger.info(
                     f"Successfully extracted and enqueued file: {file_path.name}"
@@ -1495,7 +1525,7 @@ async def pipeline_index_file(rag: LightRAG, file_path: Path, track_id: str = No
 async def pipeline_index_files(
     rag: LightRAG, file_paths: List[Path], track_id: str = None
 ):
-    """Index multiple files sequentially to avoid high CPU load
+    """Index multiple files, extracting up to LIGHTRAG_EXTRACT_WORKERS at a time
 
     Args:
         rag: LightRAG instance
@@ -1505,18 +1535,26 @@ async def pipeline_index_files(
     if not file_paths:
         return
     try:
-        enqueued = False
-
         # Use get_pinyin_sort_key for Chinese pinyin sorting
         sorted_file_paths = sorted(
             file_paths, key=lambda p: get_pinyin_sort_key(str(p))
         )
 
-        # Process files sequentially with track_id
-        for file_path in sorted_file_paths:
-            success, _ = await pipeline_enqueue_file(rag, file_path, track_id)
-            if success:
-                enqueued = True
+        # ========== eCan.ai Custom: Bounded Concurrent Enqueue ==========
+        # Files start in sorted order; at most one per extraction worker is in
+        # flight so a large scan does not read every file into memory at once
+        semaphore = asyncio.Semaphore(max(1, get_extraction_workers()))
+
+        async def enqueue(file_path: Path) -> bool:
+            async with semaphore:
+                success, _ = await pipeline_enqueue_file(rag, file_path, track_id)
+                return success
+
+        results = await asyncio.gather(
+            *(enqueue(file_path) for file_path in sorted_file_paths)
+        )
+        enqueued = any(results)
+        # ========== End eCan.ai Custom ==========
 
         # Process the queue only if at least one file was successfully enqueued
         if enqueued:
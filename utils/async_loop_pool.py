@@ -0,0 +1,432 @@
+"""
+Long-lived event loops for running coroutines from synchronous code.
+
+run_async_in_sync() used to build and tear down a fresh event loop, and
+run_async_in_worker_thread() a fresh thread as well, on every call. Each LLM
+or tool call from a sync LangGraph node paid for that setup and teardown, and
+could never reuse an HTTP connection or an MCP session. AsyncLoopPool instead
+keeps up to ECAN_ASYNC_LOOPS (default 4) loop threads alive:
+
+- submit() takes a coroutine, or a zero-arg callable returning one, and
+  returns a concurrent.futures.Future. Cancelling the future cancels the
+  coroutine. `timeout` bounds the coroutine on the loop itself;
+- a call goes to an idle loop, preferring the lowest-numbered one, whose
+  clients are warmest. Another loop is started only while every loop is
+  busy. Past the cap, a call gets a one-off thread and loop rather than
+  queueing behind busy ones: a pool call that waits on another pool call
+  would otherwise deadlock;
+- loop_resource(key, factory) caches an object per event loop, such as an
+  httpx.AsyncClient. Pool loops close theirs on shutdown;
+- spawn_detached(coro) starts background work that outlives the call that
+  starts it, such as a persistent session's reader task. cancel_leftovers
+  leaves it running.
+
+A sync helper that is called from a coroutine already running on a pool loop
+cannot block on that pool. run() detects this and uses a one-off thread and
+loop, as before. ECAN_ASYNC_LOOPS=0 turns the pool off and restores the
+one-off behaviour for every call.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
+
+from utils.logger_helper import logger_helper as logger
+
+ASYNC_LOOPS = int(os.getenv("ECAN_ASYNC_LOOPS", "4"))
+CLOSE_TIMEOUT_SEC = 5.0
+
+CoroOrFactory = Union[Awaitable[Any], Callable[[], Awaitable[Any]]]
+
+# Tasks spawned by one submitted call (None outside pool calls), for cancel_leftovers
+_call_tasks: contextvars.ContextVar[Optional[set]] = contextvars.ContextVar("ecan_loop_call_tasks", default=None)
+
+_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = weakref.WeakKeyDictionary()
+_resources_lock = threading.Lock()
+
+
+def new_worker_loop() -> asyncio.AbstractEventLoop:
+    """Event loop for a worker thread: Proactor on Windows (subprocesses, e.g. Playwright), else the policy's."""
+    if sys.platform.startswith("win") and hasattr(asyncio, "ProactorEventLoop"):
+        return asyncio.ProactorEventLoop()
+    return asyncio.get_event_loop_policy().new_event_loop()
+
+
+def _as_coroutine(coro_or_factory: CoroOrFactory) -> Awaitable[Any]:
+    return coro_or_factory() if callable(coro_or_factory) else coro_or_factory
+
+
+def _discard(coro_or_factory: CoroOrFactory):
+    """Close a coroutine object that will never run, so it does not warn 'never awaited'."""
+    if inspect.iscoroutine(coro_or_factory):
+        coro_or_factory.close()
+
+
+def _cancel_and_drain(loop: asyncio.AbstractEventLoop, tasks):
+    tasks = [t for t in tasks if not t.done()]
+    for t in tasks:
+        t.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def _close_fresh_loop(loop: asyncio.AbstractEventLoop):
+    try:
+        _cancel_and_drain(loop, asyncio.all_tasks(loop))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    except Exception:
+        pass
+    loop.close()
+
+
+def run_in_fresh_loop(coro_or_factory: CoroOrFactory) -> Any:
+    """Run a coroutine to completion on a one-off thread and event loop, then tear both down.
+
+    The pre-pool behaviour; still used for calls made from a pool loop thread
+    and when the pool is disabled.
+    """
+    result_holder = {}
+    error_holder = {}
+
+    def _worker():
+        loop = new_worker_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            # Create the coroutine inside the worker thread if a factory is provided
+            result_holder["result"] = loop.run_until_complete(_as_coroutine(coro_or_factory))
+        except BaseException as e:
+            error_holder["error"] = e
+        finally:
+            _close_fresh_loop(loop)
+
+    t = threading.Thread(target=_worker, name="async-oneoff", daemon=True)
+    t.start()
+    t.join()
+
+    if "error" in error_holder:
+        raise error_holder["error"]
+    return result_holder.get("result")
+
+
+def _submit_to_fresh_loop(coro_or_factory: CoroOrFactory, timeout: Optional[float],
+                          context: contextvars.Context) -> Future:
+    """AsyncLoopPool.submit() on a one-off thread and event loop, torn down when the call returns."""
+    future: Future = Future()
+
+    def _worker():
+        loop = new_worker_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            task = context.run(loop.create_task, AsyncLoopPool._call(coro_or_factory, timeout, False))
+
+            def on_future_done(f: Future):
+                if f.cancelled():
+                    try:
+                        loop.call_soon_threadsafe(task.cancel)
+                    except RuntimeError:
+                        pass  # loop already closed
+
+            future.add_done_callback(on_future_done)
+            try:
+                loop.run_until_complete(task)
+            except BaseException:
+                pass  # read back from the task below
+            if task.cancelled():
+                future.cancel()
+            elif future.set_running_or_notify_cancel():
+                if task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+        finally:
+            _close_fresh_loop(loop)
+
+    threading.Thread(target=_worker, name="async-oneoff", daemon=True).start()
+    return future
+
+
+# ==================== Per-loop resources ====================
+
+def _detached_context() -> contextvars.Context:
+    """Copy of the current context outside any pool call."""
+    context = contextvars.copy_context()
+    context.run(_call_tasks.set, None)
+    return context
+
+
+def _loop_cache(loop: asyncio.AbstractEventLoop) -> Dict[Hashable, Any]:
+    with _resources_lock:
+        cache = _resources.get(loop)
+        if cache is None:
+            cache = _resources[loop] = {}
+        return cache
+
+
+def loop_resource(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Object cached per running event loop (e.g. an HTTP client), made by factory() on first use.
+
+    Only the loop's own thread touches its entries. Pool loops close them
+    (aclose()/close(), awaited if needed) on shutdown; entries of other
+    loops go away with the loop.
+    """
+    cache = _loop_cache(asyncio.get_running_loop())
+    if key not in cache:
+        # Not owned by the call that happens to create it: keep it out of cancel_leftovers
+        cache[key] = _detached_context().run(factory)
+    return cache[key]
+
+
+def spawn_detached(coro: Awaitable[Any]) -> asyncio.Task:
+    """Task on the running loop that belongs to no pool call, so cancel_leftovers does not cancel it."""
+    return _detached_context().run(asyncio.get_running_loop().create_task, coro)
+
+
+def discard_loop_resource(key: Hashable) -> Any:
+    """Forget the running loop's `key` resource (without closing it); returns it or None."""
+    return _loop_cache(asyncio.get_running_loop()).pop(key, None)
+
+
+async def _close_resource(key: Hashable, value: Any):
+    for name in ("aclose", "close"):
+        method = getattr(value, name, None)
+        if callable(method):
+            try:
+                result = method()
+                if inspect.isawaitable(result):
+                    await asyncio.wait_for(result, CLOSE_TIMEOUT_SEC)
+            except Exception as e:
+                logger.debug(f"[AsyncLoopPool] Error closing loop resource {key!r}: {e}")
+            return
+
+
+# ==================== Pool ====================
+
+def _track_call_tasks(loop, coro, **kwargs):
+    """Task factory of pool loops: remember which submitted call spawned each task."""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    tasks = context.get(_call_tasks) if context is not None else _call_tasks.get()
+    if tasks is not None:
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    return task
+
+
+class _LoopWorker:
+    def __init__(self, index: int):
+        self.index = index
+        self.inflight = 0
+        self.calls = 0
+        self.loop = new_worker_loop()
+        self.loop.set_task_factory(_track_call_tasks)
+        self.thread = threading.Thread(target=self._run, name=f"AsyncLoop-{index}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def close(self):
+        """Close this loop's resources, then cancel whatever is still running on it."""
+        for key, value in list(_loop_cache(self.loop).items()):
+            await _close_resource(key, value)
+        _loop_cache(self.loop).clear()
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for t in tasks:
+            t.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=CLOSE_TIMEOUT_SEC)
+        await self.loop.shutdown_asyncgens()
+
+
+class AsyncLoopPool:
+    def __init__(self, max_loops: int = ASYNC_LOOPS):
+        self.max_loops = max(0, max_loops)
+        self._lock = threading.Lock()
+        self._workers: List[_LoopWorker] = []
+        self._shutdown = False
+        self.fresh_loop_calls = 0
+
+    def _pick(self) -> Optional[_LoopWorker]:
+        """Loop for the next call, or None when every loop is busy at the cap; caller holds the lock."""
+        for worker in self._workers:
+            if worker.inflight == 0:
+                return worker
+        if len(self._workers) < self.max_loops:
+            worker = _LoopWorker(len(self._workers) + 1)
+            self._workers.append(worker)
+            logger.debug(f"[AsyncLoopPool] Started loop {worker.index}/{self.max_loops}")
+            return worker
+        return None
+
+    def submit(self, coro_or_factory: CoroOrFactory, timeout: Optional[float] = None,
+               cancel_leftovers: bool = False) -> Future:
+        """Run a coroutine (or a zero-arg callable returning one) on a pool loop.
+
+        Prefer a factory, so the coroutine is created on the loop thread. The
+        future can be cancelled, which cancels the coroutine. With `timeout`,
+        the coroutine is cancelled on the loop after that many seconds, and
+        the future raises TimeoutError. With cancel_leftovers, tasks the call
+        spawned and left running are cancelled once it returns, as the old
+        per-call loop teardown did. Without it they keep running on the loop.
+        When every loop is busy and the pool is at its cap, the call runs on
+        a one-off thread and loop instead (see run_in_fresh_loop).
+        """
+        if self.max_loops == 0:
+            raise RuntimeError("async loop pool is disabled (ECAN_ASYNC_LOOPS=0)")
+        future: Future = Future()
+        context = contextvars.copy_context()
+        context.run(_call_tasks.set, set())
+        with self._lock:
+            if self._shutdown:
+                _discard(coro_or_factory)
+                raise RuntimeError("cannot submit coroutines after shutdown")
+            worker = self._pick()
+            if worker is None:
+                self.fresh_loop_calls += 1
+            else:
+                worker.inflight += 1
+                worker.calls += 1
+        if worker is None:
+            # Queueing behind a busy loop could wait on the very call that is waiting for this one
+            context.run(_call_tasks.set, None)
+            return _submit_to_fresh_loop(coro_or_factory, timeout, context)
+        try:
+            worker.loop.call_soon_threadsafe(self._start, worker, future, coro_or_factory, timeout,
+                                             cancel_leftovers, context=context)
+        except RuntimeError:
+            # Loop closed by a concurrent shutdown()
+            self._release(worker)
+            _discard(coro_or_factory)
+            raise
+        return future
+
+    def _release(self, worker: _LoopWorker):
+        with self._lock:
+            worker.inflight -= 1
+
+    def _start(self, worker, future, coro_or_factory, timeout, cancel_leftovers):
+        # Runs on the loop thread, in the caller's context copy
+        if future.cancelled():
+            _discard(coro_or_factory)
+            self._release(worker)
+            return
+        task = worker.loop.create_task(self._call(coro_or_factory, timeout, cancel_leftovers))
+
+        def on_task_done(t: asyncio.Task):
+            self._release(worker)
+            # The future stays pending while the task runs, so the caller can still cancel it
+            if t.cancelled():
+                future.cancel()
+            elif future.set_running_or_notify_cancel():
+                if t.exception() is not None:
+                    future.set_exception(t.exception())
+                else:
+                    future.set_result(t.result())
+
+        def on_future_done(f: Future):
+            if f.cancelled() and not task.done():
+                try:
+                    worker.loop.call_soon_threadsafe(task.cancel)
+                except RuntimeError:
+                    pass  # loop already closed
+
+        task.add_done_callback(on_task_done)
+        future.add_done_callback(on_future_done)
+
+    @staticmethod
+    async def _call(coro_or_factory, timeout, cancel_leftovers):
+        try:
+            coro = _as_coroutine(coro_or_factory)
+            if timeout is None:
+                return await coro
+            return await asyncio.wait_for(coro, timeout)
+        finally:
+            if cancel_leftovers:
+                current = asyncio.current_task()
+                leftovers = [t for t in _call_tasks.get() or () if t is not current and not t.done()]
+                for t in leftovers:
+                    t.cancel()
+                if leftovers:
+                    await asyncio.wait(leftovers, timeout=CLOSE_TIMEOUT_SEC)
+
+    def owns_current_thread(self) -> bool:
+        current = threading.current_thread()
+        return any(worker.thread is current for worker in self._workers)
+
+    def run(self, coro_or_factory: CoroOrFactory, timeout: Optional[float] = None,
+            cancel_leftovers: bool = False) -> Any:
+        """Block until the coroutine finishes on a pool loop and return its result (or raise its error)."""
+        if self.max_loops == 0 or self.owns_current_thread():
+            if timeout is None:
+                return run_in_fresh_loop(coro_or_factory)
+            return run_in_fresh_loop(lambda: asyncio.wait_for(_as_coroutine(coro_or_factory), timeout))
+        future = self.submit(coro_or_factory, timeout=timeout, cancel_leftovers=cancel_leftovers)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. KeyboardInterrupt in the caller: do not leave the coroutine running
+            future.cancel()
+            raise
+
+    # ==================== Metrics / lifecycle ====================
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_loops": self.max_loops,
+                "loops": len(self._workers),
+                "inflight": sum(w.inflight for w in self._workers),
+                "fresh_loop_calls": self.fresh_loop_calls,
+                "by_loop": {w.index: {"inflight": w.inflight, "calls": w.calls} for w in self._workers},
+            }
+
+    def shutdown(self, timeout: float = CLOSE_TIMEOUT_SEC * 2):
+        """Stop accepting calls, close per-loop resources, cancel running coroutines and stop the loops."""
+        with self._lock:
+            self._shutdown = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                asyncio.run_coroutine_threadsafe(worker.close(), worker.loop).result(timeout)
+            except Exception as e:
+                logger.debug(f"[AsyncLoopPool] Error closing loop {worker.index}: {e}")
+            try:
+                worker.loop.call_soon_threadsafe(worker.loop.stop)
+            except RuntimeError:
+                pass
+            worker.thread.join(timeout)
+        logger.info(f"[AsyncLoopPool] Shut down {len(workers)} loop(s)")
+
+
+_pool: Optional[AsyncLoopPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_async_loop_pool() -> AsyncLoopPool:
+    """Process-wide pool used by run_async_in_sync / run_async_in_worker_thread."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AsyncLoopPool()
+            logger.info(f"[AsyncLoopPool] Using up to {_pool.max_loops} event loop thread(s)")
+        return _pool
+
+
+def shutdown_async_loop_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent line index for large log files (backend of gui/log_viewer.py)
+
+The file is cut into ~64 KB blocks on line boundaries. Per block the index
+keeps its byte offset, the number of its first line and, once the level pass
+has reached it, how many lines of each level come before it. That is ~50
+bytes per 64 KB of log (~1.5 MB for 2 GB), so a page of lines, or of lines of
+one level, costs a bisect plus a read of the few blocks it spans.
+
+The index is saved under <log dir>/.logindex and reused when the same file is
+opened again. refresh() indexes only the bytes appended since the last call
+and starts over when the file was rotated or truncated.
+
+Mutating calls (open, refresh, build_levels, close) are meant to come from
+one thread; reads may come from any thread.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.logger_helper import logger_helper as logger
+
+LEVELS = ("TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+BLOCK_BYTES = 64 * 1024
+READ_CHUNK = 4 * 1024 * 1024
+# Backlogs larger than this are indexed for lines first and for levels afterwards
+LEVELS_INLINE_BYTES = 8 * 1024 * 1024
+SAVE_EVERY_BYTES = 64 * 1024 * 1024
+
+INDEX_VERSION = 1
+_MAGIC = b"ECLOGIDX"
+_FINGERPRINT_BYTES = 4096
+
+# Header written by logger_helper: "2025-11-06 12:00:00,123 - eCan - INFO - message".
+# Anchored on the preceding newline so it runs over a whole block at C speed;
+# lines without such a header (tracebacks, wrapped output) have no level.
+_LEVEL_RE = re.compile(rb"\n\d{4}-\d\d-\d\d [\d:,.]{12} - [^ \n]+ - ([A-Z]+) - ")
+_LEVEL_NAMES = {level.encode(): level for level in LEVELS}
+
+Progress = Callable[[int, int], None]
+
+
+class IndexUpdate(NamedTuple):
+    reset: bool  # the file was rotated or truncated and has been re-indexed from the start
+    lines: int  # lines added to the index by this call
+
+
+class SearchPattern(NamedTuple):
+    regex: "re.Pattern[bytes]"
+    fold: bool  # match against the lower-cased text
+
+
+def compile_pattern(text: str, regex: bool = True, ignore_case: bool = True) -> SearchPattern:
+    """Compile a search pattern for LogIndex.search(); raises re.error for an invalid regex."""
+    if not regex:
+        # re.IGNORECASE disables the literal-prefix scan and is ~10x slower on
+        # bytes; lower-casing both sides keeps plain-text search at C speed
+        pattern = re.escape(text.encode("utf-8").lower() if ignore_case else text.encode("utf-8"))
+        return SearchPattern(re.compile(pattern), ignore_case)
+    return SearchPattern(re.compile(text.encode("utf-8"), re.IGNORECASE if ignore_case else 0), False)
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", "replace").rstrip("\r")
+
+
+def _line_level(raw: bytes) -> Optional[str]:
+    match = _LEVEL_RE.match(b"\n" + raw)
+    return _LEVEL_NAMES.get(match.group(1)) if match else None
+
+
+class LogIndex:
+    """Block index over one log file, with per-level line counts and incremental tailing."""
+
+    def __init__(self, path: str, index_dir: Optional[str] = None, block_bytes: int = BLOCK_BYTES):
+        self.path = os.path.abspath(path)
+        self.index_dir = index_dir or os.path.join(os.path.dirname(self.path), ".logindex")
+        self.block_bytes = block_bytes
+        self.levels_inline_bytes = LEVELS_INLINE_BYTES
+        self.reused = False  # open() picked up a saved index
+        self.generation = 0  # bumped whenever the index is rebuilt from scratch
+        self._lock = threading.RLock()
+        self._saved_size = -1
+        self._reset()
+
+    def _reset(self):
+        self._offsets = array("q")  # byte offset of each block
+        self._line_starts = array("q")  # number of the first line of each block
+        self._level_starts: Dict[str, array] = {level: array("q") for level in LEVELS}
+        self._level_totals = dict.fromkeys(LEVELS, 0)
+        self._level_blocks = 0  # blocks with an entry in _level_starts
+        self._level_size = 0  # levels are counted for bytes [0, _level_size)
+        self.line_count = 0
+        self.indexed_size = 0  # always just past a newline; a partial last line waits for its newline
+        self._ino = None
+        self._fingerprint = ""
+        self._fingerprint_len = 0
+        self.generation += 1
+
+    @property
+    def index_path(self) -> str:
+        digest = hashlib.sha1(self.path.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.index_dir, f"{os.path.basename(self.path)}.{digest}.idx")
+
+    @property
+    def levels_complete(self) -> bool:
+        return self._level_size == self.indexed_size
+
+    # ==================== Building ====================
+
+    def open(self, progress: Optional[Progress] = None, should_stop: Optional[Callable[[], bool]] = None) -> "LogIndex":
+        """Load the saved index if it still matches the file, then index whatever was appended since."""
+        with self._lock:
+            self.reused = self._load()
+            if not self.reused:
+                self._reset()
+        self.refresh(progress, should_stop)
+        if self.indexed_size != self._saved_size:
+            self.save()
+        return self
+
+    def refresh(self, progress: Optional[Progress] = None,
+                should_stop: Optional[Callable[[], bool]] = None) -> IndexUpdate:
+        """Index bytes appended since the last call; re-index from scratch after rotation or truncation."""
+        try:
+            st = os.stat(self.path)
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            # Between the rename and the re-create of a rotation
+            return IndexUpdate(False, 0)
+        with f:
+            reset = False
+            with self._lock:
+                if self._ino is not None and not self._same_file(st, f):
+                    logger.info(f"[LogIndex] {os.path.basename(self.path)} was rotated or truncated, re-indexing")
+                    self._reset()
+                    reset = True
+                self._ino = st.st_ino
+                before = self.line_count
+            self._index_from(f, st.st_size, progress, should_stop)
+            with self._lock:
+                if self._fingerprint_len < min(self.indexed_size, _FINGERPRINT_BYTES):
+                    self._fingerprint_len = min(self.indexed_size, _FINGERPRINT_BYTES)
+                    self._fingerprint = self._hash_head(f, self._fingerprint_len)
+                added = self.line_count - before
+        if self.indexed_size - self._saved_size >= SAVE_EVERY_BYTES:
+            self.save()
+        return IndexUpdate(reset, added)
+
+    def _same_file(self, st: os.stat_result, f) -> bool:
+        if st.st_ino != self._ino or st.st_size < self.indexed_size:
+            return False
+        if not self._fingerprint_len:
+            return True
+        return self._hash_head(f, self._fingerprint_len) == self._fingerprint
+
+    @staticmethod
+    def _hash_head(f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+    def _index_from(self, f, size: int, progress: Optional[Progress], should_stop):
+        pos = self.indexed_size
+        with_levels = self.levels_complete and size - pos <= self.levels_inline_bytes
+        while pos < size:
+            if should_stop and should_stop():
+                return
+            f.seek(pos)
+            chunk = f.read(min(READ_CHUNK, size - pos))
+            cut = chunk.rfind(b"\n")
+            while cut < 0 and pos + len(chunk) < size:
+                # A line longer than the read size
+                more = f.read(min(READ_CHUNK, size - pos - len(chunk)))
+                if not more:
+                    break
+                chunk += more
+                cut = chunk.rfind(b"\n")
+            if cut < 0:
+                return
+            with self._lock:
+                self._index_data(b"\n" + chunk[:cut + 1], pos, with_levels)
+            pos += cut + 1
+            if progress:
+                progress(pos, size)
+
+    def _index_data(self, buf: bytes, offset: int, with_levels: bool):
+        """Index complete lines buf[1:] found at file `offset`; buf[0] is the newline that ends the previous line."""
+        i, n = 1, len(buf)
+        while i < n:
+            pos = offset + i - 1
+            if not self._offsets or pos - self._offsets[-1] >= self.block_bytes:
+                self._offsets.append(pos)
+                self._line_starts.append(self.line_count)
+                if with_levels:
+                    self._start_level_block()
+            end = i + self.block_bytes - (pos - self._offsets[-1])
+            if end >= n:
+                end = n
+            else:
+                cut = buf.rfind(b"\n", i, end)
+                end = cut + 1 if cut >= i else buf.index(b"\n", end) + 1
+            self.line_count += buf.count(b"\n", i, end)
+            if with_levels:
+                self._count_levels(buf, i - 1, end)
+            i = end
+        self.indexed_size = offset + n - 1
+        if with_levels:
+            self._level_size = self.indexed_size
+
+    def _start_level_block(self):
+        for level in LEVELS:
+            self._level_starts[level].append(self._level_totals[level])
+        self._level_blocks += 1
+
+    def _count_levels(self, buf: bytes, start: int, end: int):
+        for name, count in Counter(_LEVEL_RE.findall(buf, start, end)).items():
+            level = _LEVEL_NAMES.get(name)
+            if level:
+                self._level_totals[level] += count
+
+    def build_levels(self, progress: Optional[Progress] = None, should_stop: Optional[Callable[[], bool]] = None,
+                     max_bytes: Optional[int] = None) -> bool:
+        """Count levels for the part of the file indexed without them; returns True once complete."""
+        done = 0
+        while True:
+            with self._lock:
+                if self.levels_complete:
+                    if done:
+                        self.save()
+                    return True
+                if (should_stop and should_stop()) or (max_bytes is not None and done >= max_bytes):
+                    return False
+                generation = self.generation
+                start = self._level_size
+                first = end_block = self._level_blocks
+                while end_block < len(self._offsets) and self._offsets[end_block] - start < READ_CHUNK:
+                    end_block += 1
+                end = self._offsets[end_block] if end_block < len(self._offsets) else self.indexed_size
+                block_starts = list(self._offsets[first:end_block])
+            with open(self.path, "rb") as f:
+                f.seek(max(0, start - 1))
+                buf = f.read(end - max(0, start - 1))
+            if start == 0:
+                buf = b"\n" + buf
+            with self._lock:
+                if generation != self.generation:
+                    continue
+                # buf[j] is file offset start - 1 + j, so [x, y) is counted as buf[x - start: y - start + 1]
+                cursor = start
+                for block_start in block_starts:
+                    self._count_levels(buf, cursor - start, block_start - start + 1)
+                    self._start_level_block()
+                    cursor = block_start
+                self._count_levels(buf, cursor - start, end - start + 1)
+                self._level_size = end
+            done += end - start
+            if progress:
+                progress(end, self.indexed_size)
+
+    # ==================== Reading ====================
+
+    def _read(self, start: int, end: int) -> bytes:
+        # Opened per read: a handle held open would make the log handler's rename fail on Windows
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _block_end(self, block: int) -> int:
+        return self._offsets[block + 1] if block + 1 < len(self._offsets) else self.indexed_size
+
+    def read_lines(self, start: int, count: int) -> List[str]:
+        """Lines [start, start + count) of the indexed part of the file."""
+        with self._lock:
+            start, stop = max(0, start), min(self.line_count, start + count)
+            if start >= stop:
+                return []
+            first_block = bisect_right(self._line_starts, start) - 1
+            last_block = bisect_right(self._line_starts, stop - 1) - 1
+            data = self._read(self._offsets[first_block], self._block_end(last_block))
+            first_line = self._line_starts[first_block]
+        return [_decode(raw) for raw in data.split(b"\n")[start - first_line:stop - first_line]]
+
+    def read_line_numbers(self, line_numbers: Sequence[int]) -> List[str]:
+        """The lines with the given (ascending) numbers, reading each block they fall in once."""
+        result = []
+        with self._lock:
+            i = 0
+            while i < len(line_numbers):
+                if not 0 <= line_numbers[i] < self.line_count:
+                    result.append("")
+                    i += 1
+                    continue
+                block = bisect_right(self._line_starts, line_numbers[i]) - 1
+                first_line = self._line_starts[block]
+                end_line = self._line_starts[block + 1] if block + 1 < len(self._offsets) else self.line_count
+                lines = self._read(self._offsets[block], self._block_end(block)).split(b"\n")
+                while i < len(line_numbers) and first_line <= line_numbers[i] < end_line:
+                    result.append(_decode(lines[line_numbers[i] - first_line]))
+                    i += 1
+        return result
+
+    def level_count(self, level: str) -> int:
+        """Lines of `level` in the part of the file the level pass has covered."""
+        with self._lock:
+            return self._level_totals[level]
+
+    def read_level_lines(self, level: str, start: int, count: int) -> List[Tuple[int, str]]:
+        """(line number, text) of the `level` lines ranked [start, start + count)."""
+        result = []
+        with self._lock:
+            starts = self._level_starts[level]
+            rank, stop = max(0, start), min(self._level_totals[level], start + count)
+            visited = None
+            while rank < stop:
+                block = bisect_right(starts, rank, 0, self._level_blocks) - 1
+                if (block, rank) == visited:
+                    break  # counts disagree with the content (file replaced under us); stop rather than spin
+                visited = (block, rank)
+                data = self._read(self._offsets[block], min(self._block_end(block), self._level_size))
+                seen, line_no = starts[block], self._line_starts[block]
+                for raw in data.split(b"\n")[:-1]:
+                    if _line_level(raw) == level:
+                        if seen >= rank:
+                            result.append((line_no, _decode(raw)))
+                            rank += 1
+                            if rank >= stop:
+                                break
+                        seen += 1
+                    line_no += 1
+        return result
+
+    def search(self, pattern: SearchPattern, start_line: int = 0, level: Optional[str] = None,
+               should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[List[int], int]]:
+        """
+        Scan from `start_line` to the end of the index for lines matching `pattern`.
+
+        Yields (matching line numbers, next line to scan) once per chunk read, so
+        callers can show results as they arrive, stop at any point, and resume
+        from the last next-line after the file has grown.
+        """
+        line = max(0, start_line)
+        while not (should_stop and should_stop()):
+            with self._lock:
+                if line >= self.line_count:
+                    return
+                generation = self.generation
+                first_block = last_block = bisect_right(self._line_starts, line) - 1
+                while (last_block + 1 < len(self._offsets)
+                       and self._offsets[last_block + 1] - self._offsets[first_block] < READ_CHUNK):
+                    last_block += 1
+                start, end = self._offsets[first_block], self._block_end(last_block)
+                current = self._line_starts[first_block]
+                next_line = self._line_starts[last_block + 1] if last_block + 1 < len(self._offsets) else self.line_count
+            data = self._read(start, end)
+            if generation != self.generation:
+                return
+            haystack = data.lower() if pattern.fold else data
+            hits, pos = [], 0
+            while pos < len(data):
+                match = pattern.regex.search(haystack, pos)
+                if not match:
+                    break
+                current += data.count(b"\n", pos, match.start())
+                line_start = data.rfind(b"\n", 0, match.start()) + 1
+                line_end = data.find(b"\n", match.start())
+                if line_end < 0:
+                    line_end = len(data)
+                if current >= line and (level is None or _line_level(data[line_start:line_end]) == level):
+                    hits.append(current)
+                pos = line_end + 1
+                current += 1
+            line = next_line
+            yield hits, next_line
+
+    # ==================== Persistence ====================
+
+    def save(self):
+        """Write the index next to the log (best effort)."""
+        with self._lock:
+            meta = {
+                "version": INDEX_VERSION,
+                "path": self.path,
+                "block_bytes": self.block_bytes,
+                "byteorder": sys.byteorder,
+                "ino": self._ino,
+                "fingerprint": self._fingerprint,
+                "fingerprint_len": self._fingerprint_len,
+                "indexed_size": self.indexed_size,
+                "line_count": self.line_count,
+                "blocks": len(self._offsets),
+                "level_blocks": self._level_blocks,
+                "level_size": self._level_size,
+                "level_totals": self._level_totals,
+            }
+            parts = [self._offsets.tobytes(), self._line_starts.tobytes()]
+            parts += [self._level_starts[level].tobytes() for level in LEVELS]
+            size = self.indexed_size
+        header = json.dumps(meta).encode("utf-8")
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC + struct.pack("<I", len(header)) + header)
+                for part in parts:
+                    f.write(part)
+            os.replace(tmp_path, self.index_path)
+            self._saved_size = size
+        except OSError as e:
+            logger.warning(f"[LogIndex] Could not save index for {os.path.basename(self.path)}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _load(self) -> bool:
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            if data[:len(_MAGIC)] != _MAGIC:
+                return False
+            (header_len,) = struct.unpack_from("<I", data, len(_MAGIC))
+            pos = len(_MAGIC) + 4
+            meta = json.loads(data[pos:pos + header_len])
+            pos += header_len
+            if (meta["version"] != INDEX_VERSION or meta["path"] != self.path
+                    or meta["block_bytes"] != self.block_bytes or meta["byteorder"] != sys.byteorder):
+                return False
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                if (st.st_ino != meta["ino"] or st.st_size < meta["indexed_size"]
+                        or self._hash_head(f, meta["fingerprint_len"]) != meta["fingerprint"]):
+                    return False
+
+            def take(count: int) -> array:
+                nonlocal pos
+                values = array("q")
+                values.frombytes(data[pos:pos + count * values.itemsize])
+                pos += count * values.itemsize
+                if len(values) != count:
+                    raise ValueError("truncated index")
+                return values
+
+            offsets, line_starts = take(meta["blocks"]), take(meta["blocks"])
+            level_starts = {level: take(meta["level_blocks"]) for level in LEVELS}
+        except (OSError, ValueError, KeyError, struct.error):
+            return False
+
+        self._reset()
+        self._offsets, self._line_starts, self._level_starts = offsets, line_starts, level_starts
+        self._level_totals = {level: meta["level_totals"][level] for level in LEVELS}
+        self._level_blocks = meta["level_blocks"]
+        self._level_size = meta["level_size"]
+        self.line_count = meta["line_count"]
+        self.indexed_size = self._saved_size = meta["indexed_size"]
+        self._ino = meta["ino"]
+        self._fingerprint = meta["fingerprint"]
+        self._fingerprint_len = meta["fingerprint_len"]
+        return True
+
+    def close(self):
+        if self.indexed_size != self._saved_size:
+            self.save()
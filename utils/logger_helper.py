@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import atexit
 import logging
 import colorlog
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
 import sys
 import signal
 import io
+import threading
+import time
 from config.constants import APP_NAME
 from config.app_info import app_info
 import traceback
@@ -22,6 +26,194 @@ def trace(self, message, *args, **kws):
 logging.Logger.trace = trace
 # ====== END ======
 
+# Log calls only enqueue records; a single writer thread formats and writes them.
+# ECAN_LOG_ASYNC=0 writes from the calling thread as before.
+LOG_ASYNC = os.getenv("ECAN_LOG_ASYNC", "1") != "0"
+LOG_QUEUE_SIZE = int(os.getenv("ECAN_LOG_QUEUE_SIZE", "10000"))
+# Full queue: "drop" discards records below WARNING (counted and reported), "block" waits for space.
+# WARNING and above always wait, so errors are never lost.
+LOG_OVERFLOW = os.getenv("ECAN_LOG_OVERFLOW", "drop")
+LOG_BATCH_SIZE = 512
+LOG_LEVEL = logging.getLevelName(os.getenv("ECAN_LOG_LEVEL", "DEBUG").upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.DEBUG
+
+
+class _BatchFlushMixin:
+    """While owned by a BatchingQueueListener, skip the per-record flush; the listener flushes per batch."""
+    batch_flush = False
+
+    def flush(self):
+        if not self.batch_flush:
+            self.flush_batch()
+
+    def flush_batch(self):
+        try:
+            super().flush()
+        except (OSError, ValueError):
+            # Stream closed or gone (e.g. stdout at interpreter exit); keep the writer alive
+            pass
+
+
+class BatchedStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    # Set on the first write that fails with a closed or invalid descriptor
+    stream_closed = False
+
+    def emit(self, record):
+        # The writer can outlive the console stream (closed stdout at interpreter exit)
+        if self.stream_closed or getattr(self.stream, "closed", False):
+            return
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            self.stream.write(msg + self.terminator)
+            self.flush()
+        except (OSError, ValueError):
+            # e.g. "[Errno 9] Bad file descriptor": stop writing here instead of reporting every record
+            self.stream_closed = True
+
+    def setStream(self, stream):
+        self.stream_closed = False
+        return super().setStream(stream)
+
+
+class BatchedRotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+    pass
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue that drops low-priority records instead of blocking when full."""
+
+    def __init__(self, log_queue, overflow=LOG_OVERFLOW):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Render only what cannot safely wait for the writer thread: %-args and
+        # tracebacks. Level/time formatting happens in the writer.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.overflow == "block" or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def take_dropped(self) -> int:
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that drains the queue in batches and flushes its handlers once per batch."""
+
+    def __init__(self, log_queue, *handlers, queue_handler=None, batch_size=LOG_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.batch_size = batch_size
+        self.dropped_total = 0
+
+    def start(self):
+        for handler in self.handlers:
+            if isinstance(handler, _BatchFlushMixin):
+                handler.batch_flush = True
+        super().start()
+        self._thread.name = "LogWriter"
+
+    def enqueue_sentinel(self):
+        # The base class uses put_nowait, which fails on a full bounded queue
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        super().stop()
+        for handler in self.handlers:
+            if isinstance(handler, _BatchFlushMixin):
+                handler.batch_flush = False
+                handler.flush()
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+            self._report_dropped()
+            for handler in self.handlers:
+                if isinstance(handler, _BatchFlushMixin):
+                    handler.flush_batch()
+                else:
+                    try:
+                        handler.flush()
+                    except Exception:
+                        pass
+            for _ in batch:
+                q.task_done()
+            if stop:
+                return
+
+    def _report_dropped(self):
+        dropped = self.queue_handler.take_dropped() if self.queue_handler else 0
+        if dropped:
+            self.dropped_total += dropped
+            self.handle(logging.makeLogRecord({
+                "name": APP_NAME, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"[Logger] ⚠️ {dropped} log records dropped (queue full)",
+            }))
+
+
+def start_queued_logging(target_logger, handlers, queue_size=LOG_QUEUE_SIZE, overflow=LOG_OVERFLOW):
+    """Route target_logger's records through a bounded queue to `handlers` on one writer thread."""
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, overflow)
+    listener = BatchingQueueListener(log_queue, *handlers, queue_handler=queue_handler)
+    listener.start()
+    target_logger.addHandler(queue_handler)
+    return queue_handler, listener
+
+
+class LazyLogArg:
+    """Log argument rendered only if the record is actually emitted."""
+    __slots__ = ("_fn", "_args", "_kwargs")
+
+    def __init__(self, fn, *args, **kwargs):
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def __str__(self):
+        return str(self._fn(*self._args, **self._kwargs))
+
+
+def lazy(fn, *args, **kwargs) -> LazyLogArg:
+    """Defer an expensive log argument: logger.debug("state:", lazy(json.dumps, state))"""
+    return LazyLogArg(fn, *args, **kwargs)
+
 
 class LoggerHelper:
     _instance = None
@@ -44,7 +236,7 @@ class LoggerHelper:
         else:
             print(f"runlogs {runlogs_dir} directory is existed")
 
-        self.setup(APP_NAME, appdata_path + "/runlogs/" + APP_NAME + ".log", logging.DEBUG)
+        self.setup(APP_NAME, appdata_path + "/runlogs/" + APP_NAME + ".log", LOG_LEVEL)
 
         # 初始化崩溃日志功能
         self._setup_crash_logging()
@@ -53,8 +245,11 @@ class LoggerHelper:
         self.logger = logging.getLogger(log_name)
         self.logger.setLevel(level)
         self.logger.propagate = False
+        self._handlers = []
+        self._queue_handler = None
+        self._listener = None
 
-        if not any(isinstance(h, logging.StreamHandler) for h in self.logger.handlers):
+        if not self.logger.handlers:
             console_formatter = colorlog.ColoredFormatter(
                 "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s",
                 log_colors={
@@ -76,23 +271,22 @@ class LoggerHelper:
                 if sys.platform == "win32" and hasattr(sys.stdout, 'buffer'):
                     # Windows 系统需要特殊处理 UTF-8 编码
                     try:
-                        console_handler = logging.StreamHandler(
+                        console_handler = BatchedStreamHandler(
                             io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
                         )
                     except (AttributeError, OSError):
                         # 如果失败，使用标准处理器
-                        console_handler = logging.StreamHandler()
+                        console_handler = BatchedStreamHandler()
                 else:
-                    console_handler = logging.StreamHandler()
+                    console_handler = BatchedStreamHandler()
 
                 console_handler.setFormatter(console_formatter)
-                self.logger.addHandler(console_handler)
+                self._handlers.append(console_handler)
             # 如果 sys.stdout 为 None（PyInstaller windowed 模式），跳过控制台处理器
 
-        if not any(isinstance(h, RotatingFileHandler) for h in self.logger.handlers):
             file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             # 确保文件处理器使用 UTF-8 编码
-            file_handler = RotatingFileHandler(
+            file_handler = BatchedRotatingFileHandler(
                 log_file,
                 maxBytes=1024 * 1024 * 10,
                 backupCount=5,
@@ -100,7 +294,59 @@ class LoggerHelper:
                 errors='replace'
             )
             file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+            self._handlers.append(file_handler)
+
+            if LOG_ASYNC:
+                self._queue_handler, self._listener = start_queued_logging(self.logger, self._handlers)
+                # Stop the writer before atexit callbacks run: some of them (e.g. console
+                # wrappers) close stdout, and the writer must not outlive the stream
+                # (threading._register_atexit is private: fall back to atexit without it)
+                if hasattr(threading, "_register_atexit"):
+                    try:
+                        threading._register_atexit(self.shutdown)
+                    except RuntimeError:  # interpreter shutdown already started
+                        atexit.register(self.shutdown)
+                else:
+                    atexit.register(self.shutdown)
+            else:
+                for handler in self._handlers:
+                    self.logger.addHandler(handler)
+
+    def flush(self, timeout: float = 2.0):
+        """Wait (up to `timeout`) for queued records to be written, then flush the handlers."""
+        if self._queue_handler is not None:
+            deadline = time.monotonic() + timeout
+            while self._queue_handler.queue.unfinished_tasks and time.monotonic() < deadline:
+                time.sleep(0.005)
+        for handler in self._handlers:
+            handler.flush_batch() if isinstance(handler, _BatchFlushMixin) else handler.flush()
+
+    def shutdown(self):
+        """Drain the queue, stop the writer thread and log synchronously from then on."""
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        # Swap in the direct handlers in one step, so no record is lost or written twice
+        # while the queue drains
+        self.logger.handlers = [h for h in self.logger.handlers if h is not self._queue_handler] + self._handlers
+        listener.stop()
+
+    def get_log_stats(self) -> dict:
+        """Queue depth and dropped-record counts of the logging pipeline."""
+        if self._queue_handler is None:
+            return {"async": False}
+        log_queue = self._queue_handler.queue
+        return {
+            "async": self._listener is not None,
+            "queued": log_queue.qsize(),
+            "capacity": log_queue.maxsize,
+            "dropped": (self._listener.dropped_total if self._listener else 0) + self._queue_handler.dropped,
+            "overflow": self._queue_handler.overflow,
+        }
+
+    def is_enabled_for(self, level) -> bool:
+        """Guard for blocks that build expensive log output: `if logger.is_enabled_for(logging.DEBUG): ...`"""
+        return self.logger.isEnabledFor(level)
 
     def _safe_encode_message(self, message):
         """Safely encode message, handle emoji and special characters"""
@@ -194,14 +440,10 @@ class LoggerHelper:
         environment = 'production' if getattr(sys, 'frozen', False) else 'development'
 
         # Get log file path
-        log_path = getattr(self, 'logger', None)
-        if log_path and hasattr(log_path, 'handlers'):
-            for handler in log_path.handlers:
-                if isinstance(handler, RotatingFileHandler):
-                    log_file = handler.baseFilename
-                    break
-            else:
-                log_file = "Unknown"
+        for handler in getattr(self, '_handlers', []):
+            if isinstance(handler, RotatingFileHandler):
+                log_file = handler.baseFilename
+                break
         else:
             log_file = "Unknown"
 
@@ -289,9 +531,8 @@ class LoggerHelper:
             # Log the crash
             self.critical(f"FATAL CRASH: {signal_name} on {sys.platform}")
 
-            # Force flush all handlers
-            for handler in self.logger.handlers:
-                handler.flush()
+            # Force the writer thread to drain and flush all handlers
+            self.flush(timeout=1.0)
 
             # Write to crash file as backup
             try:
@@ -349,6 +590,11 @@ def get_traceback(e, eType="Error"):
     return ex_stat
 
 
+def lazy_truncate(data, max_length: int = 500) -> LazyLogArg:
+    """truncate_for_log() deferred until the log line is emitted."""
+    return LazyLogArg(truncate_for_log, data, max_length)
+
+
 def truncate_for_log(data, max_length: int = 500, suffix: str = "...") -> str:
     """
     Truncate data for logging to avoid excessively long log entries.